@@ -1,4 +1,5 @@
 ASSETS_TRACKING_SERVICE_LOG_LEVEL="INFO"
+# ASSETS_TRACKING_SERVICE_METRICS_OUTPUT_PATH="./exports/metrics.prom"  # optional
 
 ASSETS_TRACKING_SERVICE_DB_DSN="postgresql://[username]:[password]@[host]/[database]"
 
@@ -11,6 +12,7 @@ ASSETS_TRACKING_SERVICE_ENABLE_PROVIDER_RVDAS="true"
 
 ASSETS_TRACKING_SERVICE_ENABLE_EXPORTER_ARCGIS="true"
 ASSETS_TRACKING_SERVICE_ENABLE_EXPORTER_DATA_CATALOGUE="true"
+ASSETS_TRACKING_SERVICE_ENABLE_EXPORTER_VECTOR_TILES="false"
 
 ASSETS_TRACKING_SERVICE_PROVIDER_GEOTAB_USERNAME="op://Infrastructure/Assets Tracking Service - Geotab User/username"
 ASSETS_TRACKING_SERVICE_PROVIDER_GEOTAB_PASSWORD="op://Infrastructure/Assets Tracking Service - Geotab User/password"
@@ -28,6 +30,8 @@ ASSETS_TRACKING_SERVICE_EXPORTER_DATA_CATALOGUE_OUTPUT_PATH="./exports"  # set t
 ASSETS_TRACKING_SERVICE_EXPORTER_DATA_CATALOGUE_ADMIN_METADATA_ENCRYPTION_KEY_PRIVATE="op://Shared/MAGIC administrative metadata encryption key/private-jwk-escaped"
 ASSETS_TRACKING_SERVICE_EXPORTER_DATA_CATALOGUE_ADMIN_METADATA_SIGNING_KEY_PRIVATE="op://Shared/MAGIC administrative metadata signing key/private-jwk-escaped"
 
+ASSETS_TRACKING_SERVICE_EXPORTER_VECTOR_TILES_OUTPUT_PATH="./exports/tiles/assets.mbtiles"  # set to local file
+
 ASSETS_TRACKING_SERVICE_EXPORTER_ARCGIS_USERNAME="op://Infrastructure/vcadxkix3qwguf4trgspkcdxr4/username"
 ASSETS_TRACKING_SERVICE_EXPORTER_ARCGIS_PASSWORD="op://Infrastructure/vcadxkix3qwguf4trgspkcdxr4/password"
 ASSETS_TRACKING_SERVICE_EXPORTER_ARCGIS_BASE_ENDPOINT_PORTAL="op://Infrastructure/vcadxkix3qwguf4trgspkcdxr4/Endpoints/Portal base endpoint"
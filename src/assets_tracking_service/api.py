@@ -0,0 +1,713 @@
+import base64
+import gzip
+import logging
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import uvicorn
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+from psycopg.sql import SQL, Composed, Placeholder
+from psycopg_pool import AsyncConnectionPool
+from starlette.applications import Starlette
+from starlette.datastructures import QueryParams
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from ulid import ULID
+from ulid import parse as ulid_parse
+
+from assets_tracking_service import json_backend
+from assets_tracking_service.notifications import PositionsBroadcaster, Subscriber, TooManySubscribersError
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+CONFORMANCE = [
+    "http://www.opengis.net/spec/ogcapi-features-1/1.0/conf/core",
+    "http://www.opengis.net/spec/ogcapi-features-1/1.0/conf/geojson",
+]
+CRS84 = "http://www.opengis.net/def/crs/OGC/1.3/CRS84"
+LIMIT_DEFAULT = 100
+LIMIT_MAX = 10_000
+
+# responses smaller than this aren't worth compressing
+_COMPRESS_MIN_SIZE = 500
+_CACHE_SIZE = 256
+# seconds between comments sent to idle stream clients to keep connections (and any proxies) open
+_STREAM_KEEPALIVE = 15.0
+# milliseconds stream clients should wait before reconnecting
+_STREAM_RETRY = 5000
+
+# same fields as the `v_latest_assets_pos_viz` view, with compact names
+_STREAM_QUERY = SQL("""
+    SELECT json_build_object(
+        'asset_id', asset_id,
+        'time_utc', time_utc,
+        'lon', lon_dd,
+        'lat', lat_dd,
+        'speed_ms', speed_ms,
+        'heading_d', heading_d
+    )::text
+    FROM public.v_latest_assets_pos_viz
+    WHERE {condition}
+    ORDER BY asset_id;
+""")
+
+
+@dataclass(frozen=True)
+class Collection:
+    """
+    Feature collection backed by a table or view.
+
+    Features are ordered by time and then ID, which together form a unique key used for keyset pagination.
+    """
+
+    id: str
+    title: str
+    description: str
+    source: SQL
+    geom: SQL
+    feature_id: SQL
+    key_id: SQL
+    key_id_param: SQL
+    feature: SQL
+
+
+COLLECTIONS = {
+    collection.id: collection
+    for collection in [
+        Collection(
+            id="latest_positions",
+            title="Latest asset positions",
+            description="Last known position for each asset.",
+            source=SQL("public.v_latest_assets_pos AS c"),
+            geom=SQL("c.geom_2d"),
+            feature_id=SQL("c.position_id"),
+            key_id=SQL("c.position_id"),
+            key_id_param=SQL("%(key_id)s"),
+            feature=SQL("""
+                json_build_object(
+                    'type', 'Feature',
+                    'id', c.position_id,
+                    'geometry', ST_ASGEOJSON(c.geom_2d)::json,
+                    'properties', json_build_object(
+                        'asset_id', c.asset_id,
+                        'position_id', c.position_id,
+                        'name', c.asset_pref_label,
+                        'type_code', c.asset_type_code,
+                        'type_label', c.asset_type_label,
+                        'time_utc', c.time_utc,
+                        'last_fetched_utc', c.last_fetched_utc,
+                        'lat_dd', c.lat_dd,
+                        'lon_dd', c.lon_dd,
+                        'lat_ddm', c.lat_ddm,
+                        'lon_ddm', c.lon_ddm,
+                        'elv_m', c.elv_m,
+                        'elv_ft', c.elv_ft,
+                        'speed_ms', c.velocity_ms,
+                        'speed_kmh', c.velocity_kmh,
+                        'speed_kn', c.velocity_kn,
+                        'heading_d', c.heading_d
+                    )
+                )
+            """),
+        ),
+        Collection(
+            id="positions",
+            title="Asset positions",
+            description="All known positions for all assets.",
+            source=SQL("public.position AS c"),
+            geom=SQL("c.geom_2d"),
+            feature_id=SQL("c.id_ulid"),
+            key_id=SQL("c.id"),
+            key_id_param=SQL("ulid_to_uuid(%(key_id)s)"),
+            feature=SQL("""
+                json_build_object(
+                    'type', 'Feature',
+                    'id', c.id_ulid,
+                    'geometry', ST_ASGEOJSON(
+                        CASE WHEN c.geom_dimensions = 2 THEN c.geom_2d ELSE c.geom END
+                    )::json,
+                    'properties', json_build_object(
+                        'asset_id', c.asset_id_ulid,
+                        'position_id', c.id_ulid,
+                        'time_utc', c.time_utc,
+                        'speed_ms', c.velocity_ms,
+                        'heading_d', c.heading
+                    )
+                )
+            """),
+        ),
+    ]
+}
+
+
+class ApiError(Exception):
+    """Raised for errors that should be returned to API clients as an OGC API exception response."""
+
+    def __init__(self, status: int, code: str, description: str) -> None:
+        super().__init__(description)
+        self.status = status
+        self.code = code
+        self.description = description
+
+
+@dataclass(kw_only=True)
+class ItemsQuery:
+    """Parsed and validated parameters for a collection items request."""
+
+    limit: int = LIMIT_DEFAULT
+    bbox: tuple[float, float, float, float] | None = None
+    start: datetime | None = None
+    end: datetime | None = None
+    instant: datetime | None = None
+    after: tuple[datetime, str] | None = None
+
+    @staticmethod
+    def _parse_limit(value: str) -> int:
+        """Parse limit, capping values above the maximum (rather than returning an error) as per the standard."""
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            msg = f"Invalid limit: [{value}]. It must be a positive integer."
+            raise ApiError(400, "InvalidParameterValue", msg)
+        return min(limit, LIMIT_MAX)
+
+    @staticmethod
+    def _parse_bbox(value: str) -> tuple[float, float, float, float]:
+        """Parse a 2D bounding box (min lon, min lat, max lon, max lat)."""
+        msg = f"Invalid bbox: [{value}]. It must be four numbers: min lon, min lat, max lon, max lat."
+        try:
+            bbox = tuple(float(item) for item in value.split(","))
+        except ValueError:
+            raise ApiError(400, "InvalidParameterValue", msg) from None
+        if len(bbox) != 4 or bbox[1] > bbox[3]:
+            raise ApiError(400, "InvalidParameterValue", msg)
+        return bbox[0], bbox[1], bbox[2], bbox[3]
+
+    @staticmethod
+    def _parse_datetime_value(value: str) -> datetime | None:
+        """Parse an RFC 3339 date time, or None for an open ('..' or empty) interval end."""
+        if value in ("", ".."):
+            return None
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            dt = None
+        if dt is None or dt.tzinfo is None:
+            msg = f"Invalid datetime: [{value}]. It must be an RFC 3339 date time with a timezone."
+            raise ApiError(400, "InvalidParameterValue", msg)
+        return dt
+
+    @classmethod
+    def _parse_datetime(cls, value: str) -> tuple[datetime | None, datetime | None, datetime | None]:
+        """Parse a date time instant or interval as (start, end, instant)."""
+        if "/" not in value:
+            instant = cls._parse_datetime_value(value)
+            if instant is None:
+                msg = f"Invalid datetime: [{value}]. It must be a date time or interval."
+                raise ApiError(400, "InvalidParameterValue", msg)
+            return None, None, instant
+
+        start, end = (cls._parse_datetime_value(item) for item in value.split("/", maxsplit=1))
+        if start is not None and end is not None and start > end:
+            msg = f"Invalid datetime: [{value}]. Interval start must not be after its end."
+            raise ApiError(400, "InvalidParameterValue", msg)
+        return start, end, None
+
+    @classmethod
+    def from_query_params(cls, params: QueryParams) -> "ItemsQuery":
+        """Parse query parameters."""
+        query = cls()
+        if "limit" in params:
+            query.limit = cls._parse_limit(params["limit"])
+        if "bbox" in params:
+            query.bbox = cls._parse_bbox(params["bbox"])
+        if "datetime" in params:
+            query.start, query.end, query.instant = cls._parse_datetime(params["datetime"])
+        if "cursor" in params:
+            query.after = decode_cursor(params["cursor"])
+        return query
+
+    def to_sql(self, collection: Collection) -> tuple[Composed, dict]:
+        """
+        Build query for a page of features as (feature, key_time, key_id) rows.
+
+        One more feature than the limit is selected to determine if there is a next page. Bounding boxes crossing the
+        antimeridian (min lon greater than max lon) are split into two envelopes.
+
+        Inclusive time intervals are used as per the standard.
+        """
+        conditions = [SQL("TRUE")]
+        params: dict = {"limit": self.limit + 1}
+
+        if self.bbox is not None:
+            min_x, min_y, max_x, max_y = self.bbox
+            params.update({"min_y": min_y, "max_y": max_y})
+            envelopes = [(min_x, max_x)] if min_x <= max_x else [(min_x, 180), (-180, max_x)]
+            bbox_conditions = []
+            for i, (env_min_x, env_max_x) in enumerate(envelopes):
+                params.update({f"min_x_{i}": env_min_x, f"max_x_{i}": env_max_x})
+                bbox_conditions.append(
+                    SQL("{geom} && ST_MAKEENVELOPE({min_x}, %(min_y)s, {max_x}, %(max_y)s, 4326)").format(
+                        geom=collection.geom, min_x=Placeholder(f"min_x_{i}"), max_x=Placeholder(f"max_x_{i}")
+                    )
+                )
+            conditions.append(SQL("({})").format(SQL(" OR ").join(bbox_conditions)))
+        if self.instant is not None:
+            conditions.append(SQL("c.time_utc = %(instant)s"))
+            params["instant"] = self.instant
+        if self.start is not None:
+            conditions.append(SQL("c.time_utc >= %(start)s"))
+            params["start"] = self.start
+        if self.end is not None:
+            conditions.append(SQL("c.time_utc <= %(end)s"))
+            params["end"] = self.end
+        if self.after is not None:
+            conditions.append(
+                SQL("(c.time_utc, {key_id}) > (%(after_time)s, {key_id_param})").format(
+                    key_id=collection.key_id, key_id_param=collection.key_id_param
+                )
+            )
+            params["after_time"], params["key_id"] = self.after
+
+        # noinspection PyTypeChecker
+        query = SQL("""
+            SELECT {feature} AS feature, c.time_utc AS key_time, {feature_id} AS key_id
+            FROM {source}
+            WHERE {conditions}
+            ORDER BY c.time_utc, {key_id}
+            LIMIT %(limit)s;
+        """).format(
+            feature=collection.feature,
+            feature_id=collection.feature_id,
+            source=collection.source,
+            conditions=SQL(" AND ").join(conditions),
+            key_id=collection.key_id,
+        )
+        return query, params
+
+
+def encode_cursor(key_time: datetime, key_id: str) -> str:
+    """Encode the key of the last feature in a page as an opaque token for requesting the next page."""
+    return base64.urlsafe_b64encode(json_backend.dumps([key_time.isoformat(), key_id])).decode().rstrip("=")
+
+
+def decode_cursor(value: str) -> tuple[datetime, str]:
+    """Decode a next page token."""
+    try:
+        key_time, key_id = json_backend.loads(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)))
+        return datetime.fromisoformat(key_time), str(ulid_parse(key_id))
+    except (ValueError, TypeError):
+        msg = f"Invalid cursor: [{value}]."
+        raise ApiError(400, "InvalidParameterValue", msg) from None
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Choose a content encoding from an `Accept-Encoding` header.
+
+    Brotli is preferred where available (via the optional `api` extra) as it compresses JSON better than gzip.
+    """
+    if not accept_encoding:
+        return None
+
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, q = item.strip().partition(";q=")
+        try:
+            weight = float(q) if q else 1.0
+        except ValueError:
+            weight = 0.0
+        if weight > 0:
+            accepted.add(name.strip().lower())
+
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress body using content encoding."""
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def make_etag(last_modified: datetime | None) -> str:
+    """
+    Make a weak entity tag from when data was last modified.
+
+    Weak tags are used as the same response may be sent using different content encodings.
+    """
+    if last_modified is None:
+        return 'W/"0"'
+    return f'W/"{int(last_modified.timestamp() * 1_000_000):x}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check if an `If-None-Match` header matches an entity tag, using weak comparison."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+@dataclass
+class _CachedResponse:
+    """Rendered response body, with any compressed variants, for an entity tag."""
+
+    etag: str
+    body: bytes
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    def get_body(self, encoding: str | None) -> bytes:
+        """Get body with content encoding, compressing and caching it if needed."""
+        if encoding is None:
+            return self.body
+        if encoding not in self.encoded:
+            self.encoded[encoding] = compress(self.body, encoding)
+        return self.encoded[encoding]
+
+
+class _ResponseCache:
+    """Least recently used cache of rendered responses by URL."""
+
+    def __init__(self, size: int = _CACHE_SIZE) -> None:
+        self._size = size
+        self._items: OrderedDict[str, _CachedResponse] = OrderedDict()
+
+    def get(self, key: str, etag: str) -> _CachedResponse | None:
+        """Get cached response if it's for the current entity tag."""
+        item = self._items.get(key)
+        if item is None or item.etag != etag:
+            return None
+        self._items.move_to_end(key)
+        return item
+
+    def put(self, key: str, item: _CachedResponse) -> None:
+        """Cache response, evicting the least recently used response if full."""
+        self._items[key] = item
+        self._items.move_to_end(key)
+        if len(self._items) > self._size:
+            self._items.popitem(last=False)
+
+
+def _respond(request: Request, body: bytes | _CachedResponse, media_type: str, headers: dict | None = None) -> Response:
+    """Make response, compressed if accepted by the client and worthwhile."""
+    if isinstance(body, bytes):
+        body = _CachedResponse(etag="", body=body)
+    headers = {"Vary": "Accept-Encoding", **(headers or {})}
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if len(body.body) < _COMPRESS_MIN_SIZE:
+        encoding = None
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body.get_body(encoding), media_type=media_type, headers=headers)
+
+
+async def _get_last_modified(conn: AsyncConnection) -> datetime | None:
+    """
+    Get when data was last modified.
+
+    Based on when positions were last added. Asset updates and fetches are included as the latest positions
+    collection includes asset details and when assets were last fetched.
+    """
+    cur = await conn.execute(
+        SQL("""
+            SELECT GREATEST(
+                (SELECT MAX(created_at) FROM public.position),
+                (SELECT MAX(updated_at) FROM public.asset),
+                (SELECT MAX(last_fetched_at) FROM public.asset_fetch_state)
+            );
+        """)
+    )
+    row = await cur.fetchone()
+    return row[0]
+
+
+async def _cached_response(
+    request: Request, render: Callable[[AsyncConnection], Awaitable[bytes]], media_type: str
+) -> Response:
+    """
+    Make a response for data that changes as positions are added, supporting conditional requests.
+
+    Responses have an entity tag (ETag) derived from when data was last modified. Clients sending a matching tag
+    (via `If-None-Match`) get an empty 304 response. Otherwise, rendered responses are cached by URL until data
+    changes, so repeated requests only need to query when data was last modified.
+    """
+    cache: _ResponseCache = request.app.state.cache
+    key = str(request.url)
+
+    async with request.app.state.pool.connection() as conn:
+        etag = make_etag(await _get_last_modified(conn))
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        cached = cache.get(key, etag)
+        if cached is None:
+            cached = _CachedResponse(etag=etag, body=await render(conn))
+            cache.put(key, cached)
+
+    return _respond(request, cached, media_type=media_type, headers=headers)
+
+
+def _link(href: object, rel: str, media_type: str = "application/json") -> dict:
+    """Make link object."""
+    return {"href": str(href), "rel": rel, "type": media_type}
+
+
+def _get_collection(request: Request) -> Collection:
+    """Get collection from request path."""
+    collection_id = request.path_params["collection_id"]
+    try:
+        return COLLECTIONS[collection_id]
+    except KeyError:
+        msg = f"Collection [{collection_id}] not found."
+        raise ApiError(404, "NotFound", msg) from None
+
+
+def _collection_metadata(request: Request, collection: Collection) -> dict:
+    """Make collection metadata."""
+    return {
+        "id": collection.id,
+        "title": collection.title,
+        "description": collection.description,
+        "itemType": "feature",
+        "crs": [CRS84],
+        "extent": {"spatial": {"bbox": [[-180, -90, 180, 90]], "crs": CRS84}},
+        "links": [
+            _link(request.url_for("collection", collection_id=collection.id), "self"),
+            _link(request.url_for("items", collection_id=collection.id), "items", "application/geo+json"),
+        ],
+    }
+
+
+async def landing_page(request: Request) -> Response:
+    """OGC API landing page."""
+    body = {
+        "title": "BAS Assets Tracking Service",
+        "description": "Positions of BAS assets, including ships, aircraft, and vehicles.",
+        "links": [
+            _link(request.url_for("landing_page"), "self"),
+            _link(request.url_for("conformance"), "conformance"),
+            _link(request.url_for("collections"), "data"),
+        ],
+    }
+    return _respond(request, json_backend.dumps(body), media_type="application/json")
+
+
+async def conformance(request: Request) -> Response:
+    """OGC API conformance classes."""
+    return _respond(request, json_backend.dumps({"conformsTo": CONFORMANCE}), media_type="application/json")
+
+
+async def collections(request: Request) -> Response:
+    """OGC API feature collections."""
+    body = {
+        "links": [_link(request.url_for("collections"), "self")],
+        "collections": [_collection_metadata(request, collection) for collection in COLLECTIONS.values()],
+    }
+    return _respond(request, json_backend.dumps(body), media_type="application/json")
+
+
+async def collection(request: Request) -> Response:
+    """OGC API feature collection."""
+    body = _collection_metadata(request, _get_collection(request))
+    return _respond(request, json_backend.dumps(body), media_type="application/json")
+
+
+async def items(request: Request) -> Response:
+    """
+    OGC API features in collection.
+
+    Features are returned in pages ordered by time, with a `next` link (using an opaque cursor) for the next page.
+    """
+    collection_ = _get_collection(request)
+    query = ItemsQuery.from_query_params(request.query_params)
+
+    async def render(conn: AsyncConnection) -> bytes:
+        sql, params = query.to_sql(collection_)
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await cur.execute(sql, params)
+            rows = await cur.fetchall()
+
+        links = [_link(request.url, "self", "application/geo+json")]
+        if len(rows) > query.limit:
+            rows = rows[: query.limit]
+            cursor = encode_cursor(rows[-1]["key_time"], rows[-1]["key_id"])
+            links.append(_link(request.url.include_query_params(cursor=cursor), "next", "application/geo+json"))
+
+        return json_backend.dumps(
+            {
+                "type": "FeatureCollection",
+                "features": [row["feature"] for row in rows],
+                "numberReturned": len(rows),
+                "links": links,
+            }
+        )
+
+    return await _cached_response(request, render, media_type="application/geo+json")
+
+
+async def item(request: Request) -> Response:
+    """OGC API feature."""
+    collection_ = _get_collection(request)
+    feature_id = request.path_params["feature_id"]
+    msg = f"Feature [{feature_id}] not found in collection [{collection_.id}]."
+    try:
+        feature_id = str(ulid_parse(feature_id))
+    except ValueError:
+        raise ApiError(404, "NotFound", msg) from None
+
+    async def render(conn: AsyncConnection) -> bytes:
+        # noinspection PyTypeChecker
+        sql = SQL("SELECT {feature} FROM {source} WHERE {key_id} = {key_id_param};").format(
+            feature=collection_.feature,
+            source=collection_.source,
+            key_id=collection_.key_id,
+            key_id_param=collection_.key_id_param,
+        )
+        cur = await conn.execute(sql, {"key_id": feature_id})
+        row = await cur.fetchone()
+        if row is None:
+            raise ApiError(404, "NotFound", msg)
+
+        feature = row[0]
+        feature["links"] = [
+            _link(request.url, "self", "application/geo+json"),
+            _link(request.url_for("collection", collection_id=collection_.id), "collection"),
+        ]
+        return json_backend.dumps(feature)
+
+    return await _cached_response(request, render, media_type="application/geo+json")
+
+
+async def _query_latest(pool: AsyncConnectionPool, asset_ids: list[ULID] | None) -> str:
+    """Get latest positions, for all or specific assets, as a compact JSON array."""
+    condition = SQL("TRUE") if asset_ids is None else SQL("asset_id = ANY(%(asset_ids)s)")
+    params = {} if asset_ids is None else {"asset_ids": [str(asset_id) for asset_id in asset_ids]}
+    async with pool.connection() as conn:
+        # noinspection PyTypeChecker
+        cur = await conn.execute(_STREAM_QUERY.format(condition=condition), params)
+        rows = await cur.fetchall()
+    return f"[{','.join(row[0] for row in rows)}]"
+
+
+def _sse(event: str, data: str) -> bytes:
+    """Encode server-sent event."""
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+async def stream_events(
+    broadcaster: PositionsBroadcaster, subscriber: Subscriber, keepalive: float = _STREAM_KEEPALIVE
+) -> AsyncGenerator[bytes, None]:
+    """
+    Generate server-sent events for a stream subscriber.
+
+    Clients are sent the latest position of all assets (a `snapshot` event), then the latest positions of assets as
+    they change (`positions` events). Clients that fall behind are sent a new snapshot rather than missed updates.
+    """
+    try:
+        yield f"retry: {_STREAM_RETRY}\n\n".encode()
+        yield _sse("snapshot", await broadcaster.current())
+        while True:
+            try:
+                update = await subscriber.get(timeout=keepalive)
+            except TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if update is None:
+                yield _sse("snapshot", await broadcaster.current())
+            else:
+                yield _sse("positions", update)
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+async def stream(request: Request) -> Response:
+    """
+    Live stream of latest asset positions as server-sent events.
+
+    All clients share a single database listener and cached snapshot, so each client adds negligible database load.
+    """
+    broadcaster: PositionsBroadcaster = request.app.state.broadcaster
+    try:
+        subscriber = broadcaster.subscribe()
+    except TooManySubscribersError as e:
+        raise ApiError(503, "ServiceUnavailable", str(e)) from None
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(stream_events(broadcaster, subscriber), media_type="text/event-stream", headers=headers)
+
+
+async def _api_error(request: Request, exc: Exception) -> Response:
+    """Return API errors as OGC API exception responses."""
+    if not isinstance(exc, ApiError):  # pragma: no cover
+        raise exc
+    body = json_backend.dumps({"code": exc.code, "description": exc.description})
+    return Response(content=body, status_code=exc.status, media_type="application/json")
+
+
+async def _configure_conn(conn: AsyncConnection) -> None:
+    """Configure new pool connections consistently with the `DatabaseClient` class."""
+    await conn.execute("SET timezone TO 'UTC';")
+    json_backend.register(conn)
+
+
+def make_app(dsn: str, pool_size: int = 4) -> Starlette:
+    """
+    Create API application.
+
+    Uses a pool of asynchronous database connections, and a listener for new positions (for the live stream),
+    opened and closed with the application.
+    """
+    pool = AsyncConnectionPool(
+        dsn, min_size=1, max_size=pool_size, kwargs={"autocommit": True}, configure=_configure_conn, open=False
+    )
+
+    broadcaster = PositionsBroadcaster(
+        dsn=dsn, query=lambda asset_ids: _query_latest(pool, asset_ids), logger=logging.getLogger("app")
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncGenerator[None, None]:
+        await pool.open()
+        await broadcaster.start()
+        app.state.pool = pool
+        app.state.cache = _ResponseCache()
+        app.state.broadcaster = broadcaster
+        yield
+        await broadcaster.stop()
+        await pool.close()
+
+    routes = [
+        Route("/", landing_page, name="landing_page"),
+        Route("/conformance", conformance, name="conformance"),
+        Route("/collections", collections, name="collections"),
+        Route("/collections/{collection_id}", collection, name="collection"),
+        Route("/collections/{collection_id}/items", items, name="items"),
+        Route("/collections/{collection_id}/items/{feature_id}", item, name="item"),
+        Route("/stream", stream, name="stream"),
+    ]
+    return Starlette(routes=routes, lifespan=lifespan, exception_handlers={ApiError: _api_error})
+
+
+def serve(dsn: str, host: str, port: int) -> None:
+    """Run API using Uvicorn."""
+    uvicorn.run(make_app(dsn), host=host, port=port)
@@ -2,6 +2,7 @@ from typing import Union
 
 import typer
 
+from assets_tracking_service.cli.api import serve_api
 from assets_tracking_service.cli.config import config_cli
 from assets_tracking_service.cli.data import data_cli
 from assets_tracking_service.cli.db import db_cli
@@ -14,6 +15,7 @@ app_cli = typer.Typer(name="ats-ctl", help="Assets Tracking Service control CLI.
 app_cli.add_typer(config_cli, name="config", help="Manage application configuration.")
 app_cli.add_typer(data_cli, name="data", help="Manage application data.")
 app_cli.add_typer(db_cli, name="db", help="Manage application database.")
+app_cli.command(name="serve-api", help="Run read-only OGC API - Features server.")(serve_api)
 
 _version_option = typer.Option(None, "-v", "--version", is_eager=True, help="Show application version and exit.")
 
@@ -0,0 +1,38 @@
+import logging
+
+import typer
+from rich import print as rprint
+
+from assets_tracking_service.config import Config
+
+_no = "[red]No.[/red]"
+
+logger = logging.getLogger("app")
+
+_host_option = typer.Option("127.0.0.1", help="Interface to listen on.")
+_port_option = typer.Option(8000, help="Port to listen on.")
+
+
+def serve_api(host: str = _host_option, port: int = _port_option) -> None:
+    """
+    Run read-only OGC API - Features server.
+
+    Dependencies for the API are optional (via the `api` extra) and so imported here, rather than at module level, to
+    avoid requiring them for other commands.
+
+    The API connects using the read-only `DB_DSN_RO` connection string, rather than the app's `DB_DSN`.
+    """
+    try:
+        from assets_tracking_service.api import serve
+    except ImportError as e:
+        logger.error(e, exc_info=True)
+        rprint(f"{_no} API dependencies not installed. Install the 'api' extra to use this command.")
+        raise typer.Exit(code=1) from e
+
+    config = Config()
+    if config.DB_DSN_RO is None:
+        rprint(f"{_no} Read-only database connection not configured. Set 'DB_DSN_RO' to use this command.")
+        raise typer.Exit(code=1)
+
+    rprint(f"Serving API on 'http://{host}:{port}' using database: '{config.DB_DSN_RO_SAFE}' ...")
+    serve(dsn=config.DB_DSN_RO, host=host, port=port)
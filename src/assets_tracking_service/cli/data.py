@@ -7,6 +7,7 @@ from sentry_sdk import monitor
 from assets_tracking_service.config import Config
 from assets_tracking_service.db import DatabaseClient, make_conn
 from assets_tracking_service.exporters.exporters_manager import ExportersManager
+from assets_tracking_service.metrics import Metrics
 from assets_tracking_service.providers.providers_manager import ProvidersManager
 
 _ok = "[green]Ok.[/green]"
@@ -16,6 +17,20 @@ logger = logging.getLogger("app")
 data_cli = typer.Typer()
 
 
+def _make_db(config: Config, metrics: Metrics) -> DatabaseClient:
+    """Database client recording query metrics, and logging slow queries if configured."""
+    return DatabaseClient(
+        conn=make_conn(config.DB_DSN), metrics=metrics, slow_query_threshold=config.DB_SLOW_QUERY_THRESHOLD
+    )
+
+
+def _report_metrics(config: Config, metrics: Metrics) -> None:
+    """Log summary of run metrics, and write as a Prometheus textfile if configured."""
+    metrics.log(logger)
+    if config.METRICS_OUTPUT_PATH is not None:
+        metrics.write_prometheus(config.METRICS_OUTPUT_PATH)
+
+
 @data_cli.command(name="fetch", help="Fetch active assets and their last known positions.")
 def fetch() -> None:
     """
@@ -27,11 +42,15 @@ def fetch() -> None:
     As such there are no expected exceptions we can handle here.
     """
     config = Config()
-    db = DatabaseClient(conn=make_conn(config.DB_DSN))
-    providers = ProvidersManager(config=config, db=db, logger=logger)
+    metrics = Metrics()
+    db = _make_db(config=config, metrics=metrics)
+    providers = ProvidersManager(config=config, db=db, logger=logger, metrics=metrics)
 
-    providers.fetch_active_assets()
-    providers.fetch_latest_positions()
+    try:
+        providers.fetch_active_assets()
+        providers.fetch_latest_positions()
+    finally:
+        _report_metrics(config=config, metrics=metrics)
 
     db.close()
     rprint(f"{_ok} Command exited normally. Check log for any errors.")
@@ -41,10 +60,14 @@ def fetch() -> None:
 def export() -> None:
     """Dump assets with latest positions through each exporter."""
     config = Config()
-    db = DatabaseClient(conn=make_conn(config.DB_DSN))
-    exporters = ExportersManager(config=config, db=db, logger=logger)
+    metrics = Metrics()
+    db = _make_db(config=config, metrics=metrics)
+    exporters = ExportersManager(config=config, db=db, logger=logger, metrics=metrics)
 
-    exporters.export()
+    try:
+        exporters.export()
+    finally:
+        _report_metrics(config=config, metrics=metrics)
 
     db.close()
     rprint(f"{_ok} Command exited normally. Check log for any errors.")
@@ -57,17 +80,24 @@ def run() -> None:
 
     As per the `fetch()` and `export()` methods. Triggers Sentry monitoring to ensure data is refreshed regularly.
     See docs/implementation.md#monitoring for details.
+
+    Run metrics (timings, row counts and API calls per provider and exporter) are reported at the end of the run,
+    including if it fails. See docs/implementation.md#run-metrics for details.
     """
     config = Config()
-    db = DatabaseClient(conn=make_conn(config.DB_DSN))
-    providers = ProvidersManager(config=config, db=db, logger=logger)
-    exporters = ExportersManager(config=config, db=db, logger=logger)
+    metrics = Metrics()
+    db = _make_db(config=config, metrics=metrics)
+    providers = ProvidersManager(config=config, db=db, logger=logger, metrics=metrics)
+    exporters = ExportersManager(config=config, db=db, logger=logger, metrics=metrics)
 
     monitor_slug = "ats-run"
-    with monitor(monitor_slug=monitor_slug, monitor_config=config.SENTRY_MONITOR_CONFIG[monitor_slug]):
-        providers.fetch_active_assets()
-        providers.fetch_latest_positions()
-        exporters.export()
+    try:
+        with monitor(monitor_slug=monitor_slug, monitor_config=config.SENTRY_MONITOR_CONFIG[monitor_slug]):
+            providers.fetch_active_assets()
+            providers.fetch_latest_positions()
+            exporters.export()
+    finally:
+        _report_metrics(config=config, metrics=metrics)
 
     db.close()
     rprint(f"{_ok} Command exited normally. Check log for any errors.")
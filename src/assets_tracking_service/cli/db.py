@@ -3,9 +3,13 @@ import logging
 import typer
 from psycopg.sql import SQL
 from rich import print as rprint
+from rich.filesize import decimal
+from rich.table import Table
 
+from assets_tracking_service import json_backend
 from assets_tracking_service.config import Config
-from assets_tracking_service.db import DatabaseClient, DatabaseError, DatabaseMigrationError, make_conn
+from assets_tracking_service.db import LOCK_TIMEOUT, DatabaseClient, DatabaseError, DatabaseMigrationError, make_conn
+from assets_tracking_service.models.layer import LayersClient
 
 _ok = "[green]Ok.[/green]"
 _no = "[red]No.[/red]"
@@ -14,6 +18,13 @@ _wn = "[yellow]Warning![/yellow]"
 logger = logging.getLogger("app")
 db_cli = typer.Typer()
 
+_dry_run_option = typer.Option(False, "--dry-run", help="List pending migrations without applying them.")
+_lock_timeout_option = typer.Option(LOCK_TIMEOUT, help="Seconds each migration may wait for locks before failing.")
+_json_option = typer.Option(False, "--json", help="Output as JSON rather than tables.")
+
+# tables reported by `db stats`
+_stats_tables = ["asset", "position", "layer", "record"]
+
 
 @db_cli.command(name="check", help="Check application database can be accessed.")
 def check_db() -> None:
@@ -44,14 +55,27 @@ def check_db() -> None:
 
 
 @db_cli.command(name="migrate", help="Setup application database.")
-def migrate_db_up() -> None:
-    """Run DB migrations."""
+def migrate_db_up(dry_run: bool = _dry_run_option, lock_timeout: float = _lock_timeout_option) -> None:
+    """
+    Run pending DB migrations.
+
+    Reports how long each migration took to apply, or with `dry_run`, lists pending migrations without applying them.
+    """
     config = Config()
     db_client = DatabaseClient(conn=make_conn(config.DB_DSN))
 
     try:
-        db_client.migrate_upgrade()
-        rprint(f"{_ok} Database migrated.")
+        if dry_run:
+            pending = db_client.get_pending_migrations()
+            rprint(f"{len(pending)} pending migration(s).")
+            for migration in pending:
+                rprint(f"- {migration.name}")
+            return
+
+        applied = db_client.migrate_upgrade(lock_timeout=lock_timeout)
+        for migration, duration in applied:
+            rprint(f"- {migration.name} ({duration:.3f}s)")
+        rprint(f"{_ok} Database migrated ({len(applied)} migration(s) applied).")
     except DatabaseMigrationError as e:
         logger.error(e, exc_info=True)
         rprint(f"{_no} Error migrating database.")
@@ -86,3 +110,111 @@ def rollback_db_down() -> None:
         raise typer.Exit(code=1) from e
     finally:
         db_client.close()
+
+
+@db_cli.command(name="rebuild-extents", help="Recompute stored layer extents.")
+def rebuild_extents() -> None:
+    """Rebuild stored layer extents."""
+    config = Config()
+    db_client = DatabaseClient(conn=make_conn(config.DB_DSN))
+    layers_client = LayersClient(db_client=db_client, logger=logger)
+
+    try:
+        layers_client.refresh_extents()
+        rprint(f"{_ok} Layer extents rebuilt.")
+    except DatabaseError as e:
+        logger.error(e, exc_info=True)
+        rprint(f"{_no} Error rebuilding layer extents.")
+        typer.echo(e)
+        raise typer.Exit(code=1) from e
+    finally:
+        db_client.close()
+
+
+def _stats_tables_table(tables: list[dict]) -> Table:
+    """Table statistics as a Rich table."""
+    table = Table(title="Tables")
+    table.add_column("Table")
+    for column in ["Rows (est.)", "Table size", "TOAST size", "Indexes size", "Dead rows", "Seq scans", "Index scans"]:
+        table.add_column(column, justify="right")
+    for row in tables:
+        table.add_row(
+            row["table"],
+            f"{row['rows']:,}",
+            decimal(row["table_bytes"]),
+            decimal(row["toast_bytes"]),
+            decimal(row["indexes_bytes"]),
+            f"{row['dead_rows']:,} ({row['dead_ratio']:.1%})",
+            f"{row['seq_scans']:,}",
+            f"{row['idx_scans']:,}",
+        )
+    return table
+
+
+def _stats_indexes_table(indexes: list[dict]) -> Table:
+    """Index statistics as a Rich table, highlighting unused and duplicate indexes."""
+    table = Table(title="Indexes")
+    for column in ["Table", "Index", "Method", "Size", "Scans", "Unique"]:
+        table.add_column(column, justify="right" if column in ("Size", "Scans") else "left")
+    table.add_column("Notes")
+    for row in indexes:
+        notes = []
+        if row["unused"]:
+            notes.append("[yellow]unused[/yellow]")
+        if row["duplicates"]:
+            notes.append(f"[yellow]duplicates {', '.join(row['duplicates'])}[/yellow]")
+        table.add_row(
+            row["table"],
+            row["index"],
+            row["method"],
+            decimal(row["bytes"]),
+            f"{row['scans']:,}",
+            "Yes" if row["unique"] else "No",
+            "; ".join(notes),
+        )
+    return table
+
+
+def _stats_views_table(views: list[dict]) -> Table:
+    """View timings as a Rich table."""
+    table = Table(title="Export views")
+    table.add_column("View")
+    for column in ["Rows", "Planning (ms)", "Execution (ms)"]:
+        table.add_column(column, justify="right")
+    for row in views:
+        table.add_row(row["view"], f"{row['rows']:,}", f"{row['planning_ms']:.3f}", f"{row['execution_ms']:.3f}")
+    return table
+
+
+@db_cli.command(name="stats", help="Report table, index and export view statistics.")
+def stats(as_json: bool = _json_option) -> None:
+    """
+    Report database statistics, to inform partitioning, indexing and vacuum decisions.
+
+    Includes sizes, dead rows and scan counts for main tables, index usage (including unused and duplicate indexes) and
+    execution times for views used by exporters. Scan counts are since database statistics were last reset.
+    """
+    config = Config()
+    db_client = DatabaseClient(conn=make_conn(config.DB_DSN))
+    layers_client = LayersClient(db_client=db_client, logger=logger)
+
+    try:
+        result = {
+            "tables": db_client.get_table_stats(_stats_tables),
+            "indexes": db_client.get_index_stats(_stats_tables),
+            "views": db_client.get_view_timings(layers_client.list_export_views()),
+        }
+    except DatabaseError as e:
+        logger.error(e, exc_info=True)
+        rprint(f"{_no} Error getting database statistics.")
+        typer.echo(e)
+        raise typer.Exit(code=1) from e
+    finally:
+        db_client.close()
+
+    if as_json:
+        typer.echo(json_backend.dumps(result).decode())
+        return
+    rprint(_stats_tables_table(result["tables"]))
+    rprint(_stats_indexes_table(result["indexes"]))
+    rprint(_stats_views_table(result["views"]))
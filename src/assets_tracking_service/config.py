@@ -80,6 +80,16 @@ class Config:
             msg = "DB_DSN is invalid."
             raise ConfigurationError(msg) from e
 
+        try:
+            _ = self.DB_DSN_RO_SAFE
+        except (ValueError, TypeError) as e:
+            msg = "DB_DSN_RO is invalid."
+            raise ConfigurationError(msg) from e
+
+        if self.DB_SLOW_QUERY_THRESHOLD is not None and self.DB_SLOW_QUERY_THRESHOLD <= 0:
+            msg = "DB_SLOW_QUERY_THRESHOLD must be a positive number of seconds."
+            raise ConfigurationError(msg)
+
         if self.ENABLE_PROVIDER_GEOTAB:
             try:
                 _ = self.PROVIDER_GEOTAB_USERNAME
@@ -168,6 +178,18 @@ class Config:
                 msg = "Variables used for EXPORTER_DATA_CATALOGUE_ADMIN_KEYS must be valid JWKs."
                 raise ConfigurationError(msg) from e
 
+        if self.ENABLE_EXPORTER_VECTOR_TILES:
+            if self.EXPORTER_VECTOR_TILES_OUTPUT_PATH is None:
+                msg = "EXPORTER_VECTOR_TILES_OUTPUT_PATH must be set."
+                raise ConfigurationError(msg)
+            if self.EXPORTER_VECTOR_TILES_OUTPUT_PATH.is_dir():
+                msg = "EXPORTER_VECTOR_TILES_OUTPUT_PATH must be a file."
+                raise ConfigurationError(msg)
+
+        if self.METRICS_OUTPUT_PATH is not None and self.METRICS_OUTPUT_PATH.is_dir():
+            msg = "METRICS_OUTPUT_PATH must be a file."
+            raise ConfigurationError(msg)
+
     class ConfigDumpSafe(TypedDict):
         """Types for `dumps_safe`."""
 
@@ -175,6 +197,8 @@ class Config:
         LOG_LEVEL: int
         LOG_LEVEL_NAME: str
         DB_DSN: str
+        DB_DSN_RO: str | None
+        DB_SLOW_QUERY_THRESHOLD: float | None
         SENTRY_DSN: str
         ENABLE_FEATURE_SENTRY: bool
         SENTRY_ENVIRONMENT: str
@@ -185,6 +209,7 @@ class Config:
         ENABLED_PROVIDERS: list[str]
         ENABLE_EXPORTER_ARCGIS: bool
         ENABLE_EXPORTER_DATA_CATALOGUE: bool
+        ENABLE_EXPORTER_VECTOR_TILES: bool
         ENABLED_EXPORTERS: list[str]
         PROVIDER_GEOTAB_USERNAME: str
         PROVIDER_GEOTAB_PASSWORD: str
@@ -202,6 +227,8 @@ class Config:
         EXPORTER_ARCGIS_GROUP_INFO: ArcGISGroupInfo
         EXPORTER_DATA_CATALOGUE_OUTPUT_PATH: str
         EXPORTER_DATA_CATALOGUE_ADMIN_KEYS: dict
+        EXPORTER_VECTOR_TILES_OUTPUT_PATH: str | None
+        METRICS_OUTPUT_PATH: str | None
 
     def dumps_safe(self) -> ConfigDumpSafe:
         """Dump config for output to the user with sensitive data redacted."""
@@ -210,6 +237,8 @@ class Config:
             "LOG_LEVEL": self.LOG_LEVEL,
             "LOG_LEVEL_NAME": self.LOG_LEVEL_NAME,
             "DB_DSN": self.DB_DSN_SAFE,
+            "DB_DSN_RO": self.DB_DSN_RO_SAFE,
+            "DB_SLOW_QUERY_THRESHOLD": self.DB_SLOW_QUERY_THRESHOLD,
             "SENTRY_DSN": self.SENTRY_DSN,
             "ENABLE_FEATURE_SENTRY": self.ENABLE_FEATURE_SENTRY,
             "SENTRY_ENVIRONMENT": self.SENTRY_ENVIRONMENT,
@@ -220,6 +249,7 @@ class Config:
             "ENABLED_PROVIDERS": self.ENABLED_PROVIDERS,
             "ENABLE_EXPORTER_ARCGIS": self.ENABLE_EXPORTER_ARCGIS,
             "ENABLE_EXPORTER_DATA_CATALOGUE": self.ENABLE_EXPORTER_DATA_CATALOGUE,
+            "ENABLE_EXPORTER_VECTOR_TILES": self.ENABLE_EXPORTER_VECTOR_TILES,
             "ENABLED_EXPORTERS": self.ENABLED_EXPORTERS,
             "PROVIDER_GEOTAB_USERNAME": self.PROVIDER_GEOTAB_USERNAME,
             "PROVIDER_GEOTAB_PASSWORD": self.PROVIDER_GEOTAB_PASSWORD_SAFE,
@@ -237,6 +267,10 @@ class Config:
             "EXPORTER_ARCGIS_GROUP_INFO": self.EXPORTER_ARCGIS_GROUP_INFO,
             "EXPORTER_DATA_CATALOGUE_OUTPUT_PATH": str(self.EXPORTER_DATA_CATALOGUE_OUTPUT_PATH.resolve()),
             "EXPORTER_DATA_CATALOGUE_ADMIN_KEYS": self.EXPORTER_DATA_CATALOGUE_ADMIN_KEYS_SAFE,
+            "EXPORTER_VECTOR_TILES_OUTPUT_PATH": str(self.EXPORTER_VECTOR_TILES_OUTPUT_PATH.resolve())
+            if self.EXPORTER_VECTOR_TILES_OUTPUT_PATH
+            else None,
+            "METRICS_OUTPUT_PATH": str(self.METRICS_OUTPUT_PATH.resolve()) if self.METRICS_OUTPUT_PATH else None,
         }
 
     @property
@@ -258,6 +292,24 @@ class Config:
                 msg = "LOG_LEVEL is invalid."
                 raise ConfigurationError(msg) from e
 
+    def _db_dsn_database(self, dsn: str) -> str:
+        """Apply optional `DB_DATABASE` override to the database name in a DSN."""
+        with self.env.prefixed(self._app_prefix):
+            db = self.env.str("DB_DATABASE", None)
+
+        if db:
+            dsn_parsed = dsnparse.parse(dsn, EditableDsn)
+            dsn_parsed.database = db
+            dsn = dsn_parsed.geturl()
+
+        return dsn
+
+    def _db_dsn_safe(self, dsn: str) -> str:
+        """Redact password in a DSN."""
+        dsn_parsed = dsnparse.parse(dsn, EditableDsn)
+        dsn_parsed.secret = self._safe_value if dsn_parsed.secret else ""
+        return dsn_parsed.geturl()
+
     @property
     def LOG_LEVEL_NAME(self) -> str:
         """Logging level name."""
@@ -272,21 +324,35 @@ class Config:
         """
         with self.env.prefixed(self._app_prefix):
             dsn = self.env.str("DB_DSN")
-            db = self.env.str("DB_DATABASE", None)
-
-        if db:
-            dsn_parsed = dsnparse.parse(dsn, EditableDsn)
-            dsn_parsed.database = db
-            dsn = dsn_parsed.geturl()
-
-        return dsn
+        return self._db_dsn_database(dsn)
 
     @property
     def DB_DSN_SAFE(self) -> str:
         """DB_DSN with password redacted."""
-        dsn_parsed = dsnparse.parse(self.DB_DSN, EditableDsn)
-        dsn_parsed.secret = self._safe_value if dsn_parsed.secret else ""
-        return dsn_parsed.geturl()
+        return self._db_dsn_safe(self.DB_DSN)
+
+    @property
+    def DB_DSN_RO(self) -> str | None:
+        """
+        Optional psycopg connection string for read-only database connections, used by the API.
+
+        Expected to connect as the `assets_tracking_service_ro` role. Optional `DB_DATABASE` overrides the database
+        name as for `DB_DSN`.
+        """
+        with self.env.prefixed(self._app_prefix):
+            dsn = self.env.str("DB_DSN_RO", None)
+        return self._db_dsn_database(dsn) if dsn else None
+
+    @property
+    def DB_DSN_RO_SAFE(self) -> str | None:
+        """DB_DSN_RO with password redacted."""
+        return self._db_dsn_safe(self.DB_DSN_RO) if self.DB_DSN_RO else None
+
+    @property
+    def DB_SLOW_QUERY_THRESHOLD(self) -> float | None:
+        """Optional time in seconds, over which queries are logged as slow and explained."""
+        with self.env.prefixed(self._app_prefix):
+            return self.env.float("DB_SLOW_QUERY_THRESHOLD", None)
 
     @property
     def SENTRY_DSN(self) -> str:
@@ -363,6 +429,12 @@ class Config:
         with self.env.prefixed(self._app_prefix):
             return self.env.bool("ENABLE_EXPORTER_DATA_CATALOGUE", True)
 
+    @property
+    def ENABLE_EXPORTER_VECTOR_TILES(self) -> bool:
+        """Controls whether vector tiles exporter is used."""
+        with self.env.prefixed(self._app_prefix):
+            return self.env.bool("ENABLE_EXPORTER_VECTOR_TILES", False)
+
     @property
     def ENABLED_EXPORTERS(self) -> list[str]:
         """List of enabled exporters."""
@@ -374,6 +446,9 @@ class Config:
         if self.ENABLE_EXPORTER_DATA_CATALOGUE:
             exporters.append("data_catalogue")
 
+        if self.ENABLE_EXPORTER_VECTOR_TILES:
+            exporters.append("vector_tiles")
+
         return exporters
 
     @property
@@ -533,3 +608,15 @@ class Config:
     def EXPORTER_DATA_CATALOGUE_ADMIN_KEYS_SAFE(self) -> dict:
         """EXPORTER_DATA_CATALOGUE_ADMIN_KEYS with sensitive value redacted."""
         return {"encryption_private": self._safe_value, "signing_private": self._safe_value}
+
+    @property
+    def EXPORTER_VECTOR_TILES_OUTPUT_PATH(self) -> Path | None:
+        """Path to MBTiles archive for vector tiles."""
+        with self.env.prefixed(self._app_prefix), self.env.prefixed("EXPORTER_VECTOR_TILES_"):
+            return self.env.path("OUTPUT_PATH", None)
+
+    @property
+    def METRICS_OUTPUT_PATH(self) -> Path | None:
+        """Optional path to write run metrics to as a Prometheus textfile (e.g. for the node exporter)."""
+        with self.env.prefixed(self._app_prefix):
+            return self.env.path("METRICS_OUTPUT_PATH", None)
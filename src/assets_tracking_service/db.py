@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import Mapping, Sequence
+import re
+from collections.abc import Generator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from hashlib import blake2b
 from pathlib import Path
+from time import perf_counter
 from typing import Any, Literal
+from uuid import uuid4
 
 from importlib_resources import as_file as resources_as_file
 from importlib_resources import files as resources_files
 from psycopg import Connection, connect
+from psycopg.rows import dict_row
 from psycopg.sql import SQL, Composed, Identifier
 
+from assets_tracking_service.geometry_adapters import register as register_geometry_adapters
+from assets_tracking_service.json_backend import register as register_json_backend
+from assets_tracking_service.metrics import Metrics
+
 
 class DatabaseError(Exception):
     """Raised for database errors unless a more specific subclass applies."""
@@ -23,19 +35,96 @@ class DatabaseMigrationError(DatabaseError):
     pass
 
 
+LOCK_TIMEOUT = 10.0
+# literal values and comments removed when normalising queries
+_QUERY_VALUES = re.compile(r"'(?:[^']|'')*'|--[^\n]*|\b\d+(?:\.\d+)?\b")
+# statements that can be explained
+_EXPLAINABLE = {"SELECT", "WITH", "INSERT", "UPDATE", "DELETE"}
+# statements that modify data (including within a `WITH` query)
+_MODIFYING = re.compile(r"\b(?:INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+
+@dataclass(kw_only=True, frozen=True)
+class Migration:
+    """
+    Database migration file.
+
+    `id` is the index of the up migration the file applies or reverses. E.g. for `032-foo.sql` (up) and `968-foo.sql`
+    (down), 32.
+    """
+
+    id: int
+    name: str
+    sql: str
+
+    @classmethod
+    def from_path(cls, path: Path, direction: Literal["up", "down"]) -> Migration:
+        """Load migration from file."""
+        index = int(path.stem.split("-")[0])
+        return cls(id=index if direction == "up" else 1000 - index, name=path.stem, sql=path.read_text())
+
+
+@dataclass(kw_only=True, frozen=True)
+class QueryShape:
+    """
+    Normalised query, used to group queries that differ only in their values.
+
+    `sql` is the query with comments removed, literal values replaced with `?` and whitespace collapsed. `fingerprint`
+    is a short hash of `sql`, used to identify the query in metrics and logs.
+    """
+
+    fingerprint: str
+    sql: str
+
+    @classmethod
+    def from_sql(cls, sql: str) -> QueryShape:
+        """Normalise query."""
+        normalised = " ".join(_QUERY_VALUES.sub(lambda m: " " if m[0].startswith("--") else "?", sql).split())
+        return cls(fingerprint=blake2b(normalised.encode(), digest_size=6).hexdigest(), sql=normalised)
+
+    @property
+    def explainable(self) -> bool:
+        """Whether query is a single statement that can be explained."""
+        keyword = self.sql.split(" ", maxsplit=1)[0].upper()
+        return keyword in _EXPLAINABLE and ";" not in self.sql.rstrip(";")
+
+    @property
+    def modifying(self) -> bool:
+        """Whether query may modify data (e.g. an `INSERT`, or a `WITH` query containing an `UPDATE`)."""
+        return _MODIFYING.search(self.sql) is not None
+
+
+@lru_cache(maxsize=1024)
+def _query_shape(sql: str) -> QueryShape:
+    """Get query shape, cached as the same queries are run repeatedly."""
+    return QueryShape.from_sql(sql)
+
+
 class DatabaseClient:
     """Basic database client."""
 
-    def __init__(self, conn: Connection) -> None:
+    def __init__(
+        self, conn: Connection, metrics: Metrics | None = None, slow_query_threshold: float | None = None
+    ) -> None:
         """
         Create client using injected database connection.
 
-        All date times are fetched as UTC.
+        All date times are fetched as UTC. JSON values are adapted using the fastest available JSON backend.
+        Geometries are adapted as binary EWKB where PostGIS is available.
+
+        Statements are timed and counted by query shape (see `QueryShape`) using optional metrics (e.g. for a run
+        summary). If a `slow_query_threshold` (in seconds) is set, slower queries are logged as warnings, with their
+        query plan logged once for each query shape (see `_explain()`).
         """
         self._logger = logging.getLogger("app")
         self._conn = conn
+        self._metrics = metrics if metrics is not None else Metrics()
+        self._slow_query_threshold = slow_query_threshold
+        self._explained: set[str] = set()
 
         self._conn.execute("SET timezone TO 'UTC';")
+        register_json_backend(self._conn)
+        register_geometry_adapters(self._conn)
 
     @property
     def conn(self) -> Connection:
@@ -51,10 +140,53 @@ class DatabaseClient:
         self._logger.info("Closing DB connection.")
         self._conn.close()
 
+    def _explain(self, shape: QueryShape, query: SQL | Composed, params: Sequence | Mapping[str, Any] | None) -> None:
+        """
+        Log query plan for a slow query.
+
+        Read only queries are explained with `EXPLAIN (ANALYZE, BUFFERS)`, which runs the query again, in a transaction
+        that is always rolled back. Queries that modify data are explained without running them (estimated plan only),
+        as running them again would double the cost of each slow insert or update and consume sequence values, even
+        though changes are rolled back. Errors are logged rather than raised, as the original query succeeded.
+        """
+        explain = SQL("EXPLAIN ") if shape.modifying else SQL("EXPLAIN (ANALYZE, BUFFERS) ")
+        try:
+            with self._conn.transaction(force_rollback=True), self._conn.cursor() as cur:
+                cur.execute(query=explain + query, params=params)
+                plan = "\n".join(row[0] for row in cur.fetchall())
+        except Exception:
+            self._logger.warning("Error explaining slow query %s", shape.fingerprint, exc_info=True)
+            return
+        self._logger.info("Query plan for slow query %s:\n%s", shape.fingerprint, plan)
+
+    @contextmanager
+    def _instrument(
+        self, query: SQL | Composed, params: Sequence | Mapping[str, Any] | None = None
+    ) -> Generator[None, None, None]:
+        """
+        Time statement by query shape, and log slow queries.
+
+        Statements are recorded as a `db_query` timer, labelled with the query shape fingerprint. Slow queries are also
+        counted as `db_slow_query`, and explained if not already explained for their shape.
+        """
+        shape = _query_shape(query.as_string(self._conn))
+        start = perf_counter()
+        with self._metrics.timer("db_query", query=shape.fingerprint):
+            yield
+        duration = perf_counter() - start
+
+        if self._slow_query_threshold is None or duration < self._slow_query_threshold:
+            return
+        self._metrics.count("db_slow_query", query=shape.fingerprint)
+        self._logger.warning("Slow query %s took %.3f seconds: %s", shape.fingerprint, duration, shape.sql)
+        if shape.explainable and shape.fingerprint not in self._explained:
+            self._explained.add(shape.fingerprint)
+            self._explain(shape, query, params)
+
     def execute(self, query: SQL | Composed, params: Sequence | Mapping[str, Any] | None = None) -> None:
         """Execute a given SQL statement."""
         try:
-            with self._conn.cursor() as cur:
+            with self._instrument(query, params), self._conn.cursor() as cur:
                 cur.execute(query=query, params=params)
         except Exception as e:
             self._logger.exception("Error executing statement")
@@ -80,7 +212,7 @@ class DatabaseClient:
         self, query: SQL | Composed, params: Sequence | Mapping[str, Any] | None = None, as_dict: bool = False
     ) -> list[tuple | dict]:
         """Execute a query and return the result as a list of tuples or dicts."""
-        with self._conn.cursor() as cur:
+        with self._instrument(query, params), self._conn.cursor() as cur:
             try:
                 cur.execute(query=query, params=params)
             except Exception as e:
@@ -91,6 +223,30 @@ class DatabaseClient:
                 return [dict(zip(columns, row)) for row in cur.fetchall()]  # noqa: B905
             return cur.fetchall()
 
+    def iter_query_result(
+        self, query: SQL | Composed, params: Sequence | Mapping[str, Any] | None = None, size: int = 1000
+    ) -> Generator[dict, None, None]:
+        """
+        Execute a query and stream the result as dicts using a server-side (named) cursor.
+
+        Rows are fetched from the server in batches of `size`, rather than all at once. A transaction is held open until
+        the result is exhausted or the generator is closed.
+
+        Timings include fetching all rows (and so any time taken by the caller between rows).
+        """
+        with (
+            self._conn.transaction(),
+            self._instrument(query, params),
+            self._conn.cursor(name=f"ats_{uuid4().hex}", row_factory=dict_row) as cur,
+        ):
+            cur.itersize = size
+            try:
+                cur.execute(query=query, params=params)
+            except Exception as e:
+                msg = "Error executing query"
+                raise DatabaseError(msg) from e
+            yield from cur
+
     def insert_dict(self, schema: str, table_view: str, data: dict) -> None:
         """
         Insert data into table or view from a dict.
@@ -125,30 +281,76 @@ class DatabaseClient:
 
         self.execute(query, list(data.values()))
 
-    def _migrate(self, direction: Literal["up", "down"]) -> None:
+    @staticmethod
+    def _list_migrations(direction: Literal["up", "down"]) -> list[Migration]:
         """
-        Migrate DB.
+        Migrations for a direction, in the order they should be applied.
 
         Migrations are stored as SQL files included within the package.
         """
+        with resources_as_file(resources_files("assets_tracking_service.resources.db_migrations")) as migrations_path:
+            return [
+                Migration.from_path(path, direction) for path in sorted((migrations_path / direction).glob("*.sql"))
+            ]
+
+    def get_pending_migrations(self, direction: Literal["up", "down"] = "up") -> list[Migration]:
+        """
+        Migrations not yet applied (up), or applied and so able to be reversed (down), in the order to apply them.
+
+        If the latest applied migration can't be determined (e.g. for an empty database), all migrations are pending.
+        """
+        migrations = self._list_migrations(direction)
+        applied = self._head_applied_migration
+        if applied is None:
+            return migrations
+        if direction == "up":
+            return [migration for migration in migrations if migration.id > applied]
+        return [migration for migration in migrations if migration.id <= applied]
+
+    def _apply_migration(self, migration: Migration, lock_timeout: float) -> float:
+        """
+        Apply migration in its own transaction, returning how long it took in seconds.
+
+        `lock_timeout` limits how long (in seconds) statements wait for locks, so a migration fails rather than queuing
+        behind (and blocking) other queries for a long time.
+        """
+        self._logger.info("Applying migration '%s'...", migration.name)
+        start = perf_counter()
         try:
-            with resources_as_file(
-                resources_files("assets_tracking_service.resources.db_migrations")
-            ) as migrations_path:
-                self.execute_files_in_path(migrations_path / direction)
-        except DatabaseError as e:
-            msg = f"Error migrating DB {direction}"
+            with self._conn.transaction(), self._conn.cursor() as cur:
+                cur.execute(SQL("SELECT set_config('lock_timeout', %s, true);"), (f"{round(lock_timeout * 1000)}ms",))
+                # noinspection PyTypeChecker
+                cur.execute(SQL(migration.sql))
+        except Exception as e:
+            self._logger.exception("Error applying migration '%s'", migration.name)
+            msg = f"Error applying migration '{migration.name}'"
             raise DatabaseMigrationError(msg) from e
+        duration = perf_counter() - start
+        self._logger.info("Applied migration '%s' in %.3f seconds.", migration.name, duration)
+        return duration
+
+    def _migrate(self, direction: Literal["up", "down"], lock_timeout: float) -> list[tuple[Migration, float]]:
+        """
+        Apply pending migrations in a direction, returning each migration applied with how long it took in seconds.
+
+        Each migration is applied in its own transaction. If a migration fails, earlier migrations remain applied.
+        """
+        migrations = self.get_pending_migrations(direction)
+        self._logger.info("%d pending %s migrations.", len(migrations), direction)
+        return [(migration, self._apply_migration(migration, lock_timeout)) for migration in migrations]
 
-    def migrate_upgrade(self) -> None:
-        """Upgrade database to head migration."""
+    def migrate_upgrade(self, lock_timeout: float = LOCK_TIMEOUT) -> list[tuple[Migration, float]]:
+        """Upgrade database to head migration, applying only pending migrations."""
         self._logger.info("Upgrading database to head revision...")
-        self._migrate("up")
+        applied = self._migrate("up", lock_timeout=lock_timeout)
+        # PostGIS may not have been available before migrating
+        register_geometry_adapters(self._conn)
+        return applied
 
-    def migrate_downgrade(self) -> None:
-        """Downgrade database to base migration."""
+    def migrate_downgrade(self, lock_timeout: float = LOCK_TIMEOUT) -> list[tuple[Migration, float]]:
+        """Downgrade database to base migration, reversing only applied migrations."""
         self._logger.info("Downgrading database to base revision...")
-        self._migrate("down")
+        return self._migrate("down", lock_timeout=lock_timeout)
 
     @property
     def _head_available_migration(self) -> int:
@@ -157,9 +359,7 @@ class DatabaseClient:
 
         Returned as an integer to allow for comparison. E.g. If the latest migration is `012-foo.sql`, 12.
         """
-        with resources_as_file(resources_files("assets_tracking_service.resources.db_migrations")) as migrations_path:
-            head_file = sorted(migrations_path.glob("up/*.sql"))[-1]
-            return int(head_file.stem.split("-")[0])
+        return self._list_migrations("up")[-1].id
 
     @property
     def _head_applied_migration(self) -> int | None:
@@ -194,6 +394,102 @@ class DatabaseClient:
 
         return applied_migration == self._head_available_migration
 
+    def get_table_stats(self, tables: list[str]) -> list[dict]:
+        """
+        Size and activity statistics for tables in the public schema, in the order given.
+
+        Row counts are estimates from table statistics, to avoid scanning large tables. Sizes are in bytes, with the
+        TOAST size (for large values such as labels) included in `table_bytes` and also given separately. Scan counts
+        are since statistics were last reset. Tables that don't exist are skipped.
+        """
+        return self.get_query_result(
+            query=SQL("""
+                SELECT
+                    t.name AS table,
+                    s.n_live_tup AS rows,
+                    pg_table_size(c.oid) AS table_bytes,
+                    coalesce(pg_total_relation_size(nullif(c.reltoastrelid, 0)), 0) AS toast_bytes,
+                    pg_indexes_size(c.oid) AS indexes_bytes,
+                    s.n_dead_tup AS dead_rows,
+                    coalesce(s.n_dead_tup::float8 / nullif(s.n_live_tup + s.n_dead_tup, 0), 0) AS dead_ratio,
+                    s.seq_scan AS seq_scans,
+                    coalesce(s.idx_scan, 0) AS idx_scans
+                FROM unnest(%(tables)s::text[]) WITH ORDINALITY AS t (name, n)
+                INNER JOIN pg_catalog.pg_class AS c ON to_regclass('public.' || quote_ident(t.name)) = c.oid
+                INNER JOIN pg_catalog.pg_stat_user_tables AS s ON c.oid = s.relid
+                ORDER BY t.n;
+            """),
+            params={"tables": tables},
+            as_dict=True,
+        )
+
+    def get_index_stats(self, tables: list[str]) -> list[dict]:
+        """
+        Size and usage statistics for indexes on tables in the public schema.
+
+        An index is `unused` if it hasn't been scanned since statistics were last reset and isn't needed for a
+        constraint (i.e. it isn't unique). `duplicates` lists other indexes on the same table over the same columns,
+        expressions and predicate (regardless of the index method), such as a hash index alongside a unique constraint.
+        """
+        return self.get_query_result(
+            query=SQL("""
+                SELECT
+                    t.name AS table,
+                    i.relname AS index,
+                    am.amname AS method,
+                    pg_relation_size(i.oid) AS bytes,
+                    s.idx_scan AS scans,
+                    x.indisunique AS unique,
+                    (s.idx_scan = 0 AND NOT x.indisunique) AS unused,
+                    array(
+                        SELECT d.relname::text
+                        FROM pg_catalog.pg_index AS y
+                        INNER JOIN pg_catalog.pg_class AS d ON y.indexrelid = d.oid
+                        WHERE
+                            y.indrelid = x.indrelid
+                            AND y.indexrelid != x.indexrelid
+                            AND y.indkey::text = x.indkey::text
+                            AND coalesce(pg_get_expr(y.indexprs, y.indrelid), '')
+                            = coalesce(pg_get_expr(x.indexprs, x.indrelid), '')
+                            AND coalesce(pg_get_expr(y.indpred, y.indrelid), '')
+                            = coalesce(pg_get_expr(x.indpred, x.indrelid), '')
+                        ORDER BY d.relname
+                    ) AS duplicates
+                FROM unnest(%(tables)s::text[]) WITH ORDINALITY AS t (name, n)
+                INNER JOIN pg_catalog.pg_index AS x ON to_regclass('public.' || quote_ident(t.name)) = x.indrelid
+                INNER JOIN pg_catalog.pg_class AS i ON x.indexrelid = i.oid
+                INNER JOIN pg_catalog.pg_am AS am ON i.relam = am.oid
+                INNER JOIN pg_catalog.pg_stat_user_indexes AS s ON x.indexrelid = s.indexrelid
+                ORDER BY t.n, i.relname;
+            """),
+            params={"tables": tables},
+            as_dict=True,
+        )
+
+    def get_view_timings(self, views: list[str]) -> list[dict]:
+        """
+        Planning and execution time (in milliseconds) and row count for selecting all rows from views.
+
+        Views in the public schema are run (but rows are not returned) using `EXPLAIN ANALYZE`, so times are measured
+        by the database and exclude transferring rows. Each view is run once, so times may include reading data into
+        caches.
+        """
+        timings = []
+        for view in views:
+            result = self.get_query_result(
+                query=SQL("EXPLAIN (ANALYZE, FORMAT JSON) SELECT * FROM public.{view};").format(view=Identifier(view))
+            )
+            plan = result[0][0][0]
+            timings.append(
+                {
+                    "view": view,
+                    "rows": plan["Plan"]["Actual Rows"],
+                    "planning_ms": plan["Planning Time"],
+                    "execution_ms": plan["Execution Time"],
+                }
+            )
+        return timings
+
 
 def make_conn(dsn: str) -> Connection:
     """
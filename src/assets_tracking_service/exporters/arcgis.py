@@ -1,5 +1,6 @@
 import json
 import logging
+from contextlib import AbstractContextManager
 from datetime import UTC, datetime
 from tempfile import TemporaryDirectory
 
@@ -16,9 +17,11 @@ from psycopg.sql import SQL, Identifier
 from assets_tracking_service.config import Config
 from assets_tracking_service.db import DatabaseClient
 from assets_tracking_service.exporters.base_exporter import Exporter
+from assets_tracking_service.exporters.cache import ExportCache
 from assets_tracking_service.exporters.catalogue import LayerRecord
 from assets_tracking_service.lib.bas_esri_utils.client import ArcGisClient
 from assets_tracking_service.lib.bas_esri_utils.models.item import Item as CatalogueItemArcGis
+from assets_tracking_service.metrics import Metrics
 from assets_tracking_service.models.layer import Layer, LayersClient
 
 
@@ -39,24 +42,42 @@ class ArcGisExporterLayer:
         arcgis: GIS,
         layers: LayersClient,
         layer_slug: str,
+        cache: ExportCache | None = None,
+        metrics: Metrics | None = None,
     ) -> None:
         self._config = config
         self._logger = logger
         self._db = db
         self._layers = layers
+        self._cache = cache if cache is not None else ExportCache(db=db, logger=logger)
+        self._metrics = metrics if metrics is not None else Metrics()
         self._arcgis = arcgis
         self._arcgis_client = ArcGisClient(arcgis=self._arcgis, logger=self._logger)
 
         self._slug = layer_slug
         self._layer = self._get_layer()
+        self._record: LayerRecord | None = None
         self._logger.info("exporter class for layer '%s' created.", self._slug)
 
+    @property
+    def _catalogue_record(self) -> LayerRecord:
+        """
+        Data Catalogue record for layer.
+
+        Memoised as the record is needed for each ArcGIS item. Reset when the layer is re-fetched (as the record
+        includes layer properties such as item IDs).
+        """
+        if self._record is None:
+            self._record = LayerRecord(
+                config=self._config, db=self._db, logger=self._logger, layer_slug=self._slug, cache=self._cache
+            )
+        return self._record
+
     @property
     def _catalogue_item_arc_geojson(self) -> CatalogueItemArcGis:
         """Data Catalogue ArcGIS item for resource as an ArcGIS GeoJSON file."""
-        record = LayerRecord(config=self._config, db=self._db, logger=self._logger, layer_slug=self._slug)
         return CatalogueItemArcGis(
-            record=record,
+            record=self._catalogue_record,
             admin_keys=self._config.EXPORTER_DATA_CATALOGUE_ADMIN_KEYS,
             arcgis_item_id=self._layer.agol_id_geojson,
             arcgis_item_name=self._slug,
@@ -67,9 +88,8 @@ class ArcGisExporterLayer:
     @property
     def _catalogue_item_arc_feature(self) -> CatalogueItemArcGis:
         """Data Catalogue ArcGIS item for resource as an ArcGIS feature layer."""
-        record = LayerRecord(config=self._config, db=self._db, logger=self._logger, layer_slug=self._slug)
         return CatalogueItemArcGis(
-            record=record,
+            record=self._catalogue_record,
             admin_keys=self._config.EXPORTER_DATA_CATALOGUE_ADMIN_KEYS,
             arcgis_item_id=self._layer.agol_id_feature,
             arcgis_item_name=self._slug,
@@ -79,15 +99,18 @@ class ArcGisExporterLayer:
     @property
     def _catalogue_item_arc_ogc_feature(self) -> CatalogueItemArcGis:
         """Data Catalogue ArcGIS item for resource as an ArcGIS OGC feature layer."""
-        record = LayerRecord(config=self._config, db=self._db, logger=self._logger, layer_slug=self._slug)
         return CatalogueItemArcGis(
-            record=record,
+            record=self._catalogue_record,
             admin_keys=self._config.EXPORTER_DATA_CATALOGUE_ADMIN_KEYS,
             arcgis_item_id=self._layer.agol_id_feature_ogc,
             arcgis_item_name=self._slug,
             arcgis_item_type=ItemTypeEnum.OGCFEATURESERVER,
         )
 
+    def _api_call(self, operation: str) -> AbstractContextManager[None]:
+        """Time an ArcGIS API call."""
+        return self._metrics.timer("api_call", source="arcgis", operation=operation)
+
     def _get_layer(self) -> Layer:
         """Get model for layer."""
         return self._layers.get_by_slug(self._slug)
@@ -136,13 +159,14 @@ class ArcGisExporterLayer:
             with description_path.open() as f:
                 description = f.read()
 
-            return self._arcgis_client.create_group(
-                title=group_info["name"],
-                snippet=group_info["summary"],
-                description=description,
-                thumbnail_path=thumbnail_path,
-                sharing_level=SharingLevel.EVERYONE,
-            )
+            with self._api_call("create_group"):
+                return self._arcgis_client.create_group(
+                    title=group_info["name"],
+                    snippet=group_info["summary"],
+                    description=description,
+                    thumbnail_path=thumbnail_path,
+                    sharing_level=SharingLevel.EVERYONE,
+                )
 
     def _get_portrayal(self) -> dict:
         """Get portrayal information (symbology, fields, popups) for layer from a resource file."""
@@ -174,8 +198,9 @@ class ArcGisExporterLayer:
         t = datetime.fromtimestamp(arc_item.modified / 1000, tz=UTC)
         self._layers.set_last_refreshed(self._slug, metadata_refreshed=t)
 
-        # re-fetch layer to reflect 'last_refreshed' property values
+        # re-fetch layer to reflect 'last_refreshed' property values, and rebuild record to match
         self._layer = self._get_layer()
+        self._record = None
         self._log_last_refreshed()
 
     def setup(self) -> None:
@@ -188,11 +213,13 @@ class ArcGisExporterLayer:
 
         if self._layer.agol_id_geojson is None:
             self._logger.info("Creating Arc GeoJSON item...")
-            geojson_item = self._arcgis_client.create_item(
-                folder_name=self._config.EXPORTER_ARCGIS_FOLDER_NAME,
-                cat_item_arc=self._catalogue_item_arc_geojson,
-                data=self._get_data(),
-            )
+            data = self._get_data()
+            with self._api_call("create_item"):
+                geojson_item = self._arcgis_client.create_item(
+                    folder_name=self._config.EXPORTER_ARCGIS_FOLDER_NAME,
+                    cat_item_arc=self._catalogue_item_arc_geojson,
+                    data=data,
+                )
             # GeoJSON item is an implementation detail of the feature layer and so not added to the group
             self._layers.set_item_id(self._slug, geojson_id=geojson_item.id)
             self._logger.info("Created Arc GeoJSON item [%s].", geojson_item.id)
@@ -200,20 +227,24 @@ class ArcGisExporterLayer:
 
         if self._layer.agol_id_feature is None:
             self._logger.info("Publishing Arc feature layer item...")
-            feature_item = self._arcgis_client.publish_item(
-                self._catalogue_item_arc_geojson, self._catalogue_item_arc_feature
-            )
-            self._arcgis_client.add_item_to_group(item=feature_item, group=group)
+            with self._api_call("publish_item"):
+                feature_item = self._arcgis_client.publish_item(
+                    self._catalogue_item_arc_geojson, self._catalogue_item_arc_feature
+                )
+            with self._api_call("add_item_to_group"):
+                self._arcgis_client.add_item_to_group(item=feature_item, group=group)
             self._layers.set_item_id(self._slug, feature_id=feature_item.id)
             self._logger.info("Published Arc feature layer item [%s].", feature_item.id)
             self._set_refreshed_at(feature_item)
 
         if self._layer.agol_id_feature_ogc is None:
             self._logger.info("Publishing Arc OGC feature layer item...")
-            ogc_feature_item = self._arcgis_client.publish_item(
-                self._catalogue_item_arc_feature, self._catalogue_item_arc_ogc_feature
-            )
-            self._arcgis_client.add_item_to_group(item=ogc_feature_item, group=group)
+            with self._api_call("publish_item"):
+                ogc_feature_item = self._arcgis_client.publish_item(
+                    self._catalogue_item_arc_feature, self._catalogue_item_arc_ogc_feature
+                )
+            with self._api_call("add_item_to_group"):
+                self._arcgis_client.add_item_to_group(item=ogc_feature_item, group=group)
             self._layers.set_item_id(self._slug, feature_ogc_id=ogc_feature_item.id)
             self._logger.info("Published Arc OGC feature layer item [%s].", ogc_feature_item.id)
             self._set_refreshed_at(ogc_feature_item)
@@ -231,26 +262,32 @@ class ArcGisExporterLayer:
 
         if self._layer.agol_id_feature is not None:
             self._logger.debug("Overwriting features in Arc feature layer...")
-            self._arcgis_client.overwrite_service_features(
-                geojson_id=self._layer.agol_id_geojson, features_id=self._layer.agol_id_feature, data=self._get_data()
-            )
+            data = self._get_data()
+            with self._api_call("overwrite_service_features"):
+                self._arcgis_client.overwrite_service_features(
+                    geojson_id=self._layer.agol_id_geojson, features_id=self._layer.agol_id_feature, data=data
+                )
             self._logger.debug("Features in Arc feature layer [%s] overwritten.", self._layer.agol_id_feature)
 
             self._logger.info("Updating metadata for source Arc GeoJSON item...")
-            geojson_item = self._arcgis_client.update_item(self._catalogue_item_arc_geojson)
+            with self._api_call("update_item"):
+                geojson_item = self._arcgis_client.update_item(self._catalogue_item_arc_geojson)
             self._logger.info("Arc geojson item [%s] details updated.", geojson_item.id)
             _refresh_item = geojson_item
 
             self._logger.info("Updating metadata for Arc feature layer item...")
-            feature_item = self._arcgis_client.update_item(
-                self._catalogue_item_arc_feature, item_portrayal=self._get_portrayal()
-            )
+            portrayal = self._get_portrayal()
+            with self._api_call("update_item"):
+                feature_item = self._arcgis_client.update_item(
+                    self._catalogue_item_arc_feature, item_portrayal=portrayal
+                )
             self._logger.info("Arc feature item [%s] details updated.", feature_item.id)
             _refresh_item = feature_item
 
         if self._layer.agol_id_feature_ogc is not None:
             self._logger.info("Updating metadata for Arc OGC feature layer item...")
-            ogc_feature_item = self._arcgis_client.update_item(self._catalogue_item_arc_ogc_feature)
+            with self._api_call("update_item"):
+                ogc_feature_item = self._arcgis_client.update_item(self._catalogue_item_arc_ogc_feature)
             self._logger.info("Arc OGC feature item [%s] details updated.", ogc_feature_item.id)
             _refresh_item = ogc_feature_item
 
@@ -263,13 +300,27 @@ class ArcGisExporter(Exporter):
     Exports data as an ArcGIS feature layer.
 
     Creates a hosted feature layer of all assets and their latest position.
+
+    An optional export cache can be given to share records and extents with other exporters in the same run.
+    Optional metrics can be given to record the number and duration of ArcGIS API calls.
     """
 
-    def __init__(self, config: Config, db: DatabaseClient, logger: logging.Logger) -> None:
+    name = "arcgis"
+
+    def __init__(
+        self,
+        config: Config,
+        db: DatabaseClient,
+        logger: logging.Logger,
+        cache: ExportCache | None = None,
+        metrics: Metrics | None = None,
+    ) -> None:
         self._output_path: TemporaryDirectory | None = None
         self._config = config
         self._logger = logger
         self._db = db
+        self._cache = cache if cache is not None else ExportCache(db=db, logger=logger)
+        self._metrics = metrics if metrics is not None else Metrics()
 
         self._layers = LayersClient(db_client=self._db, logger=self._logger)
 
@@ -294,6 +345,8 @@ class ArcGisExporter(Exporter):
                 arcgis=self._arcgis,
                 layers=self._layers,
                 layer_slug=slug,
+                cache=self._cache,
+                metrics=self._metrics,
             )
             layers.append(layer)
 
@@ -9,6 +9,9 @@ class Exporter(ABC):
     exporters without knowledge of how each works.
     """
 
+    # Short, unique name for exporter, as used in the `ENABLED_EXPORTERS` config option.
+    name: str = ""  # e.g. "foo"
+
     @abstractmethod
     def export(self) -> None:
         """
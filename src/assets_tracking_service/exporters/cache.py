@@ -0,0 +1,64 @@
+import logging
+
+from lantern.lib.metadata_library.models.record.elements.identification import Extent
+
+from assets_tracking_service.db import DatabaseClient
+from assets_tracking_service.models.layer import LayerExtents, LayersClient
+from assets_tracking_service.models.record import Record, RecordsClient
+
+
+class ExportCache:
+    """
+    Per-run cache of records and layer extents shared between exporters.
+
+    Records and layer extents do not change while exporters run, but are needed repeatedly by each exporter (e.g. for
+    each ArcGIS item of a layer and again for catalogue records). Extents in particular are expensive to compute as
+    they aggregate over each layer's source view, and so are computed for all layers at once.
+
+    Layers are deliberately not cached as exporters update them (e.g. setting item IDs) during a run.
+
+    The cache MUST be cleared at the start of each run (via `clear()`) so extents reflect newly fetched positions.
+    """
+
+    def __init__(self, db: DatabaseClient, logger: logging.Logger) -> None:
+        self._logger = logger
+        self._records = RecordsClient(db)
+        self._layers = LayersClient(db_client=db, logger=logger)
+
+        self._records_by_slug: dict[str, Record | None] = {}
+        self._record_ids: list[str] | None = None
+        self._extents: LayerExtents | None = None
+
+    def clear(self) -> None:
+        """Discard all cached values."""
+        self._logger.debug("Clearing export cache.")
+        self._records_by_slug = {}
+        self._record_ids = None
+        self._extents = None
+
+    def get_record(self, slug: str) -> Record | None:
+        """Record by slug."""
+        if slug not in self._records_by_slug:
+            self._records_by_slug[slug] = self._records.get_by_slug(slug)
+        return self._records_by_slug[slug]
+
+    def list_record_ids(self) -> list[str]:
+        """All record IDs."""
+        if self._record_ids is None:
+            self._record_ids = self._records.list_ids()
+        return self._record_ids
+
+    def _get_extents(self) -> LayerExtents:
+        """Extents for all Layers."""
+        if self._extents is None:
+            self._logger.debug("Computing extents for all layers.")
+            self._extents = self._layers.get_extents()
+        return self._extents
+
+    def get_extent(self, slug: str) -> Extent:
+        """Bounding extent for data in a Layer by its slug."""
+        return self._get_extents().layers[slug]
+
+    def get_bounding_extent(self) -> Extent:
+        """Bounding extent for data across all Layers."""
+        return self._get_extents().bounding
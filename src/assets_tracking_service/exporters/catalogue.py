@@ -35,8 +35,8 @@ from lantern.models.record.const import ALIAS_NAMESPACE, CATALOGUE_NAMESPACE
 from assets_tracking_service.config import Config
 from assets_tracking_service.db import DatabaseClient
 from assets_tracking_service.exporters.base_exporter import Exporter
+from assets_tracking_service.exporters.cache import ExportCache
 from assets_tracking_service.models.layer import LayersClient
-from assets_tracking_service.models.record import RecordsClient
 
 
 class CollectionRecord(RecordMagicDiscoveryV1):
@@ -44,18 +44,22 @@ class CollectionRecord(RecordMagicDiscoveryV1):
     Data Catalogue record for collection grouping layer records.
 
     Based on the MAGIC Discovery profile v1 record base which sets defaults for elements such as contacts and citation.
+
+    An optional export cache can be given to reuse records and extents across records in the same export run.
     """
 
-    def __init__(self, config: Config, db: DatabaseClient, logger: logging.Logger) -> None:
+    def __init__(
+        self, config: Config, db: DatabaseClient, logger: logging.Logger, cache: ExportCache | None = None
+    ) -> None:
         self._config = config
         self._logger = logger
         self._db = db
-        self._records = RecordsClient(db)
+        self._cache = cache if cache is not None else ExportCache(db=db, logger=logger)
         self._layers = LayersClient(db_client=db, logger=logger)
 
         self._slug = "ats_collection"
         self._alias = "collections/assets-tracking-service"
-        self._record = self._records.get_by_slug(self._slug)
+        self._record = self._cache.get_record(self._slug)
 
         identification = Identification(
             title=self._record.title,
@@ -79,13 +83,13 @@ class CollectionRecord(RecordMagicDiscoveryV1):
             purpose=self._record.summary,
             contacts=Contacts([magic_contact(roles={ContactRoleCode.AUTHOR, ContactRoleCode.PUBLISHER})]),
             constraints=Constraints([OPEN_ACCESS_CONSTRAINT, OGL_V3]),
-            extents=Extents([self._layers.get_bounding_extent()]),
+            extents=Extents([self._cache.get_bounding_extent()]),
             aggregations=Aggregations(
                 [
                     make_in_bas_cat_collection(collection_id="b8b78c6c-fac2-402c-a772-9f518c7121e5"),
                     *[
                         make_bas_cat_collection_member(item_id=str(record_id))
-                        for record_id in self._records.list_ids()
+                        for record_id in self._cache.list_record_ids()
                         if record_id != self._record.id
                     ],
                 ]
@@ -116,18 +120,27 @@ class LayerRecord(RecordMagicDiscoveryV1):
     Data Catalogue record for a layer.
 
     Based on the MAGIC Discovery profile v1 record base which sets defaults for elements such as contacts and citation.
+
+    An optional export cache can be given to reuse records and extents across records in the same export run.
     """
 
-    def __init__(self, config: Config, db: DatabaseClient, logger: logging.Logger, layer_slug: str) -> None:
+    def __init__(
+        self,
+        config: Config,
+        db: DatabaseClient,
+        logger: logging.Logger,
+        layer_slug: str,
+        cache: ExportCache | None = None,
+    ) -> None:
         self._config = config
         self._logger = logger
         self._db = db
-        self._records = RecordsClient(db)
+        self._cache = cache if cache is not None else ExportCache(db=db, logger=logger)
         self._layers = LayersClient(db_client=db, logger=logger)
 
         self._slug = layer_slug
-        self._collection = self._records.get_by_slug("ats_collection")
-        self._record = self._records.get_by_slug(self._slug)
+        self._collection = self._cache.get_record("ats_collection")
+        self._record = self._cache.get_record(self._slug)
         self._layer = self._layers.get_by_slug(self._slug)
 
         identification = Identification(
@@ -138,7 +151,7 @@ class LayerRecord(RecordMagicDiscoveryV1):
             purpose=self._record.summary,
             contacts=Contacts([magic_contact(roles={ContactRoleCode.AUTHOR, ContactRoleCode.PUBLISHER})]),
             constraints=Constraints([OPEN_ACCESS_CONSTRAINT, OGL_V3]),
-            extents=Extents([self._layers.get_extent_by_slug(self._slug)]),
+            extents=Extents([self._cache.get_extent(self._slug)]),
             aggregations=Aggregations([make_in_bas_cat_collection(str(self._collection.id))]),
             maintenance=Maintenance(
                 progress=ProgressCode.ON_GOING,
@@ -185,18 +198,30 @@ class LayerRecord(RecordMagicDiscoveryV1):
 
 
 class DataCatalogueExporter(Exporter):
-    """Exports metadata records for the BAS Data Catalogue."""
+    """
+    Exports metadata records for the BAS Data Catalogue.
+
+    An optional export cache can be given to share records and extents with other exporters in the same run.
+    """
+
+    name = "data_catalogue"
 
-    def __init__(self, config: Config, db: DatabaseClient, logger: logging.Logger) -> None:
+    def __init__(
+        self, config: Config, db: DatabaseClient, logger: logging.Logger, cache: ExportCache | None = None
+    ) -> None:
         self._config = config
         self._logger = logger
         self._db = db
+        self._cache = cache if cache is not None else ExportCache(db=db, logger=logger)
         self._layers = LayersClient(db_client=db, logger=logger)
 
     def _get_records(self) -> list[CollectionRecord | LayerRecord]:
         """Metadata records to export."""
-        collection = CollectionRecord(self._config, self._db, self._logger)
-        layers = [LayerRecord(self._config, self._db, self._logger, slug) for slug in self._layers.list_slugs()]
+        collection = CollectionRecord(self._config, self._db, self._logger, cache=self._cache)
+        layers = [
+            LayerRecord(self._config, self._db, self._logger, slug, cache=self._cache)
+            for slug in self._layers.list_slugs()
+        ]
         return [collection, *layers]
 
     def _export_cat_json(self, record: Record) -> None:
@@ -4,16 +4,32 @@ from assets_tracking_service.config import Config
 from assets_tracking_service.db import DatabaseClient
 from assets_tracking_service.exporters.arcgis import ArcGisExporter
 from assets_tracking_service.exporters.base_exporter import Exporter
+from assets_tracking_service.exporters.cache import ExportCache
 from assets_tracking_service.exporters.catalogue import DataCatalogueExporter
+from assets_tracking_service.exporters.vector_tiles import VectorTilesExporter
+from assets_tracking_service.metrics import Metrics
+from assets_tracking_service.models.layer import LayersClient
 
 
 class ExportersManager:
-    """Coordinates exporting data to a variety of services and file formats."""
+    """
+    Coordinates exporting data to a variety of services and file formats.
 
-    def __init__(self, config: Config, db: DatabaseClient, logger: logging.Logger) -> None:
+    Enabled exporters share an export cache, cleared at the start of each export, to avoid repeatedly computing
+    records and extents. Stored layer extents are refreshed once at the start of each export.
+
+    Optional metrics can be given to record timings for each exporter (e.g. for a run summary).
+    """
+
+    def __init__(
+        self, config: Config, db: DatabaseClient, logger: logging.Logger, metrics: Metrics | None = None
+    ) -> None:
         self._config = config
         self._logger = logger
         self._db = db
+        self._metrics = metrics if metrics is not None else Metrics()
+        self._cache = ExportCache(db=self._db, logger=self._logger)
+        self._layers = LayersClient(db_client=self._db, logger=self._logger)
 
         self._exporters: list[Exporter] = self._make_exporters(self._config.ENABLED_EXPORTERS)
 
@@ -24,20 +40,34 @@ class ExportersManager:
 
         if "arcgis" in exporter_names:
             self._logger.info("Creating ArcGIS exporter...")
-            exporters.append(ArcGisExporter(config=self._config, db=self._db, logger=self._logger))
+            exporters.append(
+                ArcGisExporter(
+                    config=self._config, db=self._db, logger=self._logger, cache=self._cache, metrics=self._metrics
+                )
+            )
             self._logger.info("Created ArcGIS exporter.")
 
         if "data_catalogue" in exporter_names:
             self._logger.info("Creating Data Catalogue exporter...")
-            exporters.append(DataCatalogueExporter(config=self._config, db=self._db, logger=self._logger))
+            exporters.append(
+                DataCatalogueExporter(config=self._config, db=self._db, logger=self._logger, cache=self._cache)
+            )
             self._logger.info("Created Data Catalogue exporter.")
 
+        if "vector_tiles" in exporter_names:
+            self._logger.info("Creating vector tiles exporter...")
+            exporters.append(VectorTilesExporter(config=self._config, db=self._db, logger=self._logger))
+            self._logger.info("Created vector tiles exporter.")
+
         self._logger.info("Exporters created.")
         return exporters
 
     def export(self) -> None:
         """Run enabled exporters."""
         self._logger.info("Exporting data...")
+        self._layers.refresh_extents()
+        self._cache.clear()
 
         for exporter in self._exporters:
-            exporter.export()
+            with self._metrics.timer("export", exporter=exporter.name):
+                exporter.export()
@@ -0,0 +1,363 @@
+import gzip
+import json
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from psycopg.sql import SQL
+
+from assets_tracking_service.config import Config
+from assets_tracking_service.db import DatabaseClient
+from assets_tracking_service.exporters.base_exporter import Exporter
+
+# Web Mercator can't represent the poles, so features are clipped to its valid latitude range
+_MERCATOR_MAX_LAT = 85.0511287798066
+
+
+class VectorTilesExporter(Exporter):
+    """
+    Exports positions and asset tracks as Mapbox Vector Tiles (MVT) within an MBTiles archive.
+
+    Tiles are generated by PostGIS (`ST_AsMVT`) in the Web Mercator tiling scheme and contain layers for:
+    - `positions`: all asset positions (from `min_zoom_positions` only, as lower zooms would include too many)
+    - `tracks`: the current season track for each asset (from `v_assets_track_season`)
+
+    Tiles are regenerated incrementally:
+    - the archive records the latest position (by `created_at`) included in tiles, so only tiles touched by positions
+      added since are regenerated for the positions layer
+    - the archive records the track of each asset included in tiles, so only tiles touched by the parts of tracks that
+      have changed since (e.g. a new segment, or where a track is simplified differently) are regenerated for the
+      tracks layer
+
+    As `created_at` is set when a transaction starts, positions committed after an export may have an earlier
+    `created_at` than recorded. Positions created within `rescan_window` of the recorded value are therefore included
+    again, which must be longer than any transaction inserting positions.
+
+    All tiles are regenerated if the archive doesn't exist or the season has changed (as tracks will have been reset).
+    """
+
+    name = "vector_tiles"
+    min_zoom = 0
+    max_zoom = 10
+    min_zoom_positions = 6
+    extent = 4096
+    buffer = 256
+    rescan_window = timedelta(minutes=10)
+
+    def __init__(self, config: Config, db: DatabaseClient, logger: logging.Logger) -> None:
+        self._config = config
+        self._logger = logger
+        self._db = db
+
+        self._output_path: Path = self._config.EXPORTER_VECTOR_TILES_OUTPUT_PATH
+
+    def _open_archive(self) -> sqlite3.Connection:
+        """Open MBTiles archive, creating tables if needed."""
+        self._output_path.parent.mkdir(parents=True, exist_ok=True)
+        archive = sqlite3.connect(self._output_path)
+        archive.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata (name TEXT, value TEXT);
+            CREATE UNIQUE INDEX IF NOT EXISTS metadata_name ON metadata (name);
+            CREATE TABLE IF NOT EXISTS tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+            CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles (zoom_level, tile_column, tile_row);
+            CREATE TABLE IF NOT EXISTS ats_tracks (
+                asset_id TEXT PRIMARY KEY, name TEXT, type_code TEXT, time_start_utc TEXT, geom BLOB
+            );
+        """)
+        return archive
+
+    @staticmethod
+    def _get_metadata(archive: sqlite3.Connection, name: str) -> str | None:
+        """Get value of a metadata item from archive if set."""
+        result = archive.execute("SELECT value FROM metadata WHERE name = ?;", (name,)).fetchone()
+        return result[0] if result else None
+
+    def _set_metadata(self, archive: sqlite3.Connection, last_created_at: datetime, season_start: datetime) -> None:
+        """Set MBTiles metadata, and state for incremental updates, in archive."""
+        vector_layers = [
+            {
+                "id": "positions",
+                "minzoom": self.min_zoom_positions,
+                "maxzoom": self.max_zoom,
+                "fields": {"position_id": "String", "asset_id": "String", "time_utc": "String"},
+            },
+            {
+                "id": "tracks",
+                "minzoom": self.min_zoom,
+                "maxzoom": self.max_zoom,
+                "fields": {"asset_id": "String", "name": "String", "type_code": "String", "time_start_utc": "String"},
+            },
+        ]
+        metadata = {
+            "name": "BAS Assets Tracking Service",
+            "format": "pbf",
+            "type": "overlay",
+            "minzoom": str(self.min_zoom),
+            "maxzoom": str(self.max_zoom),
+            "bounds": f"-180,-{_MERCATOR_MAX_LAT},180,{_MERCATOR_MAX_LAT}",
+            "json": json.dumps({"vector_layers": vector_layers}),
+            "ats_last_created_at": last_created_at.isoformat(),
+            "ats_season_start": season_start.isoformat(),
+        }
+        archive.executemany(
+            "INSERT INTO metadata (name, value) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = excluded.value;",
+            metadata.items(),
+        )
+
+    def _get_state(self) -> tuple[datetime | None, datetime]:
+        """Latest position `created_at` and start of current season."""
+        result = self._db.get_query_result(SQL("""SELECT MAX(created_at), season_start() FROM public.position;"""))
+        return result[0][0], result[0][1]
+
+    def _prepare_tracks(self) -> None:
+        """
+        Compute tracks once for use in each tile.
+
+        Tracks are computed by a function over all positions in the season, which would be too slow for each tile.
+
+        Track features only include properties that don't change as positions are added to a track (i.e. not its end
+        time or number of positions), so tiles only touched by unchanged parts of a track don't need regenerating.
+        """
+        self._db.execute(SQL("""DROP TABLE IF EXISTS pg_temp.vector_tiles_tracks;"""))
+        # noinspection SqlResolve
+        self._db.execute(
+            SQL("""
+            CREATE TEMPORARY TABLE vector_tiles_tracks AS
+            SELECT
+                asset_id,
+                asset_pref_label AS name,
+                asset_type_code AS type_code,
+                to_char(time_start_utc AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"Z"') AS time_start_utc,
+                ST_TRANSFORM(
+                    ST_CLIPBYBOX2D(geom_2d, ST_MAKEENVELOPE(-180, -%(lat)s, 180, %(lat)s, 4326)), 3857
+                ) AS geom_3857
+            FROM v_assets_track_season;
+            """),
+            params={"lat": _MERCATOR_MAX_LAT},
+        )
+
+    def _load_previous_tracks(self, archive: sqlite3.Connection) -> None:
+        """Load tracks included in tiles by the last export from archive, for comparing with current tracks."""
+        rows = archive.execute("SELECT asset_id, name, type_code, time_start_utc, geom FROM ats_tracks;").fetchall()
+        self._db.execute(SQL("""DROP TABLE IF EXISTS pg_temp.vector_tiles_tracks_prev;"""))
+        # noinspection SqlResolve
+        self._db.execute(
+            SQL("""
+            CREATE TEMPORARY TABLE vector_tiles_tracks_prev AS
+            SELECT asset_id, name, type_code, time_start_utc, ST_GEOMFROMWKB(geom, 3857) AS geom_3857
+            FROM unnest(
+                %(asset_ids)s::text[],
+                %(names)s::text[],
+                %(type_codes)s::text[],
+                %(time_starts)s::text[],
+                %(geoms)s::bytea[]
+            ) AS t (asset_id, name, type_code, time_start_utc, geom);
+            """),
+            params={
+                "asset_ids": [row[0] for row in rows],
+                "names": [row[1] for row in rows],
+                "type_codes": [row[2] for row in rows],
+                "time_starts": [row[3] for row in rows],
+                "geoms": [row[4] for row in rows],
+            },
+        )
+
+    def _save_tracks(self, archive: sqlite3.Connection) -> None:
+        """Record tracks included in tiles in archive, for comparing with tracks in the next export."""
+        # noinspection SqlResolve
+        rows = self._db.get_query_result(
+            SQL("""
+            SELECT asset_id, name, type_code, time_start_utc, ST_ASBINARY(geom_3857)
+            FROM vector_tiles_tracks;
+            """)
+        )
+        archive.execute("DELETE FROM ats_tracks;")
+        archive.executemany(
+            "INSERT INTO ats_tracks (asset_id, name, type_code, time_start_utc, geom) VALUES (?, ?, ?, ?, ?);",
+            [(row[0], row[1], row[2], row[3], bytes(row[4])) for row in rows],
+        )
+
+    def _get_tiles(self, since: datetime | None) -> list[tuple[int, int, int]]:
+        """
+        Tiles touched by positions created since a time, or by changes to tracks since the last export.
+
+        Returns (z, x, y) tile indexes, for positions from `min_zoom_positions` and for tracks from all zoom levels.
+        A null `since` selects all positions.
+
+        Changes to a track are the parts of its current and previous line not shared by the other (so usually just the
+        segment to its latest positions). Where a track's properties have changed, or an asset has gained or lost a
+        track, its current and previous lines are included in full. As tracks are clipped to tiles including a buffer,
+        tiles within the buffer of a change are included too.
+        """
+        # noinspection SqlResolve
+        result = self._db.get_query_result(
+            SQL("""
+            WITH new_p AS (
+                SELECT geom_2d
+                FROM public.position
+                WHERE %(since)s::timestamptz IS NULL OR created_at > %(since)s
+            ),
+            changed_tracks AS (
+                SELECT
+                    CASE
+                        WHEN prev.asset_id IS NULL THEN cur.geom_3857
+                        WHEN cur.asset_id IS NULL THEN prev.geom_3857
+                        WHEN (cur.name, cur.type_code, cur.time_start_utc)
+                            IS DISTINCT FROM (prev.name, prev.type_code, prev.time_start_utc)
+                            THEN ST_COLLECT(prev.geom_3857, cur.geom_3857)
+                        ELSE ST_SYMDIFFERENCE(prev.geom_3857, cur.geom_3857)
+                    END AS geom
+                FROM vector_tiles_tracks AS cur
+                FULL OUTER JOIN vector_tiles_tracks_prev AS prev ON cur.asset_id = prev.asset_id
+            ),
+            features AS (
+                SELECT
+                    ST_TRANSFORM(
+                        ST_CLIPBYBOX2D(geom_2d, ST_MAKEENVELOPE(-180, -%(lat)s, 180, %(lat)s, 4326)), 3857
+                    ) AS geom,
+                    %(min_zoom_positions)s AS min_zoom,
+                    0.0 AS margin
+                FROM new_p
+                UNION ALL
+                SELECT geom, %(min_zoom)s, %(margin)s
+                FROM changed_tracks
+            ),
+            ranges AS (
+                SELECT
+                    z,
+                    f.geom,
+                    f.margin,
+                    (2 * 20037508.342789244) / (2 ^ z) AS size
+                FROM features AS f
+                CROSS JOIN generate_series(f.min_zoom, %(max_zoom)s) AS z
+                WHERE NOT ST_ISEMPTY(f.geom)
+            )
+            SELECT DISTINCT r.z, x, y
+            FROM ranges AS r
+            CROSS JOIN LATERAL generate_series(
+                greatest(floor((ST_XMIN(r.geom) + 20037508.342789244) / r.size - r.margin)::integer, 0),
+                least(
+                    floor((ST_XMAX(r.geom) + 20037508.342789244) / r.size + r.margin)::integer, (2 ^ r.z)::integer - 1
+                )
+            ) AS x
+            CROSS JOIN LATERAL generate_series(
+                greatest(floor((20037508.342789244 - ST_YMAX(r.geom)) / r.size - r.margin)::integer, 0),
+                least(
+                    floor((20037508.342789244 - ST_YMIN(r.geom)) / r.size + r.margin)::integer, (2 ^ r.z)::integer - 1
+                )
+            ) AS y
+            WHERE ST_INTERSECTS(r.geom, ST_TILEENVELOPE(r.z, x, y, margin => r.margin))
+            ORDER BY r.z, x, y;
+            """),
+            params={
+                "since": since,
+                "lat": _MERCATOR_MAX_LAT,
+                "min_zoom": self.min_zoom,
+                "min_zoom_positions": self.min_zoom_positions,
+                "max_zoom": self.max_zoom,
+                "margin": self.buffer / self.extent,
+            },
+        )
+        return [(row[0], row[1], row[2]) for row in result]
+
+    def _get_tile(self, z: int, x: int, y: int) -> bytes:
+        """Generate MVT tile, which will be empty if there are no features within tile."""
+        # noinspection SqlResolve
+        result = self._db.get_query_result(
+            SQL("""
+            WITH bounds AS (
+                SELECT
+                    ST_TILEENVELOPE(%(z)s, %(x)s, %(y)s) AS geom_3857,
+                    ST_TRANSFORM(ST_TILEENVELOPE(%(z)s, %(x)s, %(y)s), 4326) AS geom_4326
+            ),
+            positions AS (
+                SELECT
+                    p.id_ulid AS position_id,
+                    p.asset_id_ulid AS asset_id,
+                    to_char(p.time_utc AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"Z"') AS time_utc,
+                    ST_ASMVTGEOM(ST_TRANSFORM(p.geom_2d, 3857), b.geom_3857, %(extent)s, %(buffer)s) AS geom
+                FROM public.position AS p, bounds AS b
+                WHERE %(z)s >= %(min_zoom_positions)s AND ST_INTERSECTS(p.geom_2d, b.geom_4326)
+            ),
+            tracks AS (
+                SELECT
+                    t.asset_id,
+                    t.name,
+                    t.type_code,
+                    t.time_start_utc,
+                    ST_ASMVTGEOM(t.geom_3857, b.geom_3857, %(extent)s, %(buffer)s) AS geom
+                FROM vector_tiles_tracks AS t, bounds AS b
+                WHERE ST_INTERSECTS(t.geom_3857, b.geom_3857)
+            )
+            SELECT
+                COALESCE((SELECT ST_ASMVT(positions.*, 'positions', %(extent)s, 'geom') FROM positions), ''::BYTEA)
+                || COALESCE((SELECT ST_ASMVT(tracks.*, 'tracks', %(extent)s, 'geom') FROM tracks), ''::BYTEA);
+            """),
+            params={
+                "z": z,
+                "x": x,
+                "y": y,
+                "extent": self.extent,
+                "buffer": self.buffer,
+                "min_zoom_positions": self.min_zoom_positions,
+            },
+        )
+        return bytes(result[0][0])
+
+    @staticmethod
+    def _put_tile(archive: sqlite3.Connection, z: int, x: int, y: int, data: bytes) -> None:
+        """
+        Store tile in archive, or remove if empty.
+
+        MBTiles uses the TMS tiling scheme where rows are numbered from the bottom, and requires tiles be compressed.
+        """
+        tile_row = (2**z) - 1 - y
+        if not data:
+            archive.execute(
+                "DELETE FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?;", (z, x, tile_row)
+            )
+            return
+        archive.execute(
+            "INSERT INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (zoom_level, tile_column, tile_row) DO UPDATE SET tile_data = excluded.tile_data;",
+            (z, x, tile_row, gzip.compress(data)),
+        )
+
+    def export(self) -> None:
+        """
+        Generate tiles for new positions and tracks and save to archive.
+
+        Part of exporter public interface.
+        """
+        last_created_at, season_start = self._get_state()
+        if last_created_at is None:
+            self._logger.info("No positions to export as vector tiles, skipping.")
+            return
+
+        archive = self._open_archive()
+        try:
+            since_value = self._get_metadata(archive, "ats_last_created_at")
+            since = datetime.fromisoformat(since_value) if since_value else None
+            if since is not None and self._get_metadata(archive, "ats_season_start") != season_start.isoformat():
+                self._logger.info("Season changed since last export, regenerating all tiles.")
+                since = None
+            if since is None:
+                archive.execute("DELETE FROM tiles;")
+                archive.execute("DELETE FROM ats_tracks;")
+            else:
+                since -= self.rescan_window
+
+            self._prepare_tracks()
+            self._load_previous_tracks(archive)
+            tiles = self._get_tiles(since=since)
+            self._logger.info("Generating %s vector tiles...", len(tiles))
+            for z, x, y in tiles:
+                self._put_tile(archive, z, x, y, self._get_tile(z, x, y))
+
+            self._save_tracks(archive)
+            self._set_metadata(archive, last_created_at=last_created_at, season_start=season_start)
+            archive.commit()
+            self._logger.info("Vector tiles saved to '%s'.", self._output_path.resolve())
+        finally:
+            archive.close()
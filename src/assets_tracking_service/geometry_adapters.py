@@ -0,0 +1,85 @@
+import struct
+from functools import cache
+
+import shapely
+from psycopg import Connection
+from psycopg.types import TypeInfo
+from psycopg.types.shapely import BaseGeometryBinaryDumper, BaseGeometryDumper, register_shapely
+from shapely import Point
+from shapely.geometry.base import BaseGeometry
+
+SRID = 4326
+
+# little endian byte order, geometry type with Z and SRID flags, SRID, coordinates
+_EWKB_POINT = struct.Struct("<BIIdd")
+_EWKB_POINT_Z = struct.Struct("<BIIddd")
+_EWKB_Z_FLAG = 0x80000000
+_EWKB_SRID_FLAG = 0x20000000
+
+
+def dumps(geom: BaseGeometry, hex: bool = False) -> bytes | str:  # noqa: A002
+    """
+    Encode geometry as Extended Well Known Binary (EWKB).
+
+    Geometries without an SRID are assumed to use WGS84 (EPSG:4326). Z values are included if present.
+
+    Points (the most common case) are encoded directly, as Shapely's per-geometry overhead is much larger than the
+    encoding itself. Other geometries are encoded by Shapely.
+    """
+    srid = shapely.get_srid(geom) or SRID
+    if type(geom) is Point:
+        has_z = geom.has_z
+        coords = shapely.get_coordinates(geom, include_z=has_z)
+        if len(coords) == 1:
+            if has_z:
+                data = _EWKB_POINT_Z.pack(1, 1 | _EWKB_Z_FLAG | _EWKB_SRID_FLAG, srid, *coords[0])
+            else:
+                data = _EWKB_POINT.pack(1, 1 | _EWKB_SRID_FLAG, srid, *coords[0])
+            return data.hex().upper() if hex else data
+
+    geom = shapely.set_srid(geom, srid)
+    return shapely.to_wkb(geom, hex=hex, output_dimension=3, include_srid=True, byte_order=1)
+
+
+class _GeometryDumper(BaseGeometryDumper):
+    """Dump geometries as hex encoded EWKB (for text parameters and COPY), including default SRID."""
+
+    def dump(self, obj: BaseGeometry) -> bytes:
+        """Dump geometry."""
+        return dumps(obj, hex=True).encode()
+
+
+class _GeometryBinaryDumper(BaseGeometryBinaryDumper):
+    """Dump geometries as EWKB, including default SRID."""
+
+    def dump(self, obj: BaseGeometry) -> bytes:
+        """Dump geometry."""
+        return dumps(obj)
+
+
+@cache
+def _make_dumpers(oid: int) -> tuple[type[_GeometryDumper], type[_GeometryBinaryDumper]]:
+    """Make dumpers for PostGIS geometry type OID (which varies per database)."""
+    return (
+        type("GeometryDumper", (_GeometryDumper,), {"oid": oid}),
+        type("GeometryBinaryDumper", (_GeometryBinaryDumper,), {"oid": oid}),
+    )
+
+
+def register(conn: Connection) -> bool:
+    """
+    Use binary (EWKB) adapters for PostGIS geometries in a psycopg connection.
+
+    Shapely geometries are sent to, and geometry values loaded from, the database as (E)WKB rather than text. Binary
+    dumpers are registered last so are used by default.
+
+    Returns False, without registering adapters, if the PostGIS extension isn't available (e.g. before migrations).
+    """
+    info = TypeInfo.fetch(conn, "geometry")
+    if info is None:
+        return False
+
+    register_shapely(info, conn)
+    for dumper in _make_dumpers(info.oid):
+        conn.adapters.register_dumper(BaseGeometry, dumper)
+    return True
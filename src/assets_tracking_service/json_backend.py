@@ -0,0 +1,42 @@
+import json
+from typing import Any
+
+from psycopg import AsyncConnection, Connection
+from psycopg.types.json import set_json_dumps, set_json_loads
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps(obj: Any) -> bytes:  # noqa: ANN401
+    """
+    Serialise object as compact UTF-8 encoded JSON.
+
+    Uses orjson if installed (via the optional `fast-json` extra), otherwise the standard library.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:  # noqa: ANN401
+    """
+    Parse JSON.
+
+    Uses orjson if installed (via the optional `fast-json` extra), otherwise the standard library.
+    """
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def register(conn: Connection | AsyncConnection) -> None:
+    """Use JSON backend for adapting JSON and JSONB values in a psycopg connection."""
+    set_json_dumps(dumps, context=conn)
+    set_json_loads(loads, context=conn)
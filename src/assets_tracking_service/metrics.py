@@ -0,0 +1,141 @@
+import logging
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from time import perf_counter
+
+from assets_tracking_service import json_backend
+
+PREFIX = "ats"
+
+_Key = tuple[str, tuple[tuple[str, str], ...]]
+
+
+@dataclass(kw_only=True)
+class Timer:
+    """Number of times, and total seconds, a timed block ran."""
+
+    count: int = 0
+    seconds: float = 0.0
+
+
+def _escape(value: str) -> str:
+    """Escape label value for the Prometheus text format."""
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    """Format labels for the Prometheus text format."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class Metrics:
+    """
+    Timers and counters for instrumenting a run.
+
+    Timers record how many times, and for how long in total, a block of code runs (e.g. a provider fetch or API call).
+    Counters record totals (e.g. rows inserted). Both are identified by a name and optional labels (e.g. a provider).
+
+    At the end of a run, metrics are summarised as a structured (JSON) log line, and optionally written to a file in the
+    Prometheus text format (for the node exporter's textfile collector).
+    """
+
+    def __init__(self) -> None:
+        self._started_at = datetime.now(tz=UTC)
+        self._start = perf_counter()
+        self._timers: dict[_Key, Timer] = {}
+        self._counters: dict[_Key, int] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict[str, str]) -> _Key:
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Generator[None, None, None]:
+        """Time block, recorded even if an exception is raised."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            timer = self._timers.setdefault(self._key(name, labels), Timer())
+            timer.count += 1
+            timer.seconds += perf_counter() - start
+
+    def count(self, name: str, value: int = 1, **labels: str) -> None:
+        """Increment counter."""
+        key = self._key(name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    @property
+    def duration(self) -> float:
+        """Seconds since metrics were created."""
+        return perf_counter() - self._start
+
+    def summary(self) -> dict:
+        """Summary of all timers and counters."""
+        return {
+            "started_at": self._started_at.isoformat(),
+            "duration_seconds": round(self.duration, 6),
+            "timers": [
+                {"name": name, "labels": dict(labels), "count": timer.count, "seconds": round(timer.seconds, 6)}
+                for (name, labels), timer in sorted(self._timers.items())
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ],
+        }
+
+    def log(self, logger: logging.Logger) -> None:
+        """Log summary as a single JSON line."""
+        logger.info("Run metrics: %s", json_backend.dumps(self.summary()).decode())
+
+    def dumps_prometheus(self) -> str:
+        """
+        Metrics in the Prometheus text format.
+
+        Timers are represented as summaries (`_count` and `_sum` in seconds), counters as counters (`_total`).
+        The duration and time of the run are included as gauges.
+        """
+        lines = []
+
+        names = sorted({name for name, _ in self._timers})
+        for name in names:
+            metric = f"{PREFIX}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for (name_, labels), timer in sorted(self._timers.items()):
+                if name_ == name:
+                    lines.append(f"{metric}_count{_format_labels(labels)} {timer.count}")
+                    lines.append(f"{metric}_sum{_format_labels(labels)} {timer.seconds:.6f}")
+
+        names = sorted({name for name, _ in self._counters})
+        for name in names:
+            metric = f"{PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(
+                f"{metric}{_format_labels(labels)} {value}"
+                for (name_, labels), value in sorted(self._counters.items())
+                if name_ == name
+            )
+
+        lines.append(f"# TYPE {PREFIX}_run_duration_seconds gauge")
+        lines.append(f"{PREFIX}_run_duration_seconds {self.duration:.6f}")
+        lines.append(f"# TYPE {PREFIX}_run_timestamp_seconds gauge")
+        lines.append(f"{PREFIX}_run_timestamp_seconds {self._started_at.timestamp():.3f}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        """
+        Write metrics to a file in the Prometheus text format.
+
+        Written via a temporary file and renamed so the file is never read partially written.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(self.dumps_prometheus())
+        tmp_path.replace(path)
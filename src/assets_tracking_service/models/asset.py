@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from dataclasses import dataclass
 from typing import TypeVar
 
@@ -41,7 +42,7 @@ class AssetNew:
     def to_db_dict(self) -> dict:
         """Convert to a dictionary suitable for database insertion."""
         converter = cattrs.Converter()
-        converter.register_unstructure_hook(Labels, lambda d: Jsonb(self.labels.unstructure()))
+        converter.register_unstructure_hook(Labels, lambda d: Jsonb(d, dumps=Labels.dumps))
 
         return converter.unstructure(self)
 
@@ -89,9 +90,39 @@ class AssetsClient:
     def __init__(self, db_client: DatabaseClient) -> None:
         self._db = db_client
 
-    def add(self, asset: AssetNew) -> None:
-        """Persist a new Asset in the database."""
-        self._db.insert_dict(schema=self._schema, table_view=self._table_view, data=asset.to_db_dict())
+    def add(self, asset: AssetNew, dist_label_scheme: str) -> None:
+        """
+        Persist a new Asset in the database.
+
+        The asset is identified by the value of its distinguishing label (`dist_label_scheme`), see `add_batch()`.
+        """
+        self.add_batch([asset], dist_label_scheme=dist_label_scheme)
+
+    def add_batch(self, assets: Sequence[AssetNew], dist_label_scheme: str) -> int:
+        """
+        Persist new Assets from a provider in the database in a single statement, returning how many were new.
+
+        Assets are identified by their provider (from their 'ats:provider_id' label) and the value of their
+        distinguishing label (`dist_label_scheme`), which are unique. Assets which already exist are skipped by the
+        database, rather than by checking for existing assets first, so this is safe to repeat and to run concurrently.
+        """
+        if not assets:
+            return 0
+
+        results = self._db.get_query_result(
+            query=SQL("""
+                INSERT INTO public.asset (labels, dist_asset_value)
+                SELECT a.labels::jsonb, a.dist_value
+                FROM unnest(%s::text[], %s::text[]) AS a (labels, dist_value)
+                ON CONFLICT (provider_id, dist_asset_value) DO NOTHING
+                RETURNING id;
+            """),
+            params=(
+                [asset.labels.dumps().decode() for asset in assets],
+                [str(asset.labels.filter_by_scheme(dist_label_scheme).value) for asset in assets],
+            ),
+        )
+        return len(results)
 
     def list_filtered_by_label(self, label: Label) -> list[Asset]:
         """
@@ -110,7 +141,7 @@ class AssetsClient:
         results = self._db.get_query_result(
             query=SQL("""
                 SELECT
-                    uuid_to_ulid(id) AS id,
+                    id_ulid AS id,
                     labels
                 FROM public.asset
                 WHERE EXISTS (
@@ -129,7 +160,7 @@ class AssetsClient:
         results = self._db.get_query_result(
             query=SQL("""
                 SELECT
-                    uuid_to_ulid(id) AS id,
+                    id_ulid AS id,
                     labels
                 FROM
                     public.asset;
@@ -1,10 +1,15 @@
+import sys
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from enum import Enum
-from typing import Literal, TypedDict, TypeVar, Union
+from functools import wraps
+from typing import Literal, TypedDict, TypeVar
 
 import cattrs
 
+from assets_tracking_service import json_backend
+
 T = TypeVar("T", bound="Labels")
 
 
@@ -19,12 +24,25 @@ class LabelRelation(Enum):
     PROVIDER = "provider"
 
 
-@dataclass(kw_only=True, frozen=True)
+def label_creation() -> int:
+    """
+    Timestamp for label creation.
+
+    Labels created together (e.g. for all entities fetched from a provider) SHOULD share a single value, passed as
+    `creation`, rather than each computing their own.
+    """
+    return int(datetime.now(UTC).timestamp())
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
 class Label:
     """
     A Label.
 
     Represents the Label entity from data model.
+
+    Slotted to reduce memory use, as many labels are created for each provider entity. Schemes are interned as the same
+    few values are repeated across most labels.
     """
 
     rel: LabelRelation
@@ -32,11 +50,11 @@ class Label:
     scheme_uri: str | None = None
     value: str | int | float
     value_uri: str | None = None
-    creation: int = field(default_factory=lambda: int(datetime.now(UTC).timestamp()))
+    creation: int = field(default_factory=label_creation)
     expiration: int | None = None
 
     def __post_init__(self) -> None:
-        """Validate fields."""
+        """Validate and intern fields."""
         if not isinstance(self.rel, LabelRelation):
             msg = f"Invalid label relation: [{self.rel}]. It must be a LabelRelation enum member."
             raise TypeError(msg)
@@ -64,6 +82,11 @@ class Label:
                 msg = f"Invalid label expiration: [{self.expiration}]. It must be a valid timestamp."
                 raise ValueError(msg) from e
 
+        if isinstance(self.scheme, str):
+            object.__setattr__(self, "scheme", sys.intern(self.scheme))
+        if isinstance(self.scheme_uri, str):
+            object.__setattr__(self, "scheme_uri", sys.intern(self.scheme_uri))
+
     @property
     def created(self) -> datetime:
         """Label creation."""
@@ -86,17 +109,50 @@ class Label:
         return datetime.now(UTC) >= self.expired
 
 
+def _resets_index(method: Callable) -> Callable:
+    """Wrap a list method that modifies items to discard any scheme index built for a Labels instance."""
+
+    @wraps(method)
+    def wrapper(self: "Labels", *args, **kwargs) -> object:  # noqa: ANN002, ANN003
+        self._scheme_index = None
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class Labels(list[Label]):
-    """Collection of Labels."""
+    """
+    Collection of Labels.
+
+    Labels are indexed by scheme when first looked up by `filter_by_scheme()`. The index is discarded if labels are
+    added, removed or reordered.
+    """
 
     version = "1"
 
+    _scheme_index: dict[str, Label] | None = None
+
+    append = _resets_index(list.append)
+    extend = _resets_index(list.extend)
+    insert = _resets_index(list.insert)
+    remove = _resets_index(list.remove)
+    pop = _resets_index(list.pop)
+    clear = _resets_index(list.clear)
+    sort = _resets_index(list.sort)
+    reverse = _resets_index(list.reverse)
+    __setitem__ = _resets_index(list.__setitem__)
+    __delitem__ = _resets_index(list.__delitem__)
+    __iadd__ = _resets_index(list.__iadd__)
+    __imul__ = _resets_index(list.__imul__)
+
     def __repr__(self) -> str:
         """String representation."""  # noqa: D401
         return f"Labels[v1]({super().__repr__()})"
 
     def __eq__(self, other: "Labels") -> bool:
         """Equality check."""
+        if self is other:
+            return True
         return set(self) == set(other)
 
     @property
@@ -109,6 +165,20 @@ class Labels(list[Label]):
         """Expired labels."""
         return [label for label in self if label.expired]
 
+    @property
+    def shared(self) -> "Labels":
+        """
+        Labels shared by entities from a provider (i.e. with a provider relation).
+
+        Typically identical for all positions fetched together, so stored once for positions as a label set.
+        """
+        return Labels([label for label in self if label.rel == LabelRelation.PROVIDER])
+
+    @property
+    def unshared(self) -> "Labels":
+        """Labels specific to an entity (i.e. not shared)."""
+        return Labels([label for label in self if label.rel != LabelRelation.PROVIDER])
+
     class LabelsPlain(TypedDict):
         """Types for `unstructure`."""
 
@@ -116,7 +186,7 @@ class Labels(list[Label]):
         values: list[dict[str, str | int | float]]
 
     @staticmethod
-    def _structure_str_int_float(value: str | int | float, _) -> str | int | float:  # noqa: ANN001
+    def _structure_value(value: str | int | float) -> str | int | float:
         if isinstance(value, str | int | float):
             return value
 
@@ -129,29 +199,78 @@ class Labels(list[Label]):
         Convert from plain objects.
 
         Returns a new class instance with parsed data.
-        """
-        converter = cattrs.Converter()
-        converter.register_structure_hook(Union[str, int, float], cls._structure_str_int_float)  # noqa: UP007 for Label.value
-        converter.register_structure_hook(
-            cls, lambda d, t: cls([converter.structure(label, Label) for label in d["values"]])
-        )
 
-        _labels = converter.structure(data, Labels)
-        return cls(_labels)
+        Labels are structured directly rather than via a cattrs converter, as this is called for every asset and
+        position loaded. Errors are collected and raised as a cattrs `ClassValidationError` for consistency with other
+        models.
+        """
+        labels = []
+        errors = []
+        for value in data["values"]:
+            try:
+                labels.append(
+                    Label(
+                        rel=LabelRelation(value["rel"]),
+                        scheme=value["scheme"],
+                        scheme_uri=value.get("scheme_uri"),
+                        value=cls._structure_value(value["value"]),
+                        value_uri=value.get("value_uri"),
+                        creation=value["creation"] if "creation" in value else label_creation(),
+                        expiration=value.get("expiration"),
+                    )
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append(e)
+
+        if errors:
+            msg = f"While structuring {cls.__name__}"
+            raise cattrs.ClassValidationError(msg, errors, cls)
+        return cls(labels)
 
     def unstructure(self) -> LabelsPlain:
         """Convert to plain objects."""
-        converter = cattrs.Converter()
-        converter.register_unstructure_hook(
-            Labels, lambda d: {"version": self.version, "values": [converter.unstructure(label) for label in d]}
-        )
-        return converter.unstructure(self)
+        return {
+            "version": self.version,
+            "values": [
+                {
+                    "rel": label.rel.value,
+                    "scheme": label.scheme,
+                    "scheme_uri": label.scheme_uri,
+                    "value": label.value,
+                    "value_uri": label.value_uri,
+                    "creation": label.creation,
+                    "expiration": label.expiration,
+                }
+                for label in self
+            ],
+        }
+
+    @classmethod
+    def loads(cls: type[T], data: bytes | str) -> "Labels":
+        """Convert from JSON."""
+        return cls.structure(json_backend.loads(data))
+
+    def dumps(self) -> bytes:
+        """
+        Convert to JSON.
+
+        Can be used with psycopg's `Jsonb` adapter (as `Jsonb(labels, dumps=Labels.dumps)`).
+        """
+        return json_backend.dumps(self.unstructure())
+
+    def _get_scheme_index(self) -> dict[str, Label]:
+        """First label for each scheme."""
+        if self._scheme_index is None:
+            index = {}
+            for label in self:
+                index.setdefault(label.scheme, label)
+            self._scheme_index = index
+        return self._scheme_index
 
     def filter_by_scheme(self, scheme: str) -> Label:
         """Filter labels by scheme."""
-        for label in self:
-            if label.scheme == scheme:
-                return label
-
-        msg = f"No label with scheme: [{scheme}]."
-        raise ValueError(msg)
+        try:
+            return self._get_scheme_index()[scheme]
+        except KeyError:
+            msg = f"No label with scheme: [{scheme}]."
+            raise ValueError(msg) from None
@@ -2,12 +2,12 @@ import re
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from logging import Logger
-from typing import TypeVar
+from typing import Literal, TypeVar
 
 import cattrs
 from lantern.lib.metadata_library.models.record.elements.identification import Extent
 from lantern.lib.metadata_library.models.record.presets.extents import make_bbox_extent, make_temporal_extent
-from psycopg.sql import SQL, Identifier
+from psycopg.sql import SQL
 
 from assets_tracking_service.db import DatabaseClient
 
@@ -20,10 +20,14 @@ class LayerNew:
     A layer in its initial state.
 
     Represents the Layer meta-entity from the data model before it's been saved to the database.
+
+    `layer_type` indicates whether the layer's source view contains positions or tracks. Position layers have a
+    `time_utc` column. Track layers have `time_start_utc` and `time_end_utc` columns.
     """
 
     slug: str
     source_view: str
+    layer_type: Literal["position", "track"] = "position"
 
     def __post_init__(self) -> None:
         """Validate fields."""
@@ -68,6 +72,14 @@ class Layer(LayerNew):
         return f"Layer({', '.join(parts)})"
 
 
+@dataclass(kw_only=True)
+class LayerExtents:
+    """Bounding extents for data in each Layer (by slug) and across all Layers."""
+
+    layers: dict[str, Extent]
+    bounding: Extent
+
+
 # noinspection SqlInsertValues
 class LayersClient:
     """Client for managing Layers."""
@@ -85,6 +97,15 @@ class LayersClient:
         results = self._db.get_query_result(query=SQL("""SELECT slug FROM public.layer;"""))
         return [row[0] for row in results]
 
+    def list_export_views(self) -> list[str]:
+        """
+        Retrieve views used by exporters for all Layers.
+
+        I.e. each Layer's source view and its GeoJSON variant (see `ArcGisExporterLayer._get_data()`).
+        """
+        results = self._db.get_query_result(query=SQL("""SELECT source_view FROM public.layer ORDER BY slug;"""))
+        return [view for row in results for view in (row[0], f"{row[0]}_geojson")]
+
     def get_by_slug(self, slug: str) -> Layer | None:
         """
         Retrieve a Layer by its slug.
@@ -93,7 +114,16 @@ class LayersClient:
         """
         result = self._db.get_query_result(
             query=SQL("""
-                SELECT slug, source_view, agol_id_geojson, agol_id_feature, agol_id_feature_ogc, data_last_refreshed, metadata_last_refreshed, created_at
+                SELECT
+                    slug,
+                    source_view,
+                    layer_type,
+                    agol_id_geojson,
+                    agol_id_feature,
+                    agol_id_feature_ogc,
+                    data_last_refreshed,
+                    metadata_last_refreshed,
+                    created_at
                 FROM public.layer
                 WHERE slug = %(slug)s;
             """),
@@ -105,66 +135,75 @@ class LayersClient:
             return None
         return Layer.from_db_dict(result[0])
 
+    @staticmethod
+    def _make_extent(row: tuple) -> Extent:
+        """Make extent from a `(min_x, min_y, max_x, max_y, min_t, max_t)` result row."""
+        bbox = make_bbox_extent(min_x=row[0], max_x=row[2], min_y=row[1], max_y=row[3])
+        time = make_temporal_extent(start=row[4], end=row[5])
+        return Extent(identifier="bounding", geographic=bbox, temporal=time)
+
+    def refresh_extents(self) -> None:
+        """
+        Recompute stored extents for all Layers from their source views.
+
+        Layer source views exclude older positions (e.g. latest position per asset, or positions within a rolling
+        window), so extents can shrink as well as grow and are not updated as positions are inserted. Intended to be
+        called once before extents are read for an export.
+        """
+        self._db.execute(query=SQL("""SELECT refresh_layer_extent(slug) FROM public.layer;"""))
+
     def get_extent_by_slug(self, slug: str) -> Extent:
         """
         Retrieve a bounding geographic and temporal extent for data in Layer by its slug.
 
         Slug has a DB unique constraint so we assume they'll be at most one result.
 
-        Replies on the `layer.source_view` returning rows containing `geom_2d` and `time_utc` columns.
+        Read from stored extents, which MUST be refreshed first (see `refresh_extents()`).
         """
-        source_view_result = self._db.get_query_result(
-            query=SQL("""SELECT source_view FROM public.layer WHERE slug = %(slug)s;"""),
+        result = self._db.get_query_result(
+            query=SQL("""
+                SELECT min_x, min_y, max_x, max_y, min_time, max_time
+                FROM public.layer_extent
+                WHERE layer_slug = %(slug)s;
+            """),
             params={"slug": slug},
         )
-        source_view_result = source_view_result[0][0]
+        if not result:
+            msg = f"No extent for layer: [{slug}]."
+            raise ValueError(msg)
+        self._logger.debug("Raw extents data: %s", result[0])
+
+        return self._make_extent(result[0])
+
+    def get_extents(self) -> LayerExtents:
+        """
+        Retrieve bounding geographic and temporal extents for data in each Layer and across all Layers.
 
-        # noinspection SqlResolve
+        Read from stored extents, which MUST be refreshed first (see `refresh_extents()`). The extent across all
+        layers is included as a row with a null slug.
+        """
         result = self._db.get_query_result(
             query=SQL("""
-            WITH latest_ext AS (
-                SELECT
-                    ST_EXTENT(geom_2d) AS bbox,
-                    MIN(time_utc)::timestamptz (0) AS min_time,
-                    MAX(time_utc)::timestamptz (0) AS max_time
-                FROM {view}
-            )
-            SELECT
-                ST_XMIN(bbox) AS min_x,
-                ST_YMIN(bbox) AS min_y,
-                ST_XMAX(bbox) AS max_x,
-                ST_YMAX(bbox) AS max_y,
-                min_time AS min_t,
-                max_time AS max_t
-            FROM latest_ext;
-            """).format(view=Identifier(source_view_result))
+                SELECT layer_slug, min_x, min_y, max_x, max_y, min_time, max_time
+                FROM public.layer_extent
+                UNION ALL
+                SELECT NULL, MIN(min_x), MIN(min_y), MAX(max_x), MAX(max_y), MIN(min_time), MAX(max_time)
+                FROM public.layer_extent
+                HAVING COUNT(*) > 0;
+            """)
         )
-        self._logger.debug("Raw extents data: %s", result[0])
+        self._logger.debug("Raw extents data: %s", result)
+        if not result:
+            msg = "No layers to compute extents for."
+            raise ValueError(msg)
 
-        row = result[0]
-        bbox = make_bbox_extent(min_x=row[0], max_x=row[2], min_y=row[1], max_y=row[3])
-        time = make_temporal_extent(start=row[4], end=row[5])
-        return Extent(identifier="bounding", geographic=bbox, temporal=time)
+        extents = {row[0]: self._make_extent(row[1:]) for row in result}
+        bounding = extents.pop(None)
+        return LayerExtents(layers=extents, bounding=bounding)
 
     def get_bounding_extent(self) -> Extent:
         """Retrieve a bounding geographic and temporal extent for data across all Layers."""
-        extents = [self.get_extent_by_slug(slug) for slug in self.list_slugs()]
-
-        bboxes = [extent.geographic.bounding_box for extent in extents]
-        bbox = make_bbox_extent(
-            min_x=min(bbox.west_longitude for bbox in bboxes),
-            max_x=max(bbox.east_longitude for bbox in bboxes),
-            min_y=min(bbox.south_latitude for bbox in bboxes),
-            max_y=max(bbox.north_latitude for bbox in bboxes),
-        )
-
-        times = [extent.temporal.period for extent in extents if extent.temporal is not None]
-        time = make_temporal_extent(
-            start=min(time.start.date for time in times),
-            end=max(time.end.date for time in times),
-        )
-
-        return Extent(identifier="bounding", geographic=bbox, temporal=time)
+        return self.get_extents().bounding
 
     def get_latest_data_refresh(self) -> datetime:
         """Retrieve latest `data_last_refreshed` value, or None if null."""
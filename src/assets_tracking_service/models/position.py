@@ -1,17 +1,21 @@
-from copy import copy
+from collections.abc import Generator, Sequence
 from dataclasses import dataclass
 from datetime import UTC, datetime
-from typing import Literal, TypeVar
+from typing import ClassVar, Literal, TypeVar
 from uuid import UUID
 
 import cattrs
+import numpy as np
+import shapely
 from cattrs.gen import make_dict_structure_fn, make_dict_unstructure_fn
+from psycopg.sql import SQL, Composable, Identifier
 from psycopg.types.json import Jsonb
-from shapely import Point, wkt
+from shapely import Point, force_2d, force_3d, from_wkb
 from ulid import ULID
 from ulid import parse as ulid_parse
 
 from assets_tracking_service.db import DatabaseClient
+from assets_tracking_service.geometry_adapters import SRID
 from assets_tracking_service.models.label import Labels
 
 T = TypeVar("T", bound="Position")
@@ -66,16 +70,11 @@ class PositionNew:
 
     def to_db_dict(self) -> dict:
         """Convert to a dictionary suitable for database insertion."""
-        geom_dimensions = copy(self.geom_dimensions)
-
-        # DB geom must be 3D
-        if geom_dimensions == 2:
-            self.geom = Point(self.geom.x, self.geom.y, 0)
-
         converter = cattrs.Converter()
         converter.register_unstructure_hook(ULID, lambda d: UUID(bytes=d.bytes))
-        converter.register_unstructure_hook(Point, lambda d: d.wkt)
-        converter.register_unstructure_hook(Labels, lambda d: Jsonb(self.labels.unstructure()))
+        # DB geom must be 3D (2D geometries use a Z value of 0), sent as EWKB by the DB client's geometry adapters
+        converter.register_unstructure_hook(Point, force_3d)
+        converter.register_unstructure_hook(Labels, lambda d: Jsonb(d, dumps=Labels.dumps))
         converter.register_unstructure_hook(
             PositionNew,
             make_dict_unstructure_fn(
@@ -90,15 +89,232 @@ class PositionNew:
         # inject geom_dimensions property as cattrs doesn't handle properties
         # https://github.com/python-attrs/cattrs/issues/102
         # not using unstructure hook as they don't recurse so would clobber other hooks
-        data["geom_dimensions"] = geom_dimensions
-
-        # restore original geom
-        if geom_dimensions == 2:
-            self.geom = Point(self.geom.x, self.geom.y)
+        data["geom_dimensions"] = self.geom_dimensions
 
         return data
 
 
+@dataclass(kw_only=True, eq=False)
+class PositionBatch:
+    """
+    A set of positions in their initial state, stored as columns.
+
+    Equivalent to a list of PositionNew instances but validated, and converted for database insertion, as whole
+    columns using NumPy and Shapely array functions rather than per position.
+
+    Time values may be given as UTC datetimes or as a NumPy datetime64 array (assumed to be UTC). Missing elevations
+    (for 2D positions), velocities and headings may be given as None, and are stored as NaN.
+    """
+
+    asset_id: Sequence[ULID]
+    time: np.ndarray
+    lon: np.ndarray
+    lat: np.ndarray
+    z: np.ndarray
+    velocity: np.ndarray
+    heading: np.ndarray
+    labels: Sequence[Labels]
+
+    @property
+    def geom_dimensions(self) -> np.ndarray:
+        """Return the number of dimensions in the geometry of each position."""
+        return np.where(np.isnan(self.z), 2, 3)
+
+    @staticmethod
+    def _first(values: np.ndarray, invalid: np.ndarray) -> float:
+        """First invalid value in a column for error messages."""
+        return values[np.argmax(invalid)].item()
+
+    def _validate(self) -> None:
+        """Validate fields."""
+        columns = [self.asset_id, self.time, self.lon, self.lat, self.z, self.velocity, self.heading, self.labels]
+        if len({len(column) for column in columns}) != 1:
+            msg = "Invalid batch: All columns must be the same length."
+            raise ValueError(msg)
+
+        invalid = ~((self.lon >= -180) & (self.lon <= 180))
+        if invalid.any():
+            msg = f"Invalid longitude value: [{self._first(self.lon, invalid)}]. It must be between -180 and 180."
+            raise ValueError(msg)
+
+        invalid = ~((self.lat >= -90) & (self.lat <= 90))
+        if invalid.any():
+            msg = f"Invalid latitude value: [{self._first(self.lat, invalid)}]. It must be between -90 and 90."
+            raise ValueError(msg)
+
+        invalid = self.velocity < 0
+        if invalid.any():
+            msg = (
+                f"Invalid velocity value: [{self._first(self.velocity, invalid)}]. "
+                "It must be greater than or equal to 0."
+            )
+            raise ValueError(msg)
+
+        invalid = (self.heading < 0) | (self.heading >= 360)
+        if invalid.any():
+            msg = f"Invalid heading value: [{self._first(self.heading, invalid)}]. It must be between 0 and 360."
+            raise ValueError(msg)
+
+        if not all(isinstance(labels, Labels) for labels in self.labels):
+            msg = "Invalid labels: It must be a Labels object."
+            raise TypeError(msg)
+
+    @staticmethod
+    def _to_time_array(time: np.ndarray | Sequence[datetime]) -> np.ndarray:
+        """Convert UTC datetimes to a NumPy datetime64 array."""
+        if isinstance(time, np.ndarray) and np.issubdtype(time.dtype, np.datetime64):
+            return time.astype("datetime64[us]")
+
+        for value in time:
+            if value.tzinfo is None or value.tzinfo != UTC:
+                msg = f"Invalid timezone: [{value.tzinfo}]. It must be UTC."
+                raise ValueError(msg)
+        return np.array([value.replace(tzinfo=None) for value in time], dtype="datetime64[us]")
+
+    def __post_init__(self) -> None:
+        """Convert columns to arrays and validate."""
+        self.asset_id = list(self.asset_id)
+        self.labels = list(self.labels)
+        self.time = self._to_time_array(self.time)
+        self.lon = np.asarray(self.lon, dtype=np.float64)
+        self.lat = np.asarray(self.lat, dtype=np.float64)
+        self.z = np.asarray(self.z, dtype=np.float64)
+        self.velocity = np.asarray(self.velocity, dtype=np.float64)
+        self.heading = np.asarray(self.heading, dtype=np.float64)
+        self._validate()
+
+    def __len__(self) -> int:
+        """Return number of positions in batch."""
+        return len(self.asset_id)
+
+    def __getitem__(self, index: int) -> PositionNew:
+        """Return position at index."""
+        z = self.z[index].item()
+        velocity = self.velocity[index].item()
+        heading = self.heading[index].item()
+        return PositionNew(
+            asset_id=self.asset_id[index],
+            time=self.time[index].item().replace(tzinfo=UTC),
+            geom=Point(self.lon[index], self.lat[index]) if np.isnan(z) else Point(self.lon[index], self.lat[index], z),
+            velocity=None if np.isnan(velocity) else velocity,
+            heading=None if np.isnan(heading) else heading,
+            labels=self.labels[index],
+        )
+
+    @classmethod
+    def from_positions(cls, positions: Sequence[PositionNew]) -> "PositionBatch":
+        """Create batch from a list of positions."""
+        return cls(
+            asset_id=[position.asset_id for position in positions],
+            time=[position.time for position in positions],
+            lon=[position.geom.x for position in positions],
+            lat=[position.geom.y for position in positions],
+            z=[position.geom.z if position.geom.has_z else None for position in positions],
+            velocity=[position.velocity for position in positions],
+            heading=[position.heading for position in positions],
+            labels=[position.labels for position in positions],
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict]) -> "PositionBatch":
+        """
+        Create batch from a list of position values.
+
+        Rows use the same keys as batch columns, where optional `z`, `velocity` and `heading` keys may be omitted.
+        """
+        return cls(
+            asset_id=[row["asset_id"] for row in rows],
+            time=[row["time"] for row in rows],
+            lon=[row["lon"] for row in rows],
+            lat=[row["lat"] for row in rows],
+            z=[row.get("z") for row in rows],
+            velocity=[row.get("velocity") for row in rows],
+            heading=[row.get("heading") for row in rows],
+            labels=[row["labels"] for row in rows],
+        )
+
+    @classmethod
+    def concat(cls, batches: Sequence["PositionBatch"]) -> "PositionBatch":
+        """Combine batches into a single batch."""
+        if not batches:
+            return cls(asset_id=[], time=[], lon=[], lat=[], z=[], velocity=[], heading=[], labels=[])
+        return cls(
+            asset_id=[asset_id for batch in batches for asset_id in batch.asset_id],
+            time=np.concatenate([batch.time for batch in batches]),
+            lon=np.concatenate([batch.lon for batch in batches]),
+            lat=np.concatenate([batch.lat for batch in batches]),
+            z=np.concatenate([batch.z for batch in batches]),
+            velocity=np.concatenate([batch.velocity for batch in batches]),
+            heading=np.concatenate([batch.heading for batch in batches]),
+            labels=[labels for batch in batches for labels in batch.labels],
+        )
+
+    def select(self, indexes: Sequence[int]) -> "PositionBatch":
+        """Subset of batch containing positions at indexes."""
+        indexes = np.asarray(indexes, dtype=np.intp)
+        return PositionBatch(
+            asset_id=[self.asset_id[i] for i in indexes],
+            time=self.time[indexes],
+            lon=self.lon[indexes],
+            lat=self.lat[indexes],
+            z=self.z[indexes],
+            velocity=self.velocity[indexes],
+            heading=self.heading[indexes],
+            labels=[self.labels[i] for i in indexes],
+        )
+
+    def dist_values(self, dist_label_scheme: str) -> list[str]:
+        """Value of the distinguishing label (e.g. a log ID) of each position, as used for a natural key."""
+        return [str(labels.filter_by_scheme(dist_label_scheme).value) for labels in self.labels]
+
+    def to_db_rows(
+        self, label_set_ids: Sequence[UUID | None], dist_values: Sequence[str | None] | None = None
+    ) -> tuple[list[str], list[tuple]]:
+        """
+        Convert to column names and rows suitable for database insertion.
+
+        Geometries are encoded as hex EWKB (with SRID 4326) in a single call. DB geom must be 3D, so 2D geometries use
+        a Z value of 0.
+
+        Shared labels (see `Labels.shared`) are stored separately as label sets, referenced by `label_set_ids` (one
+        per position, see `PositionsClient`), so only unshared labels are included.
+
+        Optional `dist_values` (see `dist_values()`) identify positions for each asset, if not given no values are set.
+        """
+        coords = np.column_stack([self.lon, self.lat, np.nan_to_num(self.z, nan=0.0)])
+        geoms = shapely.set_srid(shapely.points(coords), SRID)
+        wkb = shapely.to_wkb(geoms, hex=True, output_dimension=3, include_srid=True).tolist()
+
+        times = [time.replace(tzinfo=UTC) for time in self.time.tolist()]
+        velocities = [None if np.isnan(value) else value for value in self.velocity.tolist()]
+        headings = [None if np.isnan(value) else value for value in self.heading.tolist()]
+        columns = [
+            "asset_id",
+            "time_utc",
+            "geom",
+            "geom_dimensions",
+            "velocity_ms",
+            "heading",
+            "labels",
+            "label_set_id",
+            "dist_position_value",
+        ]
+        rows = list(
+            zip(  # noqa: B905
+                [UUID(bytes=asset_id.bytes) for asset_id in self.asset_id],
+                times,
+                wkb,
+                self.geom_dimensions.tolist(),
+                velocities,
+                headings,
+                [Jsonb(labels.unshared, dumps=Labels.dumps) for labels in self.labels],
+                label_set_ids,
+                dist_values if dist_values is not None else [None] * len(self),
+            )
+        )
+        return columns, rows
+
+
 @dataclass(kw_only=True)
 class Position(PositionNew):
     """
@@ -119,7 +335,8 @@ class Position(PositionNew):
         converter = cattrs.Converter()
         converter.register_structure_hook(ULID, lambda d, t: ulid_parse(d))
         converter.register_structure_hook(datetime, lambda d, t: d.astimezone(UTC))
-        converter.register_structure_hook(Point, lambda d, t: wkt.loads(d))
+        # geometries are loaded by the DB client's geometry adapters, or may be given as (E)WKB
+        converter.register_structure_hook(Point, lambda d, t: d if isinstance(d, Point) else from_wkb(d))
         converter.register_structure_hook(Labels, lambda d, t: Labels.structure(d))
         converter.register_structure_hook(
             cls,
@@ -131,7 +348,7 @@ class Position(PositionNew):
 
         # correct geom if 2D
         if geom_dimensions == 2:
-            position.geom = Point(position.geom.x, position.geom.y)
+            position.geom = force_2d(position.geom)
 
         return position
 
@@ -141,15 +358,219 @@ class Position(PositionNew):
 
 
 class PositionsClient:
-    """Client for managing Positions."""
+    """
+    Client for managing Positions.
+
+    Methods for reading positions return generators, streaming positions from a server-side cursor rather than loading
+    all positions into memory.
+    """
 
     _schema = "public"
     _table_view = "position"
+    _page_size = 5000
+    # types of columns from `PositionBatch.to_db_rows()`, for inserting columns as arrays
+    _column_types: ClassVar[dict[str, str]] = {
+        "asset_id": "uuid",
+        "time_utc": "timestamptz",
+        "geom": "geometry",
+        "geom_dimensions": "integer",
+        "velocity_ms": "float8",
+        "heading": "float8",
+        "labels": "jsonb",
+        "label_set_id": "uuid",
+        "dist_position_value": "text",
+    }
+
+    _columns = SQL("""
+        p.id_ulid AS id,
+        p.asset_id_ulid AS asset_id,
+        p.time_utc,
+        p.geom,
+        p.geom_dimensions,
+        p.velocity_ms,
+        p.heading,
+        CASE
+            WHEN p.label_set_id IS NULL THEN p.labels
+            ELSE jsonb_set(p.labels, '{values}', (p.labels -> 'values') || (ls.labels -> 'values'))
+        END AS labels
+    """)
 
     def __init__(self, db_client: DatabaseClient) -> None:
         """Create client using injected database client."""
         self._db = db_client
 
-    def add(self, position: PositionNew) -> None:
-        """Persist a new position in the database."""
-        self._db.insert_dict(schema=self._schema, table_view=self._table_view, data=position.to_db_dict())
+    def add(self, position: PositionNew, dist_label_scheme: str) -> None:
+        """
+        Persist a new position in the database.
+
+        The position is identified by the value of its distinguishing label (`dist_label_scheme`), see `add_batch()`.
+        """
+        self.add_batch(PositionBatch.from_positions([position]), dist_label_scheme=dist_label_scheme)
+
+    def _add_label_sets(self, labels: Sequence[Labels]) -> list[UUID | None]:
+        """
+        Persist shared labels as label sets, returning the ID of the label set for each item.
+
+        Label sets are content-addressed (identified by a digest of their JSON, excluding label creation times), so each
+        distinct set of labels is sent once and existing label sets are reused. Empty labels don't need a label set.
+        """
+        distinct: dict[bytes, int] = {}
+        indexes = [None if not item else distinct.setdefault(item.dumps(), len(distinct)) for item in labels]
+        if not distinct:
+            return [None] * len(labels)
+
+        results = self._db.get_query_result(
+            query=SQL("""
+                WITH s AS (
+                    SELECT s.labels::jsonb AS labels, s.n
+                    FROM unnest(%s::text[]) WITH ORDINALITY AS s (labels, n)
+                ), inserted AS (
+                    INSERT INTO public.label_set (labels)
+                    SELECT s.labels FROM s
+                    ON CONFLICT (id) DO NOTHING
+                )
+                SELECT labels_digest(s.labels) FROM s ORDER BY s.n;
+            """),
+            params=([item.decode() for item in distinct],),
+        )
+        ids = [row[0] for row in results]
+        return [None if index is None else ids[index] for index in indexes]
+
+    def add_batch(self, batch: PositionBatch, dist_label_scheme: str | None = None) -> int:
+        """
+        Persist a batch of new positions in the database, returning how many were new.
+
+        Shared labels are persisted as label sets first, then positions are inserted in a single statement, with each
+        column sent as an array.
+
+        If a `dist_label_scheme` is given, positions are identified by their asset and the value of their
+        distinguishing label (e.g. a log ID), which are unique. Positions which already exist are skipped by the
+        database, rather than by checking for existing positions first, so this is safe to repeat and to run
+        concurrently.
+        """
+        if len(batch) == 0:
+            return 0
+        label_set_ids = self._add_label_sets([labels.shared for labels in batch.labels])
+        dist_values = batch.dist_values(dist_label_scheme) if dist_label_scheme is not None else None
+        fields, rows = batch.to_db_rows(label_set_ids=label_set_ids, dist_values=dist_values)
+
+        results = self._db.get_query_result(
+            query=SQL("""
+                INSERT INTO {schema}.{table_view} ({fields})
+                SELECT * FROM unnest({arrays})
+                ON CONFLICT (asset_id, dist_position_value) DO NOTHING
+                RETURNING id;
+            """).format(
+                schema=Identifier(self._schema),
+                table_view=Identifier(self._table_view),
+                fields=SQL(", ").join(Identifier(field) for field in fields),
+                arrays=SQL(", ").join(SQL("%s::{}[]").format(SQL(self._column_types[field])) for field in fields),
+            ),
+            params=[list(column) for column in zip(*rows)],  # noqa: B905
+        )
+        return len(results)
+
+    @staticmethod
+    def _time_conditions(start: datetime | None, end: datetime | None) -> tuple[list[Composable], dict]:
+        """Conditions and parameters for an optional time range (inclusive of start, exclusive of end)."""
+        conditions = []
+        params = {}
+        if start is not None:
+            conditions.append(SQL("p.time_utc >= %(start)s"))
+            params["start"] = start
+        if end is not None:
+            conditions.append(SQL("p.time_utc < %(end)s"))
+            params["end"] = end
+        return conditions, params
+
+    def _iter_pages(self, conditions: list[Composable], params: dict) -> Generator[Position, None, None]:
+        """
+        Stream positions matching conditions in time order.
+
+        Positions are fetched in pages using keyset pagination on `(time_utc, id)`, so each page is an indexed range
+        scan continuing from the last position of the previous page, rather than an increasing offset. As each page is
+        bounded, it is fetched as a plain query, so no transaction or cursor is held open between pages.
+        """
+        after: tuple[datetime, UUID] | None = None
+        while True:
+            page_conditions = list(conditions)
+            page_params = {**params, "limit": self._page_size}
+            if after is not None:
+                page_conditions.append(SQL("(p.time_utc, p.id) > (%(after_time)s, %(after_id)s)"))
+                page_params.update({"after_time": after[0], "after_id": after[1]})
+
+            query = SQL("""
+                SELECT {columns}
+                FROM public.position AS p
+                LEFT JOIN public.label_set AS ls ON p.label_set_id = ls.id
+                WHERE {conditions}
+                ORDER BY p.time_utc, p.id
+                LIMIT %(limit)s;
+            """).format(columns=self._columns, conditions=SQL(" AND ").join(page_conditions))
+
+            rows = self._db.get_query_result(query=query, params=page_params, as_dict=True)
+            position = None
+            for row in rows:
+                position = Position.from_db_dict(row)
+                yield position
+
+            if len(rows) < self._page_size:
+                return
+            after = (position.time, UUID(bytes=position.id.bytes))
+
+    def iter_by_asset(
+        self, asset_id: ULID, start: datetime | None = None, end: datetime | None = None
+    ) -> Generator[Position, None, None]:
+        """
+        Stream positions for an asset in time order, optionally within a time range.
+
+        The time range includes positions at `start` and excludes positions at `end`.
+        """
+        conditions, params = self._time_conditions(start=start, end=end)
+        conditions.insert(0, SQL("p.asset_id = %(asset_id)s"))
+        params["asset_id"] = UUID(bytes=asset_id.bytes)
+        yield from self._iter_pages(conditions=conditions, params=params)
+
+    def iter_in_bbox(
+        self,
+        min_x: float,
+        min_y: float,
+        max_x: float,
+        max_y: float,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Generator[Position, None, None]:
+        """
+        Stream positions within a bounding box (in WGS84) in time order, optionally within a time range.
+
+        The time range includes positions at `start` and excludes positions at `end`.
+        """
+        conditions, params = self._time_conditions(start=start, end=end)
+        conditions.insert(0, SQL("p.geom_2d && ST_MAKEENVELOPE(%(min_x)s, %(min_y)s, %(max_x)s, %(max_y)s, 4326)"))
+        params.update({"min_x": min_x, "min_y": min_y, "max_x": max_x, "max_y": max_y})
+        yield from self._iter_pages(conditions=conditions, params=params)
+
+    def latest_for_assets(self, asset_ids: Sequence[ULID]) -> Generator[Position, None, None]:
+        """
+        Stream the latest position for each asset.
+
+        Assets without any positions are skipped.
+        """
+        if not asset_ids:
+            return
+
+        query = SQL("""
+            SELECT {columns}
+            FROM unnest(%(asset_ids)s::uuid[]) AS a (asset_id)
+            CROSS JOIN LATERAL (
+                SELECT *
+                FROM public.position AS p_
+                WHERE p_.asset_id = a.asset_id
+                ORDER BY p_.time_utc DESC, p_.id DESC
+                LIMIT 1
+            ) AS p
+            LEFT JOIN public.label_set AS ls ON p.label_set_id = ls.id;
+        """).format(columns=self._columns)
+        params = {"asset_ids": [UUID(bytes=asset_id.bytes) for asset_id in asset_ids]}
+        for row in self._db.iter_query_result(query=query, params=params, size=self._page_size):
+            yield Position.from_db_dict(row)
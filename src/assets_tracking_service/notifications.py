@@ -0,0 +1,238 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable, Generator, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from psycopg import AsyncConnection, Error, Notify
+from psycopg.sql import SQL, Identifier
+from ulid import ULID
+from ulid import parse as ulid_parse
+
+from assets_tracking_service import json_backend
+
+CHANNEL = "ats_position"
+
+
+@dataclass(kw_only=True, frozen=True)
+class PositionNotification:
+    """
+    Notification of new positions for an asset.
+
+    Sent by the database (via the `position_notify_trigger` trigger) once per asset for each statement inserting
+    positions, with the time of the latest new position.
+    """
+
+    asset_id: ULID
+    time_utc: datetime
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "PositionNotification":
+        """Create from a notification payload."""
+        data = json_backend.loads(payload)
+        return cls(asset_id=ulid_parse(data["asset_id"]), time_utc=datetime.fromisoformat(data["time_utc"]))
+
+
+def coalesce(notifications: Iterable[PositionNotification]) -> dict[ULID, datetime]:
+    """Reduce notifications to the latest position time for each asset."""
+    changes: dict[ULID, datetime] = {}
+    for notification in notifications:
+        latest = changes.get(notification.asset_id)
+        if latest is None or notification.time_utc > latest:
+            changes[notification.asset_id] = notification.time_utc
+    return changes
+
+
+def _parse(notifies: Iterable[Notify], logger: logging.Logger) -> Generator[PositionNotification, None, None]:
+    """Parse notifications, skipping (and logging) any with an invalid payload."""
+    for notify in notifies:
+        try:
+            yield PositionNotification.from_payload(notify.payload)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring invalid position notification: '%s'.", notify.payload)
+
+
+class TooManySubscribersError(Exception):
+    """Raised when a broadcaster has reached its maximum number of subscribers."""
+
+    pass
+
+
+class Subscriber:
+    """
+    Bounded queue of position updates for a client of a `PositionsBroadcaster`.
+
+    Updates are never allowed to build up for slow clients. If the queue is full, queued updates are discarded and
+    replaced with a marker (`None`) indicating the client should be sent the current state instead (which supersedes
+    any missed updates).
+    """
+
+    def __init__(self, size: int) -> None:
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=size)
+        self._resync = False
+
+    def offer(self, update: str) -> None:
+        """Queue update without waiting, or mark client as needing the current state if full."""
+        if self._resync:
+            return
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            self.resync()
+
+    def resync(self) -> None:
+        """Discard queued updates and mark client as needing the current state."""
+        if self._resync:
+            return
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+        self._resync = True
+
+    async def get(self, timeout: float | None = None) -> str | None:
+        """
+        Wait for next update, or None if the client should be sent the current state.
+
+        Raises `TimeoutError` if no update is available within `timeout` seconds.
+        """
+        update = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        if update is None:
+            self._resync = False
+        return update
+
+
+class PositionsBroadcaster:
+    """
+    Share new positions with many subscribers (e.g. clients of a live stream) using a single database listener.
+
+    A dedicated connection listens for notifications of new positions. For each (debounced) set of changed assets,
+    updates are queried once using `query` (with a list of asset IDs) and offered to all subscribers. The current
+    state is also queried using `query` (with `None`), and cached until positions change, so subscribers can be sent
+    it without each querying the database.
+
+    If the listening connection fails, it's reopened after `retry` seconds. As notifications sent while disconnected
+    are missed, the current state isn't cached until listening, and on (re)connecting the cached state is discarded
+    and subscribers are marked as needing the current state.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        query: Callable[[list[ULID] | None], Awaitable[str]],
+        logger: logging.Logger,
+        queue_size: int = 100,
+        max_subscribers: int = 1000,
+        debounce: float = 0.5,
+        retry: float = 5.0,
+    ) -> None:
+        self._dsn = dsn
+        self._query = query
+        self._logger = logger
+        self._queue_size = queue_size
+        self._max_subscribers = max_subscribers
+        self._debounce = debounce
+        self._retry = retry
+
+        self._subscribers: set[Subscriber] = set()
+        self._task: asyncio.Task | None = None
+        self._listening = asyncio.Event()
+        self._version = 0
+        self._current: str | None = None
+        self._current_lock = asyncio.Lock()
+
+    @property
+    def subscribers(self) -> int:
+        """Number of subscribers."""
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        """Add subscriber."""
+        if len(self._subscribers) >= self._max_subscribers:
+            msg = f"Maximum number of subscribers ({self._max_subscribers}) reached."
+            raise TooManySubscribersError(msg)
+        subscriber = Subscriber(size=self._queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove subscriber."""
+        self._subscribers.discard(subscriber)
+
+    def publish(self, update: str) -> None:
+        """Offer update to all subscribers, without waiting for any of them."""
+        for subscriber in self._subscribers:
+            subscriber.offer(update)
+
+    async def current(self) -> str:
+        """
+        Get the current state, from cache if positions haven't changed.
+
+        Concurrent callers share a single query. Results are only cached if listening for changes, and positions didn't
+        change while querying.
+        """
+        async with self._current_lock:
+            if self._current is None:
+                version = self._version
+                current = await self._query(None)
+                if version == self._version and self._listening.is_set():
+                    self._current = current
+                return current
+            return self._current
+
+    def _resync(self) -> None:
+        """Invalidate current state and mark all subscribers as needing it, e.g. where notifications may be missed."""
+        self._version += 1
+        self._current = None
+        for subscriber in self._subscribers:
+            subscriber.resync()
+
+    async def _handle(self, notifies: list[Notify]) -> None:
+        """Invalidate current state and publish updates for changed assets."""
+        changes = coalesce(_parse(notifies, self._logger))
+        if not changes:
+            return
+        self._version += 1
+        self._current = None
+        if self._subscribers:
+            self.publish(await self._query(list(changes)))
+
+    async def _listen(self) -> None:
+        """Listen for notifications, reconnecting on error."""
+        while True:
+            try:
+                async with await AsyncConnection.connect(self._dsn, autocommit=True) as conn:
+                    # noinspection PyTypeChecker
+                    await conn.execute(SQL("LISTEN {channel};").format(channel=Identifier(CHANNEL)))
+                    self._logger.info("Broadcasting new positions from channel '%s'.", CHANNEL)
+                    self._resync()
+                    self._listening.set()
+                    while True:
+                        notifies = [notify async for notify in conn.notifies(stop_after=1)]
+                        notifies.extend([notify async for notify in conn.notifies(timeout=self._debounce)])
+                        await self._handle(notifies)
+            except Error:
+                self._listening.clear()
+                self._logger.exception("Error listening for new positions, retrying in %s seconds.", self._retry)
+                await asyncio.sleep(self._retry)
+
+    async def start(self, wait: float | None = None) -> None:
+        """
+        Start listening in the background.
+
+        If `wait` is set, waits up to this many seconds for listening to begin (e.g. to avoid missing notifications).
+        """
+        self._task = asyncio.create_task(self._listen())
+        if wait is not None:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._listening.wait(), timeout=wait)
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        self._listening.clear()
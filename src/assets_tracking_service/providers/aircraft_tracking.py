@@ -8,12 +8,12 @@ from assets_tracking_service_aircraft_provider.providers.aircraft_tracking impor
     AircraftTrackerProvider as AircraftTrackerClient,
 )
 from requests import HTTPError
-from shapely import Point
 
 from assets_tracking_service.config import Config
+from assets_tracking_service.metrics import Metrics
 from assets_tracking_service.models.asset import Asset, AssetNew
-from assets_tracking_service.models.label import Label, LabelRelation, Labels
-from assets_tracking_service.models.position import PositionNew
+from assets_tracking_service.models.label import Label, LabelRelation, Labels, label_creation
+from assets_tracking_service.models.position import PositionBatch
 from assets_tracking_service.providers.base_provider import Provider
 from assets_tracking_service.units import UnitsConverter
 
@@ -27,9 +27,10 @@ class AircraftTrackingProvider(Provider):
     distinguishing_asset_label_scheme = f"{prefix}:aircraft_id"
     distinguishing_position_label_scheme = f"{prefix}:_fake_position_id"
 
-    def __init__(self, config: Config, logger: logging.Logger) -> None:
+    def __init__(self, config: Config, logger: logging.Logger, metrics: Metrics | None = None) -> None:
         self._units = UnitsConverter()
         self._logger = logger
+        self._metrics = metrics if metrics is not None else Metrics()
 
         self._logger.debug("Setting Aircraft Tracking configuration...")
         self._config = config
@@ -54,7 +55,8 @@ class AircraftTrackingProvider(Provider):
         self._logger.info("Fetching aircraft...")
 
         try:
-            aircraft = self.client.get_active_aircraft()
+            with self._metrics.timer("api_call", source=self.name, operation="active_aircraft"):
+                aircraft = self.client.get_active_aircraft()
         except HTTPError as e:
             msg = "Failed to fetch aircraft."
             raise RuntimeError(msg) from e
@@ -91,7 +93,8 @@ class AircraftTrackingProvider(Provider):
         self._logger.info("Fetching aircraft positions...")
 
         try:
-            positions = self.client.get_last_aircraft_positions()
+            with self._metrics.timer("api_call", source=self.name, operation="last_aircraft_positions"):
+                positions = self.client.get_last_aircraft_positions()
         except HTTPError as e:
             msg = "Failed to fetch aircraft positions."
             raise RuntimeError(msg) from e
@@ -141,30 +144,38 @@ class AircraftTrackingProvider(Provider):
             self._logger.exception(msg)
             raise RuntimeError(msg) from e
 
+        creation = label_creation()
+        provider_labels = self.provider_labels
         for aeroplane in aircraft:
             id_label = Label(
-                rel=LabelRelation.SELF, scheme=self.distinguishing_asset_label_scheme, value=aeroplane["aircraft_id"]
+                rel=LabelRelation.SELF,
+                scheme=self.distinguishing_asset_label_scheme,
+                value=aeroplane["aircraft_id"],
+                creation=creation,
+            )
+            pref_label = Label(
+                rel=LabelRelation.SELF, scheme="skos:prefLabel", value=aeroplane["name"], creation=creation
             )
-            pref_label = Label(rel=LabelRelation.SELF, scheme="skos:prefLabel", value=aeroplane["name"])
             platform_label = Label(
                 rel=LabelRelation.SELF,
                 scheme="nvs:L06",
                 scheme_uri="http://vocab.nerc.ac.uk/collection/L06/current",
                 value="62",
                 value_uri="http://vocab.nerc.ac.uk/collection/L06/current/62",
+                creation=creation,
             )
 
             device_labels = [
-                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value)
+                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value, creation=creation)
                 for key, value in aeroplane.items()
             ]
 
-            labels = Labels([id_label, pref_label, platform_label, *device_labels, *self.provider_labels])
+            labels = Labels([id_label, pref_label, platform_label, *device_labels, *provider_labels])
             self._logger.debug("Asset labels: '%s'", labels.unstructure())
 
             yield AssetNew(labels=labels)
 
-    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionNew, None, None]:
+    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionBatch, None, None]:
         """
         Acquire aircraft positions as asset positions.
 
@@ -181,6 +192,9 @@ class AircraftTrackingProvider(Provider):
             self._logger.exception(msg)
             raise RuntimeError(msg) from e
 
+        creation = label_creation()
+        provider_labels = self.provider_labels
+        rows = []
         for position in positions:
             try:
                 self._logger.debug("Getting corresponding asset for aircraft in position...")
@@ -196,14 +210,15 @@ class AircraftTrackingProvider(Provider):
                 rel=LabelRelation.SELF,
                 scheme=self.distinguishing_position_label_scheme,
                 value=position["_fake_position_id"],
+                creation=creation,
             )
 
             position_labels = [
-                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value)
+                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value, creation=creation)
                 for key, value in position.items()
             ]
 
-            labels = Labels([id_label, *position_labels, *self.provider_labels])
+            labels = Labels([id_label, *position_labels, *provider_labels])
             self._logger.debug("Position labels: '%s'", labels.unstructure())
 
             time = datetime.fromtimestamp(
@@ -212,11 +227,18 @@ class AircraftTrackingProvider(Provider):
             )
             elevation = self._units.feet_to_meters(position["altitude_feet"])
 
-            yield PositionNew(
-                asset_id=asset.id,
-                time=time,
-                geom=Point(position["longitude"], position["latitude"], elevation),
-                velocity=self._units.knots_to_meters_per_second(position["speed_knots"]),
-                heading=position["heading_degrees"],
-                labels=labels,
+            rows.append(
+                {
+                    "asset_id": asset.id,
+                    "time": time,
+                    "lon": position["longitude"],
+                    "lat": position["latitude"],
+                    "z": elevation,
+                    "velocity": self._units.knots_to_meters_per_second(position["speed_knots"]),
+                    "heading": position["heading_degrees"],
+                    "labels": labels,
+                }
             )
+
+        if rows:
+            yield PositionBatch.from_rows(rows)
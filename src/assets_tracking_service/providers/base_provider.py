@@ -3,7 +3,7 @@ from collections.abc import Generator
 
 from assets_tracking_service.models.asset import Asset, AssetNew
 from assets_tracking_service.models.label import Label, LabelRelation, Labels
-from assets_tracking_service.models.position import PositionNew
+from assets_tracking_service.models.position import PositionBatch
 
 
 class Provider(ABC):
@@ -63,13 +63,14 @@ class Provider(ABC):
         pass
 
     @abstractmethod
-    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionNew, None, None]:
+    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionBatch, None, None]:
         """
         Public entrypoint for fetching latest positions of assets.
 
-        Must return a generator of PositionNew instances for a given list of assets.
+        Must return a generator of PositionBatch instances for a given list of assets. Empty batches should not be
+        returned.
 
         Typically, this method calls private, provider specific, methods to fetch raw position information, then
-        marshall it into standardised PositionNew instances in this method.
+        marshall it into standardised PositionBatch instances (e.g. via `PositionBatch.from_rows()`) in this method.
         """
         pass
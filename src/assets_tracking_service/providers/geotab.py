@@ -6,12 +6,12 @@ from datetime import datetime
 from mygeotab import API as Geotab  # noqa: N811
 from mygeotab import MyGeotabException, TimeoutException
 from requests import HTTPError
-from shapely import Point
 
 from assets_tracking_service.config import Config
+from assets_tracking_service.metrics import Metrics
 from assets_tracking_service.models.asset import Asset, AssetNew
-from assets_tracking_service.models.label import Label, LabelRelation, Labels
-from assets_tracking_service.models.position import PositionNew
+from assets_tracking_service.models.label import Label, LabelRelation, Labels, label_creation
+from assets_tracking_service.models.position import PositionBatch
 from assets_tracking_service.providers.base_provider import Provider
 from assets_tracking_service.units import UnitsConverter
 
@@ -25,9 +25,10 @@ class GeotabProvider(Provider):
     distinguishing_asset_label_scheme = f"{prefix}:device_id"
     distinguishing_position_label_scheme = f"{prefix}:log_record_id"
 
-    def __init__(self, config: Config, logger: logging.Logger) -> None:
+    def __init__(self, config: Config, logger: logging.Logger, metrics: Metrics | None = None) -> None:
         self._units = UnitsConverter()
         self._logger = logger
+        self._metrics = metrics if metrics is not None else Metrics()
 
         self._logger.debug("Setting Geotab configuration...")
         self._config = config
@@ -57,7 +58,8 @@ class GeotabProvider(Provider):
         self._logger.info("Fetching Geotab devices...")
 
         try:
-            devices = self._client.get("Device")
+            with self._metrics.timer("api_call", source=self.name, operation="Device"):
+                devices = self._client.get("Device")
         except (MyGeotabException, TimeoutException, HTTPError) as e:
             msg = "Failed to fetch devices."
             raise RuntimeError(msg) from e
@@ -98,7 +100,8 @@ class GeotabProvider(Provider):
         self._logger.info("Fetching Geotab devices statuses...")
 
         try:
-            device_statues = self._client.get("DeviceStatusInfo")
+            with self._metrics.timer("api_call", source=self.name, operation="DeviceStatusInfo"):
+                device_statues = self._client.get("DeviceStatusInfo")
         except (MyGeotabException, TimeoutException, HTTPError) as e:
             msg = "Failed to fetch device statues."
             raise RuntimeError(msg) from e
@@ -138,14 +141,15 @@ class GeotabProvider(Provider):
         self._logger.debug("Fetching Geotab log record...")
 
         try:
-            results = self._client.get(
-                "LogRecord",
-                search={
-                    "fromDate": time,
-                    "toDate": time,
-                    "deviceSearch": {"id": device_id},
-                },
-            )
+            with self._metrics.timer("api_call", source=self.name, operation="LogRecord"):
+                results = self._client.get(
+                    "LogRecord",
+                    search={
+                        "fromDate": time,
+                        "toDate": time,
+                        "deviceSearch": {"id": device_id},
+                    },
+                )
         except (MyGeotabException, TimeoutException, HTTPError) as e:
             msg = "Failed to fetch LogRecord."
             raise RuntimeError(msg) from e
@@ -180,6 +184,8 @@ class GeotabProvider(Provider):
             self._logger.exception(msg)
             raise RuntimeError(msg) from e
 
+        creation = label_creation()
+        provider_labels = self.provider_labels
         for device in devices:
             self._logger.debug(
                 "Determining prefLabel from name: '%s' and serial number: '%s'",
@@ -187,7 +193,9 @@ class GeotabProvider(Provider):
                 device["device_serial_number"],
             )
             pref_label_value = device["device_name"] if device["device_name"] else device["device_serial_number"]
-            pref_label = Label(rel=LabelRelation.SELF, scheme="skos:prefLabel", value=pref_label_value)
+            pref_label = Label(
+                rel=LabelRelation.SELF, scheme="skos:prefLabel", value=pref_label_value, creation=creation
+            )
 
             self._logger.debug("Determining platform type from group mappings...")
             self._logger.debug("Raw groups: '%s'", device["device_group_ids"])
@@ -205,19 +213,20 @@ class GeotabProvider(Provider):
                 scheme_uri="http://vocab.nerc.ac.uk/collection/L06/current",
                 value=platform_type_value,
                 value_uri=f"http://vocab.nerc.ac.uk/collection/L06/current/{platform_type_value}",
+                creation=creation,
             )
 
             device_labels = [
-                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value)
+                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value, creation=creation)
                 for key, value in device.items()
             ]
 
-            labels = Labels([pref_label, platform_label, *device_labels, *self.provider_labels])
+            labels = Labels([pref_label, platform_label, *device_labels, *provider_labels])
             self._logger.debug("Asset labels: '%s'", labels.unstructure())
 
             yield AssetNew(labels=labels)
 
-    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionNew, None, None]:
+    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionBatch, None, None]:
         """
         Acquire device statuses as asset positions.
 
@@ -237,6 +246,9 @@ class GeotabProvider(Provider):
             self._logger.exception(msg)
             raise RuntimeError(msg) from e
 
+        creation = label_creation()
+        provider_labels = self.provider_labels
+        rows = []
         for device_status in device_statuses:
             try:
                 self._logger.debug("Getting corresponding asset for device in status...")
@@ -253,7 +265,10 @@ class GeotabProvider(Provider):
                 log_record = self._fetch_log_record(time=device_status["date"], device_id=device_status["device_id"])
                 self._logger.debug("Fetched LogRecord ID: '%s'", log_record["id"])
                 log_record_label = Label(
-                    rel=LabelRelation.SELF, scheme=f"{self.prefix}:log_record_id", value=log_record["id"]
+                    rel=LabelRelation.SELF,
+                    scheme=f"{self.prefix}:log_record_id",
+                    value=log_record["id"],
+                    creation=creation,
                 )
             except (RuntimeError, IndexError):
                 self._logger.warning(
@@ -273,18 +288,24 @@ class GeotabProvider(Provider):
             device_status["date"] = device_status["date"].isoformat()
 
             status_labels = [
-                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value)
+                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value, creation=creation)
                 for key, value in device_status.items()
             ]
 
-            labels = Labels([log_record_label, *status_labels, *self.provider_labels])
+            labels = Labels([log_record_label, *status_labels, *provider_labels])
             self._logger.debug("Position labels: '%s'", labels.unstructure())
 
-            yield PositionNew(
-                asset_id=asset.id,
-                time=_time,
-                geom=Point(device_status["longitude"], device_status["latitude"]),
-                velocity=self._units.kilometers_per_hour_to_meters_per_second(device_status["speed_km_h"]),
-                heading=_heading,
-                labels=labels,
+            rows.append(
+                {
+                    "asset_id": asset.id,
+                    "time": _time,
+                    "lon": device_status["longitude"],
+                    "lat": device_status["latitude"],
+                    "velocity": self._units.kilometers_per_hour_to_meters_per_second(device_status["speed_km_h"]),
+                    "heading": _heading,
+                    "labels": labels,
+                }
             )
+
+        if rows:
+            yield PositionBatch.from_rows(rows)
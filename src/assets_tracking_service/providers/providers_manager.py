@@ -2,13 +2,12 @@ import logging
 from datetime import UTC, datetime
 
 from psycopg.sql import SQL
-from psycopg.types.json import Jsonb
 
 from assets_tracking_service.config import Config
 from assets_tracking_service.db import DatabaseClient
-from assets_tracking_service.models.asset import AssetNew, AssetsClient
-from assets_tracking_service.models.label import Label, LabelRelation
-from assets_tracking_service.models.position import PositionNew, PositionsClient
+from assets_tracking_service.metrics import Metrics
+from assets_tracking_service.models.asset import AssetsClient
+from assets_tracking_service.models.position import PositionBatch, PositionsClient
 from assets_tracking_service.providers.aircraft_tracking import AircraftTrackingProvider
 from assets_tracking_service.providers.base_provider import Provider
 from assets_tracking_service.providers.geotab import GeotabProvider
@@ -16,12 +15,19 @@ from assets_tracking_service.providers.rvdas import RvdasProvider
 
 
 class ProvidersManager:
-    """Create instances for enabled providers."""
+    """
+    Create instances for enabled providers.
 
-    def __init__(self, config: Config, db: DatabaseClient, logger: logging.Logger) -> None:
+    Optional metrics can be given to record timings and row counts for each provider (e.g. for a run summary).
+    """
+
+    def __init__(
+        self, config: Config, db: DatabaseClient, logger: logging.Logger, metrics: Metrics | None = None
+    ) -> None:
         self._config = config
         self._logger = logger
         self._db = db
+        self._metrics = metrics if metrics is not None else Metrics()
 
         self._assets = AssetsClient(db_client=self._db)
         self._positions = PositionsClient(db_client=self._db)
@@ -35,7 +41,7 @@ class ProvidersManager:
         if "geotab" in provider_names:
             self._logger.info("Creating Geotab provider...")
             try:
-                providers.append(GeotabProvider(config=self._config, logger=self._logger))
+                providers.append(GeotabProvider(config=self._config, logger=self._logger, metrics=self._metrics))
                 self._logger.info("Created Geotab provider.")
             except RuntimeError:
                 self._logger.exception("Failed to create Geotab provider.")
@@ -44,7 +50,9 @@ class ProvidersManager:
         if "aircraft_tracking" in provider_names:
             self._logger.info("Creating Aircraft Tracking provider...")
             try:
-                providers.append(AircraftTrackingProvider(config=self._config, logger=self._logger))
+                providers.append(
+                    AircraftTrackingProvider(config=self._config, logger=self._logger, metrics=self._metrics)
+                )
                 self._logger.info("Created Aircraft Tracking provider.")
             except RuntimeError:
                 self._logger.exception("Failed to create Aircraft Tracking provider.")
@@ -53,7 +61,7 @@ class ProvidersManager:
         if "rvdas" in provider_names:
             self._logger.info("Creating RVDAS provider...")
             try:
-                providers.append(RvdasProvider(config=self._config, logger=self._logger))
+                providers.append(RvdasProvider(config=self._config, logger=self._logger, metrics=self._metrics))
                 self._logger.info("Created RVDAS provider.")
             except RuntimeError:
                 self._logger.exception("Failed to create RVDAS provider.")
@@ -62,37 +70,15 @@ class ProvidersManager:
         self._logger.info("Providers created.")
         return providers
 
-    def _filter_entities(
-        self, db_values: list[dict[str, str]], indexed_fetched_entities: dict[str, AssetNew | PositionNew]
-    ) -> list[AssetNew | PositionNew]:
-        """
-        Find new assets from collection returned by a provider.
-
-        Takes:
-        - assets fetched from a provider indexed by their distinguishing label value (e.g. serial number)
-        - assets fetched from the database associated with the provider
-
-        Finds the intersection of both lists based on the distinguishing property to give new (unsaved) assets.
-        """
-        existing_values = [row["dist_label_value"] for row in db_values]
-        self._logger.debug("Existing dist IDs: [%s].", ", ".join(existing_values))
-
-        new_values = [value for value in indexed_fetched_entities if value not in existing_values]
-        _new_entities = [indexed_fetched_entities[value] for value in new_values]
-        self._logger.debug("New dist IDs: [%s].", ", ".join(new_values))
-
-        return _new_entities
-
     def fetch_active_assets(self) -> None:
         """
         Fetch and persist active assets from providers.
 
         Steps:
         - index fetched assets by their distinguishing label value (e.g. serial number)
-        - fetch assets from the database associated with the provider
-        - compare data to find new assets
-        - persist new assets in the database
-        - for all fetched assets, update the 'ats:last_fetched' label
+        - persist new assets in the database, skipping existing assets (identified by their provider and distinguishing
+          label value)
+        - for all fetched assets, record when they were last fetched
         """
         self._logger.info("Fetching active assets from providers...")
 
@@ -102,78 +88,55 @@ class ProvidersManager:
             dist_label_scheme = provider.distinguishing_asset_label_scheme
             self._logger.debug("Distinguishing asset label scheme for provider: '%s'", dist_label_scheme)
 
-            fetched_assets_by_dist_id = {
-                asset.labels.filter_by_scheme(dist_label_scheme).value: asset
-                for asset in provider.fetch_active_assets()
-            }
+            metric_labels = {"provider": provider.name, "entity": "assets"}
+            with self._metrics.timer("provider_stage", stage="fetch", **metric_labels):
+                fetched_assets_by_dist_id = {
+                    asset.labels.filter_by_scheme(dist_label_scheme).value: asset
+                    for asset in provider.fetch_active_assets()
+                }
+            self._metrics.count("rows_fetched", len(fetched_assets_by_dist_id), **metric_labels)
             self._logger.info("Fetched %d assets from '%s' provider.", len(fetched_assets_by_dist_id), provider.name)
             self._logger.debug("Fetched asset dist. labels: [%s].", ", ".join(fetched_assets_by_dist_id.keys()))
 
-            results = self._db.get_query_result(
-                query=SQL("""
-                    WITH label_elements AS (
-                        SELECT jsonb_array_elements(labels->'values') AS label
-                        FROM public.asset
-                    )
-                    SELECT label->>'value' AS dist_label_value
-                    FROM label_elements
-                    WHERE label @> %s;
-                """),
-                params=(Jsonb({"scheme": provider.distinguishing_asset_label_scheme}),),
-                as_dict=True,
-            )
-            _new_assets = self._filter_entities(db_values=results, indexed_fetched_entities=fetched_assets_by_dist_id)
-            self._logger.info("Persisting %d new assets from '%s' provider.", len(_new_assets), provider.name)
-            for asset in _new_assets:
-                asset.labels.append(Label(rel=LabelRelation.PROVIDER, scheme="ats:last_fetched", value=0))
-                self._assets.add(asset)
-
-            self._logger.info("Upserting 'ats:last_fetched' label for fetched assets.")
-            self._db.execute(
-                query=SQL("""
-                    UPDATE asset
-                    SET labels = jsonb_set(
-                        labels,
-                        '{values}',
-                        (SELECT
-                            jsonb_agg(
-                                CASE
-                                    WHEN value->>'scheme' = 'ats:last_fetched' THEN jsonb_set(value, '{value}', %s)
-                                    ELSE value
-                                END
-                            )
-                         FROM jsonb_array_elements(labels->'values') as value)
-                    )
-                    WHERE id IN (
-                        SELECT
-                            id
-                        FROM public.asset
-                        WHERE EXISTS (
-                            SELECT 1
-                            FROM jsonb_array_elements(labels->'values') AS label
-                            WHERE label @> %s
-                            AND (label->>'value')::text = ANY(%s)
-                        )
-                    );
-                """),
-                params=(
-                    Jsonb(int(datetime.now(tz=UTC).timestamp())),
-                    Jsonb({"scheme": provider.distinguishing_asset_label_scheme}),
-                    [list(fetched_assets_by_dist_id.keys())],
-                ),
-            )
+            with self._metrics.timer("provider_stage", stage="insert", **metric_labels):
+                new_count = self._assets.add_batch(
+                    list(fetched_assets_by_dist_id.values()), dist_label_scheme=dist_label_scheme
+                )
+            self._metrics.count("rows_new", new_count, **metric_labels)
+            self._logger.info("Persisted %d new assets from '%s' provider.", new_count, provider.name)
+
+            self._logger.info("Recording when assets were last fetched.")
+            with self._metrics.timer("provider_stage", stage="update", **metric_labels):
+                self._update_last_fetched(provider=provider, dist_ids=list(fetched_assets_by_dist_id.keys()))
 
         self._logger.info("Fetched active assets from providers.")
 
+    def _update_last_fetched(self, provider: Provider, dist_ids: list[str]) -> None:
+        """
+        Record the current time as when assets fetched from a provider were last fetched.
+
+        Stored in a separate table, rather than as a label, so updates don't rewrite the labels of each asset. Assets
+        are found by their natural key (provider and distinguishing label value).
+        """
+        self._db.execute(
+            query=SQL("""
+                INSERT INTO public.asset_fetch_state (asset_id, last_fetched_at)
+                SELECT id, %s
+                FROM public.asset
+                WHERE provider_id = %s AND dist_asset_value = ANY(%s)
+                ON CONFLICT (asset_id) DO UPDATE SET last_fetched_at = EXCLUDED.last_fetched_at;
+            """),
+            params=(datetime.now(tz=UTC), provider.name, [str(dist_id) for dist_id in dist_ids]),
+        )
+
     def fetch_latest_positions(self) -> None:
         """
         Fetch and persist latest positions from providers.
 
         Steps:
-        - index fetched positions by their distinguishing label value (e.g. log number)
-        - fetch asset positions from the database associated with the provider
-        - compare data to find new positions
-        - persist new positions in the database
+        - combine batches of fetched positions
+        - persist new positions in the database as a single batch, skipping existing positions (identified by their
+          asset and distinguishing label value, e.g. log number)
         """
         self._logger.info("Fetching latest positions from providers...")
 
@@ -183,40 +146,22 @@ class ProvidersManager:
             dist_label_scheme = provider.distinguishing_position_label_scheme
             self._logger.debug("Distinguishing position label scheme for provider: '%s'", dist_label_scheme)
 
+            metric_labels = {"provider": provider.name, "entity": "positions"}
             self._logger.debug("Fetching provider assets to associate with positions...")
-            provider_asset_label = provider.provider_labels.filter_by_scheme("ats:provider_id")
-            provider_assets = self._assets.list_filtered_by_label(label=provider_asset_label)
+            with self._metrics.timer("provider_stage", stage="lookup", **metric_labels):
+                provider_asset_label = provider.provider_labels.filter_by_scheme("ats:provider_id")
+                provider_assets = self._assets.list_filtered_by_label(label=provider_asset_label)
             self._logger.debug("Fetched %d provider assets.", len(provider_assets))
 
-            fetched_positions_by_dist_id = {
-                position.labels.filter_by_scheme(dist_label_scheme).value: position
-                for position in provider.fetch_latest_positions(assets=provider_assets)
-            }
-            self._logger.info(
-                "Fetched %d positions from '%s' provider.", len(fetched_positions_by_dist_id), provider.name
-            )
-            self._logger.debug("Fetched position dist. labels: [%s].", ", ".join(fetched_positions_by_dist_id.keys()))
-
-            results = self._db.get_query_result(
-                query=SQL("""
-                    WITH label_elements AS (
-                        SELECT jsonb_array_elements(labels->'values') AS label
-                        FROM public.position
-                    )
-                    SELECT label->>'value' AS dist_label_value
-                    FROM label_elements
-                    WHERE label @> %s;
-                """),
-                params=(Jsonb({"scheme": provider.distinguishing_position_label_scheme}),),
-                as_dict=True,
-            )
-
-            _new_positions = self._filter_entities(
-                db_values=results, indexed_fetched_entities=fetched_positions_by_dist_id
-            )
-            self._logger.info("Persisting %d new positions from '%s' provider.", len(_new_positions), provider.name)
-            for position in _new_positions:
-                self._positions.add(position)
+            with self._metrics.timer("provider_stage", stage="fetch", **metric_labels):
+                fetched_positions = PositionBatch.concat(list(provider.fetch_latest_positions(assets=provider_assets)))
+            self._metrics.count("rows_fetched", len(fetched_positions), **metric_labels)
+            self._logger.info("Fetched %d positions from '%s' provider.", len(fetched_positions), provider.name)
+
+            with self._metrics.timer("provider_stage", stage="insert", **metric_labels):
+                new_count = self._positions.add_batch(fetched_positions, dist_label_scheme=dist_label_scheme)
+            self._metrics.count("rows_new", new_count, **metric_labels)
+            self._logger.info("Persisted %d new positions from '%s' provider.", new_count, provider.name)
 
             self._logger.info("Fetched assets from '%s' provider.", provider.name)
 
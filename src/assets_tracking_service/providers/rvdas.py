@@ -8,12 +8,12 @@ from json import JSONDecodeError
 import requests
 from requests import ConnectionError as HTTPConnectionError
 from requests import HTTPError
-from shapely.geometry.point import Point
 
 from assets_tracking_service.config import Config
+from assets_tracking_service.metrics import Metrics
 from assets_tracking_service.models.asset import Asset, AssetNew
-from assets_tracking_service.models.label import Label, LabelRelation, Labels
-from assets_tracking_service.models.position import PositionNew
+from assets_tracking_service.models.label import Label, LabelRelation, Labels, label_creation
+from assets_tracking_service.models.position import PositionBatch
 from assets_tracking_service.providers.base_provider import Provider
 from assets_tracking_service.units import UnitsConverter
 
@@ -31,9 +31,10 @@ class RvdasProvider(Provider):
     distinguishing_asset_label_scheme = f"{prefix}:_fake_vessel_id"
     distinguishing_position_label_scheme = f"{prefix}:_fake_position_id"
 
-    def __init__(self, config: Config, logger: logging.Logger) -> None:
+    def __init__(self, config: Config, logger: logging.Logger, metrics: Metrics | None = None) -> None:
         self._units = UnitsConverter()
         self._logger = logger
+        self._metrics = metrics if metrics is not None else Metrics()
 
         self._logger.debug("Setting RVDAS configuration...")
         self._config = config
@@ -61,7 +62,8 @@ class RvdasProvider(Provider):
         Split out to allow for easier testing.
         """
         try:
-            r = requests.get(self._config.PROVIDER_RVDAS_URL, timeout=30)
+            with self._metrics.timer("api_call", source=self.name, operation="items"):
+                r = requests.get(self._config.PROVIDER_RVDAS_URL, timeout=30)
             r.raise_for_status()
             try:
                 return r.json()
@@ -142,30 +144,36 @@ class RvdasProvider(Provider):
             self._logger.exception(msg)
             raise RuntimeError(msg) from e
 
+        creation = label_creation()
+        provider_labels = self.provider_labels
         for vessel in vessels:
             id_label = Label(
-                rel=LabelRelation.SELF, scheme=self.distinguishing_asset_label_scheme, value=vessel["_fake_vessel_id"]
+                rel=LabelRelation.SELF,
+                scheme=self.distinguishing_asset_label_scheme,
+                value=vessel["_fake_vessel_id"],
+                creation=creation,
             )
-            pref_label = Label(rel=LabelRelation.SELF, scheme="skos:prefLabel", value=vessel["name"])
+            pref_label = Label(rel=LabelRelation.SELF, scheme="skos:prefLabel", value=vessel["name"], creation=creation)
             platform_label = Label(
                 rel=LabelRelation.SELF,
                 scheme="nvs:L06",
                 scheme_uri="http://vocab.nerc.ac.uk/collection/L06/current",
                 value="31",
                 value_uri="http://vocab.nerc.ac.uk/collection/L06/current/31",
+                creation=creation,
             )
 
             device_labels = [
-                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value)
+                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value, creation=creation)
                 for key, value in vessel.items()
             ]
 
-            labels = Labels([id_label, pref_label, platform_label, *device_labels, *self.provider_labels])
+            labels = Labels([id_label, pref_label, platform_label, *device_labels, *provider_labels])
             self._logger.debug("Asset labels: '%s'", labels.unstructure())
 
             yield AssetNew(labels=labels)
 
-    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionNew, None, None]:
+    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionBatch, None, None]:
         """
         Acquire vessel positions as asset positions.
 
@@ -182,6 +190,9 @@ class RvdasProvider(Provider):
             self._logger.exception(msg)
             raise RuntimeError(msg) from e
 
+        creation = label_creation()
+        provider_labels = self.provider_labels
+        rows = []
         for pos in positions:
             try:
                 self._logger.debug("Getting corresponding asset for vessel in position...")
@@ -197,28 +208,32 @@ class RvdasProvider(Provider):
                 rel=LabelRelation.SELF,
                 scheme=self.distinguishing_position_label_scheme,
                 value=pos["_fake_position_id"],
+                creation=creation,
             )
 
             position_labels = [
-                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value)
+                Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value, creation=creation)
                 for key, value in pos.items()
                 if value is not None
             ]
 
-            labels = Labels([id_label, *position_labels, *self.provider_labels])
+            labels = Labels([id_label, *position_labels, *provider_labels])
             self._logger.debug("Position labels: '%s'", labels.unstructure())
 
             time = datetime.fromisoformat(pos["gps_time"]).replace(microsecond=0)
 
-            position = PositionNew(
-                asset_id=asset.id,
-                time=time,
-                geom=Point(pos["longitude"], pos["latitude"]),
-                labels=labels,
-            )
+            row = {
+                "asset_id": asset.id,
+                "time": time,
+                "lon": pos["longitude"],
+                "lat": pos["latitude"],
+                "labels": labels,
+            }
             if pos["speedknots"] is not None:
-                position.velocity = self._units.knots_to_meters_per_second(pos["speedknots"])
+                row["velocity"] = self._units.knots_to_meters_per_second(pos["speedknots"])
             if pos["headingtrue"] is not None:
-                position.heading = pos["headingtrue"]
+                row["heading"] = pos["headingtrue"]
+            rows.append(row)
 
-            yield position
+        if rows:
+            yield PositionBatch.from_rows(rows)
@@ -0,0 +1,12 @@
+-- revert natural keys for assets and positions
+ALTER TABLE public.position DROP CONSTRAINT IF EXISTS position_asset_id_dist_position_value_key;
+ALTER TABLE public.asset DROP CONSTRAINT IF EXISTS asset_provider_id_dist_asset_value_key;
+
+ALTER TABLE public.position DROP COLUMN IF EXISTS dist_position_value;
+ALTER TABLE public.asset DROP COLUMN IF EXISTS dist_asset_value;
+ALTER TABLE public.asset DROP COLUMN IF EXISTS provider_id;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 38, migration_label = '038-position-geom-2d'
+WHERE pk = 1;
@@ -0,0 +1,111 @@
+-- revert to deriving 2D geometries from `geom`
+CREATE OR REPLACE FUNCTION assets_tracks_since(since timestamptz, tolerance float, smoothing integer DEFAULT 0)
+RETURNS TABLE (
+    asset_id uuid,
+    time_start_utc timestamptz,
+    time_end_utc timestamptz,
+    positions_count integer,
+    geom_2d geometry
+) AS $$
+    WITH tracks AS (
+        SELECT
+            asset_id,
+            min(time_utc)::timestamptz (0) AS time_start_utc,
+            max(time_utc)::timestamptz (0) AS time_end_utc,
+            count(*)::integer AS positions_count,
+            st_simplifypreservetopology(st_makeline(st_force2d(geom) ORDER BY time_utc), tolerance) AS geom_2d
+        FROM public.position
+        WHERE time_utc >= since
+        GROUP BY asset_id
+        HAVING count(*) > 1
+    )
+
+    SELECT
+        asset_id,
+        time_start_utc,
+        time_end_utc,
+        positions_count,
+        CASE
+            WHEN smoothing > 0 THEN st_chaikinsmoothing(geom_2d, smoothing)
+            ELSE geom_2d
+        END AS geom_2d
+    FROM tracks;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE VIEW public.v_latest_assets_pos AS
+WITH latest_p_by_asset AS (
+    SELECT
+        asset_id,
+        max(time_utc) AS max_time
+    FROM
+        position
+    GROUP BY
+        asset_id
+)
+
+SELECT
+    a.id_ulid AS asset_id,
+    jsonb_extract_path_text(asset_name.label, 'value') AS asset_pref_label,
+    l06.code AS asset_type_code,
+    l06.label AS asset_type_label,
+
+    p.id_ulid AS position_id,
+    p.time_utc::timestamptz (0) AS time_utc,
+    f.last_fetched_at::timestamptz (0) AS last_fetched_utc,
+    st_force2d(p.geom) AS geom_2d,
+    st_y(p.geom) AS lat_dd,
+    st_x(p.geom) AS lon_dd,
+    (p.geom_ddm).y AS lat_ddm,
+    (p.geom_ddm).x AS lon_ddm,
+    p.elv_m,
+    p.elv_ft,
+    round(p.velocity_ms::numeric, 1) AS velocity_ms,
+    p.velocity_kmh,
+    p.velocity_kn,
+    round(p.heading::numeric, 1) AS heading_d,
+    ('x' || replace(a.id::text, '-', ''))::bit(64)::bigint AS fake_object_id
+FROM position AS p
+
+INNER JOIN
+    latest_p_by_asset
+    ON
+        p.asset_id = latest_p_by_asset.asset_id
+        AND p.time_utc = latest_p_by_asset.max_time
+
+INNER JOIN asset AS a ON p.asset_id = a.id
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'skos:prefLabel' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS asset_name ON TRUE
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'nvs:L06' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS l06_label ON TRUE
+INNER JOIN LATERAL (
+    SELECT
+        nvs_l06_lookup.code,
+        nvs_l06_lookup.label
+    FROM nvs_l06_lookup
+    WHERE nvs_l06_lookup.code = jsonb_extract_path_text(l06_label.label, 'value')
+) AS l06 ON TRUE
+
+INNER JOIN asset_fetch_state AS f ON a.id = f.asset_id;
+
+GRANT SELECT ON public.v_latest_assets_pos TO assets_tracking_service_ro;
+
+CREATE INDEX IF NOT EXISTS position_geom_idx ON public.position USING gist (geom);
+DROP INDEX IF EXISTS position_geom_2d_idx;
+ALTER TABLE public.position DROP COLUMN IF EXISTS geom_2d;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 37, migration_label = '037-position-label-set'
+WHERE pk = 1;
@@ -0,0 +1,39 @@
+-- restore labels from label sets to positions
+CREATE OR REPLACE VIEW v_util_position_label AS
+SELECT
+    p.id AS position_id,
+    p.asset_id,
+    l.value ->> 'rel' AS rel,
+    l.value ->> 'value' AS val,
+    l.value ->> 'scheme' AS scheme,
+    l.value ->> 'creation' AS creation,
+    to_timestamp((l.value ->> 'creation')::bigint) AS creation_ts,
+    l.value ->> 'expiration' AS expiration,
+    to_timestamp((l.value ->> 'expiration')::bigint) AS expiration_ts,
+    CASE
+        WHEN l.value ->> 'expiration' IS NULL THEN FALSE
+        WHEN to_timestamp((l.value ->> 'expiration')::bigint) < now() THEN TRUE
+        ELSE FALSE
+    END AS is_expired,
+    l.value ->> 'value_uri' AS value_uri,
+    l.value ->> 'scheme_uri' AS scheme_uri
+FROM
+    position AS p,
+    jsonb_array_elements(p.labels -> 'values') AS l (value);
+
+UPDATE public.position AS p
+SET labels = v.labels
+FROM public.v_position_labels AS v
+WHERE
+    p.id = v.id
+    AND p.label_set_id IS NOT NULL;
+
+DROP VIEW IF EXISTS public.v_position_labels;
+ALTER TABLE public.position DROP COLUMN IF EXISTS label_set_id;
+DROP TABLE IF EXISTS public.label_set;
+DROP FUNCTION IF EXISTS labels_digest(jsonb);
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 36, migration_label = '036-asset-fetch-state'
+WHERE pk = 1;
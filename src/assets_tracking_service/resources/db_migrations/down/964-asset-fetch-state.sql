@@ -0,0 +1,112 @@
+-- revert to recording when assets were last fetched as a label
+UPDATE public.asset AS a
+SET labels = v.labels
+FROM public.v_asset_labels AS v
+WHERE a.id = v.id;
+
+CREATE OR REPLACE VIEW public.v_latest_assets_pos AS
+WITH latest_p_by_asset AS (
+    SELECT
+        asset_id,
+        max(time_utc) AS max_time
+    FROM
+        position
+    GROUP BY
+        asset_id
+)
+
+SELECT
+    a.id_ulid AS asset_id,
+    jsonb_extract_path_text(asset_name.label, 'value') AS asset_pref_label,
+    l06.code AS asset_type_code,
+    l06.label AS asset_type_label,
+
+    p.id_ulid AS position_id,
+    p.time_utc::timestamptz (0) AS time_utc,
+    to_timestamp(
+        jsonb_extract_path_text(
+            asset_last_fetched.label,
+            'value'
+        )::numeric
+    )::timestamptz (0) AS last_fetched_utc,
+    st_force2d(p.geom) AS geom_2d,
+    st_y(p.geom) AS lat_dd,
+    st_x(p.geom) AS lon_dd,
+    (p.geom_ddm).y AS lat_ddm,
+    (p.geom_ddm).x AS lon_ddm,
+    p.elv_m,
+    p.elv_ft,
+    round(p.velocity_ms::numeric, 1) AS velocity_ms,
+    p.velocity_kmh,
+    p.velocity_kn,
+    round(p.heading::numeric, 1) AS heading_d,
+    ('x' || replace(a.id::text, '-', ''))::bit(64)::bigint AS fake_object_id
+FROM position AS p
+
+INNER JOIN
+    latest_p_by_asset
+    ON
+        p.asset_id = latest_p_by_asset.asset_id
+        AND p.time_utc = latest_p_by_asset.max_time
+
+INNER JOIN asset AS a ON p.asset_id = a.id
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'skos:prefLabel' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS asset_name ON TRUE
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'nvs:L06' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS l06_label ON TRUE
+INNER JOIN LATERAL (
+    SELECT
+        nvs_l06_lookup.code,
+        nvs_l06_lookup.label
+    FROM nvs_l06_lookup
+    WHERE nvs_l06_lookup.code = jsonb_extract_path_text(l06_label.label, 'value')
+) AS l06 ON TRUE
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'ats:last_fetched'
+) AS asset_last_fetched ON TRUE;
+
+GRANT SELECT ON public.v_latest_assets_pos TO assets_tracking_service_ro;
+
+CREATE OR REPLACE VIEW v_util_asset_label AS
+SELECT
+    a.id AS asset_id,
+    l.value ->> 'rel' AS rel,
+    l.value ->> 'value' AS val,
+    l.value ->> 'scheme' AS scheme,
+    l.value ->> 'creation' AS creation,
+    to_timestamp((l.value ->> 'creation')::bigint) AS creation_ts,
+    l.value ->> 'expiration' AS expiration,
+    to_timestamp((l.value ->> 'expiration')::bigint) AS expiration_ts,
+    CASE
+        WHEN l.value ->> 'expiration' IS NULL THEN FALSE
+        WHEN to_timestamp((l.value ->> 'expiration')::bigint) < now() THEN TRUE
+        ELSE FALSE
+    END AS is_expired,
+    l.value ->> 'value_uri' AS value_uri,
+    l.value ->> 'scheme_uri' AS scheme_uri
+FROM
+    asset AS a,
+    jsonb_array_elements(a.labels -> 'values') AS l (value);
+
+DROP VIEW IF EXISTS public.v_asset_labels;
+DROP TABLE IF EXISTS public.asset_fetch_state;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 35, migration_label = '035-labels-validation-sql'
+WHERE pk = 1;
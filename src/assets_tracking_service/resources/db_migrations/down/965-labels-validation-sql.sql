@@ -0,0 +1,55 @@
+-- revert to PL/pgSQL label validation
+CREATE OR REPLACE FUNCTION are_labels_v1_valid(jsonb_labels jsonb) RETURNS boolean AS $$
+DECLARE
+    element jsonb;
+BEGIN
+    -- must have 'version' and 'values' properties
+    IF NOT (jsonb_labels ? 'version' AND jsonb_labels ? 'values') THEN
+        RETURN FALSE;
+    END IF;
+    -- version must be '1'
+    IF jsonb_labels ->> 'version' != '1' THEN
+        RETURN FALSE;
+    END IF;
+
+    FOR element IN SELECT * FROM jsonb_array_elements(jsonb_labels -> 'values')
+    LOOP
+        -- must be an object
+        IF jsonb_typeof(element) != 'object' THEN
+            RETURN FALSE;
+        END IF;
+        -- must have rel, value, scheme, and creation properties
+        IF NOT (element ? 'rel' AND element ? 'value' AND element ? 'scheme' AND element ? 'creation') THEN
+            RETURN FALSE;
+        END IF;
+    END LOOP;
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION are_labels_v1_valid_asset(jsonb_labels jsonb) RETURNS boolean AS $$
+DECLARE
+    element jsonb;
+    prefLabel_count INTEGER := 0;
+BEGIN
+    FOR element IN SELECT * FROM jsonb_array_elements(jsonb_labels -> 'values')
+    LOOP
+        -- must have exactly one label with scheme 'skos:prefLabel'
+        IF element ->> 'scheme' = 'skos:prefLabel' THEN
+            prefLabel_count := prefLabel_count + 1;
+        END IF;
+    END LOOP;
+
+    IF prefLabel_count != 1 THEN
+        RETURN FALSE;
+    END IF;
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 34, migration_label = '034-position-derived-columns'
+WHERE pk = 1;
@@ -0,0 +1,7 @@
+DROP TRIGGER IF EXISTS position_notify_trigger ON public.position;
+DROP FUNCTION IF EXISTS notify_position_inserted();
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 31, migration_label = '031-position-created-at-index'
+WHERE pk = 1;
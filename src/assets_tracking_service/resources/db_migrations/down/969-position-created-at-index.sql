@@ -0,0 +1,6 @@
+DROP INDEX IF EXISTS public.position_created_at_idx;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 30, migration_label = '030-position-keyset-index'
+WHERE pk = 1;
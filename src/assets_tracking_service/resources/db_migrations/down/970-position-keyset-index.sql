@@ -0,0 +1,6 @@
+DROP INDEX IF EXISTS public.position_asset_id_time_utc_id_idx;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 29, migration_label = '029-assets-tracks'
+WHERE pk = 1;
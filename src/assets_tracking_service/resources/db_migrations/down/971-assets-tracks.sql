@@ -0,0 +1,53 @@
+DELETE FROM public.record
+WHERE slug IN ('ats_assets_track_24h', 'ats_assets_track_7d', 'ats_assets_track_season');
+
+DROP VIEW IF EXISTS public.v_assets_track_24h_geojson;
+DROP VIEW IF EXISTS public.v_assets_track_7d_geojson;
+DROP VIEW IF EXISTS public.v_assets_track_season_geojson;
+DROP VIEW IF EXISTS public.v_assets_track_24h;
+DROP VIEW IF EXISTS public.v_assets_track_7d;
+DROP VIEW IF EXISTS public.v_assets_track_season;
+
+DROP FUNCTION IF EXISTS season_start();
+DROP FUNCTION IF EXISTS assets_tracks_since(TIMESTAMPTZ, FLOAT, INTEGER);
+
+DROP INDEX IF EXISTS public.position_time_utc_idx;
+
+-- revert to extents based on `time_utc` only
+CREATE OR REPLACE FUNCTION refresh_layer_extent(slug_value TEXT) RETURNS VOID AS $$
+DECLARE
+    view_name TEXT;
+BEGIN
+    SELECT source_view INTO view_name FROM public.layer WHERE slug = slug_value;
+    IF view_name IS NULL THEN
+        RAISE EXCEPTION 'Unknown layer: [%]', slug_value;
+    END IF;
+
+    EXECUTE format($query$
+        WITH ext AS (
+            SELECT
+                ST_EXTENT(geom_2d) AS bbox,
+                MIN(time_utc)::timestamptz (0) AS min_time,
+                MAX(time_utc)::timestamptz (0) AS max_time
+            FROM %I
+        )
+        INSERT INTO public.layer_extent (layer_slug, min_x, min_y, max_x, max_y, min_time, max_time)
+        SELECT $1, ST_XMIN(bbox), ST_YMIN(bbox), ST_XMAX(bbox), ST_YMAX(bbox), min_time, max_time
+        FROM ext
+        ON CONFLICT (layer_slug) DO UPDATE SET
+            min_x = excluded.min_x,
+            min_y = excluded.min_y,
+            max_x = excluded.max_x,
+            max_y = excluded.max_y,
+            min_time = excluded.min_time,
+            max_time = excluded.max_time;
+    $query$, view_name) USING slug_value;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE public.layer DROP COLUMN IF EXISTS layer_type;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 28, migration_label = '028-layer-extent'
+WHERE pk = 1;
@@ -0,0 +1,7 @@
+DROP FUNCTION IF EXISTS refresh_layer_extent(TEXT);
+DROP TABLE IF EXISTS public.layer_extent;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 27, migration_label = '027-rename-layer-summary'
+WHERE pk = 1;
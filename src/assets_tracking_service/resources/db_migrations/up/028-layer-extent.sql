@@ -0,0 +1,67 @@
+-- stored per-layer extents, computed once per export rather than aggregating over each layer's source view on each
+-- lookup
+CREATE TABLE IF NOT EXISTS public.layer_extent
+(
+    pk INTEGER GENERATED ALWAYS AS IDENTITY
+    CONSTRAINT layer_extent_pk PRIMARY KEY,
+    layer_slug TEXT NOT NULL UNIQUE,
+    CONSTRAINT layer_extent_layer_slug_fk
+    FOREIGN KEY (layer_slug)
+    REFERENCES public.layer (slug)
+    ON DELETE CASCADE,
+    min_x FLOAT,
+    min_y FLOAT,
+    max_x FLOAT,
+    max_y FLOAT,
+    min_time TIMESTAMPTZ,
+    max_time TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE TRIGGER layer_extent_updated_at_trigger
+BEFORE INSERT OR UPDATE
+ON public.layer_extent
+FOR EACH ROW
+EXECUTE FUNCTION set_updated_at();
+
+-- compute extent for a layer from its source view (which must have `geom_2d` and `time_utc` columns)
+CREATE OR REPLACE FUNCTION refresh_layer_extent(slug_value TEXT) RETURNS VOID AS $$
+DECLARE
+    view_name TEXT;
+BEGIN
+    SELECT source_view INTO view_name FROM public.layer WHERE slug = slug_value;
+    IF view_name IS NULL THEN
+        RAISE EXCEPTION 'Unknown layer: [%]', slug_value;
+    END IF;
+
+    EXECUTE format($query$
+        WITH ext AS (
+            SELECT
+                ST_EXTENT(geom_2d) AS bbox,
+                MIN(time_utc)::timestamptz (0) AS min_time,
+                MAX(time_utc)::timestamptz (0) AS max_time
+            FROM %I
+        )
+        INSERT INTO public.layer_extent (layer_slug, min_x, min_y, max_x, max_y, min_time, max_time)
+        SELECT $1, ST_XMIN(bbox), ST_YMIN(bbox), ST_XMAX(bbox), ST_YMAX(bbox), min_time, max_time
+        FROM ext
+        ON CONFLICT (layer_slug) DO UPDATE SET
+            min_x = excluded.min_x,
+            min_y = excluded.min_y,
+            max_x = excluded.max_x,
+            max_y = excluded.max_y,
+            min_time = excluded.min_time,
+            max_time = excluded.max_time;
+    $query$, view_name) USING slug_value;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_layer_extent(slug) FROM public.layer;
+
+GRANT SELECT ON public.layer_extent TO assets_tracking_service_ro;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 28, migration_label = '028-layer-extent'
+WHERE pk = 1;
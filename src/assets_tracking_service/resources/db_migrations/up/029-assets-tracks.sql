@@ -0,0 +1,257 @@
+-- track lines of assets over recent time windows, simplified to keep sizes bounded as tracks grow
+
+CREATE INDEX IF NOT EXISTS position_time_utc_idx ON public.position USING btree (time_utc);
+
+-- positions for each asset since a time as a simplified (and optionally smoothed) 2D line
+--
+-- `tolerance` is in degrees, `smoothing` is the number of Chaikin iterations (0 to disable).
+-- Assets need at least two positions within the window to form a track.
+CREATE OR REPLACE FUNCTION assets_tracks_since(since TIMESTAMPTZ, tolerance FLOAT, smoothing INTEGER DEFAULT 0)
+RETURNS TABLE (
+    asset_id UUID,
+    time_start_utc TIMESTAMPTZ,
+    time_end_utc TIMESTAMPTZ,
+    positions_count INTEGER,
+    geom_2d GEOMETRY
+) AS $$
+    WITH tracks AS (
+        SELECT
+            asset_id,
+            MIN(time_utc)::timestamptz (0) AS time_start_utc,
+            MAX(time_utc)::timestamptz (0) AS time_end_utc,
+            COUNT(*)::integer AS positions_count,
+            ST_SIMPLIFYPRESERVETOPOLOGY(ST_MAKELINE(ST_FORCE2D(geom) ORDER BY time_utc), tolerance) AS geom_2d
+        FROM public.position
+        WHERE time_utc >= since
+        GROUP BY asset_id
+        HAVING COUNT(*) > 1
+    )
+
+    SELECT
+        asset_id,
+        time_start_utc,
+        time_end_utc,
+        positions_count,
+        CASE
+            WHEN smoothing > 0 THEN ST_CHAIKINSMOOTHING(geom_2d, smoothing)
+            ELSE geom_2d
+        END AS geom_2d
+    FROM tracks;
+$$ LANGUAGE sql STABLE;
+
+-- start of current (or most recent) Antarctic field season, taken as 1st October
+CREATE OR REPLACE FUNCTION season_start() RETURNS TIMESTAMPTZ AS $$
+    SELECT date_trunc('year', now() - INTERVAL '9 months') + INTERVAL '9 months';
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE VIEW public.v_assets_track_24h AS
+SELECT
+    lp.asset_id,
+    lp.asset_pref_label,
+    lp.asset_type_code,
+    lp.asset_type_label,
+    t.time_start_utc,
+    t.time_end_utc,
+    t.positions_count,
+    t.geom_2d,
+    lp.fake_object_id
+FROM assets_tracks_since(now() - INTERVAL '24 hours', 0.0001) AS t
+INNER JOIN v_latest_assets_pos AS lp ON uuid_to_ulid(t.asset_id) = lp.asset_id;
+
+CREATE OR REPLACE VIEW public.v_assets_track_7d AS
+SELECT
+    lp.asset_id,
+    lp.asset_pref_label,
+    lp.asset_type_code,
+    lp.asset_type_label,
+    t.time_start_utc,
+    t.time_end_utc,
+    t.positions_count,
+    t.geom_2d,
+    lp.fake_object_id
+FROM assets_tracks_since(now() - INTERVAL '7 days', 0.001, 1) AS t
+INNER JOIN v_latest_assets_pos AS lp ON uuid_to_ulid(t.asset_id) = lp.asset_id;
+
+CREATE OR REPLACE VIEW public.v_assets_track_season AS
+SELECT
+    lp.asset_id,
+    lp.asset_pref_label,
+    lp.asset_type_code,
+    lp.asset_type_label,
+    t.time_start_utc,
+    t.time_end_utc,
+    t.positions_count,
+    t.geom_2d,
+    lp.fake_object_id
+FROM assets_tracks_since(season_start(), 0.01, 1) AS t
+INNER JOIN v_latest_assets_pos AS lp ON uuid_to_ulid(t.asset_id) = lp.asset_id;
+
+GRANT SELECT ON public.v_assets_track_24h TO assets_tracking_service_ro;
+GRANT SELECT ON public.v_assets_track_7d TO assets_tracking_service_ro;
+GRANT SELECT ON public.v_assets_track_season TO assets_tracking_service_ro;
+
+CREATE OR REPLACE VIEW public.v_assets_track_24h_geojson AS
+SELECT
+    json_build_object(
+        'type', 'FeatureCollection',
+        'features', json_agg(feature)
+    ) AS geojson
+FROM (
+    SELECT
+        json_build_object(
+            'type', 'Feature',
+            'id', asset_id,
+            'geometry', st_asgeojson(geom_2d)::JSONB,
+            'properties', json_build_object(
+                'asset_id', asset_id,
+                'name', asset_pref_label,
+                'type_code', asset_type_code,
+                'type_label', asset_type_label,
+                'time_start_utc', time_start_utc,
+                'time_end_utc', time_end_utc,
+                'positions_count', positions_count
+            )
+        ) AS feature
+    FROM v_assets_track_24h
+) AS features;
+
+GRANT SELECT ON public.v_assets_track_24h_geojson TO assets_tracking_service_ro;
+
+CREATE OR REPLACE VIEW public.v_assets_track_7d_geojson AS
+SELECT
+    json_build_object(
+        'type', 'FeatureCollection',
+        'features', json_agg(feature)
+    ) AS geojson
+FROM (
+    SELECT
+        json_build_object(
+            'type', 'Feature',
+            'id', asset_id,
+            'geometry', st_asgeojson(geom_2d)::JSONB,
+            'properties', json_build_object(
+                'asset_id', asset_id,
+                'name', asset_pref_label,
+                'type_code', asset_type_code,
+                'type_label', asset_type_label,
+                'time_start_utc', time_start_utc,
+                'time_end_utc', time_end_utc,
+                'positions_count', positions_count
+            )
+        ) AS feature
+    FROM v_assets_track_7d
+) AS features;
+
+GRANT SELECT ON public.v_assets_track_7d_geojson TO assets_tracking_service_ro;
+
+CREATE OR REPLACE VIEW public.v_assets_track_season_geojson AS
+SELECT
+    json_build_object(
+        'type', 'FeatureCollection',
+        'features', json_agg(feature)
+    ) AS geojson
+FROM (
+    SELECT
+        json_build_object(
+            'type', 'Feature',
+            'id', asset_id,
+            'geometry', st_asgeojson(geom_2d)::JSONB,
+            'properties', json_build_object(
+                'asset_id', asset_id,
+                'name', asset_pref_label,
+                'type_code', asset_type_code,
+                'type_label', asset_type_label,
+                'time_start_utc', time_start_utc,
+                'time_end_utc', time_end_utc,
+                'positions_count', positions_count
+            )
+        ) AS feature
+    FROM v_assets_track_season
+) AS features;
+
+GRANT SELECT ON public.v_assets_track_season_geojson TO assets_tracking_service_ro;
+
+-- layers are either of positions (with a `time_utc` column) or of tracks (with `time_start_utc` and `time_end_utc`)
+ALTER TABLE public.layer ADD COLUMN IF NOT EXISTS layer_type TEXT NOT NULL DEFAULT 'position'
+CONSTRAINT layer_type_check CHECK (layer_type IN ('position', 'track'));
+
+-- extents for track layers span from the start to the end of each track
+CREATE OR REPLACE FUNCTION refresh_layer_extent(slug_value TEXT) RETURNS VOID AS $$
+DECLARE
+    view_name TEXT;
+    type_value TEXT;
+    min_time_column TEXT := 'time_utc';
+    max_time_column TEXT := 'time_utc';
+BEGIN
+    SELECT source_view, layer_type INTO view_name, type_value FROM public.layer WHERE slug = slug_value;
+    IF view_name IS NULL THEN
+        RAISE EXCEPTION 'Unknown layer: [%]', slug_value;
+    END IF;
+
+    IF type_value = 'track' THEN
+        min_time_column := 'time_start_utc';
+        max_time_column := 'time_end_utc';
+    END IF;
+
+    EXECUTE format($query$
+        WITH ext AS (
+            SELECT
+                ST_EXTENT(geom_2d) AS bbox,
+                MIN(%I)::timestamptz (0) AS min_time,
+                MAX(%I)::timestamptz (0) AS max_time
+            FROM %I
+        )
+        INSERT INTO public.layer_extent (layer_slug, min_x, min_y, max_x, max_y, min_time, max_time)
+        SELECT $1, ST_XMIN(bbox), ST_YMIN(bbox), ST_XMAX(bbox), ST_YMAX(bbox), min_time, max_time
+        FROM ext
+        ON CONFLICT (layer_slug) DO UPDATE SET
+            min_x = excluded.min_x,
+            min_y = excluded.min_y,
+            max_x = excluded.max_x,
+            max_y = excluded.max_y,
+            min_time = excluded.min_time,
+            max_time = excluded.max_time;
+    $query$, min_time_column, max_time_column, view_name) USING slug_value;
+END;
+$$ LANGUAGE plpgsql;
+
+INSERT INTO public.record (slug, edition, title, summary, update_frequency)
+VALUES
+(
+    'ats_assets_track_24h',
+    '1',
+    'Assets tracks (last 24 hours) - BAS Assets Tracking Service',
+    'The track of each asset tracked by the BAS Assets Tracking Service over the last 24 hours.',
+    'continual'
+),
+(
+    'ats_assets_track_7d',
+    '1',
+    'Assets tracks (last 7 days) - BAS Assets Tracking Service',
+    'The simplified track of each asset tracked by the BAS Assets Tracking Service over the last 7 days.',
+    'continual'
+),
+(
+    'ats_assets_track_season',
+    '1',
+    'Assets tracks (current season) - BAS Assets Tracking Service',
+    'The simplified track of each asset tracked by the BAS Assets Tracking Service in the current field season.',
+    'continual'
+)
+ON CONFLICT (slug)
+DO NOTHING;
+
+INSERT INTO public.layer (slug, source_view, layer_type)
+VALUES
+('ats_assets_track_24h', 'v_assets_track_24h', 'track'),
+('ats_assets_track_7d', 'v_assets_track_7d', 'track'),
+('ats_assets_track_season', 'v_assets_track_season', 'track')
+ON CONFLICT (slug)
+DO NOTHING;
+
+SELECT refresh_layer_extent(slug) FROM public.layer;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 29, migration_label = '029-assets-tracks'
+WHERE pk = 1;
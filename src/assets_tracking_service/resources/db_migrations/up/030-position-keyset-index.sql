@@ -0,0 +1,8 @@
+-- index for reading positions of an asset in time order, using (time_utc, id) as a unique key for keyset pagination
+
+CREATE INDEX IF NOT EXISTS position_asset_id_time_utc_id_idx ON public.position USING btree (asset_id, time_utc, id);
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 30, migration_label = '030-position-keyset-index'
+WHERE pk = 1;
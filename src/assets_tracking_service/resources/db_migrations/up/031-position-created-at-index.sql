@@ -0,0 +1,8 @@
+-- index for finding when positions were last added, used to derive cache validators (ETags) for API responses
+
+CREATE INDEX IF NOT EXISTS position_created_at_idx ON public.position USING btree (created_at);
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 31, migration_label = '031-position-created-at-index'
+WHERE pk = 1;
@@ -0,0 +1,29 @@
+-- notify listeners of newly inserted positions
+--
+-- Sends one notification per asset per statement (rather than per row) on the `ats_position` channel, with the asset
+-- ID and time of its latest new position as a JSON payload. Notifications are only delivered once committed.
+CREATE OR REPLACE FUNCTION notify_position_inserted()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'ats_position',
+        json_build_object('asset_id', uuid_to_ulid(asset_id), 'time_utc', MAX(time_utc))::text
+    )
+    FROM new_position
+    GROUP BY asset_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER position_notify_trigger
+AFTER INSERT
+ON public.position
+REFERENCING NEW TABLE AS new_position
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_position_inserted();
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 32, migration_label = '032-position-notify'
+WHERE pk = 1;
@@ -0,0 +1,198 @@
+-- persist ULID representations of asset and position IDs
+--
+-- `uuid_to_ulid()` encodes each ID one character at a time, which is slow when called for every row each time views
+-- are queried. As the function is immutable, it can instead be used for stored generated columns, computed once when
+-- rows are inserted (or their IDs change).
+ALTER TABLE public.asset
+ADD COLUMN IF NOT EXISTS id_ulid text GENERATED ALWAYS AS (uuid_to_ulid(id)) STORED;
+
+ALTER TABLE public.position
+ADD COLUMN IF NOT EXISTS id_ulid text GENERATED ALWAYS AS (uuid_to_ulid(id)) STORED,
+ADD COLUMN IF NOT EXISTS asset_id_ulid text GENERATED ALWAYS AS (uuid_to_ulid(asset_id)) STORED;
+
+-- use persisted ULIDs (no other changes to this view)
+CREATE OR REPLACE VIEW public.v_latest_assets_pos AS
+WITH latest_p_by_asset AS (
+    SELECT
+        asset_id,
+        max(time_utc) AS max_time
+    FROM
+        position
+    GROUP BY
+        asset_id
+)
+
+SELECT
+    a.id_ulid AS asset_id,
+    jsonb_extract_path_text(asset_name.label, 'value') AS asset_pref_label,
+    l06.code AS asset_type_code,
+    l06.label AS asset_type_label,
+
+    p.id_ulid AS position_id,
+    p.time_utc::timestamptz (0) AS time_utc,
+    to_timestamp(
+        jsonb_extract_path_text(
+            asset_last_fetched.label,
+            'value'
+        )::numeric
+    )::timestamptz (0) AS last_fetched_utc,
+    st_force2d(p.geom) AS geom_2d,
+    st_y(p.geom) AS lat_dd,
+    st_x(p.geom) AS lon_dd,
+    (geom_as_ddm(p.geom)).y AS lat_ddm,
+    (geom_as_ddm(p.geom)).x AS lon_ddm,
+    CASE
+        WHEN p.geom_dimensions = 2 THEN NULL
+        ELSE round(st_z(p.geom)::numeric)
+    END AS elv_m,
+    CASE
+        WHEN p.geom_dimensions = 2 THEN NULL
+        ELSE round(st_z(p.geom)::numeric * 3.281)
+    END AS elv_ft,
+    CASE
+        WHEN p.velocity_ms IS NULL THEN NULL
+        ELSE round(p.velocity_ms::numeric, 1)
+    END AS velocity_ms,
+    CASE
+        WHEN p.velocity_ms IS NULL THEN NULL
+        ELSE round(p.velocity_ms::numeric * 3.6, 1)
+    END AS velocity_kmh,
+    CASE
+        WHEN p.velocity_ms IS NULL THEN NULL
+        ELSE round(p.velocity_ms::numeric * 1.944, 1)
+    END AS velocity_kn,
+    round(p.heading::numeric, 1) AS heading_d,
+    ('x' || replace(a.id::text, '-', ''))::bit(64)::bigint AS fake_object_id
+FROM position AS p
+
+INNER JOIN
+    latest_p_by_asset
+    ON
+        p.asset_id = latest_p_by_asset.asset_id
+        AND p.time_utc = latest_p_by_asset.max_time
+
+INNER JOIN asset AS a ON p.asset_id = a.id
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'skos:prefLabel' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS asset_name ON TRUE
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'nvs:L06' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS l06_label ON TRUE
+INNER JOIN LATERAL (
+    SELECT
+        nvs_l06_lookup.code,
+        nvs_l06_lookup.label
+    FROM nvs_l06_lookup
+    WHERE nvs_l06_lookup.code = jsonb_extract_path_text(l06_label.label, 'value')
+) AS l06 ON TRUE
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'ats:last_fetched'
+) AS asset_last_fetched ON TRUE;
+
+GRANT SELECT ON public.v_latest_assets_pos TO assets_tracking_service_ro;
+
+-- use persisted ULIDs (no other changes to this view)
+CREATE OR REPLACE VIEW public.v_util_basic AS
+WITH latest_p_by_asset AS (
+    SELECT
+        asset_id,
+        max(time_utc) AS max_time
+    FROM
+        position
+    GROUP BY asset_id
+)
+
+SELECT
+    a.id_ulid AS asset_id,
+    p.id_ulid AS position_id,
+    p.time_utc::timestamptz (0) AS time_utc,
+    p.geom AS geom_3d,
+    p.geom_dimensions,
+    p.velocity_ms,
+    p.heading AS heading_d
+FROM position AS p
+INNER JOIN
+    latest_p_by_asset
+    ON
+        p.asset_id = latest_p_by_asset.asset_id
+        AND p.time_utc = latest_p_by_asset.max_time
+INNER JOIN asset AS a ON p.asset_id = a.id;
+
+-- join via asset rather than encoding the ID of each track
+CREATE OR REPLACE VIEW public.v_assets_track_24h AS
+SELECT
+    lp.asset_id,
+    lp.asset_pref_label,
+    lp.asset_type_code,
+    lp.asset_type_label,
+    t.time_start_utc,
+    t.time_end_utc,
+    t.positions_count,
+    t.geom_2d,
+    lp.fake_object_id
+FROM assets_tracks_since(now() - interval '24 hours', 0.0001) AS t
+INNER JOIN asset AS a ON t.asset_id = a.id
+INNER JOIN v_latest_assets_pos AS lp ON a.id_ulid = lp.asset_id;
+
+CREATE OR REPLACE VIEW public.v_assets_track_7d AS
+SELECT
+    lp.asset_id,
+    lp.asset_pref_label,
+    lp.asset_type_code,
+    lp.asset_type_label,
+    t.time_start_utc,
+    t.time_end_utc,
+    t.positions_count,
+    t.geom_2d,
+    lp.fake_object_id
+FROM assets_tracks_since(now() - interval '7 days', 0.001, 1) AS t
+INNER JOIN asset AS a ON t.asset_id = a.id
+INNER JOIN v_latest_assets_pos AS lp ON a.id_ulid = lp.asset_id;
+
+CREATE OR REPLACE VIEW public.v_assets_track_season AS
+SELECT
+    lp.asset_id,
+    lp.asset_pref_label,
+    lp.asset_type_code,
+    lp.asset_type_label,
+    t.time_start_utc,
+    t.time_end_utc,
+    t.positions_count,
+    t.geom_2d,
+    lp.fake_object_id
+FROM assets_tracks_since(season_start(), 0.01, 1) AS t
+INNER JOIN asset AS a ON t.asset_id = a.id
+INNER JOIN v_latest_assets_pos AS lp ON a.id_ulid = lp.asset_id;
+
+-- use persisted ULIDs (no other changes to this function)
+CREATE OR REPLACE FUNCTION notify_position_inserted()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'ats_position',
+        json_build_object('asset_id', asset_id_ulid, 'time_utc', MAX(time_utc))::text
+    )
+    FROM new_position
+    GROUP BY asset_id_ulid;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 33, migration_label = '033-ulid-columns'
+WHERE pk = 1;
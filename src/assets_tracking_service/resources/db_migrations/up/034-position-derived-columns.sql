@@ -0,0 +1,100 @@
+-- persist derived presentation values for positions
+--
+-- DDM coordinates and rounded elevations and speeds in other units are computed by immutable expressions, which can
+-- be used for stored generated columns, computed once when positions are inserted (or updated) rather than for every
+-- row each time views are queried. DDM coordinates are stored as a single `ddm_point` so `geom_as_ddm()` is called once
+-- per position.
+ALTER TABLE public.position
+ADD COLUMN IF NOT EXISTS geom_ddm ddm_point GENERATED ALWAYS AS (geom_as_ddm(geom)) STORED,
+ADD COLUMN IF NOT EXISTS elv_m numeric GENERATED ALWAYS AS (
+    CASE WHEN geom_dimensions = 2 THEN NULL ELSE round(st_z(geom)::numeric) END
+) STORED,
+ADD COLUMN IF NOT EXISTS elv_ft numeric GENERATED ALWAYS AS (
+    CASE WHEN geom_dimensions = 2 THEN NULL ELSE round(st_z(geom)::numeric * 3.281) END
+) STORED,
+ADD COLUMN IF NOT EXISTS velocity_kmh numeric GENERATED ALWAYS AS (round(velocity_ms::numeric * 3.6, 1)) STORED,
+ADD COLUMN IF NOT EXISTS velocity_kn numeric GENERATED ALWAYS AS (round(velocity_ms::numeric * 1.944, 1)) STORED;
+
+-- use persisted values (no other changes to this view)
+CREATE OR REPLACE VIEW public.v_latest_assets_pos AS
+WITH latest_p_by_asset AS (
+    SELECT
+        asset_id,
+        max(time_utc) AS max_time
+    FROM
+        position
+    GROUP BY
+        asset_id
+)
+
+SELECT
+    a.id_ulid AS asset_id,
+    jsonb_extract_path_text(asset_name.label, 'value') AS asset_pref_label,
+    l06.code AS asset_type_code,
+    l06.label AS asset_type_label,
+
+    p.id_ulid AS position_id,
+    p.time_utc::timestamptz (0) AS time_utc,
+    to_timestamp(
+        jsonb_extract_path_text(
+            asset_last_fetched.label,
+            'value'
+        )::numeric
+    )::timestamptz (0) AS last_fetched_utc,
+    st_force2d(p.geom) AS geom_2d,
+    st_y(p.geom) AS lat_dd,
+    st_x(p.geom) AS lon_dd,
+    (p.geom_ddm).y AS lat_ddm,
+    (p.geom_ddm).x AS lon_ddm,
+    p.elv_m,
+    p.elv_ft,
+    round(p.velocity_ms::numeric, 1) AS velocity_ms,
+    p.velocity_kmh,
+    p.velocity_kn,
+    round(p.heading::numeric, 1) AS heading_d,
+    ('x' || replace(a.id::text, '-', ''))::bit(64)::bigint AS fake_object_id
+FROM position AS p
+
+INNER JOIN
+    latest_p_by_asset
+    ON
+        p.asset_id = latest_p_by_asset.asset_id
+        AND p.time_utc = latest_p_by_asset.max_time
+
+INNER JOIN asset AS a ON p.asset_id = a.id
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'skos:prefLabel' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS asset_name ON TRUE
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'nvs:L06' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS l06_label ON TRUE
+INNER JOIN LATERAL (
+    SELECT
+        nvs_l06_lookup.code,
+        nvs_l06_lookup.label
+    FROM nvs_l06_lookup
+    WHERE nvs_l06_lookup.code = jsonb_extract_path_text(l06_label.label, 'value')
+) AS l06 ON TRUE
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'ats:last_fetched'
+) AS asset_last_fetched ON TRUE;
+
+GRANT SELECT ON public.v_latest_assets_pos TO assets_tracking_service_ro;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 34, migration_label = '034-position-derived-columns'
+WHERE pk = 1;
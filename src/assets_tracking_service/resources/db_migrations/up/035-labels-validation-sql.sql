@@ -0,0 +1,42 @@
+-- set-based label validation
+--
+-- Label checks were PL/pgSQL functions, looping over each label, which dominated the cost of bulk inserts. They are
+-- replaced by single SQL expressions (using JSON path queries over all labels at once), which the planner can inline
+-- into check constraints. Constraints reference these functions so don't need to be recreated.
+--
+-- Labels are valid and invalid as before, except where 'values' isn't an array, which now fails the check rather than
+-- raising an error. As before, a null 'version' isn't itself rejected.
+
+-- must have 'version' (of '1') and 'values' (array) properties, with all values being objects with 'rel', 'value',
+-- 'scheme' and 'creation' properties
+CREATE OR REPLACE FUNCTION are_labels_v1_valid(jsonb_labels jsonb) RETURNS boolean AS $$
+    SELECT
+        jsonb_labels ? 'version'
+        AND jsonb_labels ? 'values'
+        AND jsonb_labels ->> 'version' = '1'
+        AND jsonb_typeof(jsonb_labels -> 'values') = 'array'
+        AND NOT jsonb_path_exists(jsonb_labels -> 'values', 'strict $[*] ? (@.type() != "object")', '{}', TRUE)
+        AND NOT jsonb_path_exists(
+            jsonb_labels -> 'values',
+            'lax $[*] ? (!exists(@.rel) || !exists(@.value) || !exists(@.scheme) || !exists(@.creation))',
+            '{}',
+            TRUE
+        );
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- must have exactly one label with scheme 'skos:prefLabel'
+CREATE OR REPLACE FUNCTION are_labels_v1_valid_asset(jsonb_labels jsonb) RETURNS boolean AS $$
+    SELECT coalesce(
+        jsonb_array_length(
+            jsonb_path_query_array(
+                jsonb_labels -> 'values', 'strict $[*] ? (@.scheme == "skos:prefLabel")', '{}', TRUE
+            )
+        ),
+        0
+    ) = 1;
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 35, migration_label = '035-labels-validation-sql'
+WHERE pk = 1;
@@ -0,0 +1,163 @@
+-- record when assets were last fetched in a separate table, rather than as a label
+--
+-- Updating an 'ats:last_fetched' label rewrote the labels of each asset every time it was fetched (bumping
+-- `updated_at` and creating new, TOASTed, row versions). A narrow table, with space left in each page and no index on
+-- the updated column, allows these updates to be HOT (heap only tuple) updates.
+CREATE TABLE IF NOT EXISTS public.asset_fetch_state
+(
+    asset_id uuid PRIMARY KEY REFERENCES public.asset (id) ON UPDATE CASCADE ON DELETE CASCADE,
+    last_fetched_at timestamptz NOT NULL
+)
+WITH (fillfactor = 70);
+
+GRANT SELECT ON public.asset_fetch_state TO assets_tracking_service_ro;
+
+-- move existing labels
+INSERT INTO public.asset_fetch_state (asset_id, last_fetched_at)
+SELECT
+    a.id,
+    to_timestamp(max((l.label ->> 'value')::numeric)) AS last_fetched_at
+FROM public.asset AS a, jsonb_array_elements(a.labels -> 'values') AS l (label)
+WHERE l.label ->> 'scheme' = 'ats:last_fetched'
+GROUP BY a.id
+ON CONFLICT (asset_id) DO NOTHING;
+
+UPDATE public.asset AS a
+SET
+    labels = jsonb_set(
+        a.labels,
+        '{values}',
+        (
+            SELECT coalesce(jsonb_agg(l.label ORDER BY l.i), '[]'::jsonb)
+            FROM jsonb_array_elements(a.labels -> 'values') WITH ORDINALITY AS l (label, i)
+            WHERE l.label ->> 'scheme' IS DISTINCT FROM 'ats:last_fetched'
+        )
+    )
+WHERE a.labels -> 'values' @> '[{"scheme": "ats:last_fetched"}]';
+
+-- assets with an 'ats:last_fetched' label added from `asset_fetch_state`, for compatibility
+CREATE OR REPLACE VIEW public.v_asset_labels AS
+SELECT
+    a.id,
+    a.id_ulid,
+    CASE
+        WHEN f.asset_id IS NULL THEN a.labels
+        ELSE jsonb_set(
+            a.labels,
+            '{values}',
+            (a.labels -> 'values') || jsonb_build_array(
+                jsonb_build_object(
+                    'rel', 'provider',
+                    'scheme', 'ats:last_fetched',
+                    'scheme_uri', NULL,
+                    'value', extract(EPOCH FROM f.last_fetched_at)::bigint,
+                    'value_uri', NULL,
+                    'creation', extract(EPOCH FROM a.created_at)::bigint,
+                    'expiration', NULL
+                )
+            )
+        )
+    END AS labels,
+    a.created_at,
+    a.updated_at
+FROM public.asset AS a
+LEFT JOIN public.asset_fetch_state AS f ON a.id = f.asset_id;
+
+GRANT SELECT ON public.v_asset_labels TO assets_tracking_service_ro;
+
+-- include 'ats:last_fetched' labels (no other changes to this view)
+CREATE OR REPLACE VIEW v_util_asset_label AS
+SELECT
+    a.id AS asset_id,
+    l.value ->> 'rel' AS rel,
+    l.value ->> 'value' AS val,
+    l.value ->> 'scheme' AS scheme,
+    l.value ->> 'creation' AS creation,
+    to_timestamp((l.value ->> 'creation')::bigint) AS creation_ts,
+    l.value ->> 'expiration' AS expiration,
+    to_timestamp((l.value ->> 'expiration')::bigint) AS expiration_ts,
+    CASE
+        WHEN l.value ->> 'expiration' IS NULL THEN FALSE
+        WHEN to_timestamp((l.value ->> 'expiration')::bigint) < now() THEN TRUE
+        ELSE FALSE
+    END AS is_expired,
+    l.value ->> 'value_uri' AS value_uri,
+    l.value ->> 'scheme_uri' AS scheme_uri
+FROM
+    v_asset_labels AS a,
+    jsonb_array_elements(a.labels -> 'values') AS l (value);
+
+-- use `asset_fetch_state` (no other changes to this view)
+CREATE OR REPLACE VIEW public.v_latest_assets_pos AS
+WITH latest_p_by_asset AS (
+    SELECT
+        asset_id,
+        max(time_utc) AS max_time
+    FROM
+        position
+    GROUP BY
+        asset_id
+)
+
+SELECT
+    a.id_ulid AS asset_id,
+    jsonb_extract_path_text(asset_name.label, 'value') AS asset_pref_label,
+    l06.code AS asset_type_code,
+    l06.label AS asset_type_label,
+
+    p.id_ulid AS position_id,
+    p.time_utc::timestamptz (0) AS time_utc,
+    f.last_fetched_at::timestamptz (0) AS last_fetched_utc,
+    st_force2d(p.geom) AS geom_2d,
+    st_y(p.geom) AS lat_dd,
+    st_x(p.geom) AS lon_dd,
+    (p.geom_ddm).y AS lat_ddm,
+    (p.geom_ddm).x AS lon_ddm,
+    p.elv_m,
+    p.elv_ft,
+    round(p.velocity_ms::numeric, 1) AS velocity_ms,
+    p.velocity_kmh,
+    p.velocity_kn,
+    round(p.heading::numeric, 1) AS heading_d,
+    ('x' || replace(a.id::text, '-', ''))::bit(64)::bigint AS fake_object_id
+FROM position AS p
+
+INNER JOIN
+    latest_p_by_asset
+    ON
+        p.asset_id = latest_p_by_asset.asset_id
+        AND p.time_utc = latest_p_by_asset.max_time
+
+INNER JOIN asset AS a ON p.asset_id = a.id
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'skos:prefLabel' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS asset_name ON TRUE
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'nvs:L06' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS l06_label ON TRUE
+INNER JOIN LATERAL (
+    SELECT
+        nvs_l06_lookup.code,
+        nvs_l06_lookup.label
+    FROM nvs_l06_lookup
+    WHERE nvs_l06_lookup.code = jsonb_extract_path_text(l06_label.label, 'value')
+) AS l06 ON TRUE
+
+INNER JOIN asset_fetch_state AS f ON a.id = f.asset_id;
+
+GRANT SELECT ON public.v_latest_assets_pos TO assets_tracking_service_ro;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 36, migration_label = '036-asset-fetch-state'
+WHERE pk = 1;
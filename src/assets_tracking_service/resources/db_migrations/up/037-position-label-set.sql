@@ -0,0 +1,106 @@
+-- store labels shared between positions (i.e. provider labels) once, as content-addressed label sets
+--
+-- Provider labels (e.g. 'ats:provider_id' and 'ats:provider_version') are identical for all positions fetched together
+-- but were repeated, with all their keys, in the labels of every position. Label sets are identified by a digest of
+-- their (canonical) JSONB representation, so identical labels are stored once and referenced by ID from positions.
+--
+-- Label creation times are excluded from the digest, as provider labels are created afresh for each fetch. Otherwise
+-- each fetch would add a new label set. A label set keeps the creation times of the labels it was first added with.
+CREATE OR REPLACE FUNCTION labels_digest(jsonb_labels jsonb) RETURNS uuid AS $$
+    SELECT md5(
+        jsonb_set(
+            jsonb_labels,
+            '{values}',
+            coalesce(
+                (
+                    SELECT jsonb_agg(l.label - 'creation' ORDER BY l.n)
+                    FROM jsonb_array_elements(jsonb_labels -> 'values') WITH ORDINALITY AS l (label, n)
+                ),
+                '[]'::jsonb
+            )
+        )::text
+    )::uuid;
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE TABLE IF NOT EXISTS public.label_set
+(
+    id uuid PRIMARY KEY GENERATED ALWAYS AS (labels_digest(labels)) STORED,
+    labels jsonb NOT NULL
+    CONSTRAINT label_set_labels_valid CHECK (are_labels_v1_valid(labels))
+);
+
+GRANT SELECT ON public.label_set TO assets_tracking_service_ro;
+
+ALTER TABLE public.position ADD COLUMN IF NOT EXISTS label_set_id uuid REFERENCES public.label_set (id);
+
+-- move provider labels from existing positions, keeping the earliest creation times for each label set
+WITH provider_labels AS (
+    SELECT
+        p.pk,
+        jsonb_set(
+            p.labels, '{values}', jsonb_path_query_array(p.labels -> 'values', 'strict $[*] ? (@.rel == "provider")')
+        ) AS labels
+    FROM public.position AS p
+    WHERE p.labels -> 'values' @> '[{"rel": "provider"}]'
+)
+
+INSERT INTO public.label_set (labels)
+SELECT DISTINCT ON (labels_digest(pl.labels)) pl.labels
+FROM provider_labels AS pl
+ORDER BY labels_digest(pl.labels), pl.pk
+ON CONFLICT (id) DO NOTHING;
+
+UPDATE public.position AS p
+SET
+    label_set_id = labels_digest(
+        jsonb_set(
+            p.labels, '{values}', jsonb_path_query_array(p.labels -> 'values', 'strict $[*] ? (@.rel == "provider")')
+        )
+    ),
+    labels = jsonb_set(
+        p.labels, '{values}', jsonb_path_query_array(p.labels -> 'values', 'strict $[*] ? (@.rel != "provider")')
+    )
+WHERE p.labels -> 'values' @> '[{"rel": "provider"}]';
+
+-- positions with labels from their label set appended, for compatibility
+CREATE OR REPLACE VIEW public.v_position_labels AS
+SELECT
+    p.id,
+    p.id_ulid,
+    p.asset_id,
+    CASE
+        WHEN p.label_set_id IS NULL THEN p.labels
+        ELSE jsonb_set(p.labels, '{values}', (p.labels -> 'values') || (ls.labels -> 'values'))
+    END AS labels
+FROM position AS p
+LEFT JOIN label_set AS ls ON p.label_set_id = ls.id;
+
+GRANT SELECT ON public.v_position_labels TO assets_tracking_service_ro;
+
+-- include labels from label sets (no other changes to this view)
+CREATE OR REPLACE VIEW v_util_position_label AS
+SELECT
+    p.id AS position_id,
+    p.asset_id,
+    l.value ->> 'rel' AS rel,
+    l.value ->> 'value' AS val,
+    l.value ->> 'scheme' AS scheme,
+    l.value ->> 'creation' AS creation,
+    to_timestamp((l.value ->> 'creation')::bigint) AS creation_ts,
+    l.value ->> 'expiration' AS expiration,
+    to_timestamp((l.value ->> 'expiration')::bigint) AS expiration_ts,
+    CASE
+        WHEN l.value ->> 'expiration' IS NULL THEN FALSE
+        WHEN to_timestamp((l.value ->> 'expiration')::bigint) < now() THEN TRUE
+        ELSE FALSE
+    END AS is_expired,
+    l.value ->> 'value_uri' AS value_uri,
+    l.value ->> 'scheme_uri' AS scheme_uri
+FROM
+    v_position_labels AS p,
+    jsonb_array_elements(p.labels -> 'values') AS l (value);
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 37, migration_label = '037-position-label-set'
+WHERE pk = 1;
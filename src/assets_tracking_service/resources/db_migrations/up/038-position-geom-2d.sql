@@ -0,0 +1,123 @@
+-- persist 2D position geometries in an indexed column
+--
+-- Views, the API and exporters use 2D geometries, which were derived from `geom` (using `st_force2d()`) for every row
+-- each time, and so couldn't use an index. A generated `geom_2d` column, with a GiST index, replaces the index on
+-- `geom` so bounding box and intersection filters on 2D geometries are indexed.
+ALTER TABLE public.position ADD COLUMN IF NOT EXISTS geom_2d GEOMETRY (POINT, 4326) GENERATED ALWAYS AS (
+    st_force2d(geom)
+) STORED;
+
+CREATE INDEX IF NOT EXISTS position_geom_2d_idx ON public.position USING gist (geom_2d);
+DROP INDEX IF EXISTS position_geom_idx;
+
+-- block range (BRIN) indexes on time columns are not added, as the existing B-tree indexes on these columns are needed
+-- for ordered reads (keyset pagination and `max()` lookups), and the query planner prefers them for time range filters.
+
+-- use persisted 2D geometries (no other changes to this function)
+CREATE OR REPLACE FUNCTION assets_tracks_since(since timestamptz, tolerance float, smoothing integer DEFAULT 0)
+RETURNS TABLE (
+    asset_id uuid,
+    time_start_utc timestamptz,
+    time_end_utc timestamptz,
+    positions_count integer,
+    geom_2d geometry
+) AS $$
+    WITH tracks AS (
+        SELECT
+            asset_id,
+            min(time_utc)::timestamptz (0) AS time_start_utc,
+            max(time_utc)::timestamptz (0) AS time_end_utc,
+            count(*)::integer AS positions_count,
+            st_simplifypreservetopology(st_makeline(geom_2d ORDER BY time_utc), tolerance) AS geom_2d
+        FROM public.position
+        WHERE time_utc >= since
+        GROUP BY asset_id
+        HAVING count(*) > 1
+    )
+
+    SELECT
+        asset_id,
+        time_start_utc,
+        time_end_utc,
+        positions_count,
+        CASE
+            WHEN smoothing > 0 THEN st_chaikinsmoothing(geom_2d, smoothing)
+            ELSE geom_2d
+        END AS geom_2d
+    FROM tracks;
+$$ LANGUAGE sql STABLE;
+
+-- use persisted 2D geometries (no other changes to this view)
+CREATE OR REPLACE VIEW public.v_latest_assets_pos AS
+WITH latest_p_by_asset AS (
+    SELECT
+        asset_id,
+        max(time_utc) AS max_time
+    FROM
+        position
+    GROUP BY
+        asset_id
+)
+
+SELECT
+    a.id_ulid AS asset_id,
+    jsonb_extract_path_text(asset_name.label, 'value') AS asset_pref_label,
+    l06.code AS asset_type_code,
+    l06.label AS asset_type_label,
+
+    p.id_ulid AS position_id,
+    p.time_utc::timestamptz (0) AS time_utc,
+    f.last_fetched_at::timestamptz (0) AS last_fetched_utc,
+    p.geom_2d::geometry AS geom_2d,
+    st_y(p.geom) AS lat_dd,
+    st_x(p.geom) AS lon_dd,
+    (p.geom_ddm).y AS lat_ddm,
+    (p.geom_ddm).x AS lon_ddm,
+    p.elv_m,
+    p.elv_ft,
+    round(p.velocity_ms::numeric, 1) AS velocity_ms,
+    p.velocity_kmh,
+    p.velocity_kn,
+    round(p.heading::numeric, 1) AS heading_d,
+    ('x' || replace(a.id::text, '-', ''))::bit(64)::bigint AS fake_object_id
+FROM position AS p
+
+INNER JOIN
+    latest_p_by_asset
+    ON
+        p.asset_id = latest_p_by_asset.asset_id
+        AND p.time_utc = latest_p_by_asset.max_time
+
+INNER JOIN asset AS a ON p.asset_id = a.id
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'skos:prefLabel' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS asset_name ON TRUE
+
+INNER JOIN LATERAL (
+    SELECT elem.label
+    FROM jsonb_array_elements(a.labels -> 'values') AS elem (label)
+    WHERE elem.label ->> 'scheme' = 'nvs:L06' AND elem.label ->> 'expiration' IS NULL
+    ORDER BY (elem.label ->> 'creation')::bigint DESC
+    LIMIT 1
+) AS l06_label ON TRUE
+INNER JOIN LATERAL (
+    SELECT
+        nvs_l06_lookup.code,
+        nvs_l06_lookup.label
+    FROM nvs_l06_lookup
+    WHERE nvs_l06_lookup.code = jsonb_extract_path_text(l06_label.label, 'value')
+) AS l06 ON TRUE
+
+INNER JOIN asset_fetch_state AS f ON a.id = f.asset_id;
+
+GRANT SELECT ON public.v_latest_assets_pos TO assets_tracking_service_ro;
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 38, migration_label = '038-position-geom-2d'
+WHERE pk = 1;
@@ -0,0 +1,70 @@
+-- identify assets and positions by natural keys, so new rows can be inserted idempotently
+--
+-- New assets and positions were found by comparing distinguishing label values (e.g. a serial number) fetched from
+-- each provider against all labels in the database (read-before-write), which was slow and racy if runs overlapped.
+-- Unique constraints on the provider of an asset and its distinguishing label value, and on the asset of a position and
+-- its distinguishing label value, allow rows to be inserted with `ON CONFLICT DO NOTHING` instead.
+--
+-- The provider of an asset is derived from its 'ats:provider_id' label. Distinguishing label values are set when rows
+-- are inserted, as the label scheme used varies by provider. Rows without a value (e.g. not from a provider) are not
+-- constrained.
+ALTER TABLE public.asset ADD COLUMN IF NOT EXISTS provider_id text GENERATED ALWAYS AS (
+    jsonb_path_query_first(labels, '$.values[*] ? (@.scheme == "ats:provider_id").value') #>> '{}'
+) STORED;
+ALTER TABLE public.asset ADD COLUMN IF NOT EXISTS dist_asset_value text;
+ALTER TABLE public.position ADD COLUMN IF NOT EXISTS dist_position_value text;
+
+-- distinguishing label schemes for existing providers
+CREATE TEMPORARY TABLE dist_scheme (provider_id text PRIMARY KEY, asset_scheme text, position_scheme text);
+INSERT INTO pg_temp.dist_scheme (provider_id, asset_scheme, position_scheme) VALUES
+('geotab', 'geotab:device_id', 'geotab:log_record_id'),
+('aircraft_tracking', 'aircraft_tracking:aircraft_id', 'aircraft_tracking:_fake_position_id'),
+('rvdas', 'rvdas:_fake_vessel_id', 'rvdas:_fake_position_id');
+
+-- set values for existing rows, where duplicates exist only the first row is set (other rows are not constrained)
+WITH dist AS (
+    SELECT DISTINCT ON (a.provider_id, l.label ->> 'value')
+        a.pk,
+        l.label ->> 'value' AS dist_value
+    FROM public.asset AS a
+    INNER JOIN pg_temp.dist_scheme AS s ON a.provider_id = s.provider_id
+    CROSS JOIN LATERAL jsonb_array_elements(a.labels -> 'values') AS l (label)
+    WHERE l.label ->> 'scheme' = s.asset_scheme
+    ORDER BY a.provider_id, l.label ->> 'value', a.pk
+)
+
+UPDATE public.asset AS a
+SET dist_asset_value = dist.dist_value
+FROM dist
+WHERE a.pk = dist.pk;
+
+WITH dist AS (
+    SELECT DISTINCT ON (p.asset_id, l.label ->> 'value')
+        p.pk,
+        l.label ->> 'value' AS dist_value
+    FROM public.position AS p
+    INNER JOIN public.asset AS a ON p.asset_id = a.id
+    INNER JOIN pg_temp.dist_scheme AS s ON a.provider_id = s.provider_id
+    CROSS JOIN LATERAL jsonb_array_elements(p.labels -> 'values') AS l (label)
+    WHERE l.label ->> 'scheme' = s.position_scheme
+    ORDER BY p.asset_id, l.label ->> 'value', p.pk
+)
+
+UPDATE public.position AS p
+SET dist_position_value = dist.dist_value
+FROM dist
+WHERE p.pk = dist.pk;
+
+DROP TABLE pg_temp.dist_scheme;
+
+ALTER TABLE public.asset ADD CONSTRAINT asset_provider_id_dist_asset_value_key UNIQUE (
+    provider_id, dist_asset_value
+);
+ALTER TABLE public.position ADD CONSTRAINT position_asset_id_dist_position_value_key UNIQUE (
+    asset_id, dist_position_value
+);
+
+-- record latest migration
+UPDATE public.meta_migration
+SET migration_id = 39, migration_label = '039-natural-keys'
+WHERE pk = 1;
@@ -0,0 +1,63 @@
+from collections.abc import Callable
+from time import perf_counter
+
+import numpy as np
+import shapely
+from shapely import Point, wkt
+
+from assets_tracking_service import geometry_adapters
+
+POINTS = 100_000
+ROUNDS = 3
+
+
+def _make_points() -> list[Point]:
+    """Random 3D points, with full precision coordinates, as providers might return."""
+    rng = np.random.default_rng(seed=0)
+    lon = rng.uniform(-180, 180, POINTS)
+    lat = rng.uniform(-90, -60, POINTS)
+    z = rng.uniform(0, 3000, POINTS)
+    return list(shapely.points(np.column_stack([lon, lat, z])))
+
+
+def _time(func: Callable[[], object]) -> float:
+    """Best time from a number of rounds."""
+    times = []
+    for _ in range(ROUNDS):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    """Script entrypoint."""
+    points = _make_points()
+    as_wkt = [point.wkt for point in points]
+    as_ewkb = [geometry_adapters.dumps(point) for point in points]
+
+    wkt_dumps = _time(lambda: [point.wkt for point in points])
+    ewkb_dumps = _time(lambda: [geometry_adapters.dumps(point) for point in points])
+    # as used for batches of positions
+    array = np.array(points)
+    ewkb_array_dumps = _time(lambda: shapely.to_wkb(shapely.set_srid(array, geometry_adapters.SRID), include_srid=True))
+    wkt_loads = _time(lambda: [wkt.loads(value) for value in as_wkt])
+    ewkb_loads = _time(lambda: [shapely.from_wkb(value) for value in as_ewkb])
+
+    wkt_lossy = sum(wkt.loads(value).coords[0] != point.coords[0] for value, point in zip(as_wkt, points, strict=True))
+    ewkb_lossy = sum(
+        shapely.from_wkb(value).coords[0] != point.coords[0] for value, point in zip(as_ewkb, points, strict=True)
+    )
+
+    print(f"Points: {POINTS:,}")
+    print(f"Encode (WKT):  {wkt_dumps:.3f}s, {sum(len(value) for value in as_wkt) / 1024**2:.1f} MiB")
+    print(f"Encode (EWKB): {ewkb_dumps:.3f}s, {sum(len(value) for value in as_ewkb) / 1024**2:.1f} MiB")
+    print(f"Encode (EWKB, as array): {ewkb_array_dumps:.3f}s")
+    print(f"Decode (WKT):  {wkt_loads:.3f}s")
+    print(f"Decode (EWKB): {ewkb_loads:.3f}s")
+    print(f"Points changed by round-trip (WKT):  {wkt_lossy:,}")
+    print(f"Points changed by round-trip (EWKB): {ewkb_lossy:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import logging
+from dataclasses import replace
+from datetime import timedelta
+from time import perf_counter
+
+from psycopg.sql import SQL, Identifier
+from tasks.bench_pipeline import DSN, _reset_db
+from tests.resources.examples.synthetic_provider import SyntheticProvider
+
+from assets_tracking_service.config import Config
+from assets_tracking_service.db import DatabaseClient, make_conn
+from assets_tracking_service.models.asset import AssetsClient
+from assets_tracking_service.models.label import Labels
+from assets_tracking_service.models.position import PositionsClient
+
+DAYS = 365
+# columns copied to a table storing all labels inline, other columns are generated or have defaults
+COLUMNS = [
+    "id",
+    "asset_id",
+    "geom",
+    "geom_dimensions",
+    "time_utc",
+    "velocity_ms",
+    "heading",
+    "created_at",
+    "updated_at",
+]
+
+
+class _HistoricProvider(SyntheticProvider):
+    """Synthetic provider where provider labels are created at the (synthetic) time of each fetch, as in a real run."""
+
+    @property
+    def provider_labels(self) -> Labels:
+        """Provider labels created at the time of the current fetch."""
+        creation = int(self._time.timestamp())
+        return Labels([replace(label, creation=creation) for label in super().provider_labels])
+
+
+def _parse_args() -> argparse.Namespace:
+    """Command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark storing shared position labels as label sets.")
+    parser.add_argument("--dsn", default=DSN, help="Disposable database, which will be reset (name must end 'bench').")
+    parser.add_argument("--assets", type=int, default=10, help="Number of assets.")
+    parser.add_argument("--interval", type=int, default=60, help="Minutes between positions for each asset.")
+    parser.add_argument("--fetch", type=int, default=24, help="Hours between fetches.")
+    return parser.parse_args()
+
+
+def _load_year(db: DatabaseClient, args: argparse.Namespace) -> float:
+    """Fetch and save a year of synthetic positions, returning the time taken to save them."""
+    logger = logging.getLogger("app")
+    positions = args.fetch * 60 // args.interval
+    provider = _HistoricProvider(
+        config=Config(read_env=False),
+        logger=logger,
+        assets=args.assets,
+        positions=positions,
+        interval=timedelta(minutes=args.interval),
+    )
+    assets_client = AssetsClient(db_client=db)
+    assets_client.add_batch(
+        list(provider.fetch_active_assets()), dist_label_scheme=provider.distinguishing_asset_label_scheme
+    )
+    assets = list(assets_client.list())
+    positions_client = PositionsClient(db_client=db)
+
+    duration = 0.0
+    for _ in range(DAYS * 24 // args.fetch):
+        for batch in provider.fetch_latest_positions(assets=assets):
+            start = perf_counter()
+            positions_client.add_batch(batch, dist_label_scheme=provider.distinguishing_position_label_scheme)
+            duration += perf_counter() - start
+    return duration
+
+
+def _copy_inline(db: DatabaseClient) -> None:
+    """Copy positions to a temporary table with all labels stored inline, as before label sets."""
+    db.execute(
+        SQL("""
+            CREATE TEMPORARY TABLE bench_inline (
+                LIKE public.position INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING IDENTITY INCLUDING INDEXES
+            );
+        """)
+    )
+    db.execute(
+        SQL("""
+            INSERT INTO pg_temp.bench_inline ({columns}, labels)
+            SELECT {p_columns}, v.labels
+            FROM public.position AS p
+            INNER JOIN public.v_position_labels AS v ON p.id = v.id
+            ORDER BY p.pk;
+        """).format(
+            columns=SQL(", ").join(Identifier(column) for column in COLUMNS),
+            p_columns=SQL(", ").join(Identifier("p", column) for column in COLUMNS),
+        )
+    )
+
+
+def main() -> None:
+    """Script entrypoint."""
+    args = _parse_args()
+    db = DatabaseClient(conn=make_conn(args.dsn))
+    _reset_db(db)
+    duration = _load_year(db, args)
+    _copy_inline(db)
+
+    result = db.get_query_result(
+        SQL("""
+            SELECT
+                (SELECT COUNT(*) FROM public.position),
+                (SELECT COUNT(*) FROM public.label_set),
+                pg_total_relation_size('pg_temp.bench_inline'),
+                pg_total_relation_size('public.position'),
+                pg_total_relation_size('public.label_set'),
+                (SELECT avg(pg_column_size(labels)) FROM pg_temp.bench_inline),
+                (SELECT avg(pg_column_size(labels)) FROM public.position);
+        """)
+    )
+    positions, label_sets, inline, interned, label_set, inline_labels, interned_labels = result[0]
+    db.close()
+
+    mib = 1024 * 1024
+    print(f"Positions: {positions:,} ({DAYS} days), label sets: {label_sets:,}")
+    print(f"Insert (with label sets): {duration:.3f}s")
+    print(f"Size (labels inline):     {inline / mib:.1f} MiB, {inline_labels:.0f} bytes of labels per position")
+    print(
+        f"Size (with label sets):   {(interned + label_set) / mib:.1f} MiB "
+        f"(of which label sets {label_set / mib:.1f} MiB), {interned_labels:.0f} bytes of labels per position"
+    )
+    print(f"Saving: {(inline - interned - label_set) / mib:.1f} MiB ({1 - (interned + label_set) / inline:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from time import perf_counter
+
+from assets_tracking_service.models.label import Label, LabelRelation, Labels, label_creation
+
+ENTITIES = 10_000  # with 10 labels each, 100k labels in total
+LOOKUP_SCHEMES = ["geotab:device_id", "skos:prefLabel", "ats:provider_id"]
+
+
+@dataclass(kw_only=True, frozen=True)
+class _BaselineLabel:
+    """Label as previously implemented (not slotted, schemes not interned, creation per label)."""
+
+    rel: LabelRelation
+    scheme: str
+    scheme_uri: str | None = None
+    value: str | int | float
+    value_uri: str | None = None
+    creation: int = field(default_factory=lambda: int(datetime.now(UTC).timestamp()))
+    expiration: int | None = None
+
+    def __post_init__(self) -> None:
+        """Equivalent validation to Label."""
+        if (
+            not isinstance(self.rel, LabelRelation)
+            or not self.scheme
+            or self.scheme_uri == ""
+            or self.value is None
+            or self.value == ""
+            or self.value_uri == ""
+        ):
+            raise ValueError
+        if self.expiration is not None:
+            datetime.fromtimestamp(self.expiration, tz=UTC)
+
+
+def _device(i: int) -> dict[str, str | int]:
+    """Fake Geotab device."""
+    return {
+        "device_id": f"b{i:04x}",
+        "device_serial_number": f"G9{i:010d}",
+        "device_name": f"Vehicle {i}",
+        "device_group_ids": "b2799,b27A3",
+        "device_comment": "",
+        "device_vin": f"VIN{i:014d}",
+    }
+
+
+def _make_baseline() -> list[list[_BaselineLabel]]:
+    entities = []
+    for i in range(ENTITIES):
+        labels = [
+            _BaselineLabel(rel=LabelRelation.SELF, scheme="skos:prefLabel", value=f"Vehicle {i}"),
+            _BaselineLabel(rel=LabelRelation.SELF, scheme="nvs:L06", value="0"),
+        ]
+        labels.extend(
+            _BaselineLabel(rel=LabelRelation.SELF, scheme=f"geotab:{key}", value=value or "-")
+            for key, value in _device(i).items()
+        )
+        labels.append(_BaselineLabel(rel=LabelRelation.PROVIDER, scheme="ats:provider_id", value="geotab"))
+        labels.append(_BaselineLabel(rel=LabelRelation.PROVIDER, scheme="ats:provider_version", value="2024-04-20"))
+        entities.append(labels)
+    return entities
+
+
+def _make_current() -> list[Labels]:
+    entities = []
+    creation = label_creation()
+    for i in range(ENTITIES):
+        labels = Labels(
+            [
+                Label(rel=LabelRelation.SELF, scheme="skos:prefLabel", value=f"Vehicle {i}", creation=creation),
+                Label(rel=LabelRelation.SELF, scheme="nvs:L06", value="0", creation=creation),
+            ]
+        )
+        labels.extend(
+            Label(rel=LabelRelation.SELF, scheme=f"geotab:{key}", value=value or "-", creation=creation)
+            for key, value in _device(i).items()
+        )
+        labels.append(Label(rel=LabelRelation.PROVIDER, scheme="ats:provider_id", value="geotab", creation=creation))
+        labels.append(
+            Label(rel=LabelRelation.PROVIDER, scheme="ats:provider_version", value="2024-04-20", creation=creation)
+        )
+        entities.append(labels)
+    return entities
+
+
+def _measure(make: Callable[[], list]) -> tuple[list, float, int]:
+    """
+    Time taken, and memory allocated, to make labels.
+
+    Timed separately to memory as tracing allocations is slow.
+    """
+    start = perf_counter()
+    make()
+    elapsed = perf_counter() - start
+
+    tracemalloc.start()
+    result = make()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, size
+
+
+def _lookup_linear(entities: list[list[_BaselineLabel]]) -> float:
+    start = perf_counter()
+    for labels in entities:
+        for scheme in LOOKUP_SCHEMES:
+            next(label for label in labels if label.scheme == scheme)
+    return perf_counter() - start
+
+
+def _lookup_indexed(entities: list[Labels]) -> float:
+    start = perf_counter()
+    for labels in entities:
+        for scheme in LOOKUP_SCHEMES:
+            labels.filter_by_scheme(scheme)
+    return perf_counter() - start
+
+
+def main() -> None:
+    """Script entrypoint."""
+    baseline, baseline_time, baseline_mem = _measure(_make_baseline)
+    current, current_time, current_mem = _measure(_make_current)
+    count = sum(len(labels) for labels in current)
+
+    print(f"Labels: {count:,} ({ENTITIES:,} entities)")
+    print(f"Create (baseline): {baseline_time:.3f}s, {baseline_mem / 1024**2:.1f} MiB")
+    print(f"Create (current):  {current_time:.3f}s, {current_mem / 1024**2:.1f} MiB")
+    print(f"Lookup {len(LOOKUP_SCHEMES)} schemes per entity (linear scan): {_lookup_linear(baseline):.3f}s")
+    print(f"Lookup {len(LOOKUP_SCHEMES)} schemes per entity (indexed):     {_lookup_indexed(current):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
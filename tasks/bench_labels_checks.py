@@ -0,0 +1,94 @@
+import argparse
+import logging
+from collections.abc import Callable
+from time import perf_counter
+
+from psycopg.sql import SQL
+from psycopg.types.json import Jsonb
+from tasks.bench_pipeline import DSN, _reset_db
+from tests.resources.examples.synthetic_provider import SyntheticProvider
+from ulid import new as new_ulid
+
+from assets_tracking_service.config import Config
+from assets_tracking_service.db import DatabaseClient, make_conn
+from assets_tracking_service.models.asset import Asset
+from assets_tracking_service.models.label import Labels
+
+ROWS = 100_000
+ROUNDS = 3
+# migration reverting to previous (PL/pgSQL) validation functions
+LEGACY_MIGRATION = "965-labels-validation-sql"
+CHECKS = {
+    "none": [],
+    "legacy": ["pg_temp.legacy_are_labels_v1_valid", "pg_temp.legacy_are_labels_v1_valid_asset"],
+    "current": ["are_labels_v1_valid", "are_labels_v1_valid_asset"],
+}
+
+
+def _parse_args() -> argparse.Namespace:
+    """Command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark inserting labels checked by validation functions.")
+    parser.add_argument("--dsn", default=DSN, help="Disposable database, which will be reset (name must end 'bench').")
+    parser.add_argument("--rows", type=int, default=ROWS, help="Number of rows.")
+    return parser.parse_args()
+
+
+def _time(func: Callable[[], object]) -> float:
+    """Best time from a number of rounds."""
+    times = []
+    for _ in range(ROUNDS):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def _create_legacy_functions(db: DatabaseClient) -> None:
+    """Previous validation functions, as temporary functions."""
+    migration = next(m for m in DatabaseClient._list_migrations("down") if m.name == LEGACY_MIGRATION)
+    sql = migration.sql[: migration.sql.index("-- record latest migration")]
+    db.execute(SQL(sql.replace("FUNCTION are_labels_v1_valid", "FUNCTION pg_temp.legacy_are_labels_v1_valid")))
+
+
+def _make_labels(rows: int) -> tuple[list[Labels], list[Labels]]:
+    """Synthetic asset and position labels (positions have more labels, similar to those from Geotab)."""
+    logger = logging.getLogger("app")
+    provider = SyntheticProvider(config=Config(read_env=False), logger=logger, assets=100, positions=rows // 100)
+    assets = [Asset(id=new_ulid(), labels=asset.labels) for asset in provider.fetch_active_assets()]
+    batch = next(provider.fetch_latest_positions(assets=assets))
+    asset_labels = [assets[i % len(assets)].labels for i in range(len(batch))]
+    return asset_labels, list(batch.labels)
+
+
+def _insert(db: DatabaseClient, checks: list[str], labels: list[Labels]) -> None:
+    """Insert labels into a temporary table with check constraints."""
+    constraints = SQL("").join(SQL(" CHECK ({func}(labels))").format(func=SQL(func)) for func in checks)
+    db.execute(SQL("DROP TABLE IF EXISTS pg_temp.bench_labels;"))
+    db.execute(
+        SQL("CREATE TEMPORARY TABLE bench_labels (labels jsonb NOT NULL{constraints});").format(constraints=constraints)
+    )
+    db.execute(
+        SQL("INSERT INTO pg_temp.bench_labels (labels) SELECT unnest(%s::jsonb[]);"),
+        params=([Jsonb(value, dumps=Labels.dumps) for value in labels],),
+    )
+
+
+def main() -> None:
+    """Script entrypoint."""
+    args = _parse_args()
+    db = DatabaseClient(conn=make_conn(args.dsn))
+    _reset_db(db)
+    _create_legacy_functions(db)
+    asset_labels, position_labels = _make_labels(args.rows)
+
+    print(f"Rows: {len(position_labels):,}")
+    for name, checks in CHECKS.items():
+        # positions are only checked by the base validation function
+        assets = _time(lambda checks=checks: _insert(db, checks=checks, labels=asset_labels))
+        positions = _time(lambda checks=checks: _insert(db, checks=checks[:1], labels=position_labels))
+        print(f"Checks ({name}): assets {assets:.3f}s, positions {positions:.3f}s")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import json
+from collections.abc import Callable
+from time import perf_counter
+from typing import Union
+
+import cattrs
+
+from assets_tracking_service import json_backend
+from assets_tracking_service.models.label import Label, LabelRelation, Labels, label_creation
+
+POSITIONS = 10_000
+ROUNDS = 3
+
+
+def _device_status(i: int) -> dict[str, str | int | float | bool]:
+    """Fake Geotab device status, as used for position labels."""
+    return {
+        "device_id": f"b{i % 200:04x}",
+        "date": f"2025-01-{i % 28 + 1:02d}T12:{i % 60:02d}:00+00:00",
+        "latitude": -67.5 + (i % 100) / 1000,
+        "longitude": -68.1 + (i % 100) / 1000,
+        "speed_km_h": float(i % 40),
+        "bearing_degrees": i % 360,
+        "is_device_communicating": True,
+        "is_driving": i % 2 == 0,
+        "current_state_duration": f"00:{i % 60:02d}:00",
+        "device_name": f"Vehicle {i % 200}",
+        "device_serial_number": f"G9{i % 200:010d}",
+    }
+
+
+def _make_labels() -> list[Labels]:
+    """Position labels for a set of realistic Geotab device statuses."""
+    creation = label_creation()
+    labels = []
+    for i in range(POSITIONS):
+        status_labels = [
+            Label(rel=LabelRelation.SELF, scheme=f"geotab:{key}", value=value, creation=creation)
+            for key, value in _device_status(i).items()
+        ]
+        labels.append(
+            Labels(
+                [
+                    Label(rel=LabelRelation.SELF, scheme="geotab:log_record_id", value=f"b{i:06x}", creation=creation),
+                    *status_labels,
+                    Label(rel=LabelRelation.PROVIDER, scheme="ats:provider_id", value="geotab", creation=creation),
+                    Label(
+                        rel=LabelRelation.PROVIDER,
+                        scheme="ats:provider_version",
+                        value="2024-04-20",
+                        creation=creation,
+                    ),
+                ]
+            )
+        )
+    return labels
+
+
+def _make_converter() -> cattrs.Converter:
+    """Make cattrs converter as previously used by Labels."""
+
+    def _structure_str_int_float(value: str | int | float, _) -> str | int | float:  # noqa: ANN001
+        return value
+
+    converter = cattrs.Converter()
+    converter.register_structure_hook(Union[str, int, float], _structure_str_int_float)  # noqa: UP007
+    converter.register_structure_hook(
+        Labels, lambda d, t: Labels([converter.structure(label, Label) for label in d["values"]])
+    )
+    converter.register_unstructure_hook(
+        Labels, lambda d: {"version": d.version, "values": [converter.unstructure(label) for label in d]}
+    )
+    return converter
+
+
+def _time(func: Callable[[], object]) -> float:
+    """Best time from a number of rounds."""
+    times = []
+    for _ in range(ROUNDS):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    """Script entrypoint."""
+    labels = _make_labels()
+    converter = _make_converter()
+    encoded = [item.dumps() for item in labels]
+    count = sum(len(item) for item in labels)
+
+    baseline_dumps = _time(lambda: [json.dumps(converter.unstructure(item)).encode() for item in labels])
+    current_dumps = _time(lambda: [item.dumps() for item in labels])
+    baseline_loads = _time(lambda: [converter.structure(json.loads(item), Labels) for item in encoded])
+    current_loads = _time(lambda: [Labels.loads(item) for item in encoded])
+
+    print(f"Label sets: {len(labels):,} ({count:,} labels), JSON backend: {json_backend.BACKEND}")
+    print(f"Labels -> bytes (cattrs + json): {baseline_dumps:.3f}s")
+    print(f"Labels -> bytes (direct):        {current_dumps:.3f}s")
+    print(f"bytes -> Labels (json + cattrs): {baseline_loads:.3f}s")
+    print(f"bytes -> Labels (direct):        {current_loads:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
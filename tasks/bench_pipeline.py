@@ -0,0 +1,192 @@
+import argparse
+import functools
+import json
+import logging
+import platform
+import resource
+import tempfile
+from collections.abc import Callable
+from importlib.metadata import version
+from pathlib import Path
+from time import perf_counter
+from types import TracebackType
+
+import numpy as np
+import psycopg
+from psycopg.sql import SQL
+from tests.resources.examples.synthetic_provider import SyntheticProvider
+
+from assets_tracking_service.config import Config
+from assets_tracking_service.db import DatabaseClient, make_conn
+from assets_tracking_service.exporters.exporters_manager import ExportersManager
+from assets_tracking_service.providers.providers_manager import ProvidersManager
+
+DSN = "postgres://localhost/assets_tracking_bench"
+PERCENTILES = [50, 90, 99]
+# methods counted as one query each (server-side cursors don't call `Cursor.execute`)
+QUERY_METHODS = [
+    (psycopg.Cursor, "execute"),
+    (psycopg.Cursor, "executemany"),
+    (psycopg.Cursor, "copy"),
+    (psycopg.ServerCursor, "execute"),
+]
+
+
+class _BenchConfig(Config):
+    """Config for benchmarking, independent of any local settings."""
+
+    def __init__(self, exporters: list[str], output_path: Path) -> None:
+        super().__init__(read_env=False)
+        self._exporters = exporters
+        self._output_path = output_path
+
+    @property
+    def ENABLED_PROVIDERS(self) -> list[str]:  # noqa: N802
+        """Providers are set directly."""
+        return []
+
+    @property
+    def ENABLED_EXPORTERS(self) -> list[str]:  # noqa: N802
+        """Exporters that don't need external services."""
+        return self._exporters
+
+    @property
+    def EXPORTER_VECTOR_TILES_OUTPUT_PATH(self) -> Path:  # noqa: N802
+        """Temporary MBTiles archive."""
+        return self._output_path
+
+
+class _QueryCounter:
+    """Count statements executed by psycopg cursors, including COPY and server-side cursors."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._originals: list[tuple[type, str, Callable]] = []
+
+    def _wrap(self, method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(*args: object, **kwargs: object) -> object:
+            self.count += 1
+            return method(*args, **kwargs)
+
+        return wrapper
+
+    def __enter__(self) -> "_QueryCounter":
+        for cls, name in QUERY_METHODS:
+            method = cls.__dict__[name]
+            self._originals.append((cls, name, method))
+            setattr(cls, name, self._wrap(method))
+        return self
+
+    def __exit__(self, exc_type: type | None, exc_val: BaseException | None, exc_tb: TracebackType | None) -> None:
+        for cls, name, method in self._originals:
+            setattr(cls, name, method)
+        self._originals = []
+
+
+def _parse_args() -> argparse.Namespace:
+    """Command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark fetching and exporting synthetic assets and positions.")
+    parser.add_argument("--dsn", default=DSN, help="Disposable database, which will be reset (name must end 'bench').")
+    parser.add_argument("--assets", type=int, default=50, help="Number of assets.")
+    parser.add_argument("--positions", type=int, default=100, help="New positions per asset per run.")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fetch and export runs.")
+    parser.add_argument("--exporters", nargs="*", default=["vector_tiles"], help="Exporters to run.")
+    parser.add_argument("--output", type=Path, help="Write JSON report to file rather than stdout.")
+    return parser.parse_args()
+
+
+def _reset_db(db: DatabaseClient) -> None:
+    """Migrate benchmark database from scratch."""
+    if not db.conn.info.dbname.endswith("bench"):
+        msg = f"Refusing to reset database '{db.conn.info.dbname}', name must end 'bench'."
+        raise SystemExit(msg)
+
+    db.execute(
+        SQL("""
+            DO $$ BEGIN
+                CREATE ROLE assets_tracking_service_ro NOLOGIN;
+            EXCEPTION WHEN duplicate_object THEN NULL;
+            END $$;
+        """)
+    )
+    if db.get_migrate_status() is not None:
+        db.migrate_downgrade()
+    db.migrate_upgrade()
+
+
+def _summarise(durations: list[float], queries: list[int]) -> dict:
+    """Latency percentiles and query counts for a stage."""
+    summary = {f"p{p}_s": round(float(np.percentile(durations, p)), 4) for p in PERCENTILES}
+    summary["max_s"] = round(max(durations), 4)
+    summary["total_s"] = round(sum(durations), 4)
+    summary["queries_per_run"] = round(sum(queries) / len(queries), 1)
+    return summary
+
+
+def main() -> None:
+    """Script entrypoint."""
+    args = _parse_args()
+    logger = logging.getLogger("app")
+    logger.setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp_path:
+        config = _BenchConfig(exporters=args.exporters, output_path=Path(tmp_path) / "positions.mbtiles")
+        db = DatabaseClient(conn=make_conn(args.dsn))
+        _reset_db(db)
+
+        provider = SyntheticProvider(config=config, logger=logger, assets=args.assets, positions=args.positions)
+        providers = ProvidersManager(config=config, db=db, logger=logger)
+        providers._providers = [provider]
+        exporters = ExportersManager(config=config, db=db, logger=logger)
+
+        stages = {
+            "fetch_assets": providers.fetch_active_assets,
+            "fetch_positions": providers.fetch_latest_positions,
+            "export": exporters.export,
+        }
+        durations: dict[str, list[float]] = {stage: [] for stage in stages}
+        queries: dict[str, list[int]] = {stage: [] for stage in stages}
+
+        with _QueryCounter() as counter:
+            for _ in range(args.runs):
+                for stage, func in stages.items():
+                    count = counter.count
+                    start = perf_counter()
+                    func()
+                    durations[stage].append(perf_counter() - start)
+                    queries[stage].append(counter.count - count)
+
+        positions = db.get_query_result(SQL("SELECT COUNT(*) FROM public.position;"))[0][0]
+        db.close()
+
+    total = sum(sum(values) for values in durations.values())
+    report = {
+        "benchmark": "pipeline",
+        "version": version("assets-tracking-service"),
+        "python": platform.python_version(),
+        "parameters": {
+            "assets": args.assets,
+            "positions": args.positions,
+            "runs": args.runs,
+            "exporters": args.exporters,
+        },
+        "positions_inserted": positions,
+        "rows_per_sec": round(positions / sum(durations["fetch_positions"]), 1),
+        "rows_per_sec_end_to_end": round(positions / total, 1),
+        "duration_s": round(total, 4),
+        "queries": sum(sum(values) for values in queries.values()),
+        "stages": {stage: _summarise(durations[stage], queries[stage]) for stage in stages},
+        # `ru_maxrss` is in KiB on Linux
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+        return
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
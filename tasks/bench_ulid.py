@@ -0,0 +1,148 @@
+import argparse
+import logging
+from collections.abc import Callable
+from time import perf_counter
+
+from psycopg.sql import SQL, Identifier
+from tasks.bench_pipeline import DSN, _reset_db
+from tests.resources.examples.synthetic_provider import SyntheticProvider
+from ulid import from_uuid
+
+from assets_tracking_service.config import Config
+from assets_tracking_service.db import DatabaseClient, make_conn
+from assets_tracking_service.models.asset import AssetsClient
+from assets_tracking_service.models.position import PositionsClient
+
+ROWS = 200_000
+ASSETS = 10_000
+ROUNDS = 3
+
+
+def _parse_args() -> argparse.Namespace:
+    """Command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark representing UUIDs as ULIDs in and out of the database.")
+    parser.add_argument("--dsn", default=DSN, help="Disposable database, which will be reset (name must end 'bench').")
+    parser.add_argument("--rows", type=int, default=ROWS, help="Number of rows.")
+    parser.add_argument("--assets", type=int, default=ASSETS, help="Number of assets for comparing utility views.")
+    return parser.parse_args()
+
+
+def _time(func: Callable[[], object]) -> float:
+    """Best time from a number of rounds."""
+    times = []
+    for _ in range(ROUNDS):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def _create_table(db: DatabaseClient, name: str, persisted: bool) -> None:
+    """Temporary table of ULIDs as UUIDs, optionally with a persisted ULID column."""
+    column = SQL(", id_ulid text GENERATED ALWAYS AS (uuid_to_ulid(id)) STORED") if persisted else SQL("")
+    db.execute(SQL("DROP TABLE IF EXISTS pg_temp.{name};").format(name=Identifier(name)))
+    db.execute(
+        SQL("CREATE TEMPORARY TABLE {name} (id uuid PRIMARY KEY DEFAULT generate_ulid(){column});").format(
+            name=Identifier(name), column=column
+        )
+    )
+
+
+def _load_assets(db: DatabaseClient, assets: int) -> None:
+    """Save synthetic assets with a few positions each, for querying the `v_util_basic` view."""
+    provider = SyntheticProvider(config=Config(read_env=False), logger=logging.getLogger("app"), assets=assets)
+    assets_client = AssetsClient(db_client=db)
+    assets_client.add_batch(
+        list(provider.fetch_active_assets()), dist_label_scheme=provider.distinguishing_asset_label_scheme
+    )
+    positions_client = PositionsClient(db_client=db)
+    for batch in provider.fetch_latest_positions(assets=list(assets_client.list())):
+        positions_client.add_batch(batch, dist_label_scheme=provider.distinguishing_position_label_scheme)
+
+
+def _create_legacy_view(db: DatabaseClient) -> None:
+    """Temporary copy of the `v_util_basic` view as it was before persisted ULIDs, encoding IDs when queried."""
+    db.execute(
+        SQL("""
+            CREATE OR REPLACE TEMPORARY VIEW bench_util_basic_legacy AS
+            WITH latest_p_by_asset AS (
+                SELECT asset_id, max(time_utc) AS max_time FROM public.position GROUP BY asset_id
+            )
+            SELECT
+                uuid_to_ulid(a.id) AS asset_id,
+                uuid_to_ulid(p.id) AS position_id,
+                p.time_utc::timestamptz (0) AS time_utc,
+                p.geom AS geom_3d,
+                p.geom_dimensions,
+                p.velocity_ms,
+                p.heading AS heading_d
+            FROM public.position AS p
+            INNER JOIN latest_p_by_asset
+                ON p.asset_id = latest_p_by_asset.asset_id AND p.time_utc = latest_p_by_asset.max_time
+            INNER JOIN public.asset AS a ON p.asset_id = a.id;
+        """)
+    )
+
+
+def main() -> None:
+    """Script entrypoint."""
+    args = _parse_args()
+    db = DatabaseClient(conn=make_conn(args.dsn))
+    _reset_db(db)
+
+    def _insert(persisted: bool) -> None:
+        _create_table(db, name="bench_ulid", persisted=persisted)
+        db.execute(SQL("INSERT INTO pg_temp.bench_ulid SELECT FROM generate_series(1, %s);"), params=(args.rows,))
+
+    insert_plain = _time(lambda: _insert(persisted=False))
+    insert_persisted = _time(lambda: _insert(persisted=True))
+
+    # table is left with a persisted column from the last insert
+    encode_plpgsql = _time(lambda: db.get_query_result(SQL("SELECT uuid_to_ulid(id) FROM pg_temp.bench_ulid;")))
+    persisted = _time(lambda: db.get_query_result(SQL("SELECT id_ulid FROM pg_temp.bench_ulid;")))
+    encode_client = _time(
+        lambda: [str(from_uuid(row[0])) for row in db.get_query_result(SQL("SELECT id FROM pg_temp.bench_ulid;"))]
+    )
+
+    mismatched = db.get_query_result(
+        SQL("SELECT COUNT(*) FROM pg_temp.bench_ulid WHERE id_ulid IS DISTINCT FROM uuid_to_ulid(id);")
+    )[0][0]
+    rows = db.get_query_result(SQL("SELECT id, id_ulid FROM pg_temp.bench_ulid;"))
+    mismatched += sum(str(from_uuid(uuid)) != ulid for uuid, ulid in rows)
+
+    _load_assets(db, assets=args.assets)
+    _create_legacy_view(db)
+    view_legacy = _time(lambda: db.get_query_result(SQL("SELECT * FROM pg_temp.bench_util_basic_legacy;")))
+    view_persisted = _time(lambda: db.get_query_result(SQL("SELECT * FROM public.v_util_basic;")))
+    mismatched += db.get_query_result(
+        SQL("""
+            SELECT COUNT(*)
+            FROM (
+                (
+                    SELECT asset_id, position_id FROM public.v_util_basic
+                    EXCEPT SELECT asset_id, position_id FROM pg_temp.bench_util_basic_legacy
+                )
+                UNION ALL
+                (
+                    SELECT asset_id, position_id FROM pg_temp.bench_util_basic_legacy
+                    EXCEPT SELECT asset_id, position_id FROM public.v_util_basic
+                )
+            ) AS diff;
+        """)
+    )[0][0]
+    db.close()
+
+    print(f"Rows: {args.rows:,}")
+    print(f"Insert (UUID only):          {insert_plain:.3f}s")
+    print(f"Insert (with persisted ULID): {insert_persisted:.3f}s")
+    print(f"Select (uuid_to_ulid):       {encode_plpgsql:.3f}s")
+    print(f"Select (persisted column):   {persisted:.3f}s")
+    print(f"Select (encoded by client):  {encode_client:.3f}s")
+    print(f"Assets: {args.assets:,}")
+    print(f"v_util_basic (uuid_to_ulid): {view_legacy:.3f}s")
+    print(f"v_util_basic (persisted):    {view_persisted:.3f}s")
+    print(f"Mismatched encodings: {mismatched:,}")
+
+
+if __name__ == "__main__":
+    main()
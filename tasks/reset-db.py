@@ -7,15 +7,18 @@ def main() -> None:
     neutral_db = "postgres"
     dev_db = "assets_tracking_dev"
     test_db = "assets_tracking_test"
+    bench_db = "assets_tracking_bench"
 
     with psycopg.connect(f"{dsn_base}/{neutral_db}", autocommit=True) as conn, conn.cursor() as cur:
         cur.execute("DROP DATABASE IF EXISTS assets_tracking_dev;")
         cur.execute("DROP DATABASE IF EXISTS assets_tracking_test;")
+        cur.execute("DROP DATABASE IF EXISTS assets_tracking_bench;")
 
         cur.execute("CREATE DATABASE assets_tracking_dev OWNER assets_tracking_owner;")
         cur.execute("CREATE DATABASE assets_tracking_test OWNER assets_tracking_owner;")
+        cur.execute("CREATE DATABASE assets_tracking_bench OWNER assets_tracking_owner;")
 
-    for db in [dev_db, test_db]:
+    for db in [dev_db, test_db, bench_db]:
         with psycopg.connect(f"{dsn_base}/{db}") as conn, conn.cursor() as cur:
             cur.execute("CREATE EXTENSION IF NOT EXISTS postgis;")
             cur.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto;")
@@ -1,3 +1,6 @@
+from pathlib import Path
+
+import pytest
 from pytest_mock import MockerFixture
 from typer.testing import CliRunner
 
@@ -46,3 +49,23 @@ class TestCliData:
 
         assert result.exit_code == 0
         assert "Command exited normally" in result.output
+
+    def test_cli_data_run_metrics(
+        self,
+        mocker: MockerFixture,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+        fx_cli: CliRunner,
+        fx_providers_manager_eg_provider: ProvidersManager,
+        fx_exporters_manager_eg_exporter: ExportersManager,
+    ) -> None:
+        """Writes run metrics to a Prometheus textfile if configured."""
+        path = tmp_path / "ats.prom"
+        monkeypatch.setenv("ASSETS_TRACKING_SERVICE_METRICS_OUTPUT_PATH", str(path))
+        mocker.patch("assets_tracking_service.cli.data.ProvidersManager", return_value=fx_providers_manager_eg_provider)
+        mocker.patch("assets_tracking_service.cli.data.ExportersManager", return_value=fx_exporters_manager_eg_exporter)
+
+        result = fx_cli.invoke(app=cli, args=["data", "run"])
+
+        assert result.exit_code == 0
+        assert "ats_run_duration_seconds" in path.read_text()
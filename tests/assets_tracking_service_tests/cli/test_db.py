@@ -1,6 +1,7 @@
 from pytest_mock import MockerFixture
 from typer.testing import CliRunner
 
+from assets_tracking_service import json_backend
 from assets_tracking_service.cli import app_cli as cli
 from assets_tracking_service.config import Config
 from assets_tracking_service.db import DatabaseError, DatabaseMigrationError
@@ -52,11 +53,23 @@ class TestCliDb:
 
     def test_cli_db_migrate(self, fx_cli_tmp_db: CliRunner) -> None:
         """App DB migrations."""
-        result = fx_cli_tmp_db.invoke(app=cli, args=["db", "migrate"])
+        result = fx_cli_tmp_db.invoke(app=cli, args=["db", "migrate", "--lock-timeout", "5"])
 
         assert result.exit_code == 0
+        assert "- 001-extensions (" in result.output
         assert "Database migrated" in result.output
 
+    def test_cli_db_migrate_dry_run(self, fx_cli_tmp_db: CliRunner) -> None:
+        """Pending App DB migrations are listed but not applied."""
+        result = fx_cli_tmp_db.invoke(app=cli, args=["db", "migrate", "--dry-run"])
+
+        assert result.exit_code == 0
+        assert "- 001-extensions" in result.output
+        assert "Database migrated" not in result.output
+
+        result = fx_cli_tmp_db.invoke(app=cli, args=["db", "check"])
+        assert "Database migration status unknown" in result.output
+
     def test_cli_db_migrate_error(self, mocker: MockerFixture, fx_cli_tmp_db: CliRunner) -> None:
         """Issue migrating App DB gives error."""
         mock_db_client = mocker.MagicMock(auto_spec=True)
@@ -94,3 +107,52 @@ class TestCliDb:
 
         assert result.exit_code == 1
         assert "Error rolling back database" in result.output
+
+    def test_cli_db_rebuild_extents(self, fx_cli_tmp_db_mig: CliRunner) -> None:
+        """Rebuild stored layer extents."""
+        result = fx_cli_tmp_db_mig.invoke(app=cli, args=["db", "rebuild-extents"])
+
+        assert result.exit_code == 0
+        assert "Layer extents rebuilt" in result.output
+
+    def test_cli_db_rebuild_extents_error(self, mocker: MockerFixture, fx_cli: CliRunner) -> None:
+        """Issue rebuilding layer extents gives error."""
+        mock_db_client = mocker.MagicMock(auto_spec=True)
+        mock_db_client.execute.side_effect = DatabaseError
+        mocker.patch("assets_tracking_service.cli.db.DatabaseClient", return_value=mock_db_client)
+
+        result = fx_cli.invoke(app=cli, args=["db", "rebuild-extents"])
+
+        assert result.exit_code == 1
+        assert "Error rebuilding layer extents" in result.output
+
+    def test_cli_db_stats(self, fx_cli_tmp_db_mig: CliRunner) -> None:
+        """Report database statistics as tables."""
+        result = fx_cli_tmp_db_mig.invoke(app=cli, args=["db", "stats"])
+
+        assert result.exit_code == 0
+        assert "Tables" in result.output
+        assert "Indexes" in result.output
+        assert "Export views" in result.output
+
+    def test_cli_db_stats_json(self, fx_cli_tmp_db_mig: CliRunner) -> None:
+        """Report database statistics as JSON."""
+        result = fx_cli_tmp_db_mig.invoke(app=cli, args=["db", "stats", "--json"])
+
+        assert result.exit_code == 0
+        stats = json_backend.loads(result.stdout)
+        assert [row["table"] for row in stats["tables"]] == ["asset", "position", "layer", "record"]
+        indexes = {row["index"]: row for row in stats["indexes"]}
+        assert indexes["position_id_idx"]["duplicates"] == ["position_id_key"]
+        assert "v_latest_assets_pos_geojson" in [row["view"] for row in stats["views"]]
+
+    def test_cli_db_stats_error(self, mocker: MockerFixture, fx_cli: CliRunner) -> None:
+        """Issue getting database statistics gives error."""
+        mock_db_client = mocker.MagicMock(auto_spec=True)
+        mock_db_client.get_table_stats.side_effect = DatabaseError
+        mocker.patch("assets_tracking_service.cli.db.DatabaseClient", return_value=mock_db_client)
+
+        result = fx_cli.invoke(app=cli, args=["db", "stats"])
+
+        assert result.exit_code == 1
+        assert "Error getting database statistics" in result.output
@@ -76,6 +76,20 @@ class TestArcGisExporterLayer:
         assert item.item_id is not None
         assert item.item_type == ItemTypeEnum.OGCFEATURESERVER
 
+    def test_catalogue_record(self, mocker: MockerFixture, fx_exporter_arcgis_layer: ArcGisExporterLayer):
+        """Reuses catalogue record across items until the layer is refreshed."""
+        spy = mocker.spy(fx_exporter_arcgis_layer._cache, "get_extent")
+
+        _ = fx_exporter_arcgis_layer._catalogue_item_arc_geojson
+        _ = fx_exporter_arcgis_layer._catalogue_item_arc_feature
+        _ = fx_exporter_arcgis_layer._catalogue_item_arc_ogc_feature
+        first = fx_exporter_arcgis_layer._catalogue_record
+        assert spy.call_count == 1
+
+        fx_exporter_arcgis_layer._set_refreshed_at(_create_fake_arcgis_item(item_id="x"))
+        second = fx_exporter_arcgis_layer._catalogue_record
+        assert first is not second
+
     def test_get_layer(self, fx_exporter_arcgis_layer: ArcGisExporterLayer, fx_layer_init: Layer):
         """Can get Layer."""
         layer = fx_exporter_arcgis_layer._get_layer()
@@ -0,0 +1,70 @@
+from lantern.lib.metadata_library.models.record.elements.identification import Extent
+from pytest_mock import MockerFixture
+
+from assets_tracking_service.exporters.cache import ExportCache
+from assets_tracking_service.models.record import Record
+
+
+class TestExportCache:
+    """Export cache tests."""
+
+    def test_get_record(self, mocker: MockerFixture, fx_export_cache: ExportCache, fx_record_layer_slug: str):
+        """Can get record by slug, fetched at most once."""
+        spy = mocker.spy(fx_export_cache._records, "get_by_slug")
+
+        first = fx_export_cache.get_record(fx_record_layer_slug)
+        second = fx_export_cache.get_record(fx_record_layer_slug)
+
+        assert isinstance(first, Record)
+        assert first is second
+        assert spy.call_count == 1
+
+    def test_get_record_unknown(self, mocker: MockerFixture, fx_export_cache: ExportCache):
+        """Unknown records are cached as missing."""
+        spy = mocker.spy(fx_export_cache._records, "get_by_slug")
+
+        assert fx_export_cache.get_record("unknown") is None
+        assert fx_export_cache.get_record("unknown") is None
+        assert spy.call_count == 1
+
+    def test_list_record_ids(self, mocker: MockerFixture, fx_export_cache: ExportCache):
+        """Can list record IDs, fetched at most once."""
+        spy = mocker.spy(fx_export_cache._records, "list_ids")
+
+        result = fx_export_cache.list_record_ids()
+        fx_export_cache.list_record_ids()
+
+        assert len(result) > 0
+        assert spy.call_count == 1
+
+    def test_get_extent(self, mocker: MockerFixture, fx_export_cache: ExportCache, fx_record_layer_slug: str):
+        """Can get layer extent, computed at most once."""
+        spy = mocker.spy(fx_export_cache._layers, "get_extents")
+
+        first = fx_export_cache.get_extent(fx_record_layer_slug)
+        second = fx_export_cache.get_extent(fx_record_layer_slug)
+
+        assert isinstance(first, Extent)
+        assert first is second
+        assert spy.call_count == 1
+
+    def test_get_bounding_extent(self, mocker: MockerFixture, fx_export_cache: ExportCache, fx_record_layer_slug: str):
+        """Bounding extent is computed with, and reuses, layer extents."""
+        spy = mocker.spy(fx_export_cache._layers, "get_extents")
+
+        fx_export_cache.get_extent(fx_record_layer_slug)
+        result = fx_export_cache.get_bounding_extent()
+        fx_export_cache.get_bounding_extent()
+
+        assert isinstance(result, Extent)
+        assert spy.call_count == 1
+
+    def test_clear(self, mocker: MockerFixture, fx_export_cache: ExportCache, fx_record_layer_slug: str):
+        """Clearing cache causes values to be fetched again."""
+        spy = mocker.spy(fx_export_cache._layers, "get_extents")
+
+        fx_export_cache.get_extent(fx_record_layer_slug)
+        fx_export_cache.clear()
+        fx_export_cache.get_extent(fx_record_layer_slug)
+
+        assert spy.call_count == 2
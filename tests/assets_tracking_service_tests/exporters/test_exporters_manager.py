@@ -40,7 +40,7 @@ class TestExportersManager:
 
         assert len(manager._exporters) == 0
 
-    @pytest.mark.parametrize("enabled_exporters", [["arcgis"], ["data_catalogue"]])
+    @pytest.mark.parametrize("enabled_exporters", [["arcgis"], ["data_catalogue"], ["vector_tiles"]])
     def test_make_each_exporter(
         self,
         mocker: MockerFixture,
@@ -74,5 +74,14 @@ class TestExportersManager:
         )
 
         fx_exporters_manager_no_exporters._exporters = [fx_exporter_example]
+        spy = mocker.spy(fx_exporters_manager_no_exporters._cache, "clear")
+        spy_extents = mocker.spy(fx_exporters_manager_no_exporters._layers, "refresh_extents")
 
         fx_exporters_manager_no_exporters.export()
+
+        spy.assert_called_once()
+        spy_extents.assert_called_once()
+        timers = fx_exporters_manager_no_exporters._metrics.summary()["timers"]
+        assert [(timer["name"], timer["labels"], timer["count"]) for timer in timers] == [
+            ("export", {"exporter": "example"}, 1)
+        ]
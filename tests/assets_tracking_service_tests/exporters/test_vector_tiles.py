@@ -0,0 +1,175 @@
+import gzip
+import logging
+import sqlite3
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from psycopg.sql import SQL
+from pytest_mock import MockerFixture
+
+from assets_tracking_service.config import Config
+from assets_tracking_service.db import DatabaseClient
+from assets_tracking_service.exporters.vector_tiles import VectorTilesExporter
+
+
+class TestExporterVectorTiles:
+    """Vector tiles exporter tests."""
+
+    @staticmethod
+    def _get_tiles(path: Path) -> list[tuple[int, int, int, bytes]]:
+        """Tiles in an MBTiles archive."""
+        archive = sqlite3.connect(path)
+        try:
+            return archive.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles;").fetchall()
+        finally:
+            archive.close()
+
+    @staticmethod
+    def _add_positions(exporter: VectorTilesExporter) -> None:
+        """Add recent positions near the latest position of an asset, so its current season track gains a segment."""
+        # noinspection PyProtectedMember
+        exporter._db.execute(
+            SQL("""
+                INSERT INTO public.position (asset_id, geom, time_utc, labels)
+                SELECT
+                    latest.asset_id,
+                    ST_TRANSLATE(latest.geom, 0.01 * n, 0.01 * n),
+                    now() + (n * interval '1 second'),
+                    '{"version": "1", "values": []}'::jsonb
+                FROM (
+                    SELECT asset_id, geom FROM public.position ORDER BY asset_id, time_utc DESC LIMIT 1
+                ) AS latest
+                CROSS JOIN generate_series(1, 2) AS n;
+            """)
+        )
+
+    def test_init(
+        self,
+        fx_config: Config,
+        fx_db_client_tmp_db_mig: DatabaseClient,
+        fx_logger: logging.Logger,
+    ):
+        """Initialises."""
+        VectorTilesExporter(config=fx_config, db=fx_db_client_tmp_db_mig, logger=fx_logger)
+
+    def test_get_tiles(self, fx_exporter_vector_tiles: VectorTilesExporter):
+        """Gets tiles touched by positions and tracks at each zoom level."""
+        archive = fx_exporter_vector_tiles._open_archive()
+        fx_exporter_vector_tiles._prepare_tracks()
+        fx_exporter_vector_tiles._load_previous_tracks(archive)
+        archive.close()
+
+        result = fx_exporter_vector_tiles._get_tiles(since=None)
+
+        assert (0, 0, 0) in result
+        assert {tile[0] for tile in result} == set(
+            range(fx_exporter_vector_tiles.min_zoom, fx_exporter_vector_tiles.max_zoom + 1)
+        )
+
+    @pytest.mark.parametrize(("z", "has_positions"), [(0, False), (10, True)])
+    def test_get_tile(self, fx_exporter_vector_tiles: VectorTilesExporter, z: int, has_positions: bool):
+        """Generates tile, with positions layer from minimum zoom level only."""
+        fx_exporter_vector_tiles._prepare_tracks()
+        # tile with its top left corner at (0, 0)
+        xy = 2**z // 2
+
+        result = fx_exporter_vector_tiles._get_tile(z=z, x=xy, y=xy)
+
+        # layer name field (1) of length 9
+        assert (b"\x0a\x09positions" in result) == has_positions
+
+    def test_put_tile(self, fx_exporter_vector_tiles: VectorTilesExporter):
+        """Stores compressed tiles using TMS row numbering and removes empty tiles."""
+        archive = fx_exporter_vector_tiles._open_archive()
+        fx_exporter_vector_tiles._put_tile(archive, z=1, x=0, y=0, data=b"x")
+        archive.commit()
+        tiles = archive.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles;").fetchall()
+        assert tiles == [(1, 0, 1, gzip.compress(b"x"))]
+
+        fx_exporter_vector_tiles._put_tile(archive, z=1, x=0, y=0, data=b"")
+        archive.commit()
+        tiles = archive.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles;").fetchall()
+        assert tiles == []
+        archive.close()
+
+    def test_export(self, fx_exporter_vector_tiles: VectorTilesExporter):
+        """Exports tiles and metadata to archive."""
+        fx_exporter_vector_tiles.export()
+
+        tiles = self._get_tiles(fx_exporter_vector_tiles._output_path)
+        assert len(tiles) > 0
+        assert any(tile[:3] == (0, 0, 0) for tile in tiles)
+        assert all(len(gzip.decompress(tile[3])) > 0 for tile in tiles)
+
+        archive = sqlite3.connect(fx_exporter_vector_tiles._output_path)
+        assert fx_exporter_vector_tiles._get_metadata(archive, "format") == "pbf"
+        assert fx_exporter_vector_tiles._get_metadata(archive, "ats_last_created_at") is not None
+        archive.close()
+
+    def test_export_no_positions(
+        self,
+        fx_config: Config,
+        fx_db_client_tmp_db_mig: DatabaseClient,
+        fx_logger: logging.Logger,
+        tmp_path: Path,
+    ):
+        """Skips export where there are no positions."""
+        exporter = VectorTilesExporter(config=fx_config, db=fx_db_client_tmp_db_mig, logger=fx_logger)
+        exporter._output_path = tmp_path / "assets.mbtiles"
+
+        exporter.export()
+
+        assert not exporter._output_path.exists()
+
+    def test_export_incremental(self, mocker: MockerFixture, fx_exporter_vector_tiles: VectorTilesExporter):
+        """Doesn't regenerate tiles where no positions have been added since the last export."""
+        fx_exporter_vector_tiles.rescan_window = timedelta(0)
+        fx_exporter_vector_tiles.export()
+        expected = self._get_tiles(fx_exporter_vector_tiles._output_path)
+        spy = mocker.spy(fx_exporter_vector_tiles, "_get_tile")
+
+        fx_exporter_vector_tiles.export()
+
+        spy.assert_not_called()
+        assert self._get_tiles(fx_exporter_vector_tiles._output_path) == expected
+
+    def test_export_season_changed(self, mocker: MockerFixture, fx_exporter_vector_tiles: VectorTilesExporter):
+        """Regenerates all tiles where the season has changed since the last export."""
+        fx_exporter_vector_tiles.export()
+        archive = sqlite3.connect(fx_exporter_vector_tiles._output_path)
+        archive.execute("UPDATE metadata SET value = 'x' WHERE name = 'ats_season_start';")
+        archive.commit()
+        archive.close()
+        spy = mocker.spy(fx_exporter_vector_tiles, "_get_tiles")
+
+        fx_exporter_vector_tiles.export()
+
+        assert spy.call_args.kwargs["since"] is None
+
+    def test_export_rescan_window(self, mocker: MockerFixture, fx_exporter_vector_tiles: VectorTilesExporter):
+        """Regenerates tiles for positions created shortly before the last export, as they may have been uncommitted."""
+        fx_exporter_vector_tiles.export()
+        spy = mocker.spy(fx_exporter_vector_tiles, "_get_tile")
+
+        fx_exporter_vector_tiles.export()
+
+        assert spy.call_count > 0
+        assert all(call.args[0] >= fx_exporter_vector_tiles.min_zoom_positions for call in spy.call_args_list)
+
+    def test_export_track_changed(
+        self, mocker: MockerFixture, fx_exporter_vector_tiles: VectorTilesExporter, tmp_path: Path
+    ):
+        """Only regenerates tiles touched by changed parts of tracks, giving the same tiles as a full regeneration."""
+        fx_exporter_vector_tiles.rescan_window = timedelta(0)
+        fx_exporter_vector_tiles.export()
+        self._add_positions(fx_exporter_vector_tiles)
+        spy = mocker.spy(fx_exporter_vector_tiles, "_get_tile")
+
+        fx_exporter_vector_tiles.export()
+
+        incremental = self._get_tiles(fx_exporter_vector_tiles._output_path)
+        assert 0 < spy.call_count < len(incremental)
+        fx_exporter_vector_tiles._output_path = tmp_path / "full" / "assets.mbtiles"
+        fx_exporter_vector_tiles.export()
+        assert sorted(incremental) == sorted(self._get_tiles(fx_exporter_vector_tiles._output_path))
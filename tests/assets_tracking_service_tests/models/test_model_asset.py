@@ -44,7 +44,7 @@ class TestAssetNew:
         """Converts Asset to a database dict."""
         data = fx_asset_new.to_db_dict()
         assert isinstance(data["labels"], Jsonb)
-        assert data["labels"].obj == fx_asset_new.labels.unstructure()
+        assert data["labels"].obj.unstructure() == fx_asset_new.labels.unstructure()
 
     def test_eq(self, fx_labels_one: Labels, fx_label_minimal: Label, fx_label_expired: Label):
         """Equality check."""
@@ -92,12 +92,32 @@ class TestAssetsClient:
     """Integration tests for a data/resource client."""
 
     def test_assets_client_add(self, fx_assets_client_empty: AssetsClient, fx_asset_new: AssetNew):
-        """Add an Asset."""
-        fx_assets_client_empty.add(asset=fx_asset_new)
+        """Add an Asset, identified by its distinguishing label value."""
+        fx_asset_new.labels.append(Label(rel=LabelRelation.PROVIDER, scheme="ats:provider_id", value="example"))
+        fx_assets_client_empty.add(asset=fx_asset_new, dist_label_scheme="skos:prefLabel")
 
-        # verify table isn't empty
-        result = fx_assets_client_empty._db.get_query_result(SQL("""SELECT * FROM public.asset;"""))
-        assert len(result) > 0
+        result = fx_assets_client_empty._db.get_query_result(
+            SQL("""SELECT provider_id, dist_asset_value FROM public.asset;""")
+        )
+        assert result == [("example", fx_asset_new.labels[0].value)]
+
+    def test_assets_client_add_batch(self, fx_assets_client_empty: AssetsClient, fx_label_full: Label):
+        """Assets with the same provider and distinguishing label value are only stored once."""
+        provider_label = Label(rel=LabelRelation.PROVIDER, scheme="ats:provider_id", value="example")
+        assets = [
+            AssetNew(
+                labels=Labels([fx_label_full, Label(rel=LabelRelation.SELF, scheme="x:id", value=i), provider_label])
+            )
+            for i in [1, 2, 2]
+        ]
+
+        assert fx_assets_client_empty.add_batch(assets=assets, dist_label_scheme="x:id") == 2
+        assert fx_assets_client_empty.add_batch(assets=assets, dist_label_scheme="x:id") == 0
+
+        result = fx_assets_client_empty._db.get_query_result(
+            SQL("""SELECT provider_id, dist_asset_value FROM public.asset ORDER BY pk;""")
+        )
+        assert result == [("example", "1"), ("example", "2")]
 
     def test_assets_client_list(self, fx_assets_client_one: AssetsClient, fx_asset: Asset):
         """List all Assets."""
@@ -1,3 +1,6 @@
+import json
+import sys
+from collections.abc import Callable
 from copy import copy
 from datetime import UTC, datetime
 
@@ -5,7 +8,7 @@ import pytest
 from cattrs import ClassValidationError
 from freezegun.api import FrozenDateTimeFactory
 
-from assets_tracking_service.models.label import Label, LabelRelation, Labels
+from assets_tracking_service.models.label import Label, LabelRelation, Labels, label_creation
 from tests.conftest import LabelsPlain
 
 creation_time = datetime(2012, 6, 10, 14, 30, 20, tzinfo=UTC)
@@ -165,6 +168,25 @@ class TestLabel:
 
         assert label1 == label2
 
+    def test_batch_creation(self, fx_label_rel: LabelRelation, fx_label_scheme: str, fx_label_value: str):
+        """Labels can share a creation timestamp."""
+        creation = label_creation()
+
+        label1 = Label(rel=fx_label_rel, scheme=fx_label_scheme, value=fx_label_value, creation=creation)
+        label2 = Label(rel=fx_label_rel, scheme=fx_label_scheme, value=fx_label_value, creation=creation)
+
+        assert label1.creation == label2.creation == creation
+
+    def test_compact(self, fx_label_rel: LabelRelation, fx_label_value: str):
+        """Labels are slotted and use interned schemes."""
+        # join to avoid compile time interning of literals
+        scheme = "".join(["x", ":", "y"])
+
+        label = Label(rel=fx_label_rel, scheme=scheme, value=fx_label_value)
+
+        assert not hasattr(label, "__dict__")
+        assert label.scheme is sys.intern("x:y")
+
 
 class TestLabels:
     """Test collection class."""
@@ -206,6 +228,15 @@ class TestLabels:
         assert fx_label_full not in expired_labels
         assert fx_label_expired in expired_labels
 
+    def test_shared(self, fx_label_minimal: Label, fx_label_scheme: str, fx_label_value: str):
+        """Shared (provider) and unshared labels."""
+        provider_label = Label(rel=LabelRelation.PROVIDER, scheme=fx_label_scheme, value=fx_label_value)
+        labels = Labels([fx_label_minimal, provider_label])
+
+        assert isinstance(labels.shared, Labels)
+        assert list(labels.shared) == [provider_label]
+        assert list(labels.unshared) == [fx_label_minimal]
+
     def test_structure(self, fx_label_full_plain: LabelsPlain, fx_labels_one: Labels):
         """Loads from plain objects."""
         labels = Labels.structure(data=fx_label_full_plain)
@@ -260,12 +291,70 @@ class TestLabels:
 
         assert data == fx_label_full_plain
 
+    def test_structure_invalid(self, fx_label_full_plain: LabelsPlain):
+        """Invalid labels trigger error."""
+        data: LabelsPlain = {"version": "1", "values": [copy(fx_label_full_plain["values"][0])]}
+        data["values"][0]["rel"] = "invalid"
+
+        with pytest.raises(ClassValidationError):
+            Labels.structure(data=data)
+
+    def test_dumps(self, fx_labels_one: Labels, fx_label_full_plain: LabelsPlain):
+        """Returns as JSON."""
+        result = fx_labels_one.dumps()
+
+        assert isinstance(result, bytes)
+        assert json.loads(result) == fx_label_full_plain
+
+    def test_loads(self, fx_labels_one: Labels, fx_label_full_plain: LabelsPlain):
+        """Loads from JSON."""
+        assert Labels.loads(json.dumps(fx_label_full_plain)) == fx_labels_one
+
     def test_filter_by_schema(self, fx_labels_one: Labels):
         """Filter labels based on schema."""
         filtered = fx_labels_one.filter_by_scheme(scheme="skos:prefLabel")
 
         assert filtered.value == fx_labels_one[0].value
 
+    def test_filter_by_schema_first(self, fx_label_rel: LabelRelation, fx_label_scheme: str):
+        """Filter returns first label where multiple have the same scheme."""
+        labels = Labels(
+            [
+                Label(rel=fx_label_rel, scheme=fx_label_scheme, value="x"),
+                Label(rel=fx_label_rel, scheme=fx_label_scheme, value="y"),
+            ]
+        )
+
+        assert labels.filter_by_scheme(scheme=fx_label_scheme).value == "x"
+
+    @pytest.mark.parametrize(
+        "modify",
+        [
+            lambda labels, label: labels.append(label),
+            lambda labels, label: labels.insert(0, label),
+            lambda labels, label: labels.extend([label]),
+            lambda labels, label: labels.__setitem__(0, label),
+            lambda labels, label: labels.__iadd__([label]),
+        ],
+    )
+    def test_filter_by_schema_modified(self, fx_labels_one: Labels, fx_label_rel: LabelRelation, modify: Callable):
+        """Filter reflects labels added after first lookup."""
+        _ = fx_labels_one.filter_by_scheme(scheme="skos:prefLabel")
+        label = Label(rel=fx_label_rel, scheme="x", value="x")
+
+        modify(fx_labels_one, label)
+
+        assert fx_labels_one.filter_by_scheme(scheme="x") == label
+
+    def test_filter_by_schema_removed(self, fx_labels_one: Labels):
+        """Filter reflects labels removed after first lookup."""
+        _ = fx_labels_one.filter_by_scheme(scheme="skos:prefLabel")
+
+        fx_labels_one.clear()
+
+        with pytest.raises(ValueError, match=r"No label with scheme"):
+            fx_labels_one.filter_by_scheme(scheme="skos:prefLabel")
+
     def test_filter_by_schema_none(self, fx_labels_one: Labels):
         """Filters labels based on schema."""
         with pytest.raises(ValueError, match=r"No label with scheme"):
@@ -5,9 +5,10 @@ from zoneinfo import ZoneInfo
 import pytest
 from lantern.lib.metadata_library.models.record.elements.identification import Extent
 from lantern.lib.metadata_library.models.record.presets.extents import make_bbox_extent, make_temporal_extent
+from psycopg.sql import SQL
 from pytest_mock import MockerFixture
 
-from assets_tracking_service.models.layer import Layer, LayerNew, LayersClient
+from assets_tracking_service.models.layer import Layer, LayerExtents, LayerNew, LayersClient
 
 
 class TestLayerNew:
@@ -31,7 +32,11 @@ class TestLayerNew:
     def test_to_db_dict(self, fx_layer_pre_init: LayerNew):
         """Converts Layer to a database dict."""
         data = fx_layer_pre_init.to_db_dict()
-        assert data == {"slug": fx_layer_pre_init.slug, "source_view": fx_layer_pre_init.source_view}
+        assert data == {
+            "slug": fx_layer_pre_init.slug,
+            "source_view": fx_layer_pre_init.source_view,
+            "layer_type": "position",
+        }
 
 
 class TestLayer:
@@ -44,6 +49,7 @@ class TestLayer:
 
         assert isinstance(layer, Layer)
         assert layer.created_at == dt
+        assert layer.layer_type == "position"
         assert layer.agol_id_geojson is None
         assert layer.agol_id_feature is None
         assert layer.agol_id_feature_ogc is None
@@ -103,13 +109,28 @@ class TestLayersClient:
     def test_list_slugs(self, fx_layers_client_one: LayersClient, fx_layer_updated: Layer):
         """Can list Layer slugs."""
         layers = fx_layers_client_one.list_slugs()
-        assert layers == [fx_layer_updated.slug]
+        assert sorted(layers) == sorted(
+            [fx_layer_updated.slug, "ats_assets_track_24h", "ats_assets_track_7d", "ats_assets_track_season"]
+        )
+
+    def test_list_export_views(self, fx_layers_client_one: LayersClient, fx_layer_updated: Layer):
+        """Can list source views and their GeoJSON variants for all Layers."""
+        views = fx_layers_client_one.list_export_views()
+        assert len(views) == 8
+        assert fx_layer_updated.source_view in views
+        assert f"{fx_layer_updated.source_view}_geojson" in views
+        assert "v_assets_track_24h_geojson" in views
 
     def test_get_by_slug(self, fx_layers_client_one: LayersClient, fx_layer_updated: Layer):
         """Can get Layer by slug that exists."""
         layer = fx_layers_client_one.get_by_slug(fx_layer_updated.slug)
         assert layer == fx_layer_updated
 
+    def test_get_by_slug_track(self, fx_layers_client_one: LayersClient):
+        """Can get a track Layer."""
+        layer = fx_layers_client_one.get_by_slug("ats_assets_track_24h")
+        assert layer.layer_type == "track"
+
     def test_get_by_slug_unknown(self, fx_layers_client_one: LayersClient):
         """Cannot get Layer for slug that does not exist."""
         result = fx_layers_client_one.get_by_slug("unknown")
@@ -120,53 +141,91 @@ class TestLayersClient:
         extent = fx_layers_client_one.get_extent_by_slug(fx_layer_updated.slug)
         assert isinstance(extent, Extent)
 
-    @staticmethod
-    def _get_layer_extent(slug: str) -> Extent:
-        extent_a = Extent(
-            identifier="bounding",
-            geographic=make_bbox_extent(
-                min_x=1,
-                max_x=3,
-                min_y=10,
-                max_y=30,
-            ),
-            temporal=make_temporal_extent(
-                start=datetime(2021, 1, 1, tzinfo=UTC),
-                end=datetime(2021, 3, 3, tzinfo=UTC),
-            ),
+    def test_get_extent_by_slug_unknown(self, fx_layers_client_one: LayersClient):
+        """Cannot get extent for a Layer without a stored extent."""
+        with pytest.raises(ValueError, match=escape("No extent for layer: [unknown].")):
+            fx_layers_client_one.get_extent_by_slug("unknown")
+
+    def test_refresh_extents(self, fx_layers_client_one: LayersClient, fx_layer_updated: Layer):
+        """Stored extents are not changed as positions are inserted, but are refreshed."""
+        db = fx_layers_client_one._db
+        original = fx_layers_client_one.get_extent_by_slug(fx_layer_updated.slug)
+        asset_id = db.get_query_result(SQL("""SELECT id FROM public.asset LIMIT 1;"""))[0][0]
+
+        # a future position for an asset will be its latest position
+        db.execute(
+            SQL("""
+                INSERT INTO public.position (asset_id, geom, time_utc, labels)
+                VALUES (
+                    %(asset_id)s,
+                    ST_SetSRID(ST_MakePoint(-180, -90, 0), 4326),
+                    '2100-01-01T00:00:00Z',
+                    '{"version": "1", "values": []}'::jsonb
+                );
+            """),
+            params={"asset_id": asset_id},
+        )
+        assert fx_layers_client_one.get_extent_by_slug(fx_layer_updated.slug) == original
+
+        fx_layers_client_one.refresh_extents()
+        refreshed = fx_layers_client_one.get_extent_by_slug(fx_layer_updated.slug)
+        assert refreshed != original
+
+    def test_get_extents(self, fx_layers_client_one: LayersClient, fx_layer_updated: Layer):
+        """Can get extents for each Layer and across all Layers."""
+        expected = fx_layers_client_one.get_extent_by_slug(fx_layer_updated.slug)
+
+        extents = fx_layers_client_one.get_extents()
+
+        assert isinstance(extents, LayerExtents)
+        assert sorted(extents.layers.keys()) == sorted(fx_layers_client_one.list_slugs())
+        assert extents.layers[fx_layer_updated.slug] == expected
+        assert isinstance(extents.bounding, Extent)
+
+    def test_get_extents_multiple(self, fx_layers_client_one: LayersClient, fx_layer_updated: Layer):
+        """Can get extents where bounding extent covers multiple Layers."""
+        fx_layers_client_one._db.execute(
+            SQL("""
+                CREATE VIEW v_test_extent AS
+                SELECT ST_SetSRID(ST_MakePoint(-180, -90), 4326) AS geom_2d, '2000-01-01T00:00:00Z'::timestamptz AS time_utc
+                UNION ALL
+                SELECT ST_SetSRID(ST_MakePoint(180, 90), 4326), '2100-01-01T00:00:00Z'::timestamptz;
+            """)
+        )
+        fx_layers_client_one._db.insert_dict(
+            schema="public", table_view="layer", data={"slug": "test_extent", "source_view": "v_test_extent"}
         )
-        extent_b = Extent(
+        fx_layers_client_one.refresh_extents()
+        # test layer covers whole world and any realistic time, so bounding extent should match it
+        expected = Extent(
             identifier="bounding",
-            geographic=make_bbox_extent(
-                min_x=2,
-                max_x=4,
-                min_y=20,
-                max_y=40,
-            ),
-            temporal=make_temporal_extent(
-                start=datetime(2021, 2, 2, tzinfo=UTC),
-                end=datetime(2021, 4, 4, tzinfo=UTC),
-            ),
+            geographic=make_bbox_extent(min_x=-180, max_x=180, min_y=-90, max_y=90),
+            temporal=make_temporal_extent(start=datetime(2000, 1, 1, tzinfo=UTC), end=datetime(2100, 1, 1, tzinfo=UTC)),
         )
+        layer_extent = fx_layers_client_one.get_extent_by_slug(fx_layer_updated.slug)
+
+        extents = fx_layers_client_one.get_extents()
+
+        assert "test_extent" in extents.layers
+        assert extents.layers[fx_layer_updated.slug] == layer_extent
+        assert extents.layers["test_extent"] == expected
+        assert extents.bounding == expected
+
+    def test_get_extents_no_layers(self, mocker: MockerFixture, fx_layers_client_one: LayersClient):
+        """Cannot get extents where there are no Layers."""
+        mocker.patch.object(fx_layers_client_one._db, "get_query_result", return_value=[])
 
-        if slug == "a":
-            return extent_a
-        return extent_b
+        with pytest.raises(ValueError, match=escape("No layers to compute extents for.")):
+            fx_layers_client_one.get_extents()
 
     def test_get_bounding_extent(self, mocker: MockerFixture, fx_layers_client_one: LayersClient):
         """Can get bounding extent across all Layer extents."""
-        mocker.patch.object(fx_layers_client_one, "list_slugs", return_value=["a", "b"])
-        mocker.patch.object(fx_layers_client_one, "get_extent_by_slug", side_effect=self._get_layer_extent)
-        expected = Extent(
-            identifier="bounding",
-            geographic=make_bbox_extent(min_x=1, max_x=4, min_y=10, max_y=40),
-            temporal=make_temporal_extent(start=datetime(2021, 1, 1, tzinfo=UTC), end=datetime(2021, 4, 4, tzinfo=UTC)),
-        )
+        spy = mocker.spy(fx_layers_client_one, "get_extents")
 
         bounding_extent = fx_layers_client_one.get_bounding_extent()
 
         assert isinstance(bounding_extent, Extent)
-        assert bounding_extent == expected
+        assert spy.call_count == 1
 
     def test_get_latest_data_refresh(self, fx_layers_client_one: LayersClient, fx_layer_updated: Layer):
         """Can get latest data refresh time across all Layers."""
@@ -1,15 +1,20 @@
-from datetime import datetime
+from collections.abc import Generator
+from datetime import datetime, timedelta
 from uuid import UUID
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pytest
+import shapely
 from psycopg.sql import SQL
 from shapely import Point
 from ulid import ULID
+from ulid import parse as ulid_parse
 
+from assets_tracking_service import geometry_adapters
 from assets_tracking_service.models.asset import Asset
-from assets_tracking_service.models.label import Labels
-from assets_tracking_service.models.position import Position, PositionNew, PositionsClient
+from assets_tracking_service.models.label import Label, LabelRelation, Labels
+from assets_tracking_service.models.position import Position, PositionBatch, PositionNew, PositionsClient
 
 
 class TestPositionNew:
@@ -89,7 +94,7 @@ class TestPositionNew:
         """Converts Position with 3D geometry to a database dict."""
         expected = {
             "asset_id": UUID(bytes=fx_position_new_minimal.asset_id.bytes),
-            "geom": "POINT Z (0 0 0)",
+            "geom": Point(0, 0, 0),
             "geom_dimensions": 3,
             "heading": None,
             "time_utc": fx_position_new_minimal.time,
@@ -102,13 +107,13 @@ class TestPositionNew:
         labels = result.pop("labels")
 
         assert result == expected
-        assert labels.obj == expected_labels
+        assert labels.obj.unstructure() == expected_labels
 
     def test_to_db_dict_minimal_2d(self, fx_position_new_minimal_2d: PositionNew):
         """Converts Position with 2D geometry to a database dict."""
         expected = {
             "asset_id": UUID(bytes=fx_position_new_minimal_2d.asset_id.bytes),
-            "geom": "POINT Z (0 0 0)",
+            "geom": Point(0, 0, 0),
             "geom_dimensions": 2,
             "heading": None,
             "time_utc": fx_position_new_minimal_2d.time,
@@ -121,7 +126,7 @@ class TestPositionNew:
         labels = result.pop("labels")
 
         assert result == expected
-        assert labels.obj == expected_labels
+        assert labels.obj.unstructure() == expected_labels
 
 
 class TestPosition:
@@ -163,7 +168,31 @@ class TestPosition:
             "id": str(fx_position_id),
             "asset_id": str(fx_asset.id),
             "time_utc": fx_position_time,
-            "geom": fx_position_geom_3d.wkt,
+            "geom": fx_position_geom_3d,
+            "geom_dimensions": 3,
+            "velocity_ms": None,
+            "heading": None,
+            "labels": {"version": "1", "values": []},
+        }
+
+        position = Position.from_db_dict(data)
+
+        assert position == fx_position_minimal
+
+    def test_from_db_dict_ewkb(
+        self,
+        fx_position_id: ULID,
+        fx_asset: Asset,
+        fx_position_time: datetime,
+        fx_position_geom_3d: Point,
+        fx_position_minimal: Position,
+    ):
+        """Makes Position from a database dict with geometry as EWKB."""
+        data = {
+            "id": str(fx_position_id),
+            "asset_id": str(fx_asset.id),
+            "time_utc": fx_position_time,
+            "geom": geometry_adapters.dumps(fx_position_geom_3d),
             "geom_dimensions": 3,
             "velocity_ms": None,
             "heading": None,
@@ -187,7 +216,7 @@ class TestPosition:
             "id": str(fx_position_id),
             "asset_id": str(fx_asset.id),
             "time_utc": fx_position_time,
-            "geom": fx_position_geom_3d.wkt,
+            "geom": fx_position_geom_3d,
             "geom_dimensions": 2,
             "velocity_ms": None,
             "heading": None,
@@ -199,6 +228,196 @@ class TestPosition:
         assert position == fx_position_minimal_2d
 
 
+class TestPositionBatch:
+    """Test columnar data class for sets of positions in initial state."""
+
+    def test_from_positions(self, fx_position_new_minimal: PositionNew, fx_position_new_minimal_2d: PositionNew):
+        """Creates a PositionBatch from PositionNew instances, and gets them back."""
+        batch = PositionBatch.from_positions([fx_position_new_minimal, fx_position_new_minimal_2d])
+
+        assert len(batch) == 2
+        assert batch.geom_dimensions.tolist() == [3, 2]
+        assert batch[0] == fx_position_new_minimal
+        assert batch[1] == fx_position_new_minimal_2d
+
+    def test_from_rows(self, fx_asset: Asset, fx_position_time: datetime):
+        """Creates a PositionBatch from rows with optional values omitted."""
+        batch = PositionBatch.from_rows(
+            [
+                {"asset_id": fx_asset.id, "time": fx_position_time, "lon": 1, "lat": 2, "labels": Labels([])},
+                {
+                    "asset_id": fx_asset.id,
+                    "time": fx_position_time,
+                    "lon": 3,
+                    "lat": 4,
+                    "z": 5,
+                    "velocity": 6,
+                    "heading": 7,
+                    "labels": Labels([]),
+                },
+            ]
+        )
+
+        assert batch.time.dtype == np.dtype("datetime64[us]")
+        assert np.isnan(batch.z[0])
+        assert batch[0].velocity is None
+        assert batch[0].heading is None
+        assert batch[1].geom == Point(3, 4, 5)
+        assert batch[1].velocity == 6
+        assert batch[1].heading == 7
+
+    def test_time_array(self, fx_asset: Asset, fx_position_time: datetime):
+        """Accepts times as a NumPy array, assumed to be UTC."""
+        time = np.array([fx_position_time.replace(tzinfo=None)], dtype="datetime64[s]")
+
+        batch = PositionBatch(
+            asset_id=[fx_asset.id],
+            time=time,
+            lon=[0],
+            lat=[0],
+            z=[None],
+            velocity=[None],
+            heading=[None],
+            labels=[Labels([])],
+        )
+
+        assert batch[0].time == fx_position_time
+
+    @pytest.mark.parametrize(
+        ("time", "expected"),
+        [
+            (datetime(2014, 4, 24, 14, 30, 0), "None"),  # noqa: DTZ001
+            (datetime(2014, 4, 24, 14, 30, 0, tzinfo=ZoneInfo("America/Lima")), "America/Lima"),
+        ],
+    )
+    def test_invalid_timezone(self, fx_asset: Asset, time: datetime, expected: str):
+        """Invalid timezone triggers error."""
+        with pytest.raises(ValueError, match=rf"Invalid timezone: \[{expected}\]. It must be UTC."):
+            PositionBatch.from_rows([{"asset_id": fx_asset.id, "time": time, "lon": 0, "lat": 0, "labels": Labels([])}])
+
+    @pytest.mark.parametrize(
+        ("key", "value", "expected"),
+        [
+            ("lon", 200, r"Invalid longitude value: \[200.0\]. It must be between -180 and 180."),
+            ("lon", float("nan"), r"Invalid longitude value: \[nan\]."),
+            ("lat", 100, r"Invalid latitude value: \[100.0\]. It must be between -90 and 90."),
+            ("velocity", -1, r"Invalid velocity value: \[-1.0\]. It must be greater than or equal to 0."),
+            ("heading", -1, r"Invalid heading value: \[-1.0\]. It must be between 0 and 360."),
+            ("heading", 360, r"Invalid heading value: \[360.0\]. It must be between 0 and 360."),
+        ],
+    )
+    def test_invalid_values(self, fx_asset: Asset, fx_position_time: datetime, key: str, value: float, expected: str):
+        """Invalid values trigger error, reporting the first invalid value."""
+        valid = {"asset_id": fx_asset.id, "time": fx_position_time, "lon": 0, "lat": 0, "labels": Labels([])}
+        invalid = {**valid, key: value}
+
+        with pytest.raises(ValueError, match=expected):
+            PositionBatch.from_rows([valid, invalid, invalid])
+
+    def test_invalid_length(self, fx_asset: Asset, fx_position_time: datetime):
+        """Columns of different lengths trigger error."""
+        with pytest.raises(ValueError, match=r"Invalid batch: All columns must be the same length."):
+            PositionBatch(
+                asset_id=[fx_asset.id],
+                time=[fx_position_time],
+                lon=[0, 1],
+                lat=[0],
+                z=[None],
+                velocity=[None],
+                heading=[None],
+                labels=[Labels([])],
+            )
+
+    def test_invalid_labels(self, fx_asset: Asset, fx_position_time: datetime):
+        """Non-Labels object triggers error."""
+        with pytest.raises(TypeError, match=r"Invalid labels: It must be a Labels object."):
+            PositionBatch.from_rows(
+                [{"asset_id": fx_asset.id, "time": fx_position_time, "lon": 0, "lat": 0, "labels": "invalid"}]
+            )
+
+    def test_concat(self, fx_position_new_minimal: PositionNew, fx_position_new_minimal_2d: PositionNew):
+        """Combines batches."""
+        batch = PositionBatch.concat(
+            [
+                PositionBatch.from_positions([fx_position_new_minimal]),
+                PositionBatch.from_positions([fx_position_new_minimal_2d]),
+            ]
+        )
+
+        assert len(batch) == 2
+        assert batch[1] == fx_position_new_minimal_2d
+
+    def test_concat_empty(self):
+        """Combines no batches into an empty batch."""
+        assert len(PositionBatch.concat([])) == 0
+
+    def test_select(self, fx_position_new_minimal: PositionNew, fx_position_new_minimal_2d: PositionNew):
+        """Selects subset of batch."""
+        batch = PositionBatch.from_positions([fx_position_new_minimal, fx_position_new_minimal_2d])
+
+        result = batch.select([1])
+
+        assert len(result) == 1
+        assert result[0] == fx_position_new_minimal_2d
+
+    def test_to_db_rows(self, fx_position_new_minimal: PositionNew, fx_position_new_minimal_2d: PositionNew):
+        """Converts batch to database columns and rows, with geometries as 3D EWKB."""
+        batch = PositionBatch.from_positions([fx_position_new_minimal, fx_position_new_minimal_2d])
+        expected_geom = shapely.to_wkb(
+            shapely.set_srid(Point(0, 0, 0), 4326), hex=True, output_dimension=3, include_srid=True
+        )
+
+        columns, rows = batch.to_db_rows(label_set_ids=[None, None])
+
+        assert columns == [
+            "asset_id",
+            "time_utc",
+            "geom",
+            "geom_dimensions",
+            "velocity_ms",
+            "heading",
+            "labels",
+            "label_set_id",
+            "dist_position_value",
+        ]
+        assert len(rows) == 2
+        for row, dimensions in zip(rows, [3, 2], strict=True):
+            # Jsonb is not hashable, so we need to compare the values separately
+            assert row[:6] == (
+                UUID(bytes=fx_position_new_minimal.asset_id.bytes),
+                fx_position_new_minimal.time,
+                expected_geom,
+                dimensions,
+                None,
+                None,
+            )
+            assert row[6].obj.unstructure() == {"version": "1", "values": []}
+            assert row[7] is None
+            assert row[8] is None
+
+    def test_to_db_rows_dist_values(self, fx_position_new_minimal: PositionNew):
+        """Distinguishing label values are included in database rows if given."""
+        fx_position_new_minimal.labels = Labels([Label(rel=LabelRelation.SELF, scheme="x:id", value=1)])
+        batch = PositionBatch.from_positions([fx_position_new_minimal])
+
+        _, rows = batch.to_db_rows(label_set_ids=[None], dist_values=batch.dist_values("x:id"))
+
+        assert rows[0][8] == "1"
+
+    def test_to_db_rows_shared_labels(self, fx_position_new_minimal: PositionNew):
+        """Shared labels are excluded from database rows, which reference a label set instead."""
+        self_label = Label(rel=LabelRelation.SELF, scheme="x:id", value="x")
+        provider_label = Label(rel=LabelRelation.PROVIDER, scheme="ats:provider_id", value="x")
+        fx_position_new_minimal.labels = Labels([self_label, provider_label])
+        batch = PositionBatch.from_positions([fx_position_new_minimal])
+        label_set_id = UUID(int=1)
+
+        _, rows = batch.to_db_rows(label_set_ids=[label_set_id])
+
+        assert rows[0][6].obj == Labels([self_label])
+        assert rows[0][7] == label_set_id
+
+
 class TestPositionsClient:
     """
     Unit tests for a data/resource client.
@@ -217,9 +436,193 @@ class TestPositionsClientIntegration:
     def test_positions_client_add(
         self, fx_positions_client_empty: PositionsClient, fx_position_new_minimal: PositionNew
     ):
-        """Test storing a Position."""
-        fx_positions_client_empty.add(position=fx_position_new_minimal)
+        """Test storing a Position, identified by its distinguishing label value."""
+        fx_position_new_minimal.labels = Labels([Label(rel=LabelRelation.SELF, scheme="x:id", value="1")])
+        fx_positions_client_empty.add(position=fx_position_new_minimal, dist_label_scheme="x:id")
+
+        result = fx_positions_client_empty._db.get_query_result(
+            SQL("""SELECT dist_position_value FROM public.position;""")
+        )
+        assert result == [("1",)]
+
+    def test_positions_client_add_precision(
+        self, fx_positions_client_empty: PositionsClient, fx_position_new_minimal: PositionNew
+    ):
+        """Test storing a Position does not lose precision in geometry."""
+        geom = Point(-67.12345678901234567, 1 / 3, 0.1 + 0.2)
+        fx_position_new_minimal.geom = geom
+        fx_position_new_minimal.labels = Labels([Label(rel=LabelRelation.SELF, scheme="x:id", value="1")])
+
+        fx_positions_client_empty.add(position=fx_position_new_minimal, dist_label_scheme="x:id")
+
+        result = fx_positions_client_empty._db.get_query_result(SQL("""SELECT geom FROM public.position;"""))
+        assert result[0][0].coords[0] == geom.coords[0]
+
+    def test_positions_client_add_batch(
+        self,
+        fx_positions_client_empty: PositionsClient,
+        fx_position_new_minimal: PositionNew,
+        fx_position_new_minimal_2d: PositionNew,
+    ):
+        """Test storing a batch of Positions."""
+        batch = PositionBatch.from_positions([fx_position_new_minimal, fx_position_new_minimal_2d])
+
+        assert fx_positions_client_empty.add_batch(batch=batch) == 2
+
+        result = fx_positions_client_empty._db.get_query_result(
+            SQL("""SELECT ST_ASTEXT(geom), geom_dimensions FROM public.position ORDER BY pk;""")
+        )
+        assert result == [("POINT Z (0 0 0)", 3), ("POINT Z (0 0 0)", 2)]
+
+    def test_positions_client_add_batch_dist_values(
+        self, fx_positions_client_empty: PositionsClient, fx_position_new_minimal: PositionNew
+    ):
+        """Positions with the same distinguishing label value for an asset are only stored once."""
+        rows = [
+            {
+                "asset_id": fx_position_new_minimal.asset_id,
+                "time": fx_position_new_minimal.time,
+                "lon": 0,
+                "lat": 0,
+                "labels": Labels([Label(rel=LabelRelation.SELF, scheme="x:id", value=str(i))]),
+            }
+            for i in [1, 2, 2]
+        ]
+        batch = PositionBatch.from_rows(rows)
+
+        assert fx_positions_client_empty.add_batch(batch=batch, dist_label_scheme="x:id") == 2
+        assert fx_positions_client_empty.add_batch(batch=batch, dist_label_scheme="x:id") == 0
+
+        result = fx_positions_client_empty._db.get_query_result(
+            SQL("""SELECT dist_position_value FROM public.position ORDER BY pk;""")
+        )
+        assert result == [("1",), ("2",)]
+
+    def test_positions_client_add_batch_label_sets(
+        self, fx_positions_client_empty: PositionsClient, fx_position_new_minimal: PositionNew
+    ):
+        """Shared labels are stored once as a label set and included when positions are read."""
+        provider_labels = [
+            Label(rel=LabelRelation.PROVIDER, scheme="ats:provider_id", value="example"),
+            Label(rel=LabelRelation.PROVIDER, scheme="ats:provider_version", value="1"),
+        ]
+        rows = [
+            {
+                "asset_id": fx_position_new_minimal.asset_id,
+                "time": fx_position_new_minimal.time,
+                "lon": i,
+                "lat": 0,
+                "labels": Labels([Label(rel=LabelRelation.SELF, scheme="x:id", value=str(i)), *provider_labels]),
+            }
+            for i in range(3)
+        ]
+        batch = PositionBatch.from_rows(rows)
+
+        fx_positions_client_empty.add_batch(batch=batch)
+        fx_positions_client_empty.add_batch(batch=batch.select([0]))
+
+        result = fx_positions_client_empty._db.get_query_result(
+            SQL("""SELECT COUNT(*), COUNT(DISTINCT label_set_id) FROM public.position;""")
+        )
+        assert result[0] == (4, 1)
+        result = fx_positions_client_empty._db.get_query_result(SQL("""SELECT COUNT(*) FROM public.label_set;"""))
+        assert result[0][0] == 1
+        positions = list(fx_positions_client_empty.iter_by_asset(asset_id=fx_position_new_minimal.asset_id))
+        assert len(positions) == 4
+        for position in positions:
+            assert position.labels == rows[int(position.geom.x)]["labels"]
+        assert [label.scheme for label in positions[0].labels] == ["x:id", "ats:provider_id", "ats:provider_version"]
+        latest = list(fx_positions_client_empty.latest_for_assets(asset_ids=[fx_position_new_minimal.asset_id]))
+        assert latest[0].labels.shared == Labels(provider_labels)
+
+    def test_positions_client_add_batch_label_sets_creation(
+        self, fx_positions_client_empty: PositionsClient, fx_position_new_minimal: PositionNew
+    ):
+        """Shared labels differing only in when they were created (e.g. from separate fetches) share a label set."""
+        for creation in [1, 2]:
+            fx_position_new_minimal.labels = Labels(
+                [Label(rel=LabelRelation.PROVIDER, scheme="ats:provider_id", value="example", creation=creation)]
+            )
+            fx_positions_client_empty.add_batch(batch=PositionBatch.from_positions([fx_position_new_minimal]))
+
+        result = fx_positions_client_empty._db.get_query_result(
+            SQL("""SELECT COUNT(*), COUNT(DISTINCT label_set_id) FROM public.position;""")
+        )
+        assert result[0] == (2, 1)
+        positions = list(fx_positions_client_empty.iter_by_asset(asset_id=fx_position_new_minimal.asset_id))
+        assert [position.labels[0].creation for position in positions] == [1, 1]
+
+    def test_positions_client_add_batch_empty(self, fx_positions_client_empty: PositionsClient):
+        """Test storing an empty batch of Positions."""
+        assert fx_positions_client_empty.add_batch(batch=PositionBatch.concat([])) == 0
 
-        # verify table isn't empty
         result = fx_positions_client_empty._db.get_query_result(SQL("""SELECT * FROM public.position;"""))
-        assert len(result) > 0
+        assert len(result) == 0
+
+    def test_iter_by_asset(self, fx_positions_client_many: PositionsClient, fx_asset: Asset):
+        """Streams positions for an asset in time order."""
+        result = fx_positions_client_many.iter_by_asset(asset_id=fx_asset.id)
+
+        assert isinstance(result, Generator)
+        positions = list(result)
+        assert [position.geom.x for position in positions] == [0, 1, 2, 3, 4]
+        assert all(isinstance(position, Position) for position in positions)
+        assert positions[0].asset_id == fx_asset.id
+
+    @pytest.mark.parametrize("page_size", [1, 2, 5])
+    def test_iter_by_asset_pages(self, fx_positions_client_many: PositionsClient, fx_asset: Asset, page_size: int):
+        """Streams all positions, once and in order, across pages, including positions with the same time."""
+        fx_positions_client_many._page_size = page_size
+
+        positions = list(fx_positions_client_many.iter_by_asset(asset_id=fx_asset.id))
+
+        assert len({position.id for position in positions}) == 5
+        assert [(position.time, str(position.id)) for position in positions] == sorted(
+            (position.time, str(position.id)) for position in positions
+        )
+
+    def test_iter_by_asset_time(
+        self, fx_positions_client_many: PositionsClient, fx_asset: Asset, fx_position_time: datetime
+    ):
+        """Streams positions for an asset within a time range, including start and excluding end."""
+        positions = fx_positions_client_many.iter_by_asset(
+            asset_id=fx_asset.id,
+            start=fx_position_time + timedelta(hours=1),
+            end=fx_position_time + timedelta(hours=3),
+        )
+
+        assert sorted(position.geom.x for position in positions) == [1, 2, 3]
+
+    def test_iter_by_asset_unknown(self, fx_positions_client_many: PositionsClient):
+        """Streams nothing for an unknown asset."""
+        # noinspection SpellCheckingInspection
+        asset_id = ulid_parse("01HYN10Z7GJKSFXSK5VQ5XWHJK")
+
+        assert list(fx_positions_client_many.iter_by_asset(asset_id=asset_id)) == []
+
+    def test_iter_in_bbox(self, fx_positions_client_many: PositionsClient, fx_position_time: datetime):
+        """Streams positions within a bounding box, optionally within a time range."""
+        positions = fx_positions_client_many.iter_in_bbox(min_x=1.5, min_y=-1, max_x=4.5, max_y=1)
+        assert [position.geom.x for position in positions] == [2, 3, 4]
+
+        positions = fx_positions_client_many.iter_in_bbox(
+            min_x=1.5, min_y=-1, max_x=4.5, max_y=1, end=fx_position_time + timedelta(hours=3)
+        )
+        assert [position.geom.x for position in positions] == [2, 3]
+
+    def test_latest_for_assets(
+        self, fx_positions_client_many: PositionsClient, fx_asset: Asset, fx_position_time: datetime
+    ):
+        """Streams latest position for each asset, skipping assets without positions."""
+        # noinspection SpellCheckingInspection
+        asset_ids = [fx_asset.id, ulid_parse("01HYN10Z7GJKSFXSK5VQ5XWHJK")]
+
+        positions = list(fx_positions_client_many.latest_for_assets(asset_ids=asset_ids))
+
+        assert len(positions) == 1
+        assert positions[0].asset_id == fx_asset.id
+        assert positions[0].time == fx_position_time + timedelta(hours=3)
+
+    def test_latest_for_assets_none(self, fx_positions_client_many: PositionsClient):
+        """Streams nothing for no assets."""
+        assert list(fx_positions_client_many.latest_for_assets(asset_ids=[])) == []
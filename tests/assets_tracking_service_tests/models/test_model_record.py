@@ -206,7 +206,7 @@ class TestRecordsClient:
     def test_list_ids(self, fx_records_client_one: RecordsClient, fx_record: Record):
         """Can list record file identifiers."""
         records = fx_records_client_one.list_ids()
-        assert len(records) == 2  # 1 collection , 1 layer
+        assert len(records) == 5  # 1 collection , 4 layers
 
     def test_get_by_slug(self, fx_records_client_one: RecordsClient, fx_record: Record):
         """Can get Record by slug that exists."""
@@ -318,7 +318,7 @@ class TestAircraftTrackingProvider:
         ]
         mocker.patch.object(fx_provider_aircraft_tracking, "_fetch_latest_positions", return_value=positions)
 
-        position = next(fx_provider_aircraft_tracking.fetch_latest_positions(assets=[asset]))
+        position = next(fx_provider_aircraft_tracking.fetch_latest_positions(assets=[asset]))[0]
 
         assert position == expected_position
 
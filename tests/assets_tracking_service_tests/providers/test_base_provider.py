@@ -63,5 +63,6 @@ class TestBaseProvider:
 
     def test_fetch_latest_positions(self, fx_provider_example: ExampleProvider, fx_asset: Asset):
         """Fetch latest positions abstract method."""
-        positions = list(fx_provider_example.fetch_latest_positions(assets=[fx_asset]))
-        assert len(positions) == 3
+        batches = list(fx_provider_example.fetch_latest_positions(assets=[fx_asset]))
+        assert len(batches) == 1
+        assert len(batches[0]) == 3
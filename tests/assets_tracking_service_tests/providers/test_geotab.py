@@ -344,7 +344,7 @@ class TestGeotabProvider:
             ),
         )
 
-        assert next(fx_provider_geotab.fetch_latest_positions(assets=[asset])) == expected_position
+        assert next(fx_provider_geotab.fetch_latest_positions(assets=[asset]))[0] == expected_position
 
     def test_fetch_latest_positions_error(
         self, caplog: pytest.LogCaptureFixture, mocker: MockerFixture, fx_provider_geotab_mocked: GeotabProvider
@@ -442,7 +442,7 @@ class TestGeotabProvider:
             ),
         )
 
-        assert next(fx_provider_geotab_mocked.fetch_latest_positions(assets=[asset])) == expected_position
+        assert next(fx_provider_geotab_mocked.fetch_latest_positions(assets=[asset]))[0] == expected_position
         assert "Skipping status for device ID: 'xx' as asset not available." in caplog.text
 
     # noinspection DuplicatedCode
@@ -577,5 +577,5 @@ class TestGeotabProvider:
 
         # can't use next() here as at least one call to each generator method must get all items to avoid pytest-cov
         # flagging the generator loop has not completed
-        position = list(fx_provider_geotab_mocked.fetch_latest_positions(assets=[asset]))[0]  # noqa: RUF015
+        position = list(fx_provider_geotab_mocked.fetch_latest_positions(assets=[asset]))[0][0]  # noqa: RUF015
         assert position == expected_position
@@ -9,11 +9,11 @@ from pytest_mock import MockerFixture
 
 from assets_tracking_service.config import Config
 from assets_tracking_service.db import DatabaseClient
-from assets_tracking_service.models.asset import AssetNew
 from assets_tracking_service.providers.providers_manager import ProvidersManager
 from tests.resources.examples.example_provider import ExampleProvider
 
 creation_time = datetime(2012, 6, 10, 14, 30, 20, tzinfo=UTC)
+refetch_time = datetime(2012, 6, 10, 15, 30, 20, tzinfo=UTC)
 
 
 class TestProvidersManager:
@@ -92,19 +92,6 @@ class TestProvidersManager:
         assert len(manager._providers) == 0
         assert f"{provider_title} provider will be skipped." in caplog.text
 
-    def test_filter_entities(self, fx_providers_manager_no_providers: ProvidersManager, fx_asset_new: AssetNew):
-        """Filters entities."""
-        db_rows = [{"dist_label_value": "1"}, {"dist_label_value": "2"}]
-        fetched_entities = {"2": fx_asset_new, "3": fx_asset_new}
-        expected_new_entities = [fx_asset_new]
-
-        assert (
-            fx_providers_manager_no_providers._filter_entities(
-                db_values=db_rows, indexed_fetched_entities=fetched_entities
-            )
-            == expected_new_entities
-        )
-
     def test_fetch_active_assets(
         self,
         freezer: FrozenDateTimeFactory,
@@ -121,10 +108,38 @@ class TestProvidersManager:
 
         assets = fx_providers_manager_no_providers._assets.list()
         assert len(assets) == 3
-        assert "Persisting 3 new assets from 'example' provider." in caplog.text
+        assert "Persisted 3 new assets from 'example' provider." in caplog.text
+
+        # verify when assets were last fetched is recorded, rather than as a label
+        result = fx_providers_manager_no_providers._db.get_query_result(
+            SQL("""SELECT last_fetched_at FROM public.asset_fetch_state;""")
+        )
+        assert [row[0] for row in result] == [creation_time] * 3
+        with pytest.raises(ValueError, match="No label with scheme"):
+            assets[0].labels.filter_by_scheme("ats:last_fetched")
+
+    def test_fetch_active_assets_last_fetched(
+        self,
+        freezer: FrozenDateTimeFactory,
+        fx_providers_manager_no_providers: ProvidersManager,
+        fx_provider_example: ExampleProvider,
+    ):
+        """Refetching assets updates when they were last fetched, available as a label for compatibility."""
+        freezer.move_to(creation_time)
+        fx_providers_manager_no_providers._providers = [fx_provider_example]
+        fx_providers_manager_no_providers.fetch_active_assets()
+        freezer.move_to(refetch_time)
+
+        fx_providers_manager_no_providers.fetch_active_assets()
 
-        # verify ats:last_fetched label value is set
-        assert assets[0].labels.filter_by_scheme("ats:last_fetched").value == 1339338620
+        result = fx_providers_manager_no_providers._db.get_query_result(
+            SQL("""
+                SELECT l ->> 'value'
+                FROM public.v_asset_labels AS a, jsonb_array_elements(a.labels -> 'values') AS l
+                WHERE l ->> 'scheme' = 'ats:last_fetched';
+            """)
+        )
+        assert [row[0] for row in result] == [str(int(refetch_time.timestamp()))] * 3
 
     def test_fetch_latest_positions(
         self,
@@ -138,4 +153,29 @@ class TestProvidersManager:
 
         result = fx_providers_manager_eg_provider._db.get_query_result(SQL("""SELECT * FROM public.position;"""))
         assert len(result) == 3
-        assert "Persisting 3 new positions from 'example' provider." in caplog.text
+        assert "Persisted 3 new positions from 'example' provider." in caplog.text
+
+        counters = {
+            (counter["name"], counter["labels"]["entity"]): counter["value"]
+            for counter in fx_providers_manager_eg_provider._metrics.summary()["counters"]
+        }
+        assert counters[("rows_fetched", "positions")] == 3
+        assert counters[("rows_new", "positions")] == 3
+
+    def test_fetch_latest_positions_repeat(self, fx_providers_manager_eg_provider: ProvidersManager):
+        """Refetching the same positions does not store them again."""
+        fx_providers_manager_eg_provider.fetch_active_assets()
+        fx_providers_manager_eg_provider.fetch_latest_positions()
+
+        fx_providers_manager_eg_provider.fetch_active_assets()
+        fx_providers_manager_eg_provider.fetch_latest_positions()
+
+        result = fx_providers_manager_eg_provider._db.get_query_result(SQL("""SELECT * FROM public.position;"""))
+        assert len(result) == 3
+        assert len(fx_providers_manager_eg_provider._assets.list()) == 3
+        counters = {
+            (counter["name"], counter["labels"]["entity"]): counter["value"]
+            for counter in fx_providers_manager_eg_provider._metrics.summary()["counters"]
+        }
+        assert counters[("rows_fetched", "positions")] == 6
+        assert counters[("rows_new", "positions")] == 3
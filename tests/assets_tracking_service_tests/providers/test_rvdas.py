@@ -365,7 +365,7 @@ class TestRvdasProvider:
             ),
         )
 
-        position = next(fx_provider_rvdas.fetch_latest_positions(assets=[asset]))
+        position = next(fx_provider_rvdas.fetch_latest_positions(assets=[asset]))[0]
 
         assert position == expected_position
 
@@ -444,7 +444,7 @@ class TestRvdasProvider:
             [label for label in expected_position.labels if label.scheme != f"rvdas:{key}"]
         )
 
-        position = next(fx_provider_rvdas.fetch_latest_positions(assets=[asset]))
+        position = next(fx_provider_rvdas.fetch_latest_positions(assets=[asset]))[0]
 
         assert position == expected_position
 
@@ -0,0 +1,333 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+from datetime import UTC, datetime
+
+import pytest
+from psycopg.sql import SQL
+from pytest_mock import MockerFixture
+from starlette.datastructures import QueryParams
+from starlette.testclient import TestClient
+
+from assets_tracking_service import json_backend
+from assets_tracking_service.api import (
+    COLLECTIONS,
+    LIMIT_MAX,
+    ApiError,
+    ItemsQuery,
+    _CachedResponse,
+    _ResponseCache,
+    decode_cursor,
+    encode_cursor,
+    etag_matches,
+    make_app,
+    make_etag,
+    negotiate_encoding,
+    serve,
+    stream_events,
+)
+from assets_tracking_service.db import DatabaseClient
+from assets_tracking_service.notifications import PositionsBroadcaster, TooManySubscribersError
+
+TIME = datetime(2024, 1, 1, tzinfo=UTC)
+ULID_VALUE = "01ARZ3NDEKTSV4RRFFQ69G5FAV"
+
+
+class TestItemsQuery:
+    """Test collection items query parameters."""
+
+    @pytest.mark.parametrize(
+        ("params", "expected"),
+        [
+            ("", ItemsQuery()),
+            ("limit=5", ItemsQuery(limit=5)),
+            (f"limit={LIMIT_MAX + 1}", ItemsQuery(limit=LIMIT_MAX)),
+            ("bbox=-10,-80,10,-60", ItemsQuery(bbox=(-10, -80, 10, -60))),
+            ("datetime=2024-01-01T00:00:00Z", ItemsQuery(instant=TIME)),
+            ("datetime=2024-01-01T00:00:00Z/..", ItemsQuery(start=TIME)),
+            ("datetime=/2024-01-01T00:00:00Z", ItemsQuery(end=TIME)),
+            (f"cursor={encode_cursor(TIME, ULID_VALUE)}", ItemsQuery(after=(TIME, ULID_VALUE))),
+        ],
+    )
+    def test_from_query_params(self, params: str, expected: ItemsQuery):
+        """Parses query parameters."""
+        assert ItemsQuery.from_query_params(QueryParams(params)) == expected
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            "limit=0",
+            "limit=x",
+            "bbox=1,2,3",
+            "bbox=a,b,c,d",
+            "bbox=-10,-60,10,-80",
+            "datetime=..",
+            "datetime=2024-01-01",
+            "datetime=2024-01-02T00:00:00Z/2024-01-01T00:00:00Z",
+            "cursor=x",
+        ],
+    )
+    def test_from_query_params_invalid(self, params: str):
+        """Invalid query parameters raise a client error."""
+        with pytest.raises(ApiError) as e:
+            ItemsQuery.from_query_params(QueryParams(params))
+
+        assert e.value.status == 400
+
+    def test_to_sql_antimeridian(self):
+        """Bounding boxes crossing the antimeridian are split into two envelopes."""
+        _, params = ItemsQuery(bbox=(170, -80, -170, -60)).to_sql(COLLECTIONS["positions"])
+
+        assert (params["min_x_0"], params["max_x_0"]) == (170, 180)
+        assert (params["min_x_1"], params["max_x_1"]) == (-180, -170)
+
+
+class TestHelpers:
+    """Test cursor, content encoding and entity tag helpers."""
+
+    def test_cursor_round_trip(self):
+        """Cursors can be decoded."""
+        assert decode_cursor(encode_cursor(TIME, ULID_VALUE)) == (TIME, ULID_VALUE)
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            (None, None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("gzip, br", "br"),
+            ("gzip;q=1.0, br;q=0", "gzip"),
+            ("gzip;q=x", None),
+        ],
+    )
+    def test_negotiate_encoding(self, value: str | None, expected: str | None):
+        """Content encoding is chosen from those accepted, preferring Brotli."""
+        assert negotiate_encoding(value) == expected
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(None, False), ("*", True), ('W/"x"', False), ('W/"x", W/"60dd710212000"', True), ('"60dd710212000"', True)],
+    )
+    def test_etag_matches(self, value: str | None, expected: bool):
+        """Entity tags are matched using weak comparison."""
+        etag = make_etag(TIME)
+
+        assert etag == 'W/"60dd710212000"'
+        assert etag_matches(value, etag) is expected
+
+    def test_make_etag_empty(self):
+        """Entity tag can be made where there's no data."""
+        assert make_etag(None) == 'W/"0"'
+
+    def test_response_cache(self):
+        """Cached responses are returned for the current entity tag, evicting the least recently used."""
+        cache = _ResponseCache(size=2)
+        for key in ["a", "b"]:
+            cache.put(key, _CachedResponse(etag="1", body=key.encode()))
+        cache.get("a", "1")
+        cache.put("c", _CachedResponse(etag="1", body=b"c"))
+
+        assert cache.get("a", "1").body == b"a"
+        assert cache.get("a", "2") is None
+        assert cache.get("b", "1") is None
+
+
+class TestApi:
+    """Test API endpoints."""
+
+    def test_landing_page(self, fx_api_client: TestClient):
+        """Landing page links to conformance and collections."""
+        result = fx_api_client.get("/")
+
+        assert result.status_code == 200
+        assert {link["rel"] for link in result.json()["links"]} == {"self", "conformance", "data"}
+
+    def test_conformance(self, fx_api_client: TestClient):
+        """Conformance classes are listed."""
+        result = fx_api_client.get("/conformance")
+
+        assert "http://www.opengis.net/spec/ogcapi-features-1/1.0/conf/core" in result.json()["conformsTo"]
+
+    def test_collections(self, fx_api_client: TestClient):
+        """Collections are listed."""
+        result = fx_api_client.get("/collections")
+
+        assert [collection["id"] for collection in result.json()["collections"]] == list(COLLECTIONS)
+
+    def test_collection_unknown(self, fx_api_client: TestClient):
+        """Unknown collection returns not found."""
+        result = fx_api_client.get("/collections/unknown/items")
+
+        assert result.status_code == 404
+        assert result.json()["code"] == "NotFound"
+
+    @pytest.mark.parametrize(("collection_id", "expected"), [("latest_positions", 1), ("positions", 3)])
+    def test_items(self, fx_api_client: TestClient, collection_id: str, expected: int):
+        """Features in collection are returned as GeoJSON."""
+        result = fx_api_client.get(f"/collections/{collection_id}/items")
+
+        assert result.status_code == 200
+        assert result.headers["content-type"] == "application/geo+json"
+        assert result.headers["etag"].startswith('W/"')
+        data = result.json()
+        assert data["type"] == "FeatureCollection"
+        assert data["numberReturned"] == expected
+        assert data["features"][0]["geometry"]["type"] == "Point"
+
+    def test_items_paging(self, fx_api_client: TestClient):
+        """Features can be paged through using next links, in time order without duplicates."""
+        features = []
+        url = "/collections/positions/items?limit=2"
+        while url:
+            data = fx_api_client.get(url).json()
+            features.extend(data["features"])
+            url = next((link["href"] for link in data["links"] if link["rel"] == "next"), None)
+
+        times = [feature["properties"]["time_utc"] for feature in features]
+        assert len(features) == 3
+        assert len({feature["id"] for feature in features}) == 3
+        assert times == sorted(times)
+
+    @pytest.mark.parametrize(
+        ("params", "expected"),
+        [
+            ("bbox=-1,-1,1,1", 3),
+            ("bbox=10,10,20,20", 0),
+            ("bbox=179,-1,1,1", 3),
+            ("datetime=2000-01-01T00:00:00Z/..", 3),
+            ("datetime=../2000-01-01T00:00:00Z", 0),
+        ],
+    )
+    def test_items_filter(self, fx_api_client: TestClient, params: str, expected: int):
+        """Features can be filtered by bounding box and date time."""
+        result = fx_api_client.get(f"/collections/positions/items?{params}")
+
+        assert result.json()["numberReturned"] == expected
+
+    def test_item(self, fx_api_client: TestClient):
+        """Feature can be returned by ID."""
+        feature = fx_api_client.get("/collections/positions/items").json()["features"][0]
+
+        result = fx_api_client.get(f"/collections/positions/items/{feature['id']}")
+
+        assert result.status_code == 200
+        assert result.json()["properties"] == feature["properties"]
+
+    @pytest.mark.parametrize("feature_id", [ULID_VALUE, "invalid"])
+    def test_item_unknown(self, fx_api_client: TestClient, feature_id: str):
+        """Unknown feature returns not found."""
+        result = fx_api_client.get(f"/collections/positions/items/{feature_id}")
+
+        assert result.status_code == 404
+
+    def test_not_modified(self, fx_api_client: TestClient, fx_db_client_tmp_db_pop: DatabaseClient):
+        """Conditional requests return not modified until positions are added."""
+        etag = fx_api_client.get("/collections/positions/items").headers["etag"]
+
+        result = fx_api_client.get("/collections/positions/items", headers={"If-None-Match": etag})
+        assert result.status_code == 304
+
+        fx_db_client_tmp_db_pop.execute(SQL("UPDATE public.position SET created_at = now() + interval '1 minute';"))
+        result = fx_api_client.get("/collections/positions/items", headers={"If-None-Match": etag})
+        assert result.status_code == 200
+        assert result.headers["etag"] != etag
+
+    @pytest.mark.parametrize("encoding", ["br", "gzip"])
+    def test_compression(self, fx_api_client: TestClient, encoding: str):
+        """Responses are compressed using an accepted content encoding."""
+        expected = fx_api_client.get("/collections/positions/items", headers={"Accept-Encoding": "identity"})
+
+        result = fx_api_client.get("/collections/positions/items", headers={"Accept-Encoding": encoding})
+
+        assert "content-encoding" not in expected.headers
+        assert result.headers["content-encoding"] == encoding
+        assert result.headers["vary"] == "Accept-Encoding"
+        assert result.content == expected.content
+
+    def test_serve(self, mocker: MockerFixture):
+        """API can be served."""
+        mock_run = mocker.patch("assets_tracking_service.api.uvicorn.run")
+
+        serve(dsn="postgresql://x", host="127.0.0.1", port=8000)
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args.kwargs == {"host": "127.0.0.1", "port": 8000}
+
+    def test_make_app(self):
+        """App routes are named for building links."""
+        app = make_app(dsn="postgresql://x")
+
+        assert {route.name for route in app.routes} == {
+            "landing_page",
+            "conformance",
+            "collections",
+            "collection",
+            "items",
+            "item",
+            "stream",
+        }
+
+    def test_stream(self, mocker: MockerFixture, fx_api_client: TestClient):
+        """Live stream is returned as server-sent events."""
+
+        async def events(*args: object) -> AsyncGenerator[bytes, None]:
+            yield b"event: snapshot\ndata: []\n\n"
+
+        mocker.patch("assets_tracking_service.api.stream_events", side_effect=events)
+
+        result = fx_api_client.get("/stream")
+
+        assert result.status_code == 200
+        assert result.headers["content-type"].startswith("text/event-stream")
+        assert result.text == "event: snapshot\ndata: []\n\n"
+
+    def test_stream_full(self, mocker: MockerFixture, fx_api_client: TestClient):
+        """Live stream is unavailable when there are too many clients."""
+        broadcaster = fx_api_client.app.state.broadcaster
+        mocker.patch.object(broadcaster, "subscribe", side_effect=TooManySubscribersError("Full."))
+
+        result = fx_api_client.get("/stream")
+
+        assert result.status_code == 503
+        assert result.json() == {"code": "ServiceUnavailable", "description": "Full."}
+
+    def test_stream_current(self, fx_api_client: TestClient):
+        """Live stream snapshot includes the latest position of each asset with compact fields."""
+        broadcaster = fx_api_client.app.state.broadcaster
+
+        result = json_backend.loads(fx_api_client.portal.call(broadcaster.current))
+
+        assert len(result) == 1
+        assert list(result[0]) == ["asset_id", "time_utc", "lon", "lat", "speed_ms", "heading_d"]
+
+
+class TestStreamEvents:
+    """Test live stream events."""
+
+    def test_stream_events(self, fx_logger: logging.Logger):
+        """Subscribers are sent a snapshot, updates, keep-alive comments, and new snapshots if they fall behind."""
+
+        async def query(asset_ids: list | None) -> str:
+            return "[]"
+
+        async def run() -> list[bytes]:
+            broadcaster = PositionsBroadcaster(dsn="", query=query, logger=fx_logger, queue_size=1)
+            subscriber = broadcaster.subscribe()
+            events = stream_events(broadcaster, subscriber, keepalive=0.01)
+            result = [await anext(events), await anext(events), await anext(events)]
+            broadcaster.publish("[1]")
+            result.append(await anext(events))
+            broadcaster.publish("[2]")
+            broadcaster.publish("[3]")
+            result.append(await anext(events))
+            await events.aclose()
+            assert broadcaster.subscribers == 0
+            return result
+
+        assert asyncio.run(run()) == [
+            b"retry: 5000\n\n",
+            b"event: snapshot\ndata: []\n\n",
+            b": keep-alive\n\n",
+            b"event: positions\ndata: [1]\n\n",
+            b"event: snapshot\ndata: []\n\n",
+        ]
@@ -9,8 +9,18 @@ from psycopg.sql import SQL, Identifier
 from psycopg.types.json import Jsonb
 from pytest_mock import MockerFixture
 
+from assets_tracking_service import json_backend
 from assets_tracking_service.config import Config
-from assets_tracking_service.db import DatabaseClient, DatabaseError, DatabaseMigrationError, make_conn
+from assets_tracking_service.db import (
+    LOCK_TIMEOUT,
+    DatabaseClient,
+    DatabaseError,
+    DatabaseMigrationError,
+    Migration,
+    QueryShape,
+    make_conn,
+)
+from assets_tracking_service.metrics import Metrics
 
 
 class TestDBClient:
@@ -130,6 +140,65 @@ class TestDBClient:
         assert isinstance(result[0][0], datetime)
         assert result[0][0].tzinfo == UTC
 
+    def test_iter_query_result(self, fx_db_client_tmp_db: DatabaseClient):
+        """Streams query result as dicts."""
+        result = fx_db_client_tmp_db.iter_query_result(
+            SQL("SELECT generate_series(1, %s) AS value;"), params=(5,), size=2
+        )
+
+        assert list(result) == [{"value": value} for value in range(1, 6)]
+
+    def test_iter_query_result_error(self, fx_db_client_tmp_db: DatabaseClient):
+        """Invalid query triggers error."""
+        with pytest.raises(DatabaseError):
+            list(fx_db_client_tmp_db.iter_query_result(SQL("SELECT * FROM unknown;")))
+
+    def test_query_metrics(self, postgresql: Connection):
+        """Statements are timed and counted by query shape."""
+        metrics = Metrics()
+        client = DatabaseClient(conn=postgresql, metrics=metrics)
+        query = SQL("SELECT %s::int;")
+
+        client.get_query_result(query, params=(1,))
+        client.get_query_result(query, params=(2,))
+        list(client.iter_query_result(SQL("SELECT 1 AS value;")))
+
+        timers = metrics.summary()["timers"]
+        fingerprint = QueryShape.from_sql(query.as_string(postgresql)).fingerprint
+        assert {"name": "db_query", "labels": {"query": fingerprint}, "count": 2} in [
+            {key: timer[key] for key in ("name", "labels", "count")} for timer in timers
+        ]
+        assert len(timers) == 2
+
+    def test_slow_query(self, caplog: pytest.LogCaptureFixture, postgresql: Connection):
+        """Slow queries are logged, with their query plan logged once for each shape."""
+        metrics = Metrics()
+        client = DatabaseClient(conn=postgresql, metrics=metrics, slow_query_threshold=0.01)
+        client.execute(SQL("CREATE TABLE public.test (id int);"))
+        query = SQL("INSERT INTO public.test (id) SELECT %s FROM pg_sleep(0.02);")
+
+        client.execute(query, params=(1,))
+        client.execute(query, params=(2,))
+
+        fingerprint = QueryShape.from_sql(query.as_string(postgresql)).fingerprint
+        assert caplog.text.count(f"Slow query {fingerprint} took") == 2
+        assert caplog.text.count(f"Query plan for slow query {fingerprint}") == 1
+        assert {"name": "db_slow_query", "labels": {"query": fingerprint}, "value": 2} in metrics.summary()["counters"]
+        # statements modifying data are not run again to explain them
+        assert "Execution Time" not in caplog.text
+        assert client.get_query_result(SQL("SELECT id FROM public.test ORDER BY id;")) == [(1,), (2,)]
+
+    def test_slow_query_analyze(self, caplog: pytest.LogCaptureFixture, postgresql: Connection):
+        """Read only slow queries are explained with run time statistics."""
+        client = DatabaseClient(conn=postgresql, slow_query_threshold=0.01)
+        query = SQL("SELECT %s FROM pg_sleep(0.02);")
+
+        client.execute(query, params=(1,))
+
+        fingerprint = QueryShape.from_sql(query.as_string(postgresql)).fingerprint
+        assert caplog.text.count(f"Query plan for slow query {fingerprint}") == 1
+        assert "Execution Time" in caplog.text
+
     # noinspection SqlResolve
     def test_insert_dict(self, fx_db_client_tmp_db: DatabaseClient):
         """Inserts a dictionary."""
@@ -173,6 +242,18 @@ class TestDBClient:
         )
         assert result == [(1, data)]
 
+    def test_json_backend(self, mocker: MockerFixture, fx_db_client_tmp_db: DatabaseClient):
+        """JSON values are adapted using JSON backend."""
+        dumps = mocker.spy(json_backend, "dumps")
+        loads = mocker.spy(json_backend, "loads")
+        data = {"foo": "bar"}
+
+        result = fx_db_client_tmp_db.get_query_result(SQL("SELECT %s::JSONB;"), params=(Jsonb(data),))
+
+        assert result == [(data,)]
+        dumps.assert_called_once()
+        loads.assert_called_once()
+
     def test_insert_dict_error(self, fx_db_client_tmp_db: DatabaseClient):
         """Invalid insert triggers error."""
         with pytest.raises(DatabaseError):
@@ -201,9 +282,12 @@ class TestDBClient:
 
     def test_migrate_upgrade(self, caplog: pytest.LogCaptureFixture, fx_db_client_tmp_db: DatabaseClient):
         """Database can be migrated up."""
-        fx_db_client_tmp_db.migrate_upgrade()
+        result = fx_db_client_tmp_db.migrate_upgrade()
 
         assert "Upgrading database to head revision..." in caplog.text
+        assert result[0][0].name == "001-extensions"
+        assert result[-1][0].id == fx_db_client_tmp_db._head_available_migration
+        assert all(duration >= 0 for _, duration in result)
 
         # verify an expected object exists
         result = fx_db_client_tmp_db.get_query_result(SQL("SELECT PostGIS_Version();"))
@@ -212,11 +296,16 @@ class TestDBClient:
     @pytest.mark.cov()
     def test_migrate_upgrade_error(self, mocker: MockerFixture, fx_db_client_tmp_db: DatabaseClient):
         """Problem when migrating database up triggers error."""
-        mocker.patch.object(fx_db_client_tmp_db, "execute_files_in_path", side_effect=DatabaseError)
+        migration = Migration(id=1, name="001-invalid", sql="CREATE TABLE public.test (id INTEGER); INVALID;")
+        mocker.patch.object(fx_db_client_tmp_db, "_list_migrations", return_value=[migration])
 
-        with pytest.raises(DatabaseMigrationError):
+        with pytest.raises(DatabaseMigrationError, match="001-invalid"):
             fx_db_client_tmp_db.migrate_upgrade()
 
+        # verify migration was rolled back
+        result = fx_db_client_tmp_db.get_query_result(SQL("SELECT to_regclass('public.test');"))
+        assert result == [(None,)]
+
     def test_migrate_downgrade(self, caplog: pytest.LogCaptureFixture, fx_db_client_tmp_db_mig: DatabaseClient):
         """Database can be migrated down."""
         fx_db_client_tmp_db_mig.migrate_downgrade()
@@ -228,10 +317,34 @@ class TestDBClient:
             fx_db_client_tmp_db_mig.get_query_result(SQL("SELECT generate_ulid();"))
 
     def test_migrate_migrate(self, caplog: pytest.LogCaptureFixture, fx_db_client_tmp_db_mig: DatabaseClient):
-        """Database can be migrated up if already at head migration."""
-        fx_db_client_tmp_db_mig.migrate_upgrade()
+        """Database can be migrated up if already at head migration, without reapplying migrations."""
+        result = fx_db_client_tmp_db_mig.migrate_upgrade()
 
         assert "Upgrading database to head revision..." in caplog.text
+        assert "0 pending up migrations." in caplog.text
+        assert result == []
+
+    def test_pending_migrations(self, mocker: MockerFixture, fx_db_client_tmp_db_mig: DatabaseClient):
+        """Migrations after the latest applied migration are pending."""
+        assert fx_db_client_tmp_db_mig.get_pending_migrations() == []
+
+        mocker.patch.object(
+            type(fx_db_client_tmp_db_mig), "_head_applied_migration", new_callable=PropertyMock, return_value=30
+        )
+        up = fx_db_client_tmp_db_mig.get_pending_migrations("up")
+        down = fx_db_client_tmp_db_mig.get_pending_migrations("down")
+
+        assert up[0].id == 31
+        assert [migration.id for migration in up] == sorted(migration.id for migration in up)
+        assert down[0].id == 30
+        assert down[-1].name == "999-extensions"
+
+    def test_pending_migrations_unknown(self, fx_db_client_tmp_db: DatabaseClient):
+        """All migrations are pending if the latest applied migration is unknown."""
+        result = fx_db_client_tmp_db.get_pending_migrations()
+
+        assert result[0].name == "001-extensions"
+        assert len(result) == fx_db_client_tmp_db._head_available_migration
 
     def test_head_available_migration(self, fx_db_client_tmp_db: DatabaseClient):
         """Latest available migrations in the app package can be reported."""
@@ -273,6 +386,199 @@ class TestDBClient:
         result = fx_db_client_tmp_db.get_migrate_status()
         assert result is None
 
+    def test_get_table_stats(self, fx_db_client_tmp_db_mig: DatabaseClient):
+        """Gets statistics for tables that exist, in the order given."""
+        result = fx_db_client_tmp_db_mig.get_table_stats(["position", "unknown", "asset"])
+
+        assert [row["table"] for row in result] == ["position", "asset"]
+        assert result[0]["table_bytes"] >= result[0]["toast_bytes"] >= 0
+        assert result[0]["indexes_bytes"] > 0
+        assert 0 <= result[0]["dead_ratio"] <= 1
+
+    def test_get_index_stats(self, fx_db_client_tmp_db_mig: DatabaseClient):
+        """Gets statistics for indexes, including duplicate indexes."""
+        result = fx_db_client_tmp_db_mig.get_index_stats(["asset"])
+        indexes = {row["index"]: row for row in result}
+
+        assert indexes["asset_id_idx"]["method"] == "hash"
+        assert indexes["asset_id_idx"]["duplicates"] == ["asset_id_key"]
+        assert indexes["asset_id_key"]["duplicates"] == ["asset_id_idx"]
+        assert indexes["asset_pk"]["duplicates"] == []
+        assert indexes["asset_pk"]["unique"] is True
+        assert indexes["asset_pk"]["unused"] is False
+
+    def test_get_view_timings(self, fx_db_client_tmp_db_mig: DatabaseClient):
+        """Gets execution time for views."""
+        result = fx_db_client_tmp_db_mig.get_view_timings(["v_latest_assets_pos", "v_latest_assets_pos_geojson"])
+
+        assert [row["view"] for row in result] == ["v_latest_assets_pos", "v_latest_assets_pos_geojson"]
+        assert result[0]["rows"] == 0
+        assert result[0]["execution_ms"] >= 0
+
+
+class TestMigration:
+    """Test database migration files."""
+
+    @pytest.mark.parametrize(
+        ("name", "direction", "expected"), [("032-foo.sql", "up", 32), ("968-foo.sql", "down", 32)]
+    )
+    def test_from_path(self, tmp_path: Path, name: str, direction: str, expected: int):
+        """Can be loaded from a file."""
+        path = tmp_path / name
+        path.write_text("SELECT 1;")
+
+        result = Migration.from_path(path, direction)
+
+        assert result == Migration(id=expected, name=path.stem, sql="SELECT 1;")
+
+    def test_asset_fetch_state(self, fx_db_client_tmp_db: DatabaseClient):
+        """Existing 'ats:last_fetched' asset labels are moved to a separate table."""
+        migrations = DatabaseClient._list_migrations("up")
+        for migration in [m for m in migrations if m.id < 36]:
+            fx_db_client_tmp_db._apply_migration(migration, lock_timeout=LOCK_TIMEOUT)
+        label = {"rel": "self", "scheme": "skos:prefLabel", "value": "x", "creation": 1}
+        last_fetched = {"rel": "provider", "scheme": "ats:last_fetched", "value": 1339338620, "creation": 1}
+        fx_db_client_tmp_db.insert_dict(
+            schema="public",
+            table_view="asset",
+            data={"labels": Jsonb({"version": "1", "values": [label, last_fetched]})},
+        )
+
+        fx_db_client_tmp_db._apply_migration(next(m for m in migrations if m.id == 36), lock_timeout=LOCK_TIMEOUT)
+
+        result = fx_db_client_tmp_db.get_query_result(
+            SQL("""
+                SELECT a.labels, f.last_fetched_at
+                FROM public.asset AS a
+                INNER JOIN public.asset_fetch_state AS f ON a.id = f.asset_id;
+            """)
+        )
+        assert result[0][0]["values"] == [label]
+        assert result[0][1] == datetime(2012, 6, 10, 14, 30, 20, tzinfo=UTC)
+
+    def test_position_label_set(self, fx_db_client_tmp_db: DatabaseClient):
+        """Provider labels in existing positions are moved to label sets."""
+        migrations = DatabaseClient._list_migrations("up")
+        for migration in [m for m in migrations if m.id < 37]:
+            fx_db_client_tmp_db._apply_migration(migration, lock_timeout=LOCK_TIMEOUT)
+        label = {"rel": "self", "scheme": "x:id", "value": "x", "creation": 1}
+        provider = {"rel": "provider", "scheme": "ats:provider_id", "value": "example", "creation": 1}
+        fx_db_client_tmp_db.execute(
+            SQL("""
+                WITH a AS (
+                    INSERT INTO public.asset (labels) VALUES (%s) RETURNING id
+                )
+                INSERT INTO public.position (asset_id, geom, time_utc, labels)
+                SELECT a.id, 'SRID=4326;POINT Z (0 0 0)', now(), %s
+                FROM a, generate_series(1, 2);
+            """),
+            params=(
+                Jsonb({"version": "1", "values": [{**label, "scheme": "skos:prefLabel"}]}),
+                Jsonb({"version": "1", "values": [label, provider]}),
+            ),
+        )
+
+        fx_db_client_tmp_db._apply_migration(next(m for m in migrations if m.id == 37), lock_timeout=LOCK_TIMEOUT)
+
+        result = fx_db_client_tmp_db.get_query_result(
+            SQL("""
+                SELECT p.labels, ls.labels, v.labels
+                FROM public.position AS p
+                INNER JOIN public.label_set AS ls ON p.label_set_id = ls.id
+                INNER JOIN public.v_position_labels AS v ON p.id = v.id;
+            """)
+        )
+        assert len(result) == 2
+        assert result[0][0]["values"] == [label]
+        assert result[0][1]["values"] == [provider]
+        assert result[0][2]["values"] == [label, provider]
+        result = fx_db_client_tmp_db.get_query_result(SQL("""SELECT COUNT(*) FROM public.label_set;"""))
+        assert result[0][0] == 1
+
+    def test_natural_keys(self, fx_db_client_tmp_db: DatabaseClient):
+        """Existing assets and positions are given natural keys, with only the first of any duplicates set."""
+        migrations = DatabaseClient._list_migrations("up")
+        for migration in [m for m in migrations if m.id < 39]:
+            fx_db_client_tmp_db._apply_migration(migration, lock_timeout=LOCK_TIMEOUT)
+        name = {"rel": "self", "scheme": "skos:prefLabel", "value": "x", "creation": 1}
+        device = {"rel": "self", "scheme": "geotab:device_id", "value": "b1", "creation": 1}
+        provider = {"rel": "provider", "scheme": "ats:provider_id", "value": "geotab", "creation": 1}
+        log = {"rel": "self", "scheme": "geotab:log_record_id", "value": "l1", "creation": 1}
+        fx_db_client_tmp_db.execute(
+            SQL("""
+                WITH a AS (
+                    INSERT INTO public.asset (labels) VALUES (%s) RETURNING id
+                )
+                INSERT INTO public.position (asset_id, geom, time_utc, labels)
+                SELECT a.id, 'SRID=4326;POINT Z (0 0 0)', now(), %s
+                FROM a, generate_series(1, 2);
+            """),
+            params=(
+                Jsonb({"version": "1", "values": [name, device, provider]}),
+                Jsonb({"version": "1", "values": [log]}),
+            ),
+        )
+
+        fx_db_client_tmp_db._apply_migration(next(m for m in migrations if m.id == 39), lock_timeout=LOCK_TIMEOUT)
+
+        result = fx_db_client_tmp_db.get_query_result(
+            SQL("""SELECT provider_id, dist_asset_value FROM public.asset;""")
+        )
+        assert result == [("geotab", "b1")]
+        result = fx_db_client_tmp_db.get_query_result(
+            SQL("""SELECT dist_position_value FROM public.position ORDER BY pk;""")
+        )
+        assert result == [("l1",), (None,)]
+
+
+class TestQueryShape:
+    """Test normalised queries."""
+
+    @pytest.mark.parametrize(
+        ("sql", "expected"),
+        [
+            ("SELECT 1;", "SELECT ?;"),
+            ("SELECT *\n  FROM foo  -- comment\n  WHERE id = %s;", "SELECT * FROM foo WHERE id = %s;"),
+            ("SELECT 'it''s', 1.5, st_force2d(geom) FROM v_2d;", "SELECT ?, ?, st_force2d(geom) FROM v_2d;"),
+        ],
+    )
+    def test_from_sql(self, sql: str, expected: str):
+        """Comments, literal values and whitespace are normalised."""
+        result = QueryShape.from_sql(sql)
+
+        assert result.sql == expected
+        assert len(result.fingerprint) == 12
+        assert result == QueryShape.from_sql(sql.replace("1", "2"))
+
+    @pytest.mark.parametrize(
+        ("sql", "expected"),
+        [
+            ("SELECT 1;", True),
+            ("with x AS (SELECT 1) SELECT * FROM x;", True),
+            ("INSERT INTO foo VALUES (1);", True),
+            ("COPY foo (id) FROM STDIN;", False),
+            ("CREATE TABLE foo (id int);", False),
+            ("SELECT 1; SELECT 2;", False),
+        ],
+    )
+    def test_explainable(self, sql: str, expected: bool):
+        """Only single statements that can be explained are explainable."""
+        assert QueryShape.from_sql(sql).explainable == expected
+
+    @pytest.mark.parametrize(
+        ("sql", "expected"),
+        [
+            ("SELECT updated_at FROM foo;", False),
+            ("with x AS (SELECT 1) SELECT * FROM x;", False),
+            ("INSERT INTO foo VALUES (1);", True),
+            ("update foo SET id = 1;", True),
+            ("WITH x AS (DELETE FROM foo RETURNING id) SELECT * FROM x;", True),
+        ],
+    )
+    def test_modifying(self, sql: str, expected: bool):
+        """Statements that may modify data are identified."""
+        assert QueryShape.from_sql(sql).modifying == expected
+
 
 class TestMakeConn:
     """Test method to make a database connection."""
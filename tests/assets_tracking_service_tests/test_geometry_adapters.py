@@ -0,0 +1,55 @@
+import pytest
+import shapely
+from psycopg.sql import SQL
+from pytest_mock import MockerFixture
+from shapely import LineString, Point, wkt
+from shapely.geometry.base import BaseGeometry
+
+from assets_tracking_service import geometry_adapters
+from assets_tracking_service.db import DatabaseClient
+
+# values that can't be represented exactly with the number of digits used in WKT
+PRECISE_POINT = Point(-67.12345678901234567, 1 / 3, 0.1 + 0.2)
+
+
+class TestGeometryAdapters:
+    """Test geometry adapters."""
+
+    @pytest.mark.parametrize("hex_", [False, True])
+    @pytest.mark.parametrize("geom", [Point(1, 2), Point(1, 2, 3), Point(), LineString([(0, 0), (1, 1)])])
+    def test_dumps(self, geom: BaseGeometry, hex_: bool):
+        """Encodes geometry as EWKB with default SRID, equivalent to Shapely."""
+        expected = shapely.to_wkb(shapely.set_srid(geom, 4326), hex=hex_, include_srid=True, byte_order=1)
+
+        assert geometry_adapters.dumps(geom, hex=hex_) == expected
+
+    def test_dumps_srid(self):
+        """Encodes geometry as EWKB with existing SRID."""
+        result = geometry_adapters.dumps(shapely.set_srid(Point(1, 2), 3031))
+
+        assert shapely.get_srid(shapely.from_wkb(result)) == 3031
+
+    def test_precision(self):
+        """Round-trips coordinates exactly, unlike WKT."""
+        result = shapely.from_wkb(geometry_adapters.dumps(PRECISE_POINT))
+
+        assert result.coords[0] == PRECISE_POINT.coords[0]
+        assert wkt.loads(PRECISE_POINT.wkt).coords[0] != PRECISE_POINT.coords[0]
+
+    def test_register_no_postgis(self, mocker: MockerFixture, fx_db_client_tmp_db: DatabaseClient):
+        """Adapters aren't registered where PostGIS isn't available."""
+        mocker.patch.object(geometry_adapters.TypeInfo, "fetch", return_value=None)
+        spy = mocker.spy(geometry_adapters, "register_shapely")
+
+        assert geometry_adapters.register(fx_db_client_tmp_db.conn) is False
+        spy.assert_not_called()
+
+    @pytest.mark.parametrize("point", [Point(1, 2), PRECISE_POINT])
+    def test_round_trip(self, fx_db_client_tmp_db_mig: DatabaseClient, point: Point):
+        """Geometries are sent and loaded as binary values without losing precision or SRID."""
+        result = fx_db_client_tmp_db_mig.get_query_result(
+            SQL("SELECT %b::geometry, ST_SRID(%b::geometry);"), (point,) * 2
+        )
+
+        assert result[0][0].coords[0] == point.coords[0]
+        assert result[0][1] == 4326
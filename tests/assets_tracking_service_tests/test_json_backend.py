@@ -0,0 +1,28 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from assets_tracking_service import json_backend
+
+data = {"version": "1", "values": [{"scheme": "x", "value": "é", "creation": 1, "expiration": None}]}
+expected = '{"version":"1","values":[{"scheme":"x","value":"é","creation":1,"expiration":null}]}'.encode()
+
+
+class TestJsonBackend:
+    """Tests for JSON backend."""
+
+    @pytest.mark.parametrize("fast", [True, False])
+    def test_dumps(self, mocker: MockerFixture, fast: bool):
+        """Serialises to compact UTF-8 JSON with and without orjson."""
+        if not fast:
+            mocker.patch.object(json_backend, "orjson", new=None)
+
+        assert json_backend.dumps(data) == expected
+
+    @pytest.mark.parametrize("fast", [True, False])
+    @pytest.mark.parametrize("value", [expected, expected.decode(), memoryview(expected)])
+    def test_loads(self, mocker: MockerFixture, fast: bool, value: bytes | str | memoryview):
+        """Parses JSON from bytes, strings and memory views with and without orjson."""
+        if not fast:
+            mocker.patch.object(json_backend, "orjson", new=None)
+
+        assert json_backend.loads(value) == data
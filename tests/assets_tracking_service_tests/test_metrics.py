@@ -0,0 +1,92 @@
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from assets_tracking_service.metrics import Metrics
+
+
+class TestMetrics:
+    """Test run metrics."""
+
+    def test_timer(self):
+        """Timers record number of runs and total duration."""
+        metrics = Metrics()
+
+        with metrics.timer("stage", provider="example"):
+            pass
+        with metrics.timer("stage", provider="example"):
+            pass
+
+        timers = metrics.summary()["timers"]
+        assert len(timers) == 1
+        assert timers[0]["name"] == "stage"
+        assert timers[0]["labels"] == {"provider": "example"}
+        assert timers[0]["count"] == 2
+        assert timers[0]["seconds"] >= 0
+
+    def test_timer_exception(self):
+        """Timers record runs that raise an exception."""
+        metrics = Metrics()
+
+        with pytest.raises(RuntimeError), metrics.timer("stage"):
+            raise RuntimeError()
+
+        assert metrics.summary()["timers"][0]["count"] == 1
+
+    def test_count(self):
+        """Counters are incremented separately for each set of labels."""
+        metrics = Metrics()
+
+        metrics.count("rows", 2, provider="a")
+        metrics.count("rows", provider="a")
+        metrics.count("rows", 5, provider="b")
+
+        assert metrics.summary()["counters"] == [
+            {"name": "rows", "labels": {"provider": "a"}, "value": 3},
+            {"name": "rows", "labels": {"provider": "b"}, "value": 5},
+        ]
+
+    def test_log(self, caplog: pytest.LogCaptureFixture):
+        """Summary is logged as a JSON line."""
+        logger = logging.getLogger("app")
+        logger.setLevel(logging.INFO)
+        metrics = Metrics()
+        metrics.count("rows", 1)
+
+        metrics.log(logger)
+
+        message = caplog.records[-1].getMessage()
+        assert message.startswith("Run metrics: ")
+        assert json.loads(message.removeprefix("Run metrics: "))["counters"][0]["value"] == 1
+
+    def test_dumps_prometheus(self):
+        """Metrics can be formatted in the Prometheus text format."""
+        metrics = Metrics()
+        with metrics.timer("api_call", source="example", operation='say "hi"'):
+            pass
+        metrics.count("rows_new", 3, provider="example")
+        metrics.count("runs")
+
+        result = metrics.dumps_prometheus()
+
+        assert "# TYPE ats_api_call_seconds summary\n" in result
+        assert 'ats_api_call_seconds_count{operation="say \\"hi\\"",source="example"} 1\n' in result
+        assert 'ats_api_call_seconds_sum{operation="say \\"hi\\"",source="example"} ' in result
+        assert "# TYPE ats_rows_new_total counter\n" in result
+        assert 'ats_rows_new_total{provider="example"} 3\n' in result
+        assert "ats_runs_total 1\n" in result
+        assert "# TYPE ats_run_duration_seconds gauge\n" in result
+        assert "ats_run_timestamp_seconds " in result
+
+    def test_write_prometheus(self, tmp_path: Path):
+        """Metrics can be written to a Prometheus textfile."""
+        path = tmp_path / "metrics" / "ats.prom"
+        metrics = Metrics()
+        metrics.count("runs")
+
+        metrics.write_prometheus(path)
+
+        assert "ats_runs_total 1\n" in path.read_text()
+        assert list(path.parent.iterdir()) == [path]
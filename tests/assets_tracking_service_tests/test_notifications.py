@@ -0,0 +1,251 @@
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from psycopg import Notify
+from psycopg.conninfo import make_conninfo
+from psycopg.sql import SQL
+from ulid import parse as ulid_parse
+
+from assets_tracking_service.db import DatabaseClient
+from assets_tracking_service.models.asset import Asset
+from assets_tracking_service.models.label import Labels
+from assets_tracking_service.models.position import PositionBatch, PositionsClient
+from assets_tracking_service.notifications import (
+    CHANNEL,
+    PositionNotification,
+    PositionsBroadcaster,
+    Subscriber,
+    TooManySubscribersError,
+    coalesce,
+)
+
+ASSET_ID = ulid_parse("01ARZ3NDEKTSV4RRFFQ69G5FAV")
+TIME = datetime(2024, 1, 1, tzinfo=UTC)
+PAYLOAD = f'{{"asset_id": "{ASSET_ID}", "time_utc": "2024-01-01T00:00:00+00:00"}}'
+
+
+async def _query(asset_ids: list | None) -> str:
+    """Fake query returning asset IDs, or 'all' for the current state."""
+    return "all" if asset_ids is None else ",".join(str(asset_id) for asset_id in asset_ids)
+
+
+class TestPositionNotification:
+    """Test position notifications."""
+
+    def test_from_payload(self):
+        """Can be created from a notification payload."""
+        result = PositionNotification.from_payload(
+            f'{{"asset_id": "{ASSET_ID}", "time_utc": "2024-01-01T00:00:00+00:00"}}'
+        )
+
+        assert result == PositionNotification(asset_id=ASSET_ID, time_utc=TIME)
+
+    def test_coalesce(self):
+        """Notifications are reduced to the latest time per asset."""
+        other_id = ulid_parse("01BX5ZZKBKACTAV9WEVGEMMVRZ")
+        notifications = [
+            PositionNotification(asset_id=ASSET_ID, time_utc=TIME + timedelta(hours=1)),
+            PositionNotification(asset_id=ASSET_ID, time_utc=TIME),
+            PositionNotification(asset_id=other_id, time_utc=TIME),
+        ]
+
+        assert coalesce(notifications) == {ASSET_ID: TIME + timedelta(hours=1), other_id: TIME}
+
+
+class TestSubscriber:
+    """Test broadcaster subscribers."""
+
+    def test_offer_get(self):
+        """Updates are returned in order."""
+
+        async def run() -> list:
+            subscriber = Subscriber(size=2)
+            subscriber.offer("a")
+            subscriber.offer("b")
+            return [await subscriber.get(), await subscriber.get()]
+
+        assert asyncio.run(run()) == ["a", "b"]
+
+    def test_offer_full(self):
+        """Slow subscribers are sent a marker for the current state instead of queued updates."""
+
+        async def run() -> list:
+            subscriber = Subscriber(size=2)
+            for update in ["a", "b", "c", "d"]:
+                subscriber.offer(update)
+            result = [await subscriber.get()]
+            subscriber.offer("e")
+            result.append(await subscriber.get())
+            return result
+
+        assert asyncio.run(run()) == [None, "e"]
+
+    def test_resync(self):
+        """Queued updates can be replaced with a marker for the current state."""
+
+        async def run() -> list:
+            subscriber = Subscriber(size=2)
+            subscriber.offer("a")
+            subscriber.resync()
+            subscriber.resync()
+            subscriber.offer("b")
+            result = [await subscriber.get()]
+            subscriber.offer("c")
+            result.append(await subscriber.get())
+            return result
+
+        assert asyncio.run(run()) == [None, "c"]
+
+    def test_get_timeout(self):
+        """Waiting for an update can time out."""
+        with pytest.raises(TimeoutError):
+            asyncio.run(Subscriber(size=1).get(timeout=0.01))
+
+
+class TestPositionsBroadcaster:
+    """Test positions broadcaster."""
+
+    def test_subscribe(self, fx_logger: logging.Logger):
+        """Subscribers can be added and removed, up to a limit."""
+        broadcaster = PositionsBroadcaster(dsn="", query=_query, logger=fx_logger, max_subscribers=1)
+
+        subscriber = broadcaster.subscribe()
+        with pytest.raises(TooManySubscribersError):
+            broadcaster.subscribe()
+        broadcaster.unsubscribe(subscriber)
+
+        assert broadcaster.subscribers == 0
+
+    def test_handle(self, fx_logger: logging.Logger):
+        """Notifications are published to subscribers as a single update, invalidating the current state."""
+
+        async def run() -> tuple[str | None, list]:
+            queries = []
+
+            async def query(asset_ids: list | None) -> str:
+                queries.append(asset_ids)
+                return await _query(asset_ids)
+
+            broadcaster = PositionsBroadcaster(dsn="", query=query, logger=fx_logger)
+            broadcaster._listening.set()
+            subscriber = broadcaster.subscribe()
+            await broadcaster.current()
+            await broadcaster.current()
+            await broadcaster._handle([Notify(CHANNEL, PAYLOAD, 1), Notify(CHANNEL, PAYLOAD, 1)])
+            await broadcaster._handle([Notify(CHANNEL, "invalid", 1)])
+            await broadcaster.current()
+            return await subscriber.get(), queries
+
+        update, queries = asyncio.run(run())
+
+        assert update == str(ASSET_ID)
+        assert queries == [None, [ASSET_ID], None]
+
+    def test_current_not_listening(self, fx_logger: logging.Logger):
+        """Current state isn't cached while not listening, as changes would be missed."""
+
+        async def run() -> list:
+            queries = []
+
+            async def query(asset_ids: list | None) -> str:
+                queries.append(asset_ids)
+                return await _query(asset_ids)
+
+            broadcaster = PositionsBroadcaster(dsn="", query=query, logger=fx_logger)
+            await broadcaster.current()
+            await broadcaster.current()
+            return queries
+
+        assert asyncio.run(run()) == [None, None]
+
+    def test_resync(self, fx_logger: logging.Logger):
+        """Resyncing invalidates the current state and marks subscribers as needing it."""
+
+        async def run() -> tuple[str | None, list]:
+            queries = []
+
+            async def query(asset_ids: list | None) -> str:
+                queries.append(asset_ids)
+                return await _query(asset_ids)
+
+            broadcaster = PositionsBroadcaster(dsn="", query=query, logger=fx_logger)
+            broadcaster._listening.set()
+            subscriber = broadcaster.subscribe()
+            subscriber.offer("a")
+            await broadcaster.current()
+            broadcaster._resync()
+            await broadcaster.current()
+            return await subscriber.get(), queries
+
+        update, queries = asyncio.run(run())
+
+        assert update is None
+        assert queries == [None, None]
+
+    def test_retry(self, caplog: pytest.LogCaptureFixture, fx_logger: logging.Logger):
+        """Listening is retried if the database can't be reached."""
+
+        async def run() -> None:
+            broadcaster = PositionsBroadcaster(
+                dsn="postgresql://invalid@127.0.0.1:1/invalid", query=_query, logger=fx_logger, retry=0.01
+            )
+            await broadcaster.start(wait=0.05)
+            await broadcaster.stop()
+            await broadcaster.stop()
+
+        asyncio.run(run())
+
+        assert "Error listening for new positions, retrying in 0.01 seconds." in caplog.text
+
+    def test_listen(
+        self,
+        fx_logger: logging.Logger,
+        fx_db_client_tmp_db_mig: DatabaseClient,
+        fx_positions_client_empty: PositionsClient,
+        fx_asset: Asset,
+    ):
+        """Subscribers are sent updates for assets as positions are inserted."""
+        info = fx_db_client_tmp_db_mig.conn.info
+        batch = PositionBatch.from_rows(
+            [{"asset_id": fx_asset.id, "time": TIME, "lon": 0, "lat": 0, "labels": Labels([])}]
+        )
+
+        async def run() -> str | None:
+            broadcaster = PositionsBroadcaster(
+                dsn=make_conninfo(info.dsn, password=info.password), query=_query, logger=fx_logger, debounce=0.1
+            )
+            await broadcaster.start(wait=5)
+            subscriber = broadcaster.subscribe()
+            fx_positions_client_empty.add_batch(batch)
+            try:
+                return await subscriber.get(timeout=5)
+            finally:
+                await broadcaster.stop()
+
+        assert asyncio.run(run()) == str(fx_asset.id)
+
+    def test_reconnect(self, fx_logger: logging.Logger, fx_db_client_tmp_db_mig: DatabaseClient):
+        """Subscribers are marked as needing the current state when listening resumes after a connection is lost."""
+        info = fx_db_client_tmp_db_mig.conn.info
+
+        async def run() -> str | None:
+            broadcaster = PositionsBroadcaster(
+                dsn=make_conninfo(info.dsn, password=info.password), query=_query, logger=fx_logger, retry=0.01
+            )
+            await broadcaster.start(wait=5)
+            subscriber = broadcaster.subscribe()
+            fx_db_client_tmp_db_mig.execute(
+                SQL("""
+                    SELECT pg_terminate_backend(pid)
+                    FROM pg_stat_activity
+                    WHERE query LIKE 'LISTEN%' AND pid <> pg_backend_pid();
+                """)
+            )
+            try:
+                return await subscriber.get(timeout=5)
+            finally:
+                await broadcaster.stop()
+
+        assert asyncio.run(run()) is None
@@ -1,8 +1,10 @@
 import logging
+from collections.abc import Generator
 from contextlib import suppress
 from copy import deepcopy
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from importlib.metadata import version
+from pathlib import Path
 from typing import Literal, TypedDict
 from unittest.mock import MagicMock, PropertyMock
 from uuid import uuid4
@@ -12,27 +14,33 @@ from arcgis.gis import Item, ItemTypeEnum, SharingLevel
 from lantern.lib.metadata_library.models.record.record import Record as LibRecord
 from mygeotab import MyGeotabException, TimeoutException
 from psycopg import Connection
+from psycopg.conninfo import make_conninfo
 from psycopg.sql import SQL
+from psycopg.types.json import Jsonb
 from pytest_mock import MockerFixture
 from pytest_postgresql import factories
 from requests import HTTPError
 from shapely import Point
+from starlette.testclient import TestClient
 from typer.testing import CliRunner
 from ulid import ULID
 from ulid import parse as ulid_parse
 
+from assets_tracking_service.api import make_app
 from assets_tracking_service.cli import app_cli
 from assets_tracking_service.config import Config
 from assets_tracking_service.db import DatabaseClient, DatabaseError
 from assets_tracking_service.exporters.arcgis import ArcGisExporter, ArcGisExporterLayer
+from assets_tracking_service.exporters.cache import ExportCache
 from assets_tracking_service.exporters.catalogue import CollectionRecord, DataCatalogueExporter, LayerRecord
 from assets_tracking_service.exporters.exporters_manager import ExportersManager
+from assets_tracking_service.exporters.vector_tiles import VectorTilesExporter
 from assets_tracking_service.lib.bas_esri_utils.client import ArcGisClient
 from assets_tracking_service.lib.bas_esri_utils.models.item import Item as CatalogueItemArcGis
 from assets_tracking_service.models.asset import Asset, AssetNew, AssetsClient
 from assets_tracking_service.models.label import Label, LabelRelation, Labels
 from assets_tracking_service.models.layer import Layer, LayerNew, LayersClient
-from assets_tracking_service.models.position import Position, PositionNew, PositionsClient
+from assets_tracking_service.models.position import Position, PositionBatch, PositionNew, PositionsClient
 from assets_tracking_service.models.record import Record, RecordNew, RecordsClient
 from assets_tracking_service.providers.aircraft_tracking import AircraftTrackingProvider
 from assets_tracking_service.providers.geotab import GeotabProvider
@@ -121,6 +129,35 @@ def fx_db_client_tmp_db_mig(fx_db_client_tmp_db: DatabaseClient) -> DatabaseClie
     return fx_db_client_tmp_db
 
 
+@pytest.fixture()
+def fx_db_client_tmp_db_positions_many(fx_db_client_tmp_db_mig: DatabaseClient) -> DatabaseClient:
+    """
+    Database client with a migrated, disposable, database with many synthetic positions, for checking query plans.
+
+    Positions are added a minute apart, in time order, for a single asset. Statistics are updated for the query planner.
+    """
+    fx_db_client_tmp_db_mig.execute(
+        SQL("""
+            WITH a AS (
+                INSERT INTO public.asset (labels) VALUES (%s) RETURNING id
+            )
+            INSERT INTO public.position (asset_id, geom, time_utc, labels, created_at)
+            SELECT
+                a.id,
+                ST_SETSRID(ST_MAKEPOINT(-180 + (i % 3600) / 10.0, -80 + (i % 1600) / 100.0, 0), 4326),
+                '2025-01-01'::timestamptz + i * INTERVAL '1 minute',
+                '{"version": "1", "values": []}',
+                '2025-01-01'::timestamptz + i * INTERVAL '1 minute'
+            FROM a, generate_series(1, 50000) AS i;
+        """),
+        params=(
+            Jsonb(Labels([Label(rel=LabelRelation.SELF, scheme="skos:prefLabel", value="x")]), dumps=Labels.dumps),
+        ),
+    )
+    fx_db_client_tmp_db_mig.execute(SQL("""ANALYZE public.position;"""))
+    return fx_db_client_tmp_db_mig
+
+
 @pytest.fixture()
 def fx_db_client_tmp_db_pop(
     mocker: MockerFixture,
@@ -137,6 +174,8 @@ def fx_db_client_tmp_db_pop(
     providers._providers = [fx_provider_example]
     providers.fetch_active_assets()
     providers.fetch_latest_positions()
+    # as at the start of an export
+    LayersClient(db_client=fx_db_client_tmp_db_mig, logger=fx_logger).refresh_extents()
 
     # Set system created_at for layer added my migration to controlled value, as field is exposed in Layer model
     fx_db_client_tmp_db_mig.execute(
@@ -167,6 +206,15 @@ def fx_db_client_tmp_db_pop_exported(
     return fx_db_client_tmp_db_pop
 
 
+@pytest.fixture()
+def fx_api_client(fx_db_client_tmp_db_pop: DatabaseClient) -> Generator[TestClient, None, None]:
+    """API test client using a populated, disposable, database."""
+    info = fx_db_client_tmp_db_pop.conn.info
+    app = make_app(dsn=make_conninfo(info.dsn, password=info.password))
+    with TestClient(app) as client:
+        yield client
+
+
 @pytest.fixture()
 def fx_cli() -> CliRunner:
     """CLI testing fixture."""
@@ -347,7 +395,7 @@ def fx_assets_client_one(
     fx_assets_client_empty: AssetsClient, fx_asset_new: AssetNew, fx_asset_id: ULID
 ) -> AssetsClient:
     """Assets client setup using a disposable, migrated, database with a stored asset."""
-    fx_assets_client_empty.add(asset=fx_asset_new)
+    fx_assets_client_empty.add(asset=fx_asset_new, dist_label_scheme="skos:prefLabel")
 
     # update asset with the expected id
     # noinspection PyTypeChecker,PyProtectedMember,PyUnresolvedReferences
@@ -374,7 +422,7 @@ def fx_assets_client_many(fx_assets_client_one: AssetsClient) -> AssetsClient:
         )
     )
 
-    fx_assets_client_one.add(asset=asset_two)
+    fx_assets_client_one.add(asset=asset_two, dist_label_scheme="skos:prefLabel")
     # update asset with the expected id
     # noinspection PyTypeChecker,PyProtectedMember,PyUnresolvedReferences
     fx_assets_client_one._db.execute(
@@ -449,6 +497,33 @@ def fx_positions_client_empty(fx_assets_client_one: AssetsClient) -> PositionsCl
     return PositionsClient(db_client=fx_assets_client_one._db)
 
 
+@pytest.fixture()
+def fx_positions_client_many(
+    fx_positions_client_empty: PositionsClient, fx_asset: Asset, fx_position_time: datetime
+) -> PositionsClient:
+    """
+    Positions client using a disposable, migrated, database with stored positions for an asset.
+
+    Positions are at hourly intervals from the position time, along the equator from 0 to 4 degrees longitude. The
+    second and third positions share the same time.
+    """
+    hours = [0, 1, 1, 2, 3]
+    batch = PositionBatch.from_rows(
+        [
+            {
+                "asset_id": fx_asset.id,
+                "time": fx_position_time + timedelta(hours=hour),
+                "lon": i,
+                "lat": 0,
+                "labels": Labels([]),
+            }
+            for i, hour in enumerate(hours)
+        ]
+    )
+    fx_positions_client_empty.add_batch(batch)
+    return fx_positions_client_empty
+
+
 @pytest.fixture()
 def fx_record_layer_slug() -> str:
     """Record/Layer slug."""
@@ -701,6 +776,12 @@ def fx_exporter_arcgis(
     return ArcGisExporter(config=fx_config, db=fx_db_client_tmp_db_pop, logger=fx_logger)
 
 
+@pytest.fixture()
+def fx_export_cache(fx_db_client_tmp_db_pop_exported: DatabaseClient, fx_logger: logging.Logger) -> ExportCache:
+    """Export cache using a disposable, migrated and exported database."""
+    return ExportCache(db=fx_db_client_tmp_db_pop_exported, logger=fx_logger)
+
+
 @pytest.fixture()
 def fx_exporter_collection_record(
     fx_config: Config,
@@ -736,6 +817,19 @@ def fx_exporter_catalogue(
     return DataCatalogueExporter(config=fx_config, db=fx_db_client_tmp_db_pop, logger=fx_logger)
 
 
+@pytest.fixture()
+def fx_exporter_vector_tiles(
+    tmp_path: Path,
+    fx_config: Config,
+    fx_db_client_tmp_db_pop: DatabaseClient,
+    fx_logger: logging.Logger,
+) -> VectorTilesExporter:
+    """VectorTilesExporter writing to a temporary archive."""
+    exporter = VectorTilesExporter(config=fx_config, db=fx_db_client_tmp_db_pop, logger=fx_logger)
+    exporter._output_path = tmp_path / "tiles" / "assets.mbtiles"
+    return exporter
+
+
 @pytest.fixture()
 def fx_exporters_manager_no_exporters(
     mocker: MockerFixture, fx_db_client_tmp_db_pop: DatabaseClient, fx_logger: logging.Logger
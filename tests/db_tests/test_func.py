@@ -1,11 +1,15 @@
 from uuid import UUID
 
 import pytest
-from psycopg.sql import SQL
+from psycopg.sql import SQL, Composable, Identifier
 from psycopg.types.json import Jsonb
+from ulid import ULID
 from ulid import parse as ulid_parse
 
 from assets_tracking_service.db import DatabaseClient, DatabaseError
+from assets_tracking_service.models.asset import AssetsClient
+
+_LABEL = {"rel": "self", "scheme": "skos:prefLabel", "value": "foo", "creation": 1339338620}
 
 
 class TestDbFuncUlid:
@@ -41,6 +45,44 @@ class TestDbFuncUlid:
         assert result[0][0] == "01HYR9NC4WSVF2ZR0AHQCV1SE8"
 
 
+class TestDbUlidColumns:
+    """Test persisted ULID columns."""
+
+    def test_columns(self, fx_db_client_tmp_db_pop: DatabaseClient):
+        """Persisted ULIDs match ULIDs encoded when queried."""
+        result = fx_db_client_tmp_db_pop.get_query_result(
+            SQL("""
+                SELECT
+                    (SELECT COUNT(*) FROM public.asset WHERE id_ulid IS DISTINCT FROM uuid_to_ulid(id)),
+                    (SELECT COUNT(*) FROM public.position WHERE id_ulid IS DISTINCT FROM uuid_to_ulid(id)),
+                    (SELECT COUNT(*) FROM public.position WHERE asset_id_ulid IS DISTINCT FROM uuid_to_ulid(asset_id)),
+                    (SELECT COUNT(*) FROM public.position);
+            """)
+        )
+        assert result[0][:3] == (0, 0, 0)
+        assert result[0][3] > 0
+
+    def test_util_view(self, fx_db_client_tmp_db_pop: DatabaseClient):
+        """Basic utility view uses persisted ULIDs."""
+        result = fx_db_client_tmp_db_pop.get_query_result(
+            SQL("""
+                SELECT COUNT(*)
+                FROM v_util_basic AS ub
+                INNER JOIN public.position AS p ON ub.position_id = p.id_ulid
+                INNER JOIN public.asset AS a ON ub.asset_id = a.id_ulid;
+            """)
+        )
+        definition = fx_db_client_tmp_db_pop.get_query_result(SQL("""SELECT pg_get_viewdef('v_util_basic');"""))
+        assert result[0][0] > 0
+        assert "uuid_to_ulid" not in definition[0][0]
+
+    def test_id_changed(self, fx_assets_client_one: AssetsClient, fx_asset_id: ULID):
+        """Persisted ULIDs are updated if IDs change."""
+        # noinspection PyProtectedMember,PyUnresolvedReferences
+        result = fx_assets_client_one._db.get_query_result(SQL("""SELECT id_ulid FROM public.asset;"""))
+        assert result[0][0] == str(fx_asset_id)
+
+
 class TestDbFuncDdm:
     """test DDM coordinate formatting function."""
 
@@ -52,6 +94,124 @@ class TestDbFuncDdm:
         assert result[0][0] == '("30° 25.92\' E","40° 15.9\' N")'
 
 
+class TestDbPositionDerivedColumns:
+    """Test persisted derived position values."""
+
+    def test_columns(self, fx_db_client_tmp_db_pop: DatabaseClient):
+        """Persisted values match values computed when queried."""
+        result = fx_db_client_tmp_db_pop.get_query_result(
+            SQL("""
+                SELECT COUNT(*)
+                FROM public.position
+                WHERE geom_ddm IS DISTINCT FROM geom_as_ddm(geom)
+                OR elv_m IS DISTINCT FROM (
+                    CASE WHEN geom_dimensions = 2 THEN NULL ELSE round(st_z(geom)::numeric) END
+                )
+                OR elv_ft IS DISTINCT FROM (
+                    CASE WHEN geom_dimensions = 2 THEN NULL ELSE round(st_z(geom)::numeric * 3.281) END
+                )
+                OR velocity_kmh IS DISTINCT FROM round(velocity_ms::numeric * 3.6, 1)
+                OR velocity_kn IS DISTINCT FROM round(velocity_ms::numeric * 1.944, 1);
+            """)
+        )
+        assert result[0][0] == 0
+
+    def test_view(self, fx_db_client_tmp_db_pop: DatabaseClient):
+        """Latest positions view uses persisted values."""
+        result = fx_db_client_tmp_db_pop.get_query_result(
+            SQL("""
+                SELECT lp.lat_ddm, lp.lon_ddm, (geom_as_ddm(p.geom)).y, (geom_as_ddm(p.geom)).x
+                FROM v_latest_assets_pos AS lp
+                INNER JOIN public.position AS p ON lp.position_id = p.id_ulid;
+            """)
+        )
+        assert len(result) > 0
+        for lat_ddm, lon_ddm, expected_lat_ddm, expected_lon_ddm in result:
+            assert lat_ddm == expected_lat_ddm
+            assert lon_ddm == expected_lon_ddm
+
+
+def _explain(db: DatabaseClient, query: Composable) -> str:
+    """Query plan as text."""
+    return "\n".join(row[0] for row in db.get_query_result(SQL("EXPLAIN {}").format(query)))
+
+
+class TestDbPositionIndexes:
+    """Test query plans use position indexes."""
+
+    def test_geom_2d(self, fx_db_client_tmp_db_positions_many: DatabaseClient):
+        """Persisted 2D geometries match geometries derived when queried."""
+        result = fx_db_client_tmp_db_positions_many.get_query_result(
+            SQL("""SELECT COUNT(*) FROM public.position WHERE NOT ST_EQUALS(geom_2d, ST_FORCE2D(geom));""")
+        )
+        assert result[0][0] == 0
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            SQL("SELECT id FROM public.position WHERE geom_2d && ST_MAKEENVELOPE(0, -70, 1, -69, 4326);"),
+            SQL("SELECT id FROM public.position WHERE ST_INTERSECTS(geom_2d, ST_MAKEENVELOPE(0, -70, 1, -69, 4326));"),
+        ],
+    )
+    def test_bbox(self, fx_db_client_tmp_db_positions_many: DatabaseClient, query: SQL):
+        """Spatial filters on 2D geometries use a spatial index."""
+        assert "position_geom_2d_idx" in _explain(fx_db_client_tmp_db_positions_many, query)
+
+    @pytest.mark.parametrize("column", ["time_utc", "created_at"])
+    def test_time_range(self, fx_db_client_tmp_db_positions_many: DatabaseClient, column: str):
+        """Time range filters use an index rather than scanning the table."""
+        query = SQL(
+            "SELECT id FROM public.position WHERE {column} >= '2025-01-20' AND {column} < '2025-01-21';"
+        ).format(column=Identifier(column))
+
+        assert f"position_{column}_idx" in _explain(fx_db_client_tmp_db_positions_many, query)
+
+
+class TestDbLabelSet:
+    """Test shared position labels stored as label sets."""
+
+    def test_digest(self, fx_db_client_tmp_db_mig: DatabaseClient):
+        """Label sets are identified by their content, regardless of formatting, key order or label creation times."""
+        result = fx_db_client_tmp_db_mig.get_query_result(
+            SQL("""
+                SELECT
+                    labels_digest('{"version": "1", "values": []}'::jsonb),
+                    labels_digest('{"values":[],"version":"1"}'::jsonb),
+                    labels_digest('{"version": "1", "values": [{}]}'::jsonb),
+                    labels_digest('{"version": "1", "values": [{"value": "x", "creation": 1}]}'::jsonb),
+                    labels_digest('{"version": "1", "values": [{"value": "x", "creation": 2}]}'::jsonb),
+                    labels_digest('{"version": "1", "values": [{"value": "y", "creation": 1}]}'::jsonb);
+            """)
+        )
+        assert result[0][0] == result[0][1]
+        assert result[0][0] != result[0][2]
+        # creation times are ignored
+        assert result[0][3] == result[0][4]
+        assert result[0][3] != result[0][5]
+
+    def test_positions(self, fx_db_client_tmp_db_pop: DatabaseClient):
+        """Provider labels are shared between positions and included in the compatibility view."""
+        result = fx_db_client_tmp_db_pop.get_query_result(
+            SQL("""
+                SELECT
+                    (SELECT COUNT(*) FROM public.label_set),
+                    (SELECT COUNT(DISTINCT label_set_id) FROM public.position),
+                    (SELECT COUNT(*) FROM public.position WHERE labels -> 'values' @> '[{"rel": "provider"}]'),
+                    (
+                        SELECT COUNT(*)
+                        FROM public.v_position_labels
+                        WHERE labels -> 'values' @> '[{"scheme": "ats:provider_id"}]'
+                    ),
+                    (SELECT COUNT(*) FROM public.position);
+            """)
+        )
+        label_sets, referenced, inline, viewed, positions = result[0]
+        assert label_sets == referenced
+        assert 0 < label_sets < positions
+        assert inline == 0
+        assert viewed == positions
+
+
 class TestDbFuncLabelsValidity:
     """Test label validation function."""
 
@@ -243,6 +403,69 @@ class TestDbFuncLabelsValidity:
                 },
             )
 
+    @pytest.mark.parametrize(
+        "labels",
+        [
+            {"version": "1", "values": [_LABEL]},
+            {"version": "1", "values": [_LABEL, {**_LABEL, "scheme": "foo", "rel": None}]},
+            {"version": "1", "values": []},
+            {"version": "1", "values": [_LABEL, _LABEL]},
+            {"version": "1", "values": [{**_LABEL, "scheme": "foo"}]},
+            {"version": "1", "values": [{**_LABEL, "scheme": 1}]},
+            {"version": "2", "values": [_LABEL]},
+            {"version": None, "values": [_LABEL]},
+            {"version": None, "values": ["invalid"]},
+            {"values": [_LABEL]},
+            {"version": "1"},
+            {"version": "1", "values": ["invalid"]},
+            {"version": "1", "values": [[_LABEL]]},
+            {"version": "1", "values": [None, _LABEL]},
+            *[{"version": "1", "values": [{k: v for k, v in _LABEL.items() if k != key}]} for key in _LABEL],
+            ["version", "values"],
+            ["invalid"],
+            "invalid",
+        ],
+    )
+    def test_equivalent(self, fx_db_client_tmp_db_mig: DatabaseClient, labels: dict | list | str):
+        """Labels are valid or invalid as with previous, PL/pgSQL, validation functions."""
+        legacy = next(
+            migration
+            for migration in DatabaseClient._list_migrations("down")
+            if migration.name == "965-labels-validation-sql"
+        )
+        legacy_sql = legacy.sql[: legacy.sql.index("-- record latest migration")].replace(
+            "FUNCTION are_labels_v1_valid", "FUNCTION pg_temp.legacy_are_labels_v1_valid"
+        )
+        fx_db_client_tmp_db_mig.execute(SQL(legacy_sql))
+
+        # check constraints pass if null
+        result = fx_db_client_tmp_db_mig.get_query_result(
+            SQL("""
+                SELECT
+                    coalesce(are_labels_v1_valid(%(labels)s), TRUE),
+                    coalesce(pg_temp.legacy_are_labels_v1_valid(%(labels)s), TRUE),
+                    coalesce(are_labels_v1_valid_asset(%(labels)s), TRUE),
+                    coalesce(pg_temp.legacy_are_labels_v1_valid_asset(%(labels)s), TRUE);
+            """),
+            params={"labels": Jsonb(labels)},
+        )
+        valid, legacy_valid, valid_asset, legacy_valid_asset = result[0]
+        assert valid == legacy_valid
+        assert valid_asset == legacy_valid_asset
+
+    def test_inlined(self, fx_db_client_tmp_db_mig: DatabaseClient):
+        """Validation functions are SQL functions, able to be inlined."""
+        result = fx_db_client_tmp_db_mig.get_query_result(
+            SQL("""
+                SELECT p.proname, l.lanname
+                FROM pg_proc AS p
+                INNER JOIN pg_language AS l ON p.prolang = l.oid
+                WHERE p.proname IN ('are_labels_v1_valid', 'are_labels_v1_valid_asset')
+                ORDER BY p.proname;
+            """)
+        )
+        assert result == [("are_labels_v1_valid", "sql"), ("are_labels_v1_valid_asset", "sql")]
+
 
 class TestDbFuncSetUpdatedAt:
     """test `updated_at` column updated on change."""
@@ -279,3 +502,77 @@ class TestDbFuncSetUpdatedAt:
         updated_value = updated_result[0][0]
 
         assert updated_value != initial_value
+
+
+class TestDbFuncAssetsTracks:
+    """Test asset track functions."""
+
+    @staticmethod
+    def _insert_track(db_client: DatabaseClient) -> UUID:
+        """Insert positions forming a track for an asset without existing positions."""
+        asset_id = db_client.get_query_result(
+            SQL("""SELECT id FROM public.asset WHERE id NOT IN (SELECT asset_id FROM public.position) LIMIT 1;""")
+        )[0][0]
+        for i, (x, y) in enumerate([(0, 0), (1, 0.00001), (2, 0)]):
+            db_client.execute(
+                SQL("""
+                    INSERT INTO public.position (asset_id, geom, time_utc, labels)
+                    VALUES (
+                        %(asset_id)s,
+                        ST_SetSRID(ST_MakePoint(%(x)s, %(y)s, 0), 4326),
+                        now() - make_interval(mins => %(mins)s),
+                        '{"version": "1", "values": []}'::jsonb
+                    );
+                """),
+                params={"asset_id": asset_id, "x": x, "y": y, "mins": 30 - i},
+            )
+        return asset_id
+
+    @pytest.mark.parametrize(
+        ("tolerance", "smoothing", "expected"),
+        [(0, 0, 3), (0.001, 0, 2), (0, 1, 6)],
+    )
+    def test_tracks_since(
+        self, fx_db_client_tmp_db_pop: DatabaseClient, tolerance: float, smoothing: int, expected: int
+    ):
+        """Tracks are built from positions in time order and simplified/smoothed as requested."""
+        asset_id = self._insert_track(fx_db_client_tmp_db_pop)
+
+        result = fx_db_client_tmp_db_pop.get_query_result(
+            SQL("""
+                SELECT positions_count, ST_NPoints(geom_2d), ST_X(ST_StartPoint(geom_2d))
+                FROM assets_tracks_since(now() - INTERVAL '1 hour', %(tolerance)s, %(smoothing)s)
+                WHERE asset_id = %(asset_id)s;
+            """),
+            params={"tolerance": tolerance, "smoothing": smoothing, "asset_id": asset_id},
+        )
+
+        assert result[0][0] == 3
+        assert result[0][1] == expected
+        assert result[0][2] == 0
+
+    def test_tracks_since_window(self, fx_db_client_tmp_db_pop: DatabaseClient):
+        """Tracks only include positions within the window and need at least two positions."""
+        asset_id = self._insert_track(fx_db_client_tmp_db_pop)
+
+        result = fx_db_client_tmp_db_pop.get_query_result(
+            SQL("""
+                SELECT asset_id
+                FROM assets_tracks_since(now() - INTERVAL '28 minutes 30 seconds', 0)
+                WHERE asset_id = %(asset_id)s;
+            """),
+            params={"asset_id": asset_id},
+        )
+
+        assert result == []
+
+    def test_season_start(self, fx_db_client_tmp_db_mig: DatabaseClient):
+        """Season starts on the most recent 1st October."""
+        result = fx_db_client_tmp_db_mig.get_query_result(
+            SQL("""SELECT season_start(), season_start() <= now(), now() - season_start() < INTERVAL '1 year';""")
+        )
+
+        assert result[0][0].month == 10
+        assert result[0][0].day == 1
+        assert result[0][1] is True
+        assert result[0][2] is True
@@ -8,6 +8,8 @@ from assets_tracking_service.exporters.base_exporter import Exporter
 class ExampleExporter(Exporter):
     """Minimal Exporter for testing."""
 
+    name = "example"
+
     # noinspection PyUnusedLocal
     def __init__(self, config: Config, db: DatabaseClient, logger: logging.Logger) -> None:
         pass
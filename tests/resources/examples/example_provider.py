@@ -2,12 +2,10 @@ import logging
 from collections.abc import Generator
 from datetime import UTC, datetime
 
-from shapely import Point
-
 from assets_tracking_service.config import Config
 from assets_tracking_service.models.asset import Asset, AssetNew
 from assets_tracking_service.models.label import Label, LabelRelation, Labels
-from assets_tracking_service.models.position import PositionNew
+from assets_tracking_service.models.position import PositionBatch
 from assets_tracking_service.providers.base_provider import Provider
 
 
@@ -48,21 +46,30 @@ class ExampleProvider(Provider):
 
             yield AssetNew(labels=labels)
 
-    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionNew, None, None]:
+    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionBatch, None, None]:
         """Fetch latest positions for assets."""
         asset = assets[0]
 
+        rows = []
         for i in range(3):
             value = f"example-position-{i}"
 
-            yield PositionNew(
-                asset_id=asset.id,
-                time=datetime.now(tz=UTC),
-                geom=Point(0, 0, 0),
-                labels=Labels(
-                    [
-                        Label(rel=LabelRelation.SELF, scheme=self.distinguishing_position_label_scheme, value=value),
-                        *self.provider_labels,
-                    ]
-                ),
+            rows.append(
+                {
+                    "asset_id": asset.id,
+                    "time": datetime.now(tz=UTC),
+                    "lon": 0,
+                    "lat": 0,
+                    "z": 0,
+                    "labels": Labels(
+                        [
+                            Label(
+                                rel=LabelRelation.SELF, scheme=self.distinguishing_position_label_scheme, value=value
+                            ),
+                            *self.provider_labels,
+                        ]
+                    ),
+                }
             )
+
+        yield PositionBatch.from_rows(rows)
@@ -0,0 +1,130 @@
+import logging
+from collections.abc import Generator
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+
+from assets_tracking_service.config import Config
+from assets_tracking_service.models.asset import Asset, AssetNew
+from assets_tracking_service.models.label import Label, LabelRelation, Labels, label_creation
+from assets_tracking_service.models.position import PositionBatch
+from tests.resources.examples.example_provider import ExampleProvider
+
+# NVS L06 platform codes for ships, aircraft, and vehicles
+PLATFORM_CODES = ["31", "62", "15", "97", "98"]
+
+
+class SyntheticProvider(ExampleProvider):
+    """
+    Synthetic Provider for benchmarking.
+
+    Generates a configurable fleet of assets, each with a number of new positions per fetch. Positions follow a random
+    walk around Antarctica and have labels similar in size and shape to those from the Geotab provider.
+
+    Generated data is reproducible for a given seed. Each fetch returns positions later than the previous fetch.
+    """
+
+    name = "synthetic"
+    prefix = name
+    version = "2025-01-01"
+    distinguishing_asset_label_scheme = f"{prefix}:asset_id"
+    distinguishing_position_label_scheme = f"{prefix}:position_id"
+
+    def __init__(
+        self,
+        config: Config,
+        logger: logging.Logger,
+        assets: int = 10,
+        positions: int = 10,
+        interval: timedelta = timedelta(minutes=1),
+        seed: int = 0,
+    ) -> None:
+        super().__init__(config=config, logger=logger)
+        self._assets = assets
+        self._positions = positions
+        self._interval = interval
+        self._rng = np.random.default_rng(seed=seed)
+        self._time = datetime(2025, 1, 1, tzinfo=UTC)
+        self._fetches = 0
+
+    def fetch_active_assets(self) -> Generator[AssetNew, None, None]:
+        """Fetch active assets."""
+        for i in range(self._assets):
+            value = f"synthetic-asset-{i:05d}"
+            code = PLATFORM_CODES[i % len(PLATFORM_CODES)]
+            yield AssetNew(
+                labels=Labels(
+                    [
+                        Label(rel=LabelRelation.SELF, scheme="skos:prefLabel", value=f"Synthetic {i}"),
+                        Label(rel=LabelRelation.SELF, scheme=self.distinguishing_asset_label_scheme, value=value),
+                        Label(
+                            rel=LabelRelation.SELF,
+                            scheme="nvs:L06",
+                            scheme_uri="http://vocab.nerc.ac.uk/collection/L06/current",
+                            value=code,
+                            value_uri=f"http://vocab.nerc.ac.uk/collection/L06/current/{code}",
+                        ),
+                        *self.provider_labels,
+                    ]
+                )
+            )
+
+    def _status_labels(self, asset: int, position: int, creation: int) -> list[Label]:
+        """Fake device status labels, similar to those from the Geotab provider."""
+        status = {
+            "device_id": f"b{asset:04x}",
+            "is_device_communicating": True,
+            "is_driving": position % 2 == 0,
+            "current_state_duration": f"00:{position % 60:02d}:00",
+            "device_name": f"Synthetic {asset}",
+            "device_serial_number": f"S9{asset:010d}",
+        }
+        return [
+            Label(rel=LabelRelation.SELF, scheme=f"{self.prefix}:{key}", value=value, creation=creation)
+            for key, value in status.items()
+        ]
+
+    def fetch_latest_positions(self, assets: list[Asset]) -> Generator[PositionBatch, None, None]:
+        """Fetch latest positions for assets."""
+        indexed_assets = self._index_assets(assets)
+        creation = label_creation()
+        provider_labels = list(self.provider_labels)
+        rows = []
+
+        for i in range(self._assets):
+            asset = indexed_assets.get(f"synthetic-asset-{i:05d}")
+            if asset is None:
+                continue
+
+            lon = self._rng.uniform(-180, 180) + np.cumsum(self._rng.normal(0, 0.01, self._positions))
+            lat = self._rng.uniform(-80, -60) + np.cumsum(self._rng.normal(0, 0.01, self._positions))
+            velocity = self._rng.uniform(0, 20, self._positions)
+            heading = self._rng.uniform(0, 360, self._positions)
+            for j in range(self._positions):
+                rows.append(
+                    {
+                        "asset_id": asset.id,
+                        "time": self._time + self._interval * j,
+                        "lon": (lon[j] + 180) % 360 - 180,
+                        "lat": lat[j],
+                        "velocity": velocity[j],
+                        "heading": heading[j],
+                        "labels": Labels(
+                            [
+                                Label(
+                                    rel=LabelRelation.SELF,
+                                    scheme=self.distinguishing_position_label_scheme,
+                                    value=f"{i:05d}-{self._fetches:05d}-{j:05d}",
+                                    creation=creation,
+                                ),
+                                *self._status_labels(asset=i, position=j, creation=creation),
+                                *provider_labels,
+                            ]
+                        ),
+                    }
+                )
+
+        self._time += self._interval * self._positions
+        self._fetches += 1
+        if rows:
+            yield PositionBatch.from_rows(rows)